@@ -1,3 +1,6 @@
+import time
+
+from django.conf import settings
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.contrib import messages
@@ -80,4 +83,33 @@ class EmailVerificationMiddleware:
                 )
                 request.session[warning_key] = True
 
-        return self.get_response(request)
\ No newline at end of file
+        return self.get_response(request)
+
+
+class SessionRefreshMiddleware:
+    """
+    Keep active sessions alive without saving the session on every request.
+
+    With SESSION_SAVE_EVERY_REQUEST off a session's expiry only moves when it
+    is saved, so an existing, non-empty session is re-saved at most once every
+    SESSION_REFRESH_SECONDS while the visitor is active. Visitors without a
+    session never get one from here. Must come after SessionMiddleware.
+    """
+
+    REFRESHED_KEY = '_session_refreshed_at'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        session = getattr(request, 'session', None)
+        if session is None or not session.session_key or session.is_empty():
+            return response
+
+        now = int(time.time())
+        refresh_seconds = getattr(settings, 'SESSION_REFRESH_SECONDS', 5 * 60)
+        if not session.modified and now - session.get(self.REFRESHED_KEY, 0) >= refresh_seconds:
+            session[self.REFRESHED_KEY] = now
+        return response
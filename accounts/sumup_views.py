@@ -300,11 +300,8 @@ class SumUpStatusView(View):
             # Check if token needs refreshing
             if artist_profile.sumup_token_expired:
                 try:
-                    # Refresh the token
-                    new_token_data = sumup_api.refresh_access_token_direct(
-                        artist_profile.sumup_refresh_token
-                    )
-                    artist_profile.update_sumup_connection(new_token_data)
+                    # Refresh the token (single-flight with checkout/polling paths)
+                    sumup_api.token_manager.refresh_artist_token(artist_profile)
                     messages.success(request, "SumUp connection refreshed successfully.")
 
                 except Exception as e:
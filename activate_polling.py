@@ -53,17 +53,17 @@ def check_schedule():
         except Exception:
             print(f"   Last Run: Unable to determine")
 
-        if schedule.minutes != 5:
-            print(f"\n⚠️  WARNING: Schedule interval is {schedule.minutes} minutes, expected 5 minutes")
+        if schedule.minutes != 1:
+            print(f"\n⚠️  WARNING: Schedule interval is {schedule.minutes} minutes, expected 1 minute")
             response = input("Do you want to fix this? (y/n): ")
             if response.lower() == 'y':
-                schedule.minutes = 5
+                schedule.minutes = 1
                 schedule.save()
-                print("✅ Fixed! Schedule now runs every 5 minutes")
+                print("✅ Fixed! Schedule now runs every minute")
 
         if not schedule.name:
             print("\n💡 TIP: Schedule has no name. Adding descriptive name...")
-            schedule.name = 'Payment Polling - Every 5 Minutes'
+            schedule.name = 'Payment Polling - Every Minute'
             schedule.save()
             print("✅ Name added!")
 
@@ -73,10 +73,10 @@ def check_schedule():
         print("\nCreating schedule now...")
 
         schedule = Schedule.objects.create(
-            name='Payment Polling - Every 5 Minutes',
+            name='Payment Polling - Every Minute',
             func='payments.polling_service.polling_service.process_pending_payments',
             schedule_type='I',  # Interval
-            minutes=5,
+            minutes=1,
             repeats=-1  # Forever
         )
 
@@ -0,0 +1,250 @@
+"""
+Session Cart
+============
+Anonymous visitors' carts live in their session, not in the database:
+
+    request.session['cart'] = {'<event id>': {'quantity': 2, 'price': '12.50'}, ...}
+
+A Cart/CartItem row is only written when the visitor shows purchase intent:
+
+    - CheckoutView materializes the session cart into an anonymous Cart row
+      (session_key set), remembered in request.session['cart_id']; from then
+      on that row is the visitor's cart
+    - logging in merges the session cart, or the materialized row, into the
+      user's active Cart (see merge_session_cart)
+
+get_cart(request) returns whichever applies: the user's Cart, the
+materialized anonymous Cart, or a SessionCart. SessionCart mirrors the parts
+of Cart the cart views and templates use (items, total_items, subtotal,
+shipping_cost, total), and its line items use the event id as their id.
+"""
+
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+SESSION_KEY = 'cart'
+MATERIALIZED_KEY = 'cart_id'
+
+
+class SessionCartItem:
+    """A line of a session cart, shaped like CartItem for templates."""
+
+    def __init__(self, event, quantity, price_at_time):
+        self.event = event
+        self.quantity = quantity
+        self.price_at_time = price_at_time
+
+    @property
+    def id(self):
+        return self.event.id
+
+    @property
+    def total_price(self):
+        return Decimal(str(self.quantity)) * self.price_at_time
+
+    @property
+    def is_available(self):
+        return (self.event.status == 'published' and
+                self.event.tickets_available >= self.quantity)
+
+
+class SessionCart:
+    """Cart for an anonymous visitor, held in the session."""
+
+    user = None
+
+    def __init__(self, request):
+        self.request = request
+        self.lines = request.session.get(SESSION_KEY, {})
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __bool__(self):
+        return bool(self.lines)
+
+    # Lines
+
+    def add(self, event, quantity):
+        """Add tickets for an event; returns the line's new quantity."""
+        line = self.lines.setdefault(str(event.id), {'quantity': 0, 'price': str(event.ticket_price)})
+        line['quantity'] += quantity
+        self._save()
+        return line['quantity']
+
+    def set_quantity(self, event_id, quantity):
+        """Set a line's quantity; zero or less removes it."""
+        if quantity < 1:
+            return self.remove(event_id)
+        if str(event_id) in self.lines:
+            self.lines[str(event_id)]['quantity'] = quantity
+            self._save()
+
+    def get_quantity(self, event_id):
+        return self.lines.get(str(event_id), {}).get('quantity', 0)
+
+    def remove(self, event_id):
+        if self.lines.pop(str(event_id), None) is not None:
+            self._save()
+
+    def clear(self):
+        self.lines = {}
+        self._save()
+
+    def _save(self):
+        from .summary import invalidate_cart_summary
+
+        self.request.session[SESSION_KEY] = self.lines
+        invalidate_cart_summary(self.request)
+
+    @property
+    def items(self):
+        """Line items with their events, loaded in one query."""
+        from events.models import Event
+
+        events = Event.objects.select_related('organiser').in_bulk([int(pk) for pk in self.lines])
+        return [
+            SessionCartItem(events[int(pk)], line['quantity'], Decimal(line['price']))
+            for pk, line in self.lines.items()
+            if int(pk) in events
+        ]
+
+    # Totals (no queries)
+
+    def get_totals(self):
+        return {
+            'total_items': sum(line['quantity'] for line in self.lines.values()),
+            'subtotal': sum(
+                (line['quantity'] * Decimal(line['price']) for line in self.lines.values()),
+                Decimal('0.00')
+            ),
+        }
+
+    @property
+    def total_items(self):
+        return self.get_totals()['total_items']
+
+    @property
+    def subtotal(self):
+        return self.get_totals()['subtotal']
+
+    @property
+    def shipping_cost(self):
+        from .models import Cart
+
+        return Cart.get_shipping_cost(self.subtotal)
+
+    @property
+    def total(self):
+        subtotal = self.subtotal
+        return subtotal + self.shipping_cost
+
+    # Persisting
+
+    def _line_items(self, cart):
+        from .models import CartItem
+
+        return [
+            CartItem(cart=cart, event=item.event, quantity=item.quantity, price_at_time=item.price_at_time)
+            for item in self.items
+        ]
+
+    def materialize(self):
+        """Write the session cart to an anonymous Cart row and switch the visitor to it."""
+        from .models import Cart
+
+        if not self.request.session.session_key:
+            self.request.session.create()
+
+        with transaction.atomic():
+            cart = Cart.objects.create(session_key=self.request.session.session_key)
+            line_items = cart.items.bulk_create(self._line_items(cart))
+
+        self.request.session[MATERIALIZED_KEY] = cart.pk
+        self.clear()
+        logger.info(f"Materialized session cart as cart {cart.pk} ({len(line_items)} lines)")
+        return cart
+
+    def merge_into(self, cart):
+        """Add the session cart's lines to a Cart, then empty the session cart."""
+        from .models import CartItem
+
+        with transaction.atomic():
+            existing = {item.event_id: item for item in cart.items.select_for_update()}
+            new_items = []
+            for item in self._line_items(cart):
+                if item.event_id in existing:
+                    existing[item.event_id].quantity += item.quantity
+                else:
+                    new_items.append(item)
+            CartItem.objects.bulk_update(existing.values(), ['quantity'])
+            CartItem.objects.bulk_create(new_items)
+
+        self.clear()
+
+
+def get_materialized_cart(request):
+    """The anonymous Cart row CheckoutView made for this visitor, if it is still active."""
+    from .models import Cart
+
+    cart_id = request.session.get(MATERIALIZED_KEY)
+    if not cart_id:
+        return None
+    # Not matched on session_key: login rotates the key before merge_session_cart runs
+    cart = Cart.objects.filter(pk=cart_id, user__isnull=True, is_active=True).first()
+    if cart is None:
+        del request.session[MATERIALIZED_KEY]
+    return cart
+
+
+def get_cart(request, create=False):
+    """
+    The visitor's cart.
+
+    Returns:
+        Cart for users (created if `create`) and for anonymous visitors past
+        checkout, SessionCart otherwise; None for a user without a cart
+    """
+    from .models import Cart
+
+    if request.user.is_authenticated:
+        if create:
+            return Cart.objects.get_or_create(user=request.user, is_active=True)[0]
+        return Cart.objects.filter(user=request.user, is_active=True).first()
+
+    return get_materialized_cart(request) or SessionCart(request)
+
+
+def get_checkout_cart(request):
+    """
+    The visitor's cart as a Cart row, for checkout.
+
+    Anonymous visitors' session carts are materialized here. Returns None
+    when there is nothing to check out.
+    """
+    cart = get_cart(request)
+    if isinstance(cart, SessionCart):
+        return cart.materialize() if cart else None
+    return cart
+
+
+def merge_session_cart(request, user):
+    """On login: move the visitor's anonymous cart into the user's active Cart."""
+    from .models import Cart
+
+    session_cart = SessionCart(request)
+    anonymous_cart = get_materialized_cart(request)
+    if not session_cart and anonymous_cart is None:
+        return
+
+    cart, _ = Cart.objects.get_or_create(user=user, is_active=True)
+    if anonymous_cart is not None:
+        if anonymous_cart.pk != cart.pk:
+            cart.merge_with(anonymous_cart)
+        del request.session[MATERIALIZED_KEY]
+    if session_cart:
+        session_cart.merge_into(cart)
@@ -1,23 +1,8 @@
-from .models import Cart
+from .summary import get_cart_summary
 
 
 def cart_context(request):
-    """Make cart available in all templates."""
-    cart = None
-    
-    if request.user.is_authenticated:
-        cart = Cart.objects.filter(
-            user=request.user,
-            is_active=True
-        ).first()
-    else:
-        session_key = request.session.session_key
-        if session_key:
-            cart = Cart.objects.filter(
-                session_key=session_key,
-                is_active=True
-            ).first()
-    
+    """Make the cart summary available in all templates; it is only loaded when used."""
     return {
-        'cart': cart if cart else None
+        'cart': get_cart_summary(request)
     }
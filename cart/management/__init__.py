@@ -0,0 +1 @@
+# Management module for cart app
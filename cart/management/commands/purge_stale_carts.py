@@ -0,0 +1,52 @@
+"""
+Management command to delete stale carts.
+
+Used by Django-Q on a daily schedule (or cron) to purge expired anonymous
+and checked-out carts (see cart.purge).
+
+Usage:
+    python manage.py purge_stale_carts
+    python manage.py purge_stale_carts --batch-size 1000 --max-batches 50
+"""
+
+from django.core.management.base import BaseCommand
+from cart.purge import cart_purge
+import logging
+
+logger = logging.getLogger('cart.purge')
+
+
+class Command(BaseCommand):
+    help = 'Delete expired anonymous and inactive carts in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Carts deleted per transaction (default: CART_PURGE_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            default=None,
+            help='Stop after this many batches (default: until none are left)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            stats = cart_purge.purge(
+                batch_size=options.get('batch_size'),
+                max_batches=options.get('max_batches'),
+            )
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Cart purge failed: {str(e)}'))
+            logger.error(f"Management command error: {e}", exc_info=True)
+            raise
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Purged {stats['carts']} stale carts "
+                f"({stats['items']} items, {stats['batches']} batches)"
+            )
+        )
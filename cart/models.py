@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from accounts.models import User
 from events.models import Event
@@ -29,55 +29,103 @@ class Cart(models.Model):
 
     class Meta:
         ordering = ['-updated_at']
+        indexes = [
+            # Active cart lookups (cart.cart.get_cart, cart.summary)
+            models.Index(fields=['user', 'is_active'], name='cart_cart_user_active_idx'),
+            models.Index(fields=['session_key', 'is_active'], name='cart_cart_session_active_idx'),
+            # Stale cart purge (cart.purge)
+            models.Index(fields=['updated_at'], name='cart_cart_updated_idx'),
+        ]
 
     def __str__(self):
         if self.user:
             return f"Cart for {self.user.username}"
         return f"Anonymous cart ({self.session_key[:8]}...)"
 
+    # Free shipping over this subtotal, otherwise a fixed rate (Jersey is small)
+    FREE_SHIPPING_OVER = Decimal('100.00')
+    SHIPPING_RATE = Decimal('5.00')
+
+    @classmethod
+    def get_shipping_cost(cls, subtotal):
+        """Shipping cost for a cart subtotal."""
+        if subtotal > cls.FREE_SHIPPING_OVER:
+            return Decimal('0.00')
+        return cls.SHIPPING_RATE
+
+    def get_totals(self):
+        """
+        Item count and subtotal in one aggregate query.
+
+        Returns:
+            dict: {'total_items': int, 'subtotal': Decimal}
+        """
+        totals = self.items.aggregate(
+            total_items=models.Sum('quantity'),
+            subtotal=models.Sum(
+                models.F('quantity') * models.F('price_at_time'),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2)
+            )
+        )
+        return {
+            'total_items': totals['total_items'] or 0,
+            'subtotal': totals['subtotal'] or Decimal('0.00'),
+        }
+
     @property
     def total_items(self):
         """Get total number of items in cart."""
-        return self.items.aggregate(
-            total=models.Sum('quantity')
-        )['total'] or 0
+        return self.get_totals()['total_items']
 
     @property
     def subtotal(self):
         """Calculate cart subtotal."""
-        total = Decimal('0.00')
-        for item in self.items.all():
-            total += item.total_price
-        return total
+        return self.get_totals()['subtotal']
 
     @property
     def shipping_cost(self):
         """Calculate shipping cost."""
-        # Jersey is small, fixed shipping rate
-        if self.subtotal > Decimal('100.00'):
-            return Decimal('0.00')  # Free shipping over £100
-        return Decimal('5.00')  # Fixed £5 shipping
+        return self.get_shipping_cost(self.subtotal)
 
     @property
     def total(self):
         """Calculate cart total including shipping."""
-        return self.subtotal + self.shipping_cost
+        subtotal = self.subtotal
+        return subtotal + self.get_shipping_cost(subtotal)
 
     def clear(self):
         """Clear all items from cart."""
         self.items.all().delete()
 
     def merge_with(self, other_cart):
-        """Merge another cart into this one (useful after login)."""
-        for item in other_cart.items.all():
-            existing_item = self.items.filter(event=item.event).first()
-            if existing_item:
-                existing_item.quantity += item.quantity
-                existing_item.save()
-            else:
-                item.cart = self
-                item.save()
-        other_cart.delete()
+        """
+        Merge another cart into this one (useful after login), then delete it.
+
+        Set-based: one UPDATE adds the other cart's quantities to events both
+        carts hold, one UPDATE moves the rest of its items over.
+        """
+        from .summary import cart_items_changed
+
+        if other_cart.pk == self.pk:
+            return
+
+        with transaction.atomic():
+            shared_events = other_cart.items.values('event_id')
+            other_quantity = CartItem.objects.filter(
+                cart=other_cart,
+                event_id=models.OuterRef('event_id')
+            ).order_by().values('quantity')[:1]
+
+            self.items.filter(event_id__in=shared_events).update(
+                quantity=models.F('quantity') + models.Subquery(other_quantity)
+            )
+            other_cart.items.exclude(
+                event_id__in=self.items.values('event_id')
+            ).update(cart=self)
+            other_cart.delete()
+
+        # Queryset updates send no signals
+        cart_items_changed(self.pk)
 
 
 class CartItem(models.Model):
@@ -129,39 +177,27 @@ class CartItem(models.Model):
         return (self.event.status == 'published' and
                 self.event.tickets_available >= self.quantity)
 
-    def validate_and_reserve_tickets(self):
+    def validate_and_reserve_tickets(self, order=None):
         """
-        Validate ticket availability and reserve them atomically.
+        Hold this line's tickets for a checkout (see events.ticket_holds).
 
-        ⚠️  CRITICAL: Must be called within a transaction to prevent race conditions!
+        The hold is taken with a conditional UPDATE of the event's counter and
+        expires after TICKET_HOLD_TTL_SECONDS unless the order is fulfilled.
 
         Returns:
-            bool: True if tickets were reserved, False otherwise
+            bool: True if tickets were held, False otherwise
         """
-        from django.db import transaction
-        from django.db.models import F
+        from django.core.exceptions import ValidationError
+        from events.ticket_holds import ticket_holds
 
-        with transaction.atomic():
-            # Use SELECT FOR UPDATE to lock the event row
-            event = Event.objects.select_for_update().get(id=self.event.id)
-
-            # Check availability with locked row
-            if event.tickets_available < self.quantity:
-                logger.error(
-                    f"Ticket race condition prevented: Event {event.id} only has "
-                    f"{event.tickets_available} tickets but {self.quantity} requested"
-                )
-                return False
-
-            # Reserve tickets by incrementing sold count
-            event.tickets_sold = F('tickets_sold') + self.quantity
-            event.save(update_fields=['tickets_sold'])
-
-            logger.info(
-                f"Reserved {self.quantity} tickets for event {event.id}. "
-                f"Total sold: {event.tickets_sold}"
-            )
-            return True
+        try:
+            ticket_holds.hold_items([self], order=order)
+        except ValidationError as e:
+            logger.error(f"Ticket hold refused for event {self.event_id}: {e.messages[0]}")
+            return False
+
+        logger.info(f"Held {self.quantity} tickets for event {self.event_id}")
+        return True
 
 
 class SavedItem(models.Model):
@@ -0,0 +1,131 @@
+"""
+Stale Cart Purge
+================
+Cart rows pile up: every anonymous visitor who reaches checkout leaves one
+behind (cart.cart materializes session carts), and every completed checkout
+leaves an inactive one. Neither is read again once it is old:
+
+    - anonymous carts (no user) not updated for CART_ANONYMOUS_MAX_AGE_DAYS;
+      their session expired long before (SESSION_COOKIE_AGE is a day)
+    - inactive carts not updated for CART_INACTIVE_MAX_AGE_DAYS
+
+purge() deletes them in chunks of CART_PURGE_BATCH_SIZE carts, each chunk in
+its own short transaction, so the job never holds locks on the cart tables
+for longer than one chunk takes. A chunk's carts are locked with SKIP LOCKED,
+so a cart a visitor is touching right now is left for the next run instead of
+making either side wait.
+
+Run it daily with django_q:
+
+    Schedule.objects.create(
+        name='Purge Stale Carts - Daily',
+        func='cart.purge.cart_purge.purge',
+        schedule_type='D',
+        repeats=-1
+    )
+
+or with cron through `python manage.py purge_stale_carts`.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class CartPurgeService:
+    """Deletes expired anonymous and inactive carts in chunks."""
+
+    def get_anonymous_max_age(self):
+        return timedelta(days=getattr(settings, 'CART_ANONYMOUS_MAX_AGE_DAYS', 7))
+
+    def get_inactive_max_age(self):
+        return timedelta(days=getattr(settings, 'CART_INACTIVE_MAX_AGE_DAYS', 30))
+
+    def get_batch_size(self):
+        return getattr(settings, 'CART_PURGE_BATCH_SIZE', 500)
+
+    def get_stale_carts(self, now=None):
+        """Queryset of carts due for deletion."""
+        from .models import Cart
+
+        now = now or timezone.now()
+        return Cart.objects.filter(
+            Q(user__isnull=True, updated_at__lt=now - self.get_anonymous_max_age())
+            | Q(is_active=False, updated_at__lt=now - self.get_inactive_max_age())
+        )
+
+    def purge(self, batch_size=None, max_batches=None):
+        """
+        Delete stale carts and their items, one chunk per transaction.
+
+        Args:
+            batch_size: carts per chunk (default CART_PURGE_BATCH_SIZE)
+            max_batches: stop after this many chunks (default: until none are left)
+
+        Returns:
+            dict: carts, items, batches
+        """
+        batch_size = batch_size or self.get_batch_size()
+        now = timezone.now()
+        stats = {'carts': 0, 'items': 0, 'batches': 0}
+
+        while max_batches is None or stats['batches'] < max_batches:
+            carts, items = self._purge_batch(now, batch_size)
+            if not carts:
+                break
+            stats['carts'] += carts
+            stats['items'] += items
+            stats['batches'] += 1
+            if carts < batch_size:
+                break
+
+        if stats['carts']:
+            logger.info(
+                f"Purged {stats['carts']} stale carts ({stats['items']} items) "
+                f"in {stats['batches']} batches"
+            )
+        return stats
+
+    def _purge_batch(self, now, batch_size):
+        from .models import Cart, CartItem
+
+        with transaction.atomic():
+            ids = list(
+                self.get_stale_carts(now)
+                .select_for_update(skip_locked=True)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                return 0, 0
+
+            # Plain DELETEs rather than QuerySet.delete(), which would load
+            # every row and send post_delete to the cart summary handlers:
+            # nothing reads the summaries of carts this old (see cart.summary)
+            item_count = self._delete(CartItem, 'cart', ids)
+            cart_count = self._delete(Cart, 'id', ids)
+
+        return cart_count, item_count
+
+    @staticmethod
+    def _delete(model, field, ids):
+        """DELETE the rows of model whose field is in ids; returns the row count."""
+        quote = connection.ops.quote_name
+        column = model._meta.get_field(field).column
+        placeholders = ', '.join(['%s'] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {quote(model._meta.db_table)} WHERE {quote(column)} IN ({placeholders})",
+                ids
+            )
+            return cursor.rowcount
+
+
+# Singleton instance
+cart_purge = CartPurgeService()
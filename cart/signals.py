@@ -0,0 +1,33 @@
+"""
+Signal handlers for the cart app.
+
+Stale the cached cart summaries (cart.summary) whenever a cart or its items
+change, whichever request or process made the change, and move an anonymous
+visitor's cart into their account when they log in.
+"""
+
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cart import merge_session_cart
+from .models import Cart, CartItem
+from .summary import cart_changed, cart_items_changed
+
+
+@receiver(post_save, sender=Cart)
+@receiver(post_delete, sender=Cart)
+def cart_saved(sender, instance, **kwargs):
+    cart_changed(instance)
+
+
+@receiver(post_save, sender=CartItem)
+@receiver(post_delete, sender=CartItem)
+def cart_item_saved(sender, instance, **kwargs):
+    cart_items_changed(instance.cart_id)
+
+
+@receiver(user_logged_in)
+def user_logged_in_merge_cart(sender, request, user, **kwargs):
+    if request is not None and hasattr(request, 'session'):
+        merge_session_cart(request, user)
@@ -0,0 +1,192 @@
+"""
+Cart Summary
+============
+The item count, subtotal, shipping and total shown by the navbar badge, the
+mini cart and the checkout summaries, without loading the cart itself.
+
+get_cart_summary(request) returns a CartSummary memoized on the request.
+Nothing is read until a template first touches one of its figures; the
+figures then come from a single aggregate query over the active cart and are
+kept in the session, so later pages need no cart query at all. Anonymous
+visitors' carts live in the session (cart.cart.SessionCart) and are summed
+there, so anonymous browsing never queries.
+
+The session copy is stamped with version counters kept in the shared cache:
+one per cart owner (user or session) and one per cart. cart.signals bumps
+them whenever a cart or its items are saved or deleted, so changes made
+outside the visitor's own requests (a payment webhook clearing the cart, the
+admin) are picked up on the next page. Checking the stamps is one cache read.
+The cart views also drop the session copy directly with
+invalidate_cart_summary().
+"""
+
+import logging
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import DecimalField, F, Sum
+
+logger = logging.getLogger(__name__)
+
+SESSION_KEY = 'cart_summary'
+VERSION_KEY_PREFIX = 'cart_summary'
+# Version counters outlive any session (SESSION_COOKIE_AGE is at most a day)
+VERSION_TIMEOUT = 2 * 24 * 60 * 60
+
+
+def get_owner(request):
+    """Cart owner key for a request: the user, else the session, else None."""
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    session_key = request.session.session_key
+    if session_key:
+        return f"session:{session_key}"
+    return None
+
+
+def _owner_key(owner):
+    return f"{VERSION_KEY_PREFIX}:{owner}"
+
+
+def _cart_key(cart_id):
+    return f"{VERSION_KEY_PREFIX}:cart:{cart_id}"
+
+
+def _version_keys(owner, cart_id):
+    keys = [_owner_key(owner)]
+    if cart_id:
+        keys.append(_cart_key(cart_id))
+    return keys
+
+
+def _bump(keys):
+    for key in keys:
+        try:
+            cache.add(key, 0, VERSION_TIMEOUT)
+            cache.incr(key)
+        except Exception as e:
+            logger.warning(f"Failed to bump cart summary version {key}: {e}")
+
+
+def cart_changed(cart):
+    """A cart was saved or deleted: stale the summaries of the cart and its owner."""
+    keys = [_cart_key(cart.pk)]
+    if cart.user_id:
+        keys.append(_owner_key(f"user:{cart.user_id}"))
+    if cart.session_key:
+        keys.append(_owner_key(f"session:{cart.session_key}"))
+    _bump(keys)
+
+
+def cart_items_changed(cart_id):
+    """Items of a cart were added, changed or removed."""
+    _bump([_cart_key(cart_id)])
+
+
+def invalidate_cart_summary(request):
+    """Drop the request's memoized summary and its session copy."""
+    if hasattr(request, '_cart_summary'):
+        del request._cart_summary
+    if SESSION_KEY in request.session:
+        del request.session[SESSION_KEY]
+
+
+def get_cart_summary(request):
+    """The request's lazy CartSummary, created on first use."""
+    if not hasattr(request, '_cart_summary'):
+        request._cart_summary = CartSummary(request)
+    return request._cart_summary
+
+
+class CartSummary:
+    """Lazy cart figures for templates; the first attribute read loads them."""
+
+    def __init__(self, request):
+        self.request = request
+        self._data = None
+
+    def __bool__(self):
+        return self.total_items > 0
+
+    @property
+    def total_items(self):
+        return self._load()['total_items']
+
+    @property
+    def subtotal(self):
+        return Decimal(self._load()['subtotal'])
+
+    @property
+    def shipping_cost(self):
+        from .models import Cart
+
+        return Cart.get_shipping_cost(self.subtotal)
+
+    @property
+    def total(self):
+        return self.subtotal + self.shipping_cost
+
+    def _load(self):
+        if self._data is None:
+            if self._is_session_cart():
+                self._data = self._from_session_cart()
+            else:
+                self._data = self._from_session() or self._from_database()
+        return self._data
+
+    def _is_session_cart(self):
+        from .cart import MATERIALIZED_KEY
+
+        return not self.request.user.is_authenticated and not self.request.session.get(MATERIALIZED_KEY)
+
+    def _from_session_cart(self):
+        from .cart import SessionCart
+
+        totals = SessionCart(self.request).get_totals()
+        return {'total_items': totals['total_items'], 'subtotal': str(totals['subtotal'])}
+
+    def _from_session(self):
+        data = self.request.session.get(SESSION_KEY)
+        owner = get_owner(self.request)
+        if not data or data.get('owner') != owner:
+            return None
+
+        keys = _version_keys(owner, data['cart_id'])
+        versions = cache.get_many(keys)
+        if [versions.get(key, 0) for key in keys] != data['versions']:
+            return None
+        return data
+
+    def _from_database(self):
+        owner = get_owner(self.request)
+        row = self._query()
+        data = {
+            'owner': owner,
+            'cart_id': row['pk'] if row else None,
+            'total_items': (row and row['total_items']) or 0,
+            'subtotal': str(Decimal((row and row['subtotal']) or 0).quantize(Decimal('0.01'))),
+        }
+
+        keys = _version_keys(owner, data['cart_id'])
+        versions = cache.get_many(keys)
+        data['versions'] = [versions.get(key, 0) for key in keys]
+
+        self.request.session[SESSION_KEY] = data
+        return data
+
+    def _query(self):
+        """The active cart's id, item count and subtotal in one query."""
+        from .models import Cart
+
+        if self.request.user.is_authenticated:
+            carts = Cart.objects.filter(user=self.request.user, is_active=True)
+        else:
+            carts = Cart.objects.filter(session_key=self.request.session.session_key, is_active=True)
+
+        return carts.annotate(
+            total_items=Sum('items__quantity'),
+            subtotal=Sum(
+                F('items__quantity') * F('items__price_at_time'),
+                output_field=DecimalField(max_digits=12, decimal_places=2)
+            ),
+        ).order_by('-updated_at').values('pk', 'total_items', 'subtotal').first()
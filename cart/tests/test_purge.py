@@ -0,0 +1,114 @@
+"""
+Tests for the set-based cart merge and the stale cart purge.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from cart.models import Cart, CartItem
+from cart.purge import cart_purge
+from events.models import Event
+
+User = get_user_model()
+
+
+class CartPurgeTestMixin:
+
+    def setUp(self):
+        cache.clear()
+        self.organiser = User.objects.create_user(
+            email='purge-organiser@test.com',
+            password='test123',
+            user_type='artist'
+        )
+        self.customer = User.objects.create_user(
+            email='purge-customer@test.com',
+            password='test123',
+            user_type='customer'
+        )
+        self.event = self._event('Purge Event', Decimal('10.00'))
+        self.other_event = self._event('Other Purge Event', Decimal('4.50'))
+
+    def _event(self, title, price):
+        return Event.objects.create(
+            title=title,
+            organiser=self.organiser,
+            description='Test event',
+            venue_name='Test Venue',
+            venue_address='Test Address',
+            event_date=timezone.now().date(),
+            event_time=timezone.now().time(),
+            capacity=100,
+            ticket_price=price,
+            status='published'
+        )
+
+    def _cart(self, age_days=0, items=(), **fields):
+        cart = Cart.objects.create(**fields)
+        for event, quantity in items:
+            cart.items.create(event=event, quantity=quantity, price_at_time=event.ticket_price)
+        # updated_at is auto_now, so age the row with a queryset update
+        Cart.objects.filter(pk=cart.pk).update(updated_at=timezone.now() - timedelta(days=age_days))
+        return cart
+
+
+class CartMergeTests(CartPurgeTestMixin, TestCase):
+
+    def test_merge_adds_shared_lines_and_moves_the_rest(self):
+        cart = self._cart(user=self.customer, items=[(self.event, 1)])
+        other = self._cart(session_key='merge-session', items=[(self.event, 2), (self.other_event, 3)])
+
+        # Two UPDATEs, then deleting the other cart and its leftover lines, whatever their number
+        with self.assertNumQueries(7):
+            cart.merge_with(other)
+
+        quantities = dict(cart.items.values_list('event_id', 'quantity'))
+        self.assertEqual(quantities, {self.event.pk: 3, self.other_event.pk: 3})
+        self.assertFalse(Cart.objects.filter(pk=other.pk).exists())
+        self.assertEqual(CartItem.objects.count(), 2)
+
+
+class CartPurgeTests(CartPurgeTestMixin, TestCase):
+
+    def test_purges_expired_anonymous_and_inactive_carts(self):
+        expired = self._cart(age_days=8, session_key='old', items=[(self.event, 1)])
+        fresh = self._cart(age_days=1, session_key='new', items=[(self.event, 1)])
+        checked_out = self._cart(age_days=31, user=self.customer, is_active=False, items=[(self.event, 2)])
+        recent_order = self._cart(age_days=10, user=self.customer, is_active=False)
+        user_cart = self._cart(age_days=90, user=self.customer, items=[(self.other_event, 1)])
+
+        stats = cart_purge.purge()
+
+        self.assertEqual(stats, {'carts': 2, 'items': 2, 'batches': 1})
+        remaining = set(Cart.objects.values_list('pk', flat=True))
+        self.assertEqual(remaining, {fresh.pk, recent_order.pk, user_cart.pk})
+        self.assertNotIn(expired.pk, remaining)
+        self.assertNotIn(checked_out.pk, remaining)
+        self.assertFalse(CartItem.objects.filter(cart_id__in=[expired.pk, checked_out.pk]).exists())
+
+    def test_purges_in_batches(self):
+        for n in range(5):
+            self._cart(age_days=8, session_key=f'old-{n}', items=[(self.event, 1)])
+
+        self.assertEqual(cart_purge.purge(batch_size=2, max_batches=2)['carts'], 4)
+        self.assertEqual(Cart.objects.count(), 1)
+
+        stats = cart_purge.purge(batch_size=2)
+        self.assertEqual(stats, {'carts': 1, 'items': 1, 'batches': 1})
+        self.assertFalse(Cart.objects.exists())
+
+    def test_command(self):
+        self._cart(age_days=8, session_key='old', items=[(self.event, 1)])
+        out = StringIO()
+
+        call_command('purge_stale_carts', '--batch-size', '10', stdout=out)
+
+        self.assertIn('Purged 1 stale carts', out.getvalue())
+        self.assertFalse(Cart.objects.exists())
@@ -0,0 +1,131 @@
+"""
+Tests for session-only anonymous carts and where they turn into Cart rows.
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from cart.cart import MATERIALIZED_KEY, SESSION_KEY
+from cart.models import Cart, CartItem
+from events.models import Event
+
+User = get_user_model()
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class SessionCartTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.organiser = User.objects.create_user(
+            email='session-cart-organiser@test.com',
+            password='test123',
+            user_type='artist'
+        )
+        self.customer = User.objects.create_user(
+            email='session-cart-customer@test.com',
+            password='test123',
+            user_type='customer',
+            email_verified=True
+        )
+        self.event = self._event('Session Cart Event', Decimal('10.00'))
+        self.other_event = self._event('Other Session Cart Event', Decimal('4.50'))
+
+    def _event(self, title, price):
+        return Event.objects.create(
+            title=title,
+            organiser=self.organiser,
+            description='Test event',
+            venue_name='Test Venue',
+            venue_address='Test Address',
+            event_date=timezone.now().date(),
+            event_time=timezone.now().time(),
+            capacity=100,
+            ticket_price=price,
+            status='published'
+        )
+
+    def _add(self, event, quantity):
+        return self.client.post(reverse('cart:add', args=[event.pk]), {'quantity': quantity})
+
+    def test_anonymous_cart_lives_in_the_session(self):
+        self._add(self.event, 2)
+        self._add(self.event, 1)
+        self._add(self.other_event, 1)
+
+        self.assertFalse(Cart.objects.exists())
+        self.assertEqual(self.client.session[SESSION_KEY], {
+            str(self.event.pk): {'quantity': 3, 'price': '10.00'},
+            str(self.other_event.pk): {'quantity': 1, 'price': '4.50'},
+        })
+
+        response = self.client.get(reverse('cart:view'))
+        self.assertEqual(len(response.context['cart_items']), 2)
+        self.assertEqual(response.context['cart'].subtotal, Decimal('34.50'))
+        self.assertContains(response, 'Other Session Cart Event')
+        self.assertFalse(Cart.objects.exists())
+
+    def test_update_and_remove_session_lines(self):
+        self._add(self.event, 2)
+        self._add(self.other_event, 1)
+
+        self.client.post(reverse('cart:update', args=[self.event.pk]), {'quantity': 5})
+        self.client.post(reverse('cart:remove', args=[self.other_event.pk]))
+
+        self.assertEqual(self.client.session[SESSION_KEY], {str(self.event.pk): {'quantity': 5, 'price': '10.00'}})
+        response = self.client.post(reverse('cart:remove', args=[self.other_event.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_browsing_does_not_create_sessions(self):
+        self.client.get(reverse('cart:view'))
+        self.client.get(reverse('events:events_list'))
+
+        self.assertFalse(Session.objects.exists())
+
+    def test_checkout_materializes_the_cart(self):
+        self._add(self.event, 2)
+
+        self.client.get(reverse('payments:checkout'))
+
+        cart = Cart.objects.get()
+        self.assertIsNone(cart.user)
+        self.assertEqual(cart.session_key, self.client.session.session_key)
+        self.assertEqual(list(cart.items.values_list('event_id', 'quantity')), [(self.event.pk, 2)])
+        self.assertEqual(self.client.session[MATERIALIZED_KEY], cart.pk)
+        self.assertEqual(self.client.session[SESSION_KEY], {})
+
+        # The materialized row is now the visitor's cart
+        self._add(self.event, 1)
+        self.assertEqual(cart.items.get().quantity, 3)
+        self.assertEqual(Cart.objects.count(), 1)
+
+    def test_login_merges_the_session_cart(self):
+        user_cart = Cart.objects.create(user=self.customer)
+        CartItem.objects.create(cart=user_cart, event=self.event, quantity=1, price_at_time=Decimal('10.00'))
+        self._add(self.event, 2)
+        self._add(self.other_event, 1)
+
+        self.client.post(reverse('accounts:login'), {'email': self.customer.email, 'password': 'test123'})
+
+        self.assertEqual(
+            dict(user_cart.items.values_list('event_id', 'quantity')),
+            {self.event.pk: 3, self.other_event.pk: 1}
+        )
+        self.assertEqual(self.client.session.get(SESSION_KEY), {})
+        self.assertEqual(Cart.objects.count(), 1)
+
+    def test_login_merges_a_materialized_cart(self):
+        self._add(self.event, 2)
+        self.client.get(reverse('payments:checkout'))
+
+        self.client.force_login(self.customer)
+
+        cart = Cart.objects.get(user=self.customer, is_active=True)
+        self.assertEqual(list(cart.items.values_list('event_id', 'quantity')), [(self.event.pk, 2)])
+        self.assertNotIn(MATERIALIZED_KEY, self.client.session)
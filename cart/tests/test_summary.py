@@ -0,0 +1,110 @@
+"""
+Tests for the lazy, session-cached cart summary.
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from cart.models import Cart, CartItem
+from events.models import Event
+
+User = get_user_model()
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class CartSummaryTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.organiser = User.objects.create_user(
+            email='summary-organiser@test.com',
+            password='test123',
+            user_type='artist'
+        )
+        self.customer = User.objects.create_user(
+            email='summary-customer@test.com',
+            password='test123',
+            user_type='customer'
+        )
+        self.event = Event.objects.create(
+            title='Summary Event',
+            organiser=self.organiser,
+            description='Test event',
+            venue_name='Test Venue',
+            venue_address='Test Address',
+            event_date=timezone.now().date(),
+            event_time=timezone.now().time(),
+            capacity=100,
+            ticket_price=Decimal('12.50'),
+            status='published'
+        )
+
+    def _cart_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [q['sql'] for q in queries.captured_queries if 'cart_cart' in q['sql']]
+
+    def _add(self, quantity=2):
+        return self.client.post(reverse('cart:add', args=[self.event.pk]), {'quantity': quantity})
+
+    def test_anonymous_browsing_makes_no_cart_queries(self):
+        self.assertEqual(self._cart_queries(reverse('events:events_list')), [])
+        self.assertEqual(self._cart_queries(reverse('events:events_list')), [])
+
+    def test_summary_is_one_query_then_served_from_session(self):
+        self.client.force_login(self.customer)
+        self._add()
+
+        self.assertEqual(len(self._cart_queries(reverse('events:events_list'))), 1)
+        self.assertEqual(self._cart_queries(reverse('events:events_list')), [])
+
+        summary = self.client.session['cart_summary']
+        self.assertEqual(summary['total_items'], 2)
+        self.assertEqual(summary['subtotal'], '25.00')
+
+    def test_cart_views_refresh_the_summary(self):
+        self.client.force_login(self.customer)
+        self._add(quantity=1)
+        self.client.get(reverse('events:events_list'))
+
+        response = self._add(quantity=2)
+        response = self.client.get(reverse('events:events_list'))
+
+        self.assertEqual(response.context['cart'].total_items, 3)
+        self.assertEqual(response.context['cart'].total, Decimal('42.50'))
+
+    def test_changes_outside_the_request_are_picked_up(self):
+        self.client.force_login(self.customer)
+        self._add()
+        self.client.get(reverse('events:events_list'))
+
+        # e.g. the payment webhook clearing the customer's cart
+        Cart.objects.filter(user=self.customer, is_active=True).delete()
+
+        response = self.client.get(reverse('events:events_list'))
+        self.assertEqual(response.context['cart'].total_items, 0)
+        self.assertFalse(response.context['cart'])
+
+    def test_anonymous_cart_summary(self):
+        self._add(quantity=3)
+
+        response = self.client.get(reverse('events:events_list'))
+
+        self.assertEqual(response.context['cart'].total_items, 3)
+        self.assertContains(response, 'badge rounded-pill bg-danger')
+
+    def test_cart_totals_in_one_query(self):
+        cart = Cart.objects.create(user=self.customer)
+        CartItem.objects.create(cart=cart, event=self.event, quantity=10, price_at_time=Decimal('12.50'))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(cart.total, Decimal('125.00'))
+        self.assertEqual(cart.shipping_cost, Decimal('0.00'))
@@ -2,13 +2,15 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.views import View
 from django.views.generic import TemplateView
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, Http404
 from django.db.models import F
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from decimal import Decimal
 
+from .cart import SessionCart, get_cart
 from .models import Cart, CartItem, SavedItem
+from .summary import get_cart_summary, invalidate_cart_summary
 from events.models import Event
 
 
@@ -17,35 +19,21 @@ class CartView(TemplateView):
     template_name = 'cart/view.html'
     
     def get_cart(self):
-        """Get or create cart for current user/session."""
-        if self.request.user.is_authenticated:
-            cart, created = Cart.objects.get_or_create(
-                user=self.request.user,
-                is_active=True
-            )
-        else:
-            # For anonymous users, use session
-            session_key = self.request.session.session_key
-            if not session_key:
-                self.request.session.create()
-                session_key = self.request.session.session_key
-            
-            cart, created = Cart.objects.get_or_create(
-                session_key=session_key,
-                is_active=True
-            )
-        
-        return cart
+        """Get cart for current user (created if needed) or the visitor's session cart."""
+        return get_cart(self.request, create=True)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         cart = self.get_cart()
         
         # Get cart items with related event data
-        cart_items = cart.items.select_related(
-            'event',
-            'event__organiser'
-        ).order_by('-added_at')
+        if isinstance(cart, SessionCart):
+            cart_items = cart.items
+        else:
+            cart_items = cart.items.select_related(
+                'event',
+                'event__organiser'
+            ).order_by('-added_at')
         
         # Check availability for each item - IMPORTANT: Check this happens every time
         has_unavailable = False
@@ -103,57 +91,53 @@ class AddToCartView(View):
         if quantity > event.tickets_available:
             messages.error(request, f"Only {event.tickets_available} tickets available.")
             return redirect('events:event_detail', pk=event.id)
-        # Get or create cart
-        if request.user.is_authenticated:
-            cart, created = Cart.objects.get_or_create(
-                user=request.user,
-                is_active=True
-            )
-        else:
-            session_key = request.session.session_key
-            if not session_key:
-                request.session.create()
-                session_key = request.session.session_key
-            
-            cart, created = Cart.objects.get_or_create(
-                session_key=session_key,
-                is_active=True
-            )
+        # Get or create cart (anonymous visitors get a session cart, no database row)
+        cart = get_cart(request, create=True)
         
         # Add or update cart item
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            event=event,
-            defaults={
-                'quantity': quantity,
-                'price_at_time': event.ticket_price
-            }
-        )
+        if isinstance(cart, SessionCart):
+            created = not cart.get_quantity(event.id)
+            cart_quantity = cart.add(event, quantity)
+        else:
+            cart_item, created = CartItem.objects.get_or_create(
+                cart=cart,
+                event=event,
+                defaults={
+                    'quantity': quantity,
+                    'price_at_time': event.ticket_price
+                }
+            )
+            if not created:
+                # Update quantity if item already in cart
+                cart_item.quantity = F('quantity') + quantity
+                cart_item.save()
+                cart_item.refresh_from_db()
+            cart_quantity = cart_item.quantity
         
         if not created:
-            # Update quantity if item already in cart
-            cart_item.quantity = F('quantity') + quantity
-            cart_item.save()
-            cart_item.refresh_from_db()
-            
             # Check if updated quantity is available
-            if cart_item.quantity > event.tickets_available:
-                cart_item.quantity = event.tickets_available
-                cart_item.save()
+            if cart_quantity > event.tickets_available:
+                if isinstance(cart, SessionCart):
+                    cart.set_quantity(event.id, event.tickets_available)
+                else:
+                    cart_item.quantity = event.tickets_available
+                    cart_item.save()
                 messages.warning(
                     request,
                     f"Quantity adjusted to {event.tickets_available} (maximum available)."
                 )
             else:
-                messages.success(request, f"Updated quantity to {cart_item.quantity}.")
+                messages.success(request, f"Updated quantity to {cart_quantity}.")
         else:
             messages.success(request, f"Added {event.title} to cart.")
-        
+
+        invalidate_cart_summary(request)
+
         # Handle AJAX requests
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({
                 'success': True,
-                'cart_total_items': cart.total_items,
+                'cart_total_items': get_cart_summary(request).total_items,
                 'message': f"Added to cart successfully."
             })
         
@@ -164,55 +148,68 @@ class UpdateCartItemView(View):
     """Update cart item quantity."""
     
     def post(self, request, item_id):
-    # Get cart
-        if request.user.is_authenticated:
-            cart = Cart.objects.filter(
-                user=request.user,
-                is_active=True
-            ).first()
-        else:
-            session_key = request.session.session_key
-            cart = Cart.objects.filter(
-                session_key=session_key,
-                is_active=True
-            ).first()
+        # Get cart
+        cart = get_cart(request)
         
         if not cart:
             messages.error(request, "Cart not found.")
             return redirect('cart:view')
         
-        # Get cart item
-        cart_item = get_object_or_404(CartItem, id=item_id, cart=cart)
         quantity = int(request.POST.get('quantity', 1))
-        
-        # Validate quantity
-        if quantity < 1:
-            # If quantity is 0 or negative, remove item
-            cart_item.delete()
-            messages.success(request, "Item removed from cart.")
-        else:
-            # Check availability and adjust if needed
-            if quantity > cart_item.event.stock_quantity:
-                quantity = cart_item.event.stock_quantity
-                cart_item.quantity = quantity
-                cart_item.save()
+
+        if isinstance(cart, SessionCart):
+            # Session cart lines are identified by their event
+            if not cart.get_quantity(item_id):
+                raise Http404("No such cart item.")
+            event = get_object_or_404(Event, id=item_id)
+            if quantity > event.tickets_available:
+                quantity = event.tickets_available
                 messages.warning(
                     request,
                     f"Quantity adjusted to {quantity} (maximum available)."
                 )
-            else:
-                cart_item.quantity = quantity
-                cart_item.save()
+            elif quantity >= 1:
                 messages.success(request, "Cart updated.")
-        
+            else:
+                messages.success(request, "Item removed from cart.")
+            cart.set_quantity(item_id, quantity)
+            item_total = quantity * Decimal(cart.lines[str(item_id)]['price']) if quantity > 0 else Decimal('0.00')
+        else:
+            # Get cart item
+            cart_item = get_object_or_404(CartItem, id=item_id, cart=cart)
+            
+            # Validate quantity
+            if quantity < 1:
+                # If quantity is 0 or negative, remove item
+                cart_item.delete()
+                messages.success(request, "Item removed from cart.")
+            else:
+                # Check availability and adjust if needed
+                if quantity > cart_item.event.tickets_available:
+                    quantity = cart_item.event.tickets_available
+                    cart_item.quantity = quantity
+                    cart_item.save()
+                    messages.warning(
+                        request,
+                        f"Quantity adjusted to {quantity} (maximum available)."
+                    )
+                else:
+                    cart_item.quantity = quantity
+                    cart_item.save()
+                    messages.success(request, "Cart updated.")
+            item_total = cart_item.total_price if quantity > 0 else Decimal('0.00')
+
+        invalidate_cart_summary(request)
+
         # Handle AJAX requests
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            summary = get_cart_summary(request)
             return JsonResponse({
                 'success': True,
-                'item_total': str(cart_item.total_price) if quantity > 0 else "0.00",
-                'cart_subtotal': str(cart.subtotal),
-                'cart_total': str(cart.total),
-                'cart_total_items': cart.total_items
+                'item_total': str(item_total),
+                'cart_subtotal': str(summary.subtotal),
+                'cart_total': str(summary.total),
+                'cart_total_items': summary.total_items
             })
         
         return redirect('cart:view')
@@ -223,36 +220,35 @@ class RemoveFromCartView(View):
     
     def post(self, request, item_id):
         # Get cart
-        if request.user.is_authenticated:
-            cart = Cart.objects.filter(
-                user=request.user,
-                is_active=True
-            ).first()
-        else:
-            session_key = request.session.session_key
-            cart = Cart.objects.filter(
-                session_key=session_key,
-                is_active=True
-            ).first()
+        cart = get_cart(request)
         
         if not cart:
             messages.error(request, "Cart not found.")
             return redirect('cart:view')
         
         # Remove item
-        cart_item = get_object_or_404(CartItem, id=item_id, cart=cart)
-        event_title = cart_item.event.title
-        cart_item.delete()
+        if isinstance(cart, SessionCart):
+            if not cart.get_quantity(item_id):
+                raise Http404("No such cart item.")
+            event_title = get_object_or_404(Event, id=item_id).title
+            cart.remove(item_id)
+        else:
+            cart_item = get_object_or_404(CartItem, id=item_id, cart=cart)
+            event_title = cart_item.event.title
+            cart_item.delete()
         
         messages.success(request, f"Removed {event_title} from cart.")
-        
+
+        invalidate_cart_summary(request)
+
         # Handle AJAX requests
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            summary = get_cart_summary(request)
             return JsonResponse({
                 'success': True,
-                'cart_subtotal': str(cart.subtotal),
-                'cart_total': str(cart.total),
-                'cart_total_items': cart.total_items
+                'cart_subtotal': str(summary.subtotal),
+                'cart_total': str(summary.total),
+                'cart_total_items': summary.total_items
             })
         
         return redirect('cart:view')
@@ -263,21 +259,13 @@ class ClearCartView(View):
     
     def post(self, request):
         # Get cart
-        if request.user.is_authenticated:
-            cart = Cart.objects.filter(
-                user=request.user,
-                is_active=True
-            ).first()
-        else:
-            session_key = request.session.session_key
-            cart = Cart.objects.filter(
-                session_key=session_key,
-                is_active=True
-            ).first()
+        cart = get_cart(request)
         
         if cart:
             cart.clear()
             messages.success(request, "Cart cleared.")
+
+        invalidate_cart_summary(request)
         
         return redirect('cart:view')
 
@@ -301,6 +289,7 @@ class SaveForLaterView(View):
             cart = Cart.objects.filter(user=request.user, is_active=True).first()
             if cart:
                 CartItem.objects.filter(cart=cart, event=event).delete()
+                invalidate_cart_summary(request)
         else:
             messages.info(request, "Item already saved.")
         
@@ -349,7 +338,8 @@ class MoveToCartView(View):
         
         # Remove from saved items
         saved_item.delete()
-        
+        invalidate_cart_summary(request)
+
         messages.success(request, f"Moved {event.title} to cart.")
         
         return redirect('cart:view')
\ No newline at end of file
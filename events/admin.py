@@ -1,7 +1,9 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
-from events.models import Event, EventImage, Category, Ticket, EventFee, TicketTier
+from events.catalog import catalog_cache
+from events.inventory import inventory_counters
+from events.models import Event, EventImage, Category, Ticket, EventFee, TicketTier, TicketValidationAttempt
 
 # Register Category
 admin.site.register(Category)
@@ -19,7 +21,7 @@ class TicketTierInline(admin.TabularInline):
         if obj:
             # Add help text showing remaining capacity
             formset.help_texts = {
-                'quantity_available': f'Event capacity: {obj.capacity} | Sold: {obj.tickets_sold} | Available: {obj.tickets_available}'
+                'quantity_available': f'Event capacity: {obj.capacity} | Sold: {obj.tickets_sold} | Held: {obj.tickets_held} | Available: {obj.tickets_available}'
             }
         return formset
 
@@ -41,7 +43,7 @@ class EventAdmin(admin.ModelAdmin):
     ]
     list_filter = ['status', 'event_date', 'category', 'processing_fee_passed_to_customer']
     search_fields = ['title', 'description', 'venue_name', 'organiser__email']
-    actions = ['make_published', 'make_draft', 'mark_sold_out']
+    actions = ['make_published', 'make_draft', 'mark_sold_out', 'shard_inventory', 'unshard_inventory']
     date_hierarchy = 'event_date'
     inlines = [TicketTierInline]
 
@@ -56,6 +58,8 @@ class EventAdmin(admin.ModelAdmin):
             'fields': (
                 'capacity',
                 'tickets_sold',
+                'tickets_held',
+                'inventory_shards',
                 'ticket_price',
                 'processing_fee_passed_to_customer',
                 'pricing_breakdown_display'
@@ -75,7 +79,7 @@ class EventAdmin(admin.ModelAdmin):
         }),
     )
 
-    readonly_fields = ['slug', 'tickets_sold', 'created_at', 'updated_at', 'pricing_breakdown_display']
+    readonly_fields = ['slug', 'tickets_sold', 'tickets_held', 'inventory_shards', 'created_at', 'updated_at', 'pricing_breakdown_display']
 
     def pricing_tier_display(self, obj):
         """Display pricing tier based on capacity."""
@@ -174,26 +178,47 @@ class EventAdmin(admin.ModelAdmin):
 
     def make_published(self, request, queryset):
         count = queryset.update(status='published')
+        catalog_cache.invalidate()
         self.message_user(request, f'{count} event(s) published!')
     make_published.short_description = "✅ Publish selected events"
 
     def make_draft(self, request, queryset):
         count = queryset.update(status='draft')
+        catalog_cache.invalidate()
         self.message_user(request, f'{count} event(s) set to DRAFT')
     make_draft.short_description = "📝 Set selected events to DRAFT"
 
     def mark_sold_out(self, request, queryset):
         count = queryset.update(status='sold_out')
+        catalog_cache.invalidate()
         self.message_user(request, f'{count} event(s) marked as sold out')
     mark_sold_out.short_description = "🎫 Mark as SOLD OUT"
 
+    def shard_inventory(self, request, queryset):
+        events = list(queryset)
+        for event in events:
+            inventory_counters.shard(event)
+        self.message_user(
+            request,
+            f'{len(events)} event(s) sharded over {inventory_counters.get_shard_count()} inventory slots'
+        )
+    shard_inventory.short_description = "🔥 Shard inventory for a hot on-sale"
+
+    def unshard_inventory(self, request, queryset):
+        events = list(queryset.filter(inventory_shards__gt=0))
+        for event in events:
+            inventory_counters.unshard(event)
+        self.message_user(request, f'{len(events)} event(s) back on a single inventory counter')
+    unshard_inventory.short_description = "📦 Unshard inventory"
+
 # Register Ticket
 @admin.register(Ticket)
 class TicketAdmin(admin.ModelAdmin):
     list_display = ['ticket_number', 'event', 'customer', 'tier_display', 'status', 'validation_status', 'purchase_date']
-    list_filter = ['status', 'is_validated', 'purchase_date', 'event__event_date', 'ticket_tier__tier_type']
+    list_filter = ['status', 'is_validated', 'render_status', 'purchase_date', 'event__event_date', 'ticket_tier__tier_type']
     search_fields = ['ticket_number', 'event__title', 'customer__email', 'customer_email']
-    readonly_fields = ['ticket_number', 'qr_code', 'validation_hash', 'qr_data', 'pdf_file']
+    readonly_fields = ['ticket_number', 'qr_code', 'validation_hash', 'qr_data', 'pdf_file',
+                       'render_status', 'render_attempts', 'render_error', 'render_started_at']
 
     fieldsets = (
         ('Ticket Information', {
@@ -207,7 +232,7 @@ class TicketAdmin(admin.ModelAdmin):
             'description': 'Ticket validation information for entry at the event'
         }),
         ('Files', {
-            'fields': ('qr_code', 'pdf_file'),
+            'fields': ('qr_code', 'pdf_file', 'render_status', 'render_attempts', 'render_error', 'render_started_at'),
             'classes': ('collapse',)
         }),
         ('Additional', {
@@ -238,6 +263,22 @@ class TicketAdmin(admin.ModelAdmin):
     validation_status.short_description = 'Validation'
 
 
+# Register TicketValidationAttempt (append-only door scan log)
+@admin.register(TicketValidationAttempt)
+class TicketValidationAttemptAdmin(admin.ModelAdmin):
+    list_display = ['attempted_at', 'event', 'ticket_number', 'outcome', 'scanner_id', 'latency_ms', 'message']
+    list_filter = ['outcome', 'attempted_at']
+    search_fields = ['ticket_number', 'scanner_id', 'event__title']
+    list_select_related = ['event']
+    date_hierarchy = 'attempted_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 # Register TicketTier
 @admin.register(TicketTier)
 class TicketTierAdmin(admin.ModelAdmin):
@@ -2,6 +2,7 @@ from django.urls import path
 from django.views.generic import TemplateView
 from . import views
 from . import listing_fee_views
+from . import validation_views
 
 app_name = "events"
 
@@ -9,6 +10,7 @@ urlpatterns = [
     path("health/", views.health_check, name="health_check"),
     path("", views.home, name="home"),
     path("events/", views.events_list, name="events_list"),
+    path("events/feed/", views.events_list_json, name="events_list_json"),
     path("event/<int:pk>/", views.event_detail, name="event_detail"),
     path("create-event/", views.create_event, name="create_event"),
     path("my-events/", views.my_events, name="my_events"),
@@ -17,6 +19,18 @@ urlpatterns = [
     path("event/<int:event_id>/summary/", views.event_summary_report, name="event_summary_report"),
     path("event/<int:event_id>/export-guests/", views.export_guest_list, name="export_guest_list"),
 
+    # Ticket downloads
+    path("tickets/<str:ticket_number>/download/", views.download_ticket, name="download_ticket"),
+    path("orders/<str:order_number>/tickets/download/", views.download_order_tickets, name="download_order_tickets"),
+
+    # Door validation (JSON endpoints for scanner clients)
+    path("validation/validate/", validation_views.validate_ticket_qr, name="validate_ticket_qr"),
+    path("validation/validate-batch/", validation_views.validate_ticket_batch, name="validate_ticket_batch"),
+    path("validation/event/<int:event_id>/manifest/", validation_views.event_scanner_manifest, name="scanner_manifest"),
+    path("validation/event/<int:event_id>/sync/", validation_views.sync_offline_admissions, name="sync_offline_admissions"),
+    path("validation/event/<int:event_id>/stats/", validation_views.event_validation_stats, name="event_validation_stats"),
+    path("validation/event/<int:event_id>/stream/", validation_views.validation_event_stream, name="validation_event_stream"),
+
     # Listing fee payments
     path("event/<int:event_id>/pay-listing-fee/", listing_fee_views.pay_listing_fee, name="pay_listing_fee"),
     path("event/<int:event_id>/listing-fee/success/", listing_fee_views.listing_fee_success, name="listing_fee_success"),
@@ -0,0 +1,299 @@
+"""
+Public Event Catalog Cache
+==========================
+The events listing and the home page are the busiest anonymous pages, so
+their event data is served from the cache as plain "listing cards" (dicts
+with everything the card templates show) instead of querying Event on
+every view.
+
+Entries are keyed by catalog generation plus filter, sort and cursor:
+
+    catalog:{generation}:list:{category}:{artist}:{sort}:{cursor}
+    catalog:{generation}:search:{category}:{sha1 of query}
+    catalog:{generation}:home
+
+The listing is paged by keyset (cursor) rather than OFFSET: a page is the
+next CATALOG_PAGE_SIZE events after the sort key of the previous page's
+last event, so every page costs one index range scan on the composite
+(status, <sort fields>, id) indexes on Event however many past and future
+events the catalog holds. Cursors are signed so they can be handed to the
+browser and back.
+
+Invalidating the catalog bumps the generation; old entries are never read
+again and expire after CATALOG_CACHE_TIMEOUT_SECONDS. events.signals bumps
+it when an Event or Category is saved or deleted (publishing included).
+
+Ticket sales only change the sold/available figures on a card, so they are
+debounced: the first sale bumps the generation, further sales within
+CATALOG_TICKET_DEBOUNCE_SECONDS only mark the catalog dirty, and the first
+read after the window bumps it once more.
+
+The cache backend is the default Django cache: Redis when REDIS_URL is set,
+local memory otherwise (see CACHES in settings).
+"""
+
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Q
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogCacheService:
+    """Builds and caches listing cards for the public event pages."""
+
+    KEY_PREFIX = 'catalog'
+    GENERATION_KEY = 'catalog:generation'
+    DIRTY_KEY = 'catalog:dirty'
+    DEBOUNCE_KEY = 'catalog:debounce'
+    CURSOR_SALT = 'events.catalog.cursor'
+
+    # Each ordering ends in id so the sort key is unique, and matches an index on Event
+    SORTS = {
+        'price_low': ('ticket_price', 'id'),
+        'price_high': ('-ticket_price', '-id'),
+        'date': ('event_date', 'event_time', 'id'),
+        'newest': ('-created_at', '-id'),
+    }
+
+    def get_timeout(self):
+        return getattr(settings, 'CATALOG_CACHE_TIMEOUT_SECONDS', 5 * 60)
+
+    def get_debounce(self):
+        return getattr(settings, 'CATALOG_TICKET_DEBOUNCE_SECONDS', 30)
+
+    def get_page_size(self):
+        return getattr(settings, 'CATALOG_PAGE_SIZE', 24)
+
+    # Generations and invalidation
+
+    def get_generation(self):
+        """Return the current generation, applying a pending debounced bump."""
+        values = cache.get_many([self.GENERATION_KEY, self.DIRTY_KEY, self.DEBOUNCE_KEY])
+        if self.DIRTY_KEY in values and self.DEBOUNCE_KEY not in values:
+            cache.delete(self.DIRTY_KEY)
+            cache.add(self.DEBOUNCE_KEY, 1, self.get_debounce())
+            return self.invalidate()
+        return values.get(self.GENERATION_KEY, 0)
+
+    def invalidate(self):
+        """Drop every cached catalog page; returns the new generation."""
+        try:
+            cache.add(self.GENERATION_KEY, 0, None)
+            return cache.incr(self.GENERATION_KEY)
+        except Exception as e:
+            logger.warning(f"Failed to invalidate event catalog cache: {e}")
+            return None
+
+    def ticket_counts_changed(self):
+        """Ticket sales changed availability: invalidate now or after the debounce window."""
+        try:
+            if cache.add(self.DEBOUNCE_KEY, 1, self.get_debounce()):
+                self.invalidate()
+            else:
+                cache.set(self.DIRTY_KEY, 1, None)
+        except Exception as e:
+            logger.warning(f"Failed to flag event catalog for refresh: {e}")
+
+    def _key(self, generation, *parts):
+        return ':'.join([self.KEY_PREFIX, str(generation)] + [str(part) for part in parts])
+
+    def _cached(self, key, build):
+        data = cache.get(key)
+        if data is None:
+            data = build()
+            cache.set(key, data, self.get_timeout())
+        return data
+
+    # Cards
+
+    @staticmethod
+    def get_queryset():
+        from .models import Event
+
+        return (
+            Event.objects.filter(status='published')
+            .defer('search_vector')
+            .select_related('organiser', 'category')
+            .prefetch_related('additional_images')
+        )
+
+    @staticmethod
+    def build_card(event):
+        """Everything an event listing card shows, as cacheable plain data."""
+        if event.main_image:
+            image_url = event.main_image.url
+        else:
+            images = list(event.additional_images.all())
+            image_url = images[0].image.url if images else None
+
+        return {
+            'pk': event.pk,
+            'title': event.title,
+            'slug': event.slug,
+            'event_date': event.event_date,
+            'event_time': event.event_time,
+            'venue_name': event.venue_name,
+            'ticket_price': event.ticket_price,
+            'capacity': event.capacity,
+            'tickets_sold': event.tickets_sold,
+            'tickets_available': event.tickets_available,
+            'status': event.status,
+            'featured': event.featured,
+            'image_url': image_url,
+            'organiser_name': event.organiser.get_full_name(),
+            'category_name': event.category.name if event.category else None,
+            'category_slug': event.category.slug if event.category else None,
+        }
+
+    # Cursors
+
+    def encode_cursor(self, event, sort):
+        """Signed cursor holding the sort key of an event."""
+        values = [getattr(event, field.lstrip('-')) for field in self.SORTS[sort]]
+        return signing.dumps(
+            [value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in values],
+            salt=self.CURSOR_SALT
+        )
+
+    def decode_cursor(self, cursor, sort):
+        """Sort key values from a cursor, or None if it is invalid for this sort."""
+        from .models import Event
+
+        try:
+            values = signing.loads(cursor, salt=self.CURSOR_SALT)
+            fields = [field.lstrip('-') for field in self.SORTS[sort]]
+            if len(values) != len(fields):
+                return None
+            return [Event._meta.get_field(field).to_python(value) for field, value in zip(fields, values)]
+        except (signing.BadSignature, ValidationError, TypeError, ValueError) as e:
+            logger.debug(f"Ignoring invalid catalog cursor: {e}")
+            return None
+
+    def _after(self, sort, values):
+        """Q for events sorting after the given key: (a > x) OR (a = x AND b > y) ..."""
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.SORTS[sort], values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    # Pages
+
+    def get_listing(self, category=None, artist_id=None, sort=None, cursor=None):
+        """
+        Return one page of the public events listing.
+
+        Args:
+            cursor: next_cursor of the previous page, or None for the first page
+
+        Returns:
+            dict: cards, next_cursor (None on the last page), has_next, has_previous
+        """
+        if sort not in self.SORTS:
+            sort = 'newest'
+        after = self.decode_cursor(cursor, sort) if cursor else None
+        if after is None:
+            cursor = None
+
+        key = self._key(self.get_generation(), 'list', category or '', artist_id or '', sort, cursor or '')
+        return self._cached(key, lambda: self._build_listing(category, artist_id, sort, after))
+
+    def _build_listing(self, category, artist_id, sort, after):
+        page_size = self.get_page_size()
+
+        events = self.get_queryset()
+        if category:
+            events = events.filter(category__slug=category)
+        if artist_id:
+            events = events.filter(organiser_id=artist_id)
+        if after is not None:
+            events = events.filter(self._after(sort, after))
+
+        # One extra row tells us whether there is a next page, without a COUNT
+        events = list(events.order_by(*self.SORTS[sort])[:page_size + 1])
+        has_next = len(events) > page_size
+        events = events[:page_size]
+
+        return {
+            'cards': [self.build_card(event) for event in events],
+            'next_cursor': self.encode_cursor(events[-1], sort) if has_next else None,
+            'has_next': has_next,
+            'has_previous': after is not None,
+        }
+
+    def get_search(self, text, category=None):
+        """
+        Return the ranked search results for a query (see events.search).
+
+        Returns:
+            dict: cards (each with a highlighted snippet), in the same shape as
+                  get_listing; results are one page of the best matches
+        """
+        digest = hashlib.sha1(text.strip().lower().encode()).hexdigest()
+        key = self._key(self.get_generation(), 'search', category or '', digest)
+        return self._cached(key, lambda: self._build_search(text, category))
+
+    def _build_search(self, text, category):
+        from .search import event_search
+
+        events = self.get_queryset()
+        if category:
+            events = events.filter(category__slug=category)
+
+        cards = []
+        for event in event_search.search(events, text):
+            card = self.build_card(event)
+            card['snippet'] = event.snippet
+            cards.append(card)
+
+        return {
+            'cards': cards,
+            'next_cursor': None,
+            'has_next': False,
+            'has_previous': False,
+        }
+
+    def get_home(self):
+        """Return the home page's featured event cards and featured artists."""
+        key = self._key(self.get_generation(), 'home')
+        return self._cached(key, self._build_home)
+
+    def _build_home(self):
+        from accounts.models import User
+
+        # Featured first, then the latest published events
+        featured_events = self.get_queryset().order_by('-featured', '-created_at')[:8]
+
+        # Organisers with published events, most events first
+        featured_artists = User.objects.filter(
+            user_type='artist',
+            is_active=True,
+            events__status='published'
+        ).annotate(
+            event_count=Count('events')
+        ).order_by('-event_count')[:4]
+
+        return {
+            'featured_events': [self.build_card(event) for event in featured_events],
+            'featured_artists': [
+                {
+                    'pk': artist.pk,
+                    'name': artist.get_full_name(),
+                    'event_count': artist.event_count,
+                }
+                for artist in featured_artists
+            ],
+        }
+
+
+# Singleton instance
+catalog_cache = CatalogCacheService()
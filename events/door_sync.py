@@ -0,0 +1,263 @@
+"""
+Offline Door Scanner Sync
+=========================
+Lets a door scanner validate tickets with no server round trip per scan.
+
+1. Before doors open the scanner downloads the event manifest
+   (build_manifest): the sorted ids of tickets that may still enter, the
+   ids already admitted, and the per-event token verification keys (see
+   events.ticket_token). It can then check signatures and admit tickets
+   locally.
+
+2. Whenever it has a connection it uploads its queued admissions
+   (sync_admissions) and gets back a delta: every ticket of the event
+   admitted, refunded or cancelled since its cursor, wherever that
+   happened.
+
+Conflicts are resolved by scan time: the first admission wins. A ticket that
+was admitted elsewhere comes back as a duplicate. If the uploaded scan
+happened earlier, the ticket's validated_at is moved back to it.
+
+Cursors are server timestamps on Ticket.updated_at. Each delta re-sends the
+last DOOR_SYNC_OVERLAP_SECONDS so admissions committed out of order are never
+missed. Applying a delta is idempotent on the scanner side.
+"""
+
+import base64
+import logging
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Ticket
+from .ticket_token import TOKEN_PREFIX, TOKEN_VERSION, get_event_key, get_signing_key_id, get_signing_keys
+from .ticket_validator import TicketValidator
+from .validation_index import validation_index
+from .validation_log import validation_log
+
+logger = logging.getLogger('events.validation')
+
+
+class DoorSyncService:
+    """Builds scanner manifests and ingests offline admissions."""
+
+    def get_overlap(self):
+        return timedelta(seconds=getattr(settings, 'DOOR_SYNC_OVERLAP_SECONDS', 30))
+
+    def get_max_batch_size(self):
+        return getattr(settings, 'VALIDATION_BATCH_MAX_SIZE', 200)
+
+    @staticmethod
+    def format_cursor(moment):
+        return moment.isoformat()
+
+    @staticmethod
+    def parse_cursor(cursor):
+        """Return the datetime for a cursor string, or None for a full sync."""
+        if not cursor:
+            return None
+        moment = parse_datetime(cursor)
+        if moment is None:
+            raise ValueError("Invalid cursor")
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment, dt_timezone.utc)
+        return moment
+
+    def build_manifest(self, event):
+        """
+        Return the JSON-serialisable manifest a scanner needs to work offline.
+        """
+        now = timezone.now()
+        admissible = []
+        admitted = []
+        rows = Ticket.objects.filter(event_id=event.pk, status='valid').values_list('pk', 'is_validated').order_by('pk')
+        for pk, is_validated in rows.iterator():
+            (admitted if is_validated else admissible).append(pk)
+
+        keys = {
+            str(key_id): base64.b64encode(get_event_key(event.pk, key_id)).decode('ascii')
+            for key_id in sorted(get_signing_keys())
+        }
+
+        return {
+            'event_id': event.pk,
+            'event_date': event.event_date.isoformat(),
+            'generated_at': now.isoformat(),
+            'cursor': self.format_cursor(now),
+            'token': {
+                'prefix': TOKEN_PREFIX,
+                'version': TOKEN_VERSION,
+                'key_id': get_signing_key_id(),
+                'keys': keys,
+            },
+            'valid_ticket_ids': admissible,
+            'admitted_ticket_ids': admitted,
+        }
+
+    def get_delta(self, event_id, since):
+        """
+        Return tickets admitted or revoked since a cursor (minus the overlap).
+
+        Returns:
+            (dict, str): delta and the next cursor
+        """
+        now = timezone.now()
+        tickets = Ticket.objects.filter(event_id=event_id)
+        if since is not None:
+            tickets = tickets.filter(updated_at__gt=since - self.get_overlap())
+
+        admitted = []
+        revoked = []
+        rows = tickets.values_list('pk', 'status', 'is_validated', 'validated_at').order_by('updated_at', 'pk')
+        for pk, status, is_validated, validated_at in rows.iterator():
+            if status != 'valid':
+                revoked.append(pk)
+            elif is_validated:
+                admitted.append({'ticket_id': pk, 'validated_at': validated_at.isoformat() if validated_at else None})
+
+        return {'admitted': admitted, 'revoked': revoked}, self.format_cursor(now)
+
+    def sync_admissions(self, event, admissions, scanner_id='', validated_by=None, cursor=None):
+        """
+        Ingest a scanner's offline admissions and return the delta since its cursor.
+
+        Args:
+            admissions: [{'qr_data': 'JE:...', 'scanned_at': ISO-8601}, ...]
+
+        Returns:
+            dict: {'results': [...], 'delta': {...}, 'cursor': str}
+        """
+        since = self.parse_cursor(cursor)
+        validator = TicketValidator()
+        now = timezone.now()
+
+        results = []
+        scan_times = []
+        scans = {}
+        for index, admission in enumerate(admissions):
+            result = {'qr_data': None, 'ticket_id': None, 'outcome': 'rejected', 'message': None}
+            results.append(result)
+            scan_times.append(now)
+
+            if not isinstance(admission, dict) or not isinstance(admission.get('qr_data'), str):
+                result['message'] = "Invalid admission record"
+                continue
+            result['qr_data'] = admission['qr_data']
+
+            qr_data, error = validator.parse_qr_data(admission['qr_data'])
+            if error:
+                result['message'] = error
+                continue
+            if not qr_data['signed']:
+                result['message'] = "Offline admissions require a signed ticket token"
+                continue
+            if qr_data['event_id'] != event.pk:
+                result['message'] = "Ticket is for a different event"
+                continue
+
+            scanned_at = parse_datetime(admission.get('scanned_at') or '') or now
+            if timezone.is_naive(scanned_at):
+                scanned_at = timezone.make_aware(scanned_at, dt_timezone.utc)
+            scanned_at = min(scanned_at, now)
+            scan_times[index] = scanned_at
+
+            ticket_id = qr_data['ticket_id']
+            result['ticket_id'] = ticket_id
+            scans.setdefault(ticket_id, []).append((scanned_at, index))
+
+        if scans:
+            self._record_admissions(event, scans, results, validated_by)
+
+        validation_log.record([
+            validation_log.build_attempt(
+                result['outcome'] == 'admitted', result['message'],
+                event_id=event.pk,
+                ticket_id=result['ticket_id'],
+                scanner_id=scanner_id,
+                validated_by=validated_by,
+                attempted_at=scanned_at
+            )
+            for result, scanned_at in zip(results, scan_times)
+        ], flush=True)
+
+        delta, next_cursor = self.get_delta(event.pk, since)
+
+        admitted = sum(1 for result in results if result['outcome'] == 'admitted')
+        logger.info(
+            f"Door sync for event {event.pk} from scanner {scanner_id or 'unknown'}: "
+            f"{admitted}/{len(results)} admissions recorded"
+        )
+        return {'results': results, 'delta': delta, 'cursor': next_cursor}
+
+    def _record_admissions(self, event, scans, results, validated_by):
+        """
+        Apply scans grouped by ticket id; the earliest scan of each ticket wins.
+
+        All new admissions are written by one UPDATE and all earlier-than-
+        recorded scan times by a second one, inside one transaction.
+        """
+        with transaction.atomic():
+            tickets = {
+                ticket.pk: ticket
+                for ticket in Ticket.objects.select_for_update().filter(event_id=event.pk, pk__in=list(scans))
+            }
+
+            admit = {}
+            backdate = {}
+            for ticket_id, ticket_scans in scans.items():
+                ticket_scans.sort()
+                first_scanned_at, first_index = ticket_scans[0]
+                ticket = tickets.get(ticket_id)
+
+                for _, index in ticket_scans[1:]:
+                    results[index]['outcome'] = 'duplicate'
+                    results[index]['message'] = "Duplicate scan in this batch"
+
+                if ticket is None:
+                    results[first_index]['message'] = "Ticket not found"
+                    continue
+                if ticket.status != 'valid':
+                    results[first_index]['message'] = f"Ticket is {ticket.status} and cannot be used"
+                    continue
+
+                if ticket.is_validated:
+                    results[first_index]['outcome'] = 'duplicate'
+                    results[first_index]['message'] = "Ticket was already admitted"
+                    if ticket.validated_at is None or first_scanned_at < ticket.validated_at:
+                        backdate[ticket_id] = first_scanned_at
+                    continue
+
+                admit[ticket_id] = first_scanned_at
+                results[first_index]['outcome'] = 'admitted'
+                results[first_index]['message'] = "Ticket validated successfully"
+
+            now = timezone.now()
+            if admit:
+                Ticket.objects.filter(pk__in=list(admit)).update(
+                    is_validated=True,
+                    validated_at=Case(*[When(pk=pk, then=Value(moment)) for pk, moment in admit.items()]),
+                    validated_by=validated_by,
+                    updated_at=now
+                )
+            if backdate:
+                Ticket.objects.filter(pk__in=list(backdate)).update(
+                    validated_at=Case(
+                        *[When(pk=pk, then=Value(moment)) for pk, moment in backdate.items()],
+                        default=F('validated_at')
+                    ),
+                    updated_at=now
+                )
+
+        for ticket_id, moment in {**backdate, **admit}.items():
+            ticket = tickets[ticket_id]
+            ticket.is_validated = True
+            ticket.validated_at = moment
+            validation_index.update_ticket(ticket)
+
+
+# Singleton instance
+door_sync = DoorSyncService()
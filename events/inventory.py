@@ -0,0 +1,188 @@
+"""
+Sharded Inventory Counters
+==========================
+Every ticket hold is a conditional UPDATE of one counter, Event.tickets_held
+(see events.ticket_holds), and TicketTier.reserve_tickets updates the tier
+row. The statement is short, but its row lock lasts until the reserving
+transaction commits, so when a popular gig goes on sale at 10:00 hundreds of
+checkouts queue on that one row.
+
+For such on-sales an event or tier can be sharded: its remaining tickets are
+spread over INVENTORY_SHARD_COUNT InventorySlot rows, and a reservation
+takes them from one slot picked at random among those with enough left:
+
+    UPDATE events_inventoryslot SET available = available - n
+     WHERE id = (SELECT id FROM events_inventoryslot
+                  WHERE event_id = %s AND tier_id IS NULL AND available >= n
+                  ORDER BY random() LIMIT 1)
+       AND available >= n
+
+so concurrent checkouts mostly lock different rows. Released tickets go back
+to a random slot. Availability is the sum of the slots.
+
+When no single slot has enough left (a slot emptied, or the on-sale is
+nearly sold out) the claim rebalances: it locks the slots no other
+transaction is using (SKIP LOCKED, so it doesn't queue behind every open
+checkout), takes the tickets from their pooled total and spreads the rest
+evenly back over them. If those slots alone fall short it locks all of them
+in slot order, waiting for the busy ones, and pools again before refusing,
+so a claim is only refused when the tickets really are gone.
+
+While an event is sharded its slots stand in for tickets_held: holds take
+from and return to the slots, and fulfillment adds to tickets_sold, taking
+from the slots only what a sale had no live hold for (its hold was swept
+before a late payment).
+A sharded tier's quantity_sold is brought up to date when sharding is turned
+off. Shard an event before its on-sale opens (holds taken while it is being
+sharded are not moved over) and unshard it afterwards, with the EventAdmin
+actions.
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Subquery, Sum
+
+logger = logging.getLogger(__name__)
+
+
+class InventoryCounterService:
+    """Spreads an event's or tier's remaining tickets over counter slots."""
+
+    def get_shard_count(self):
+        return getattr(settings, 'INVENTORY_SHARD_COUNT', 8)
+
+    def _slots(self, event_id, tier_id=None):
+        from .models import InventorySlot
+
+        if tier_id is not None:
+            return InventorySlot.objects.filter(tier_id=tier_id)
+        return InventorySlot.objects.filter(event_id=event_id, tier__isnull=True)
+
+    # Sharding
+
+    def shard(self, event, tier=None, shards=None):
+        """
+        Spread the remaining tickets of an event (or one of its tiers) over slots.
+
+        Re-sharding an already sharded event or tier changes its slot count.
+        """
+        from .models import Event, InventorySlot, TicketHold, TicketTier
+
+        shards = shards or self.get_shard_count()
+        if (tier or event).inventory_shards:
+            self.unshard(event, tier=tier)
+
+        with transaction.atomic():
+            if tier is not None:
+                owner = TicketTier.objects.select_for_update().get(pk=tier.pk)
+                remaining = owner.quantity_available - owner.quantity_sold
+                counters = {}
+            else:
+                owner = Event.objects.select_for_update().get(pk=event.pk)
+                # Live holds come back through the slots from now on
+                held = TicketHold.objects.filter(event=owner).aggregate(total=Sum('quantity'))['total'] or 0
+                remaining = owner.capacity - owner.tickets_sold - held
+                counters = {'tickets_held': 0}
+
+            share, extra = divmod(max(remaining, 0), shards)
+            InventorySlot.objects.bulk_create([
+                InventorySlot(
+                    event_id=event.pk,
+                    tier=tier,
+                    slot=slot,
+                    available=share + (1 if slot < extra else 0)
+                )
+                for slot in range(shards)
+            ])
+            type(owner).objects.filter(pk=owner.pk).update(inventory_shards=shards, **counters)
+
+        (tier or event).inventory_shards = shards
+        logger.info(f"Sharded inventory of {owner} over {shards} slots ({remaining} tickets)")
+
+    def unshard(self, event, tier=None):
+        """Fold the slots back into the event's (or tier's) own counters."""
+        from .models import Event, TicketHold, TicketTier
+
+        with transaction.atomic():
+            slots = self._slots(event.pk, tier.pk if tier is not None else None)
+            remaining = sum(slot.available for slot in slots.select_for_update())
+
+            if tier is not None:
+                owner = TicketTier.objects.select_for_update().get(pk=tier.pk)
+                counters = {'quantity_sold': max(owner.quantity_available - remaining, 0)}
+            else:
+                owner = Event.objects.select_for_update().get(pk=event.pk)
+                held = TicketHold.objects.filter(event=owner).aggregate(total=Sum('quantity'))['total'] or 0
+                counters = {'tickets_held': held}
+
+            slots.delete()
+            type(owner).objects.filter(pk=owner.pk).update(inventory_shards=0, **counters)
+
+        (tier or event).inventory_shards = 0
+        logger.info(f"Unsharded inventory of {owner} ({remaining} tickets left in slots)")
+
+    # Counting
+
+    def available(self, event_id, tier_id=None):
+        """Remaining tickets: the sum of the slots."""
+        return self._slots(event_id, tier_id).aggregate(total=Sum('available'))['total'] or 0
+
+    def claim(self, event_id, quantity, tier_id=None):
+        """Take tickets from a random slot, rebalancing if none has enough; returns success."""
+        slots = self._slots(event_id, tier_id)
+        candidate = slots.filter(available__gte=quantity).order_by('?').values('pk')[:1]
+        claimed = slots.filter(pk=Subquery(candidate), available__gte=quantity).update(
+            available=F('available') - quantity
+        )
+        return (
+            claimed == 1
+            or self._rebalance_claim(slots, quantity) == quantity
+            # The slots in use may hold the missing tickets: wait for them
+            or self._rebalance_claim(slots, quantity, skip_locked=False) == quantity
+        )
+
+    def take(self, event_id, quantity, tier_id=None):
+        """
+        Take up to quantity tickets, for sales that arrive without a hold.
+
+        The order is paid by then, so it takes whatever is left rather than
+        failing. Returns the number of tickets taken.
+        """
+        if self.claim(event_id, quantity, tier_id=tier_id):
+            return quantity
+        return self._rebalance_claim(self._slots(event_id, tier_id), quantity, skip_locked=False, partial=True)
+
+    def _rebalance_claim(self, slots, quantity, skip_locked=True, partial=False):
+        """
+        Pool the slots, take quantity tickets and spread the rest evenly.
+
+        Returns the number taken: quantity, or 0 when the pool is short
+        (with partial, whatever the pool held).
+        """
+        with transaction.atomic():
+            pool = list(slots.select_for_update(skip_locked=skip_locked).order_by('slot'))
+            total = sum(slot.available for slot in pool)
+            taken = min(quantity, total) if partial else quantity
+            if not pool or total < taken:
+                return 0
+
+            share, extra = divmod(total - taken, len(pool))
+            for n, slot in enumerate(pool):
+                slot.available = share + (1 if n < extra else 0)
+            slots.model.objects.bulk_update(pool, ['available'])
+
+        logger.debug(f"Rebalanced {len(pool)} inventory slots ({total - taken} tickets left)")
+        return taken
+
+    def release(self, event_id, quantity, tier_id=None):
+        """Give tickets back to a random slot."""
+        slots = self._slots(event_id, tier_id)
+        slots.filter(pk=Subquery(slots.order_by('?').values('pk')[:1])).update(
+            available=F('available') + quantity
+        )
+
+
+# Singleton instance
+inventory_counters = InventoryCounterService()
@@ -15,6 +15,7 @@ from django.db import transaction
 from .models import Event, ListingFee, ListingFeeConfig
 from payments import sumup as sumup_api
 from payments.models import SumUpCheckout
+from payments.webhook_inbox import webhook_inbox
 
 import logging
 import json
@@ -204,43 +205,16 @@ def listing_fee_webhook(request):
 
     try:
         data = json.loads(request.body.decode('utf-8'))
-        checkout_id = data.get('id') or data.get('checkout_id')
-        status = data.get('status')
+        if not isinstance(data, dict):
+            raise ValueError("Webhook payload must be a JSON object")
 
-        logger.info(f"Listing fee webhook received: checkout_id={checkout_id}, status={status}")
-
-        if not checkout_id:
-            return HttpResponse('OK')
-
-        # Find the listing fee by checkout ID
-        try:
-            listing_fee = ListingFee.objects.get(sumup_checkout_id=checkout_id)
-        except ListingFee.DoesNotExist:
-            # Might be a regular order payment, not a listing fee
-            return HttpResponse('OK')
-
-        # Update listing fee status based on webhook
-        if status == 'PAID':
-            listing_fee.payment_status = 'paid'
-            listing_fee.paid_at = timezone.now()
-            listing_fee.payment_data.update(data)
-            listing_fee.save()
-
-            # Publish the event
-            event = listing_fee.event
-            if event.status == 'draft':
-                event.status = 'published'
-                event.save()
-
-            logger.info(f"Listing fee paid for event {event.id}, event published")
-
-        elif status == 'FAILED':
-            listing_fee.payment_status = 'failed'
-            listing_fee.payment_data.update(data)
-            listing_fee.save()
-
-            logger.info(f"Listing fee payment failed for event {listing_fee.event.id}")
+        logger.info(
+            f"Listing fee webhook received: checkout_id={data.get('id') or data.get('checkout_id')}, "
+            f"status={data.get('status')}"
+        )
 
+        # Store and acknowledge - process_listing_fee_webhook runs from the inbox
+        webhook_inbox.record('listing_fee', data)
         return HttpResponse('OK')
 
     except Exception as e:
@@ -248,6 +222,44 @@ def listing_fee_webhook(request):
         return HttpResponse('Error', status=500)
 
 
+def process_listing_fee_webhook(data):
+    """Apply a stored listing fee webhook (called by the webhook inbox)."""
+    checkout_id = data.get('id') or data.get('checkout_id')
+    status = data.get('status')
+
+    if not checkout_id:
+        return
+
+    # Find the listing fee by checkout ID
+    try:
+        listing_fee = ListingFee.objects.get(sumup_checkout_id=checkout_id)
+    except ListingFee.DoesNotExist:
+        # Might be a regular order payment, not a listing fee
+        return
+
+    # Update listing fee status based on webhook
+    if status == 'PAID':
+        listing_fee.payment_status = 'paid'
+        listing_fee.paid_at = timezone.now()
+        listing_fee.payment_data.update(data)
+        listing_fee.save()
+
+        # Publish the event
+        event = listing_fee.event
+        if event.status == 'draft':
+            event.status = 'published'
+            event.save()
+
+        logger.info(f"Listing fee paid for event {event.id}, event published")
+
+    elif status == 'FAILED':
+        listing_fee.payment_status = 'failed'
+        listing_fee.payment_data.update(data)
+        listing_fee.save()
+
+        logger.info(f"Listing fee payment failed for event {listing_fee.event.id}")
+
+
 @login_required
 def listing_fee_status(request, event_id):
     """Check listing fee payment status."""
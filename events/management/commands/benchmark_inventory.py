@@ -0,0 +1,146 @@
+"""
+Management command to benchmark concurrent ticket reservations.
+
+Creates a throwaway event and has many threads take one-ticket holds on it
+at once through events.ticket_holds, each hold inside a transaction that
+stays open for --txn-ms (standing in for the order rows a checkout writes
+after its hold). Run once per shard count - 0 is the single Event counter -
+and reports reservations per second for each. The event, its holds and slots
+and its organiser are deleted afterwards.
+
+Needs PostgreSQL: SQLite serialises every write, so shard counts can't
+differ there.
+
+Usage:
+    python manage.py benchmark_inventory
+    python manage.py benchmark_inventory --shards 0 4 16 64 --threads 64 --reservations 5000
+"""
+
+import threading
+import time
+import uuid
+from collections import namedtuple
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from events.inventory import inventory_counters
+from events.models import Event
+from events.ticket_holds import ticket_holds
+
+User = get_user_model()
+
+Line = namedtuple('Line', ['event_id', 'quantity'])
+
+
+class Command(BaseCommand):
+    help = 'Benchmark concurrent ticket reservations (reservations per second) by shard count'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--shards',
+            type=int,
+            nargs='+',
+            default=[0, 1, 4, 16],
+            help='Shard counts to compare; 0 is the unsharded Event counter (default: 0 1 4 16)',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=32,
+            help='Concurrent checkouts (default: 32)',
+        )
+        parser.add_argument(
+            '--reservations',
+            type=int,
+            default=2000,
+            help='Holds taken per run, shared between the threads (default: 2000)',
+        )
+        parser.add_argument(
+            '--txn-ms',
+            type=float,
+            default=5.0,
+            help='Milliseconds each reserving transaction stays open after its hold (default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('benchmark_inventory needs PostgreSQL (SQLite serialises all writes)')
+
+        organiser = User.objects.create_user(
+            email=f'benchmark-{uuid.uuid4().hex[:8]}@example.com',
+            password=None,
+            user_type='artist',
+            first_name='Bench',
+            last_name='Organiser'
+        )
+        try:
+            self.stdout.write(
+                f"{options['threads']} threads, {options['reservations']} one-ticket holds per run, "
+                f"{options['txn_ms']:g} ms per reserving transaction"
+            )
+            for shards in options['shards']:
+                self.run(organiser, shards, options)
+        finally:
+            organiser.delete()
+
+    def run(self, organiser, shards, options):
+        total = options['reservations']
+        event = Event.objects.create(
+            title=f'Benchmark On-Sale ({shards} shards)',
+            organiser=organiser,
+            description='Inventory benchmark',
+            venue_name='Fort Regent',
+            venue_address='Pier Road, St Helier, Jersey',
+            event_date=timezone.now().date() + timedelta(days=90),
+            event_time=timezone.now().time(),
+            capacity=total,
+            ticket_price=Decimal('25.00'),
+            status='draft'
+        )
+        try:
+            if shards:
+                inventory_counters.shard(event, shards=shards)
+
+            lock = threading.Lock()
+            counts = {'left': total, 'held': 0, 'refused': 0}
+
+            def worker():
+                try:
+                    while True:
+                        with lock:
+                            if counts['left'] == 0:
+                                return
+                            counts['left'] -= 1
+                        try:
+                            with transaction.atomic():
+                                ticket_holds.hold_items([Line(event.pk, 1)])
+                                time.sleep(options['txn_ms'] / 1000)
+                            outcome = 'held'
+                        except Exception:
+                            outcome = 'refused'
+                        with lock:
+                            counts[outcome] += 1
+                finally:
+                    connection.close()
+
+            threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            event.refresh_from_db()
+            self.stdout.write(
+                f"{shards or 'unsharded':>10}: {counts['held'] / elapsed:8.1f} reservations/s "
+                f"({counts['held']} held, {counts['refused']} refused in {elapsed:.2f}s; "
+                f"{event.tickets_available} left)"
+            )
+        finally:
+            event.delete()
@@ -0,0 +1,96 @@
+"""
+Management command to benchmark ticket PDF generation throughput.
+
+Builds unsaved in-memory tickets (no database writes) and times
+TicketGenerator for single-ticket orders and one multi-ticket order,
+reporting tickets per second for each.
+
+Usage:
+    python manage.py benchmark_ticket_pdfs
+    python manage.py benchmark_ticket_pdfs --order-size 50 --rounds 20
+"""
+
+import time
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from events.models import Event, Ticket
+from events.ticket_generator import TicketGenerator
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark ticket PDF generation (tickets per second)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--order-size',
+            type=int,
+            default=50,
+            help='Tickets in the multi-ticket order (default: 50)',
+        )
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=20,
+            help='Single-ticket PDFs to render and multi-ticket orders to build (default: 20)',
+        )
+
+    def build_tickets(self, count):
+        organiser = User(email='benchmark-organiser@example.com', first_name='Bench', last_name='Organiser')
+        customer = User(email='benchmark-customer@example.com', first_name='Bench', last_name='Customer')
+        event = Event(
+            pk=1,
+            title='Benchmark Concert',
+            organiser=organiser,
+            venue_name='Fort Regent',
+            venue_address='Pier Road, St Helier, Jersey',
+            event_date=date(2026, 12, 31),
+            event_time=dt_time(19, 30),
+            ticket_price=Decimal('25.00'),
+        )
+        purchase_date = timezone.make_aware(datetime(2026, 11, 1, 12, 0))
+
+        tickets = []
+        for i in range(count):
+            ticket = Ticket(
+                event=event,
+                customer=customer,
+                ticket_number=f'BENCH{i:06d}',
+                status='valid',
+            )
+            ticket.purchase_date = purchase_date
+            tickets.append(ticket)
+        return tickets
+
+    def timed(self, func, rounds):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        return time.perf_counter() - start
+
+    def handle(self, *args, **options):
+        order_size = options['order_size']
+        rounds = options['rounds']
+        generator = TicketGenerator()
+
+        single = self.build_tickets(1)[0]
+        order = self.build_tickets(order_size)
+
+        # Warm-up so one-off imports and font loading aren't measured
+        generator.generate_ticket_pdf(single)
+
+        elapsed = self.timed(lambda: generator.generate_ticket_pdf(single), rounds)
+        self.stdout.write(f"Single-ticket orders: {rounds / elapsed:.1f} tickets/s ({rounds} PDFs in {elapsed:.2f}s)")
+
+        elapsed = self.timed(lambda: generator.generate_multiple_tickets_pdf(order), rounds)
+        total = rounds * order_size
+        self.stdout.write(
+            f"{order_size}-ticket orders: {total / elapsed:.1f} tickets/s "
+            f"({rounds} PDFs in {elapsed:.2f}s)"
+        )
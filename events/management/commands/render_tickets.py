@@ -0,0 +1,45 @@
+"""
+Management command to render ticket QR codes and PDFs that are still pending.
+
+Used by Django-Q on a schedule (or cron) to retry failed renders and pick up
+tickets whose render task was lost. Can also be run manually.
+
+Usage:
+    python manage.py render_tickets
+    python manage.py render_tickets --order 123
+    python manage.py render_tickets --batch-size 50
+"""
+
+from django.core.management.base import BaseCommand
+from events.ticket_render_service import ticket_render_service
+
+
+class Command(BaseCommand):
+    help = 'Render QR codes and PDFs for tickets that are pending or failed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--order',
+            type=int,
+            default=None,
+            help='Only render tickets for this order id',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Maximum tickets to render (default: TICKET_RENDER_BATCH_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        if options.get('order'):
+            stats = ticket_render_service.render_order(options['order'])
+        else:
+            stats = ticket_render_service.render_pending(batch_size=options.get('batch_size'))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Rendered {stats['rendered']} tickets "
+                f"(failed {stats['failed']}, skipped {stats['skipped']})"
+            )
+        )
@@ -0,0 +1,44 @@
+# Generated manually for the ticket QR/PDF rendering pipeline
+
+from django.db import migrations, models
+
+
+def mark_existing_pdfs_ready(apps, schema_editor):
+    """Tickets rendered before the pipeline existed already have their PDF."""
+    Ticket = apps.get_model('events', 'Ticket')
+    Ticket.objects.exclude(pdf_file='').exclude(pdf_file__isnull=True).update(render_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_event_processing_fee_passed_to_customer_tickettier_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='render_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('rendering', 'Rendering'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', help_text='Whether the QR code and PDF have been rendered', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='render_attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='render_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='render_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['render_status', 'render_started_at'], name='events_tkt_render_idx'),
+        ),
+        migrations.RunPython(mark_existing_pdfs_ready, migrations.RunPython.noop),
+    ]
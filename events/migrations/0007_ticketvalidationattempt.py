@@ -0,0 +1,39 @@
+# Generated manually for the door validation attempt log
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_ticket_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketValidationAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticket_number', models.CharField(blank=True, max_length=20)),
+                ('scanner_id', models.CharField(blank=True, help_text='Door scanner that submitted the scan', max_length=50)),
+                ('outcome', models.CharField(choices=[('admitted', 'Admitted'), ('duplicate', 'Duplicate'), ('rejected', 'Rejected')], max_length=20)),
+                ('message', models.CharField(blank=True, max_length=255)),
+                ('latency_ms', models.PositiveIntegerField(blank=True, help_text='Server time taken to decide the scan; empty for offline scans', null=True)),
+                ('attempted_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('event', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='validation_attempts', to='events.event')),
+                ('ticket', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='validation_attempts', to='events.ticket')),
+                ('validated_by', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-attempted_at'],
+                'indexes': [
+                    models.Index(fields=['event', 'attempted_at'], name='events_tva_event_idx'),
+                    models.Index(fields=['ticket', 'attempted_at'], name='events_tva_ticket_idx'),
+                ],
+            },
+        ),
+    ]
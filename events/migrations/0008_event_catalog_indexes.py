@@ -0,0 +1,25 @@
+# Generated manually for keyset pagination of the public event catalog
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_ticketvalidationattempt'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['status', 'event_date', 'event_time', 'id'], name='events_evt_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['status', 'ticket_price', 'id'], name='events_evt_status_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='events_evt_status_created_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated manually for full-text event search
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_CONFIG = 'english'
+
+
+def create_search_index(apps, schema_editor):
+    """GIN index and initial vectors; the column stays unused on other databases."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS events_evt_search_idx "
+        "ON events_event USING gin (search_vector)"
+    )
+    # Same weights as events.search.EventSearchService.get_vector
+    schema_editor.execute(
+        """
+        UPDATE events_event AS e SET search_vector =
+            setweight(to_tsvector(%(config)s::regconfig, coalesce(e.title, '')), 'A')
+            || setweight(to_tsvector(%(config)s::regconfig, coalesce(e.venue_name, '')), 'B')
+            || setweight(to_tsvector(%(config)s::regconfig, coalesce(
+                nullif(trim(concat(u.first_name, ' ', u.last_name)), ''), u.email, '')), 'B')
+            || setweight(to_tsvector(%(config)s::regconfig, coalesce(e.description, '')), 'C')
+        FROM accounts_user AS u
+        WHERE u.id = e.organiser_id
+        """,
+        params={'config': SEARCH_CONFIG}
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS events_evt_search_idx")
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('events', '0008_event_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,49 @@
+# Generated manually for time-limited ticket holds
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_event_search_vector'),
+        ('orders', '0004_order_fulfilled_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='tickets_held',
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text='Tickets set aside for checkouts in progress (events.ticket_holds)'
+            ),
+        ),
+        migrations.CreateModel(
+            name='TicketHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField()),
+                ('event', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='holds',
+                    to='events.event'
+                )),
+                ('order', models.ForeignKey(
+                    blank=True,
+                    null=True,
+                    on_delete=django.db.models.deletion.SET_NULL,
+                    related_name='ticket_holds',
+                    to='orders.order'
+                )),
+            ],
+            options={
+                'ordering': ['expires_at'],
+                'indexes': [models.Index(fields=['expires_at'], name='events_hold_expiry_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated manually for sharded inventory counters
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_ticket_holds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='inventory_shards',
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                editable=False,
+                help_text='Counter slots remaining tickets are spread over for hot on-sales (events.inventory); 0 when off'
+            ),
+        ),
+        migrations.AddField(
+            model_name='tickettier',
+            name='inventory_shards',
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                editable=False,
+                help_text='Counter slots remaining tickets are spread over (events.inventory); '
+                          'quantity_sold is brought up to date when sharding is turned off'
+            ),
+        ),
+        migrations.CreateModel(
+            name='InventorySlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveSmallIntegerField()),
+                ('available', models.PositiveIntegerField(default=0)),
+                ('event', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='inventory_slots',
+                    to='events.event'
+                )),
+                ('tier', models.ForeignKey(
+                    blank=True,
+                    null=True,
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='inventory_slots',
+                    to='events.tickettier'
+                )),
+            ],
+            options={
+                'ordering': ['event', 'tier', 'slot'],
+                'constraints': [
+                    models.UniqueConstraint(
+                        condition=models.Q(tier__isnull=True),
+                        fields=('event', 'slot'),
+                        name='events_slot_event_uniq'
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(tier__isnull=False),
+                        fields=('tier', 'slot'),
+                        name='events_slot_tier_uniq'
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.urls import reverse
 from django.utils.text import slugify
@@ -91,6 +92,16 @@ class Event(models.Model):
         help_text="Maximum number of tickets available. Maximum: 500 tickets for automatic pricing."
     )
     tickets_sold = models.PositiveIntegerField(default=0)
+    tickets_held = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Tickets set aside for checkouts in progress (events.ticket_holds)"
+    )
+    inventory_shards = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        help_text="Counter slots remaining tickets are spread over for hot on-sales (events.inventory); 0 when off"
+    )
     ticket_price = models.DecimalField(
         max_digits=10,
         decimal_places=2,
@@ -130,8 +141,17 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Full-text search (events.search); rebuilt on save by events.signals, PostgreSQL only
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
     class Meta:
         ordering = ['-event_date', '-event_time']
+        indexes = [
+            # Keyset pagination of the public catalog (events.catalog.SORTS)
+            models.Index(fields=['status', 'event_date', 'event_time', 'id'], name='events_evt_status_date_idx'),
+            models.Index(fields=['status', 'ticket_price', 'id'], name='events_evt_status_price_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='events_evt_status_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.event_date}"
@@ -178,7 +198,10 @@ class Event(models.Model):
 
     @property
     def tickets_available(self):
-        return self.capacity - self.tickets_sold
+        if self.inventory_shards:
+            from .inventory import inventory_counters
+            return inventory_counters.available(self.pk)
+        return self.capacity - self.tickets_sold - self.tickets_held
 
     @property
     def total_revenue(self):
@@ -287,6 +310,13 @@ class Ticket(models.Model):
         ('refunded', 'Refunded'),
     ]
 
+    RENDER_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('rendering', 'Rendering'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+
     event = models.ForeignKey(
         Event,
         on_delete=models.CASCADE,
@@ -323,6 +353,17 @@ class Ticket(models.Model):
         help_text="Generated PDF ticket file"
     )
 
+    # QR/PDF rendering pipeline (events.ticket_render_service)
+    render_status = models.CharField(
+        max_length=20,
+        choices=RENDER_STATUS_CHOICES,
+        default='pending',
+        help_text="Whether the QR code and PDF have been rendered"
+    )
+    render_attempts = models.PositiveIntegerField(default=0)
+    render_error = models.TextField(blank=True)
+    render_started_at = models.DateTimeField(null=True, blank=True)
+
     # Validation fields
     validation_hash = models.CharField(
         max_length=32,
@@ -351,6 +392,10 @@ class Ticket(models.Model):
         help_text="Staff member who validated this ticket"
     )
 
+    # Bumped on every admission or status change; offline door scanners
+    # sync from it (events.door_sync)
+    updated_at = models.DateTimeField(auto_now=True)
+
     # Optional fields for additional ticket info
     seat_number = models.CharField(max_length=20, blank=True)
     special_requirements = models.TextField(blank=True)
@@ -368,19 +413,35 @@ class Ticket(models.Model):
     class Meta:
         ordering = ['-purchase_date']
         unique_together = ['event', 'ticket_number']
+        indexes = [
+            models.Index(fields=['render_status', 'render_started_at'], name='events_tkt_render_idx'),
+            models.Index(fields=['event', 'updated_at'], name='events_tkt_event_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Ticket {self.ticket_number} for {self.event.title}"
 
     def save(self, *args, **kwargs):
+        is_new = self._state.adding
         if not self.ticket_number:
             self.ticket_number = self.generate_ticket_number()
 
         super().save(*args, **kwargs)
 
-        # Generate QR code after saving
-        if not self.qr_code:
-            self.generate_qr_code()
+        # QR code and PDF are rendered by a worker once the ticket is committed
+        if is_new and self.render_status == 'pending':
+            from .ticket_render_service import ticket_render_service
+            ticket_render_service.enqueue_tickets([self.pk])
+
+        # Keep the door validation index in step with refunds/cancellations
+        if not is_new:
+            from .validation_index import validation_index
+            validation_index.update_ticket(self)
+
+        update_fields = kwargs.get('update_fields')
+        if is_new or update_fields is None or 'status' in update_fields:
+            from .validation_log import validation_log
+            validation_log.invalidate_totals(self.event_id)
 
     def generate_ticket_number(self):
         """Generate a unique ticket number."""
@@ -388,12 +449,10 @@ class Ticket(models.Model):
 
     def generate_qr_code(self):
         """Generate QR code for the ticket."""
-        # Use customer_email if customer is None
-        customer_identifier = str(self.customer.id) if self.customer else self.customer_email
-        qr_data = f"TICKET:{self.ticket_number}:EVENT:{self.event.slug}:CUSTOMER:{customer_identifier}"
+        from .ticket_token import encode_ticket_token
 
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        qr.add_data(qr_data)
+        qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=10, border=4)
+        qr.add_data(encode_ticket_token(self))
         qr.make(fit=True)
 
         img = qr.make_image(fill_color="black", back_color="white")
@@ -441,29 +500,37 @@ class Ticket(models.Model):
             return False
 
     def validate_ticket(self, validated_by=None):
-        """Mark ticket as validated for entry."""
-        if self.is_validated:
-            return False, "Ticket has already been used"
+        """
+        Mark ticket as validated for entry.
 
-        if self.status != 'valid':
+        Admission is a single conditional UPDATE, so when two scanners read
+        the same QR code at once exactly one of them admits the holder.
+        """
+        now = timezone.now()
+        admitted = Ticket.objects.filter(
+            pk=self.pk, is_validated=False, status='valid'
+        ).update(is_validated=True, validated_at=now, validated_by=validated_by, updated_at=now)
+
+        if not admitted:
+            # Lost the race (or the ticket was never admissible) - report why
+            self.refresh_from_db(fields=['is_validated', 'validated_at', 'status'])
+            if self.is_validated:
+                return False, "Ticket has already been used"
             return False, f"Ticket is {self.status} and cannot be used"
 
-        # Mark as validated
         self.is_validated = True
-        self.validated_at = timezone.now()
-        if validated_by:
-            self.validated_by = validated_by
+        self.validated_at = now
+        self.validated_by = validated_by
 
-        self.save(update_fields=['is_validated', 'validated_at', 'validated_by'])
+        from .validation_index import validation_index
+        validation_index.update_ticket(self)
 
         logger.info(f"Ticket {self.ticket_number} validated for entry")
         return True, "Ticket validated successfully"
 
     def get_download_url(self):
-        """Get URL for downloading the PDF ticket."""
-        if self.pdf_file:
-            return self.pdf_file.url
-        return None
+        """Get URL for downloading the PDF ticket (rendered on demand if needed)."""
+        return reverse('events:download_ticket', args=[self.ticket_number])
 
     @property
     def is_valid_for_entry(self):
@@ -475,6 +542,142 @@ class Ticket(models.Model):
         )
 
 
+class TicketValidationAttempt(models.Model):
+    """
+    One scan at the door, kept as an append-only log (events.validation_log).
+
+    Rows are only ever inserted, in bulk. Event, ticket and staff member are
+    not enforced as database constraints, so the log outlives deleted rows
+    and scans of unknown tickets can still be recorded.
+    """
+    OUTCOME_CHOICES = [
+        ('admitted', 'Admitted'),
+        ('duplicate', 'Duplicate'),
+        ('rejected', 'Rejected'),
+    ]
+
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='validation_attempts'
+    )
+    ticket = models.ForeignKey(
+        Ticket,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='validation_attempts'
+    )
+    ticket_number = models.CharField(max_length=20, blank=True)
+    validated_by = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    scanner_id = models.CharField(max_length=50, blank=True, help_text="Door scanner that submitted the scan")
+    outcome = models.CharField(max_length=20, choices=OUTCOME_CHOICES)
+    message = models.CharField(max_length=255, blank=True)
+    latency_ms = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Server time taken to decide the scan; empty for offline scans"
+    )
+    attempted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-attempted_at']
+        indexes = [
+            models.Index(fields=['event', 'attempted_at'], name='events_tva_event_idx'),
+            models.Index(fields=['ticket', 'attempted_at'], name='events_tva_ticket_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_outcome_display()} scan of {self.ticket_number or 'unknown ticket'} at {self.attempted_at}"
+
+
+class TicketHold(models.Model):
+    """
+    Tickets set aside for one checkout until it is paid or the hold expires.
+
+    Event.tickets_held is the sum of the quantities of an event's holds; rows
+    and counter only change together, through events.ticket_holds. A hold
+    outlives its order (SET_NULL) so the sweeper still returns its tickets.
+    """
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='holds'
+    )
+    order = models.ForeignKey(
+        'orders.Order',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ticket_holds'
+    )
+    quantity = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['expires_at']
+        indexes = [
+            models.Index(fields=['expires_at'], name='events_hold_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.event} held until {self.expires_at}"
+
+
+class InventorySlot(models.Model):
+    """
+    One shard of an event's (or tier's) remaining tickets (events.inventory).
+
+    Reservations take tickets from a single slot with a conditional UPDATE,
+    so concurrent checkouts for a hot on-sale spread over several rows
+    instead of queuing on the Event or TicketTier row.
+    """
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='inventory_slots'
+    )
+    tier = models.ForeignKey(
+        'TicketTier',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='inventory_slots'
+    )
+    slot = models.PositiveSmallIntegerField()
+    available = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['event', 'tier', 'slot']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['event', 'slot'],
+                condition=models.Q(tier__isnull=True),
+                name='events_slot_event_uniq'
+            ),
+            models.UniqueConstraint(
+                fields=['tier', 'slot'],
+                condition=models.Q(tier__isnull=False),
+                name='events_slot_tier_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.tier or self.event} slot {self.slot}: {self.available} available"
+
+
 class TicketTier(models.Model):
     """Ticket tiers for events (VIP, Standard, Child, Concession, Elderly)."""
     TIER_TYPE_CHOICES = [
@@ -518,6 +721,12 @@ class TicketTier(models.Model):
         default=0,
         help_text="Number of tickets sold at this tier"
     )
+    inventory_shards = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        help_text="Counter slots remaining tickets are spread over (events.inventory); "
+                  "quantity_sold is brought up to date when sharding is turned off"
+    )
     is_active = models.BooleanField(
         default=True,
         help_text="Whether this tier is available for purchase"
@@ -575,11 +784,14 @@ class TicketTier(models.Model):
     @property
     def is_sold_out(self):
         """Check if this tier is sold out."""
-        return self.quantity_sold >= self.quantity_available
+        return self.tickets_remaining <= 0
 
     @property
     def tickets_remaining(self):
         """Get number of tickets remaining for this tier."""
+        if self.inventory_shards:
+            from .inventory import inventory_counters
+            return inventory_counters.available(self.event_id, tier_id=self.pk)
         return self.quantity_available - self.quantity_sold
 
     def get_customer_price(self):
@@ -601,12 +813,23 @@ class TicketTier(models.Model):
         Reserve tickets from this tier (increment sold count).
         Must be called within a transaction.
 
+        A sharded tier takes them from one of its counter slots instead, so
+        concurrent reservations don't queue on the tier row.
+
         Args:
             quantity (int): Number of tickets to reserve
 
         Returns:
             bool: True if successful, False if not enough tickets
         """
+        if self.inventory_shards:
+            from .inventory import inventory_counters
+            if not inventory_counters.claim(self.event_id, quantity, tier_id=self.pk):
+                logger.error(f"Not enough tickets in sharded tier {self.id}: requested={quantity}")
+                return False
+            logger.info(f"Reserved {quantity} tickets from tier {self.id}")
+            return True
+
         if self.tickets_remaining < quantity:
             logger.error(
                 f"Not enough tickets in tier {self.id}: "
@@ -0,0 +1,175 @@
+"""
+Event Search
+============
+Text search over published events: title, description, venue and organiser
+name.
+
+On PostgreSQL each event stores a weighted tsvector in Event.search_vector
+(title A, venue and organiser B, description C), indexed with GIN
+(events_evt_search_idx, created in migration 0009). Queries use
+websearch_to_tsquery, so phrases in quotes, "or" and -exclusions work, and
+only matching rows are read from the index however large the event history
+grows. Results are ordered by ts_rank and carry a ts_headline snippet of the
+description.
+
+The vector is rebuilt when an event's text fields are saved (Event.save) and
+when an organiser's name changes (events.signals). Bulk queryset updates of
+those fields must call update_vectors() themselves.
+
+Other databases (SQLite in local test mode) fall back to icontains matching
+of every search term against the same fields, newest first, with a plain
+excerpt as the snippet.
+"""
+
+import logging
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q, Value
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+logger = logging.getLogger(__name__)
+
+# Highlight markers, swapped for <mark> tags once the snippet has been escaped
+MARK_START = '\x02'
+MARK_STOP = '\x03'
+
+
+class EventSearchService:
+    """Builds search vectors and runs ranked event searches."""
+
+    # Event fields the vector is built from (plus the organiser's name)
+    SEARCH_FIELDS = ('title', 'description', 'venue_name')
+
+    SNIPPET_WORDS = 30
+
+    def get_config(self):
+        return getattr(settings, 'EVENT_SEARCH_CONFIG', 'english')
+
+    def get_limit(self):
+        return getattr(settings, 'EVENT_SEARCH_LIMIT', 48)
+
+    def is_full_text(self):
+        return connection.vendor == 'postgresql'
+
+    # Vectors
+
+    def get_vector(self, organiser_name):
+        """Weighted tsvector expression for events of an organiser."""
+        from django.contrib.postgres.search import SearchVector
+
+        config = self.get_config()
+        return (
+            SearchVector('title', weight='A', config=config)
+            + SearchVector('venue_name', weight='B', config=config)
+            + SearchVector(Value(organiser_name or ''), weight='B', config=config)
+            + SearchVector('description', weight='C', config=config)
+        )
+
+    def update_event(self, event):
+        """Rebuild one event's search vector."""
+        if not self.is_full_text():
+            return
+        from .models import Event
+
+        Event.objects.filter(pk=event.pk).update(
+            search_vector=self.get_vector(event.organiser.get_full_name())
+        )
+
+    def update_organiser(self, organiser):
+        """Rebuild the vectors of every event of an organiser (their name changed)."""
+        if not self.is_full_text():
+            return
+        from .models import Event
+
+        Event.objects.filter(organiser=organiser).update(
+            search_vector=self.get_vector(organiser.get_full_name())
+        )
+
+    def update_vectors(self, events):
+        """Rebuild the vectors of a queryset of events, one UPDATE per organiser."""
+        if not self.is_full_text():
+            return
+        from accounts.models import User
+
+        organisers = User.objects.filter(pk__in=events.values('organiser_id'))
+        for organiser in organisers:
+            events.filter(organiser=organiser).update(
+                search_vector=self.get_vector(organiser.get_full_name())
+            )
+
+    # Searching
+
+    def search(self, events, text):
+        """
+        Filter and order an Event queryset by a search string.
+
+        Returns:
+            list: up to EVENT_SEARCH_LIMIT events, best match first, each with
+                  a `snippet` attribute (safe HTML with <mark> highlights)
+        """
+        text = (text or '').strip()
+        if not text:
+            return []
+
+        if self.is_full_text():
+            results = list(self._full_text(events, text)[:self.get_limit()])
+            for event in results:
+                event.snippet = self._highlight(event.snippet)
+        else:
+            terms = text.split()
+            results = list(self._fallback(events, terms)[:self.get_limit()])
+            for event in results:
+                event.snippet = self._highlight(self._excerpt(event.description, terms))
+        return results
+
+    def _full_text(self, events, text):
+        from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+
+        config = self.get_config()
+        query = SearchQuery(text, search_type='websearch', config=config)
+        return events.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query),
+            snippet=SearchHeadline(
+                'description',
+                query,
+                config=config,
+                start_sel=MARK_START,
+                stop_sel=MARK_STOP,
+                max_words=self.SNIPPET_WORDS,
+                min_words=self.SNIPPET_WORDS // 2,
+            ),
+        ).order_by('-rank', '-id')
+
+    def _fallback(self, events, terms):
+        for term in terms:
+            events = events.filter(
+                Q(title__icontains=term)
+                | Q(description__icontains=term)
+                | Q(venue_name__icontains=term)
+                | Q(organiser__first_name__icontains=term)
+                | Q(organiser__last_name__icontains=term)
+            )
+        return events.order_by('-created_at', '-id')
+
+    def _excerpt(self, text, terms):
+        """Around SNIPPET_WORDS words of text from the first matching term, terms marked."""
+        words = (text or '').split()
+        pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+
+        start = next((n for n, word in enumerate(words) if pattern.search(word)), 0)
+        start = max(start - self.SNIPPET_WORDS // 3, 0)
+        excerpt = ' '.join(words[start:start + self.SNIPPET_WORDS])
+        return pattern.sub(lambda match: f"{MARK_START}{match.group(0)}{MARK_STOP}", excerpt)
+
+    @staticmethod
+    def _highlight(snippet):
+        """Escape a marked-up snippet (it is user text) and turn the markers into <mark> tags."""
+        html = escape(snippet or '').replace(MARK_START, '<mark>').replace(MARK_STOP, '</mark>')
+        return mark_safe(html)
+
+
+# Singleton instance
+event_search = EventSearchService()
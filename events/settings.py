@@ -139,6 +139,7 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Must be right after SecurityMiddleware
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'accounts.middleware.SessionRefreshMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -221,6 +222,27 @@ else:
     if not DEBUG and not DATABASE_URL and not os.getenv("POSTGRES_PASSWORD"):
         raise ValueError("Production requires DATABASE_URL or POSTGRES_PASSWORD to be set!")
 
+# Cache Configuration
+# Redis is shared by every web/worker process (SumUp tokens, door validation
+# index). Without REDIS_URL each process falls back to its own memory cache.
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'jerseyevents',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'jerseyevents',
+        }
+    }
+
 # Custom user model
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -267,8 +289,12 @@ LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 
 # Session configuration
-SESSION_SAVE_EVERY_REQUEST = True
+# Sessions are only written when they change (anonymous carts live in the
+# session, see cart.cart); SessionRefreshMiddleware re-saves an active
+# session every SESSION_REFRESH_SECONDS so its expiry still slides
+SESSION_SAVE_EVERY_REQUEST = False
 SESSION_COOKIE_AGE = 86400  # 1 day
+SESSION_REFRESH_SECONDS = int(os.getenv('SESSION_REFRESH_SECONDS', '300'))
 
 # ============================================
 # SUBSCRIPTION CONFIGURATION (DEPRECATED - Using pay-per-event model)
@@ -421,6 +447,25 @@ if not DEBUG and not all([SUMUP_CLIENT_ID, SUMUP_CLIENT_SECRET, SUMUP_MERCHANT_C
     import sys
     print("⚠️  CRITICAL: Missing SumUp credentials for production!", file=sys.stderr)
 
+# SumUp HTTP client: pooled keep-alive connections, timeouts (seconds) and GET retries
+SUMUP_HTTP_POOL_SIZE = int(os.getenv("SUMUP_HTTP_POOL_SIZE", "10"))
+SUMUP_HTTP_CONNECT_TIMEOUT = float(os.getenv("SUMUP_HTTP_CONNECT_TIMEOUT", "5"))
+SUMUP_HTTP_READ_TIMEOUT = float(os.getenv("SUMUP_HTTP_READ_TIMEOUT", "20"))
+SUMUP_HTTP_MAX_RETRIES = int(os.getenv("SUMUP_HTTP_MAX_RETRIES", "3"))
+SUMUP_HTTP_BACKOFF_FACTOR = float(os.getenv("SUMUP_HTTP_BACKOFF_FACTOR", "0.3"))
+SUMUP_HTTP_BACKOFF_JITTER = float(os.getenv("SUMUP_HTTP_BACKOFF_JITTER", "0.3"))
+
+# Refresh SumUp access tokens in the background this many seconds before they expire
+SUMUP_TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv("SUMUP_TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+
+# Scheduled artist token refresh (refresh_sumup_tokens / token_refresh_service)
+SUMUP_TOKEN_REFRESH_WINDOW_MINUTES = int(os.getenv("SUMUP_TOKEN_REFRESH_WINDOW_MINUTES", "30"))
+SUMUP_TOKEN_REFRESH_BATCH_SIZE = int(os.getenv("SUMUP_TOKEN_REFRESH_BATCH_SIZE", "50"))
+SUMUP_TOKEN_REFRESH_CONCURRENCY = int(os.getenv("SUMUP_TOKEN_REFRESH_CONCURRENCY", "4"))
+
+# Payment polling: number of SumUp checkout status lookups in flight per cycle
+PAYMENT_POLLING_CONCURRENCY = int(os.getenv("PAYMENT_POLLING_CONCURRENCY", "5"))
+
 # SumUp OAuth redirect URI - must match the callback URL registered in SumUp dashboard
 # For artist OAuth: https://your.site/accounts/sumup/callback/
 # If not set, will be constructed from SITE_URL (requires SITE_URL to be set correctly)
@@ -820,6 +865,104 @@ if os.getenv('ENABLE_DJANGO_Q', 'false').lower() == 'true':
     }
     print("✅ Django-Q task scheduling enabled")
 
+# SumUp webhook inbox (payments.webhook_inbox)
+# Async drain needs a qcluster worker; without one, events are processed inline
+# right after they are stored (development only)
+WEBHOOK_INBOX_ASYNC = os.getenv(
+    'WEBHOOK_INBOX_ASYNC', str('django_q' in INSTALLED_APPS)
+).lower() == 'true'
+if not DEBUG and not WEBHOOK_INBOX_ASYNC:
+    import sys
+    print("⚠️  WARNING: WEBHOOK_INBOX_ASYNC is off - webhooks are processed inside the request", file=sys.stderr)
+WEBHOOK_INBOX_BATCH_SIZE = int(os.getenv('WEBHOOK_INBOX_BATCH_SIZE', '100'))
+WEBHOOK_INBOX_MAX_ATTEMPTS = int(os.getenv('WEBHOOK_INBOX_MAX_ATTEMPTS', '5'))
+WEBHOOK_INBOX_CLAIM_TIMEOUT_SECONDS = int(os.getenv('WEBHOOK_INBOX_CLAIM_TIMEOUT_SECONDS', '300'))
+
+# Order fulfillment (payments.fulfillment_service)
+# Ticket QR/PDF rendering and confirmation emails run as a Django-Q task when
+# a worker is available, otherwise straight after the order commits
+FULFILLMENT_ASYNC = os.getenv(
+    'FULFILLMENT_ASYNC', str('django_q' in INSTALLED_APPS)
+).lower() == 'true'
+FULFILLMENT_TICKET_BATCH_SIZE = int(os.getenv('FULFILLMENT_TICKET_BATCH_SIZE', '500'))
+
+# Ticket QR/PDF rendering pipeline (events.ticket_render_service)
+TICKET_RENDER_ASYNC = os.getenv(
+    'TICKET_RENDER_ASYNC', str('django_q' in INSTALLED_APPS)
+).lower() == 'true'
+TICKET_RENDER_MAX_ATTEMPTS = int(os.getenv('TICKET_RENDER_MAX_ATTEMPTS', '3'))
+TICKET_RENDER_CLAIM_TIMEOUT_SECONDS = int(os.getenv('TICKET_RENDER_CLAIM_TIMEOUT_SECONDS', '600'))
+TICKET_RENDER_BATCH_SIZE = int(os.getenv('TICKET_RENDER_BATCH_SIZE', '200'))
+
+# Combined multi-ticket PDFs (events.ticket_generator) are rendered in a
+# process pool once an order reaches TICKET_PDF_PARALLEL_THRESHOLD tickets
+TICKET_PDF_PARALLEL_THRESHOLD = int(os.getenv('TICKET_PDF_PARALLEL_THRESHOLD', '100'))
+TICKET_PDF_WORKERS = int(os.getenv('TICKET_PDF_WORKERS', str(min(os.cpu_count() or 1, 4))))
+TICKET_PDF_CHUNK_SIZE = int(os.getenv('TICKET_PDF_CHUNK_SIZE', '25'))
+
+# Signed ticket QR tokens (events.ticket_token)
+# To rotate: bump TICKET_TOKEN_KEY_ID, set the new TICKET_TOKEN_SECRET and keep
+# the old key in TICKET_TOKEN_PREVIOUS_KEYS ("1:old-secret,2:older-secret")
+# until every ticket signed with it has been used
+TICKET_TOKEN_KEY_ID = int(os.getenv('TICKET_TOKEN_KEY_ID', '1'))
+TICKET_TOKEN_KEYS = {
+    int(key_id): secret
+    for key_id, secret in (
+        entry.split(':', 1) for entry in os.getenv('TICKET_TOKEN_PREVIOUS_KEYS', '').split(',') if entry
+    )
+}
+TICKET_TOKEN_KEYS[TICKET_TOKEN_KEY_ID] = os.getenv('TICKET_TOKEN_SECRET', SECRET_KEY)
+
+# Door validation index (events.validation_index), loaded into the cache when
+# an organiser opens the validation dashboard
+VALIDATION_INDEX_TIMEOUT_SECONDS = int(os.getenv('VALIDATION_INDEX_TIMEOUT_SECONDS', str(12 * 60 * 60)))
+VALIDATION_INDEX_BATCH_SIZE = int(os.getenv('VALIDATION_INDEX_BATCH_SIZE', '500'))
+# Most QR codes a scanner may submit to the batch admission endpoint at once
+VALIDATION_BATCH_MAX_SIZE = int(os.getenv('VALIDATION_BATCH_MAX_SIZE', '200'))
+# Offline scanner deltas (events.door_sync) re-send this many seconds before
+# the cursor so admissions that commit out of order are not missed
+DOOR_SYNC_OVERLAP_SECONDS = int(os.getenv('DOOR_SYNC_OVERLAP_SECONDS', '30'))
+# Validation attempt log (events.validation_log): buffered scans are written
+# in one INSERT once this many are pending or the oldest is this old
+VALIDATION_LOG_FLUSH_SIZE = int(os.getenv('VALIDATION_LOG_FLUSH_SIZE', '50'))
+VALIDATION_LOG_FLUSH_SECONDS = int(os.getenv('VALIDATION_LOG_FLUSH_SECONDS', '5'))
+# Dashboard counters are re-seeded from the database after this long
+VALIDATION_STATS_TIMEOUT_SECONDS = int(os.getenv('VALIDATION_STATS_TIMEOUT_SECONDS', '300'))
+# Live dashboard stream (events.validation_events): 'cache' shares scans
+# between workers through the cache, 'local' keeps them in-process
+VALIDATION_EVENTS_BACKEND = os.getenv('VALIDATION_EVENTS_BACKEND', 'cache')
+VALIDATION_EVENTS_BACKLOG = int(os.getenv('VALIDATION_EVENTS_BACKLOG', '100'))
+VALIDATION_STREAM_POLL_SECONDS = float(os.getenv('VALIDATION_STREAM_POLL_SECONDS', '1'))
+VALIDATION_STREAM_KEEPALIVE_SECONDS = int(os.getenv('VALIDATION_STREAM_KEEPALIVE_SECONDS', '15'))
+# Streams are closed after this long and the browser reconnects
+VALIDATION_STREAM_MAX_SECONDS = int(os.getenv('VALIDATION_STREAM_MAX_SECONDS', '300'))
+
+# Public event catalog cache (events.catalog) for the listing and home pages
+CATALOG_CACHE_TIMEOUT_SECONDS = int(os.getenv('CATALOG_CACHE_TIMEOUT_SECONDS', '300'))
+# Ticket sales refresh the catalog at most once per this many seconds
+CATALOG_TICKET_DEBOUNCE_SECONDS = int(os.getenv('CATALOG_TICKET_DEBOUNCE_SECONDS', '30'))
+CATALOG_PAGE_SIZE = int(os.getenv('CATALOG_PAGE_SIZE', '24'))
+
+# Event search (events.search): text search configuration on PostgreSQL and
+# the number of best matches shown for a query
+EVENT_SEARCH_CONFIG = os.getenv('EVENT_SEARCH_CONFIG', 'english')
+EVENT_SEARCH_LIMIT = int(os.getenv('EVENT_SEARCH_LIMIT', '48'))
+
+# Ticket holds (events.ticket_holds): how long checkout keeps tickets aside
+# for an unpaid order, and how many expired holds the sweeper returns per batch
+TICKET_HOLD_TTL_SECONDS = int(os.getenv('TICKET_HOLD_TTL_SECONDS', '900'))
+TICKET_HOLD_SWEEP_BATCH_SIZE = int(os.getenv('TICKET_HOLD_SWEEP_BATCH_SIZE', '500'))
+
+# Sharded inventory counters (events.inventory): counter slots a hot on-sale's
+# remaining tickets are spread over when an admin shards the event
+INVENTORY_SHARD_COUNT = int(os.getenv('INVENTORY_SHARD_COUNT', '8'))
+
+# Stale cart purge (cart.purge): anonymous carts not touched for this many
+# days, and checked-out (inactive) carts after this many, deleted in chunks
+CART_ANONYMOUS_MAX_AGE_DAYS = int(os.getenv('CART_ANONYMOUS_MAX_AGE_DAYS', '7'))
+CART_INACTIVE_MAX_AGE_DAYS = int(os.getenv('CART_INACTIVE_MAX_AGE_DAYS', '30'))
+CART_PURGE_BATCH_SIZE = int(os.getenv('CART_PURGE_BATCH_SIZE', '500'))
+
 # Note: Email configuration is handled earlier in this file (lines 381-470)
 # based on DEBUG mode and EMAIL_PROVIDER environment variable
 # Amazon SES is the default provider for production (EMAIL_PROVIDER=ses)
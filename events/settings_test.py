@@ -15,3 +15,6 @@ PASSWORD_HASHERS = [
 
 # Use in-memory email backend
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# Live validation events stay in-process
+VALIDATION_EVENTS_BACKEND = 'local'
@@ -0,0 +1,47 @@
+"""
+Signal handlers for the events app.
+
+Keeps the public event catalog cache (events.catalog) and the event search
+vectors (events.search) in step with events, categories and organisers.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import User
+
+from .catalog import catalog_cache
+from .models import Category, Event
+from .search import event_search
+
+# User fields that make up the organiser name on cards and in search vectors
+ORGANISER_NAME_FIELDS = {'first_name', 'last_name', 'email'}
+
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or set(update_fields) & {*event_search.SEARCH_FIELDS, 'organiser'}:
+        event_search.update_event(instance)
+
+    if update_fields is not None and set(update_fields) == {'tickets_sold'}:
+        # Ticket sales only move availability figures - debounced
+        catalog_cache.ticket_counts_changed()
+    else:
+        catalog_cache.invalidate()
+
+
+@receiver(post_save, sender=User)
+def organiser_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    if created or instance.user_type != 'artist':
+        return
+    if update_fields is not None and not set(update_fields) & ORGANISER_NAME_FIELDS:
+        return
+    event_search.update_organiser(instance)
+    catalog_cache.invalidate()
+
+
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def catalog_changed(sender, **kwargs):
+    catalog_cache.invalidate()
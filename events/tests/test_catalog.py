@@ -0,0 +1,187 @@
+"""
+Tests for the cached public event catalog.
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events.catalog import catalog_cache
+from events.models import Category, Event
+
+User = get_user_model()
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class CatalogCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.organiser = User.objects.create_user(
+            email='catalog-organiser@test.com',
+            password='test123',
+            user_type='artist',
+            first_name='Catalog',
+            last_name='Organiser'
+        )
+        self.category = Category.objects.create(name='Music', slug='music')
+        self.events = [self._event(f'Catalog Event {n}', price=10 + n) for n in range(3)]
+
+    def _event(self, title, price=10, status='published'):
+        return Event.objects.create(
+            title=title,
+            organiser=self.organiser,
+            category=self.category,
+            description='Test event',
+            venue_name='Test Venue',
+            venue_address='Test Address',
+            event_date=timezone.now().date(),
+            event_time=timezone.now().time(),
+            capacity=100,
+            ticket_price=Decimal(price),
+            status=status
+        )
+
+    def test_listing_is_served_from_cache(self):
+        listing = catalog_cache.get_listing(sort='price_low')
+        self.assertEqual([card['title'] for card in listing['cards']], [e.title for e in self.events])
+        self.assertEqual(listing['cards'][0]['organiser_name'], 'Catalog Organiser')
+        self.assertEqual(listing['cards'][0]['category_name'], 'Music')
+
+        with self.assertNumQueries(0):
+            catalog_cache.get_listing(sort='price_low')
+
+    def test_filters_and_pages_are_cached_separately(self):
+        other = Category.objects.create(name='Food', slug='food')
+        Event.objects.filter(pk=self.events[0].pk).update(category=other)
+        catalog_cache.invalidate()
+
+        with self.settings(CATALOG_PAGE_SIZE=1):
+            food = catalog_cache.get_listing(category='food')
+            first_page = catalog_cache.get_listing(sort='price_low')
+            second_page = catalog_cache.get_listing(sort='price_low', cursor=first_page['next_cursor'])
+
+        self.assertEqual([card['pk'] for card in food['cards']], [self.events[0].pk])
+        self.assertFalse(food['has_next'])
+        self.assertEqual([card['pk'] for card in second_page['cards']], [self.events[1].pk])
+        self.assertTrue(second_page['has_previous'])
+        self.assertTrue(second_page['has_next'])
+
+    def test_cursor_walks_every_sort(self):
+        # Ties on the sort fields are broken by id, so no event is skipped or repeated
+        self.events.append(self._event('Catalog Event Tie', price=11))
+
+        for sort, ordering in catalog_cache.SORTS.items():
+            expected = list(Event.objects.filter(status='published').order_by(*ordering).values_list('pk', flat=True))
+            seen = []
+            cursor = None
+            with self.settings(CATALOG_PAGE_SIZE=1):
+                while True:
+                    listing = catalog_cache.get_listing(sort=sort, cursor=cursor)
+                    seen += [card['pk'] for card in listing['cards']]
+                    cursor = listing['next_cursor']
+                    if not listing['has_next']:
+                        break
+            self.assertEqual(seen, expected, sort)
+
+    def test_page_queries_do_not_depend_on_position(self):
+        with self.settings(CATALOG_PAGE_SIZE=1):
+            cursor = catalog_cache.get_listing(sort='date')['next_cursor']
+            catalog_cache.invalidate()
+
+            # Page rows plus the image prefetch, wherever the page starts
+            with self.assertNumQueries(2):
+                catalog_cache.get_listing(sort='date', cursor=cursor)
+
+    def test_invalid_cursor_serves_first_page(self):
+        first = catalog_cache.get_listing(sort='price_low')
+
+        for cursor in ('not-a-cursor', catalog_cache.encode_cursor(self.events[0], 'date')):
+            listing = catalog_cache.get_listing(sort='price_low', cursor=cursor)
+            self.assertEqual(listing, first)
+
+    def test_event_save_invalidates(self):
+        catalog_cache.get_listing()
+
+        event = self.events[0]
+        event.title = 'Renamed Event'
+        event.save()
+
+        titles = [card['title'] for card in catalog_cache.get_listing()['cards']]
+        self.assertIn('Renamed Event', titles)
+
+    def test_publishing_adds_event_to_listing(self):
+        draft = self._event('Draft Event', status='draft')
+        self.assertEqual(len(catalog_cache.get_listing()['cards']), 3)
+
+        draft.status = 'published'
+        draft.save()
+
+        self.assertEqual(len(catalog_cache.get_listing()['cards']), 4)
+
+    def test_category_save_invalidates(self):
+        catalog_cache.get_listing()
+
+        self.category.name = 'Live Music'
+        self.category.save()
+
+        self.assertEqual(catalog_cache.get_listing()['cards'][0]['category_name'], 'Live Music')
+
+    def test_ticket_sales_are_debounced(self):
+        event = self.events[0]
+        catalog_cache.get_listing()
+
+        # First sale refreshes straight away
+        event.tickets_sold = 5
+        event.save(update_fields=['tickets_sold'])
+        generation = catalog_cache.get_generation()
+
+        # Further sales inside the window wait for it to close
+        event.tickets_sold = 6
+        event.save(update_fields=['tickets_sold'])
+        self.assertEqual(catalog_cache.get_generation(), generation)
+
+        cache.delete(catalog_cache.DEBOUNCE_KEY)
+        self.assertEqual(catalog_cache.get_generation(), generation + 1)
+        card = next(c for c in catalog_cache.get_listing()['cards'] if c['pk'] == event.pk)
+        self.assertEqual(card['tickets_sold'], 6)
+
+    def test_home_is_cached(self):
+        self.client.get(reverse('events:home'))
+
+        with self.assertNumQueries(0):
+            data = catalog_cache.get_home()
+
+        self.assertEqual(len(data['featured_events']), 3)
+        self.assertEqual(data['featured_artists'][0]['event_count'], 3)
+
+    def test_events_list_view(self):
+        response = self.client.get(reverse('events:events_list'), {'sort': 'price_high'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([card['pk'] for card in response.context['events']], [e.pk for e in reversed(self.events)])
+        self.assertContains(response, 'Catalog Event 2')
+
+    def test_events_list_links_next_page(self):
+        with self.settings(CATALOG_PAGE_SIZE=2):
+            response = self.client.get(reverse('events:events_list'), {'sort': 'date', 'category': 'music'})
+
+        self.assertTrue(response.context['has_next'])
+        self.assertIn('category=music', response.context['next_query'])
+        self.assertIn('after=', response.context['next_query'])
+
+    def test_events_list_json(self):
+        url = reverse('events:events_list_json')
+        with self.settings(CATALOG_PAGE_SIZE=2):
+            first = self.client.get(url, {'sort': 'price_high'}).json()
+            second = self.client.get(first['next_url']).json()
+
+        self.assertEqual([card['pk'] for card in first['events']], [self.events[2].pk, self.events[1].pk])
+        self.assertIn('Catalog Event 2', first['html'])
+        self.assertEqual([card['pk'] for card in second['events']], [self.events[0].pk])
+        self.assertFalse(second['has_next'])
+        self.assertIsNone(second['next_url'])
@@ -0,0 +1,181 @@
+"""
+Tests for the offline door scanner manifest and admission sync.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from events.door_sync import door_sync
+from events.models import Event, Ticket
+from events.ticket_render_service import TicketRenderService
+from events.ticket_token import TOKEN_PREFIX, encode_ticket_token
+
+User = get_user_model()
+
+
+class DoorSyncTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.organiser = User.objects.create_user(
+            email='door-organiser@test.com',
+            password='test123',
+            user_type='artist'
+        )
+        self.customer = User.objects.create_user(
+            email='door-customer@test.com',
+            password='test123',
+            user_type='customer'
+        )
+        self.event = Event.objects.create(
+            title='Door Event',
+            slug='door-event',
+            organiser=self.organiser,
+            description='Test event',
+            venue_name='Test Venue',
+            venue_address='Test Address',
+            event_date=timezone.now().date(),
+            event_time=timezone.now().time(),
+            capacity=100,
+            ticket_price=Decimal('10.00'),
+            status='published'
+        )
+        self.tickets = [self._ticket() for _ in range(3)]
+
+    def _ticket(self):
+        with patch.object(TicketRenderService, 'enqueue_tickets'):
+            return Ticket.objects.create(event=self.event, customer=self.customer)
+
+    def test_manifest_lists_admissible_and_admitted_ids(self):
+        admitted, refunded, open_ticket = self.tickets
+        admitted.validate_ticket()
+        Ticket.objects.filter(pk=refunded.pk).update(status='refunded')
+
+        manifest = door_sync.build_manifest(self.event)
+
+        self.assertEqual(manifest['valid_ticket_ids'], [open_ticket.pk])
+        self.assertEqual(manifest['admitted_ticket_ids'], [admitted.pk])
+        self.assertEqual(manifest['token']['prefix'], TOKEN_PREFIX)
+
+    def test_manifest_key_verifies_tokens_offline(self):
+        manifest = door_sync.build_manifest(self.event)
+        key = base64.b64decode(manifest['token']['keys'][str(manifest['token']['key_id'])])
+
+        raw = base64.b32decode(encode_ticket_token(self.tickets[0])[len(TOKEN_PREFIX):])
+        expected = hmac.new(key, raw[:10], hashlib.sha256).digest()[:10]
+
+        self.assertEqual(raw[10:], expected)
+
+    def test_offline_admission_keeps_scan_time(self):
+        scanned_at = timezone.now() - timedelta(minutes=5)
+
+        sync = door_sync.sync_admissions(self.event, [
+            {'qr_data': encode_ticket_token(self.tickets[0]), 'scanned_at': scanned_at.isoformat()},
+        ], scanner_id='door-1')
+
+        self.assertEqual(sync['results'][0]['outcome'], 'admitted')
+        ticket = Ticket.objects.get(pk=self.tickets[0].pk)
+        self.assertTrue(ticket.is_validated)
+        self.assertEqual(ticket.validated_at, scanned_at)
+
+    def test_earliest_scan_wins(self):
+        ticket = self.tickets[0]
+        ticket.validate_ticket()
+        earlier = timezone.now() - timedelta(minutes=10)
+
+        sync = door_sync.sync_admissions(self.event, [
+            {'qr_data': encode_ticket_token(ticket), 'scanned_at': earlier.isoformat()},
+        ])
+
+        self.assertEqual(sync['results'][0]['outcome'], 'duplicate')
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.validated_at, earlier)
+
+    def test_duplicate_scans_in_one_upload(self):
+        token = encode_ticket_token(self.tickets[0])
+        now = timezone.now()
+
+        sync = door_sync.sync_admissions(self.event, [
+            {'qr_data': token, 'scanned_at': now.isoformat()},
+            {'qr_data': token, 'scanned_at': (now - timedelta(minutes=1)).isoformat()},
+        ])
+
+        self.assertEqual([r['outcome'] for r in sync['results']], ['duplicate', 'admitted'])
+
+    def test_delta_returns_changes_since_cursor(self):
+        cursor = door_sync.build_manifest(self.event)['cursor']
+        admitted, refunded, _ = self.tickets
+        admitted.validate_ticket()
+        refunded.status = 'refunded'
+        refunded.save()
+
+        with self.settings(DOOR_SYNC_OVERLAP_SECONDS=0):
+            sync = door_sync.sync_admissions(self.event, [], cursor=cursor)
+
+        self.assertEqual([a['ticket_id'] for a in sync['delta']['admitted']], [admitted.pk])
+        self.assertEqual(sync['delta']['revoked'], [refunded.pk])
+
+    def test_unsigned_payloads_are_rejected(self):
+        ticket = self.tickets[0]
+        legacy = f"JERSEY_EVENTS|{ticket.ticket_number}|{self.event.pk}|{self.customer.email}|abc"
+
+        sync = door_sync.sync_admissions(self.event, [{'qr_data': legacy}, 'garbage'])
+
+        self.assertEqual([r['outcome'] for r in sync['results']], ['rejected', 'rejected'])
+        self.assertFalse(Ticket.objects.filter(is_validated=True).exists())
+
+    def test_manifest_and_sync_endpoints(self):
+        self.client.force_login(self.organiser)
+
+        manifest = self.client.get(reverse('events:scanner_manifest', args=[self.event.pk])).json()['manifest']
+        response = self.client.post(
+            reverse('events:sync_offline_admissions', args=[self.event.pk]),
+            data=json.dumps({
+                'scanner_id': 'door-2',
+                'cursor': manifest['cursor'],
+                'admissions': [{'qr_data': encode_ticket_token(self.tickets[1])}],
+            }),
+            content_type='application/json'
+        )
+
+        data = response.json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['results'][0]['outcome'], 'admitted')
+        self.assertEqual(data['delta']['admitted'][0]['ticket_id'], self.tickets[1].pk)
+
+    def test_endpoints_require_event_organiser(self):
+        intruder = User.objects.create_user(email='door-intruder@test.com', password='test123', user_type='artist')
+        self.client.force_login(intruder)
+
+        manifest = self.client.get(reverse('events:scanner_manifest', args=[self.event.pk]))
+        sync = self.client.post(
+            reverse('events:sync_offline_admissions', args=[self.event.pk]),
+            data=json.dumps({'admissions': [{'qr_data': encode_ticket_token(self.tickets[0])}]}),
+            content_type='application/json'
+        )
+
+        self.assertEqual(manifest.status_code, 403)
+        self.assertEqual(sync.status_code, 403)
+        self.assertFalse(Ticket.objects.filter(is_validated=True).exists())
+
+    def test_bad_cursor_is_rejected(self):
+        self.client.force_login(self.organiser)
+
+        response = self.client.post(
+            reverse('events:sync_offline_admissions', args=[self.event.pk]),
+            data=json.dumps({'cursor': 'yesterday', 'admissions': []}),
+            content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,188 @@
+"""
+Tests for sharded inventory counters.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from events.inventory import InventoryCounterService, inventory_counters
+from events.models import Event, InventorySlot, TicketHold, TicketTier
+from events.ticket_holds import ticket_holds
+from orders.models import Order, OrderItem
+
+User = get_user_model()
+
+
+class InventoryCounterTests(TestCase):
+
+    def setUp(self):
+        self.organiser = User.objects.create_user(
+            email='inventory-organiser@test.com',
+            password='test123',
+            user_type='artist'
+        )
+        self.event = Event.objects.create(
+            title='Hot On-Sale',
+            organiser=self.organiser,
+            description='Test event',
+            venue_name='Test Venue',
+            venue_address='Test Address',
+            event_date=timezone.now().date() + timedelta(days=30),
+            event_time=timezone.now().time(),
+            capacity=10,
+            tickets_sold=2,
+            ticket_price=Decimal('10.00'),
+            status='published'
+        )
+
+    def _slots(self):
+        return list(InventorySlot.objects.filter(event=self.event, tier__isnull=True).values_list('available', flat=True))
+
+    def _order(self, quantity):
+        order = Order.objects.create(
+            email='inventory-customer@test.com',
+            phone='07700900000',
+            delivery_first_name='Inventory',
+            delivery_last_name='Customer',
+            delivery_address_line_1='1 Test Street',
+            delivery_parish='st_helier',
+            delivery_postcode='JE2 3AB',
+            subtotal=Decimal('10.00'),
+            shipping_cost=Decimal('0.00'),
+            total=Decimal('10.00'),
+            status='pending'
+        )
+        OrderItem.objects.create(order=order, event=self.event, quantity=quantity, price=Decimal('10.00'))
+        ticket_holds.hold_items(order.items.all(), order=order)
+        return order
+
+    def test_shard_spreads_remaining_tickets(self):
+        self._order(1)
+
+        inventory_counters.shard(self.event, shards=3)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.inventory_shards, 3)
+        self.assertEqual(self.event.tickets_held, 0)
+        self.assertEqual(self._slots(), [3, 2, 2])
+        self.assertEqual(self.event.tickets_available, 7)
+
+    def test_claims_take_from_one_slot(self):
+        inventory_counters.shard(self.event, shards=4)
+
+        self.assertTrue(inventory_counters.claim(self.event.pk, 2))
+
+        self.assertEqual(sorted(self._slots()), [0, 2, 2, 2])
+        self.assertEqual(inventory_counters.available(self.event.pk), 6)
+
+    def test_claim_rebalances_when_no_slot_has_enough(self):
+        inventory_counters.shard(self.event, shards=4)
+
+        # Every slot holds two tickets, so five have to be pooled
+        self.assertTrue(inventory_counters.claim(self.event.pk, 5))
+        self.assertEqual(self._slots(), [1, 1, 1, 0])
+
+        self.assertFalse(inventory_counters.claim(self.event.pk, 4))
+        self.assertEqual(inventory_counters.available(self.event.pk), 3)
+
+    def test_claim_waits_for_busy_slots_before_refusing(self):
+        inventory_counters.shard(self.event, shards=4)
+        rebalance = InventoryCounterService._rebalance_claim
+
+        def every_slot_busy(service, slots, quantity, skip_locked=True, partial=False):
+            # SKIP LOCKED finds nothing while other checkouts hold the slots
+            if skip_locked:
+                return 0
+            return rebalance(service, slots, quantity, skip_locked=False, partial=partial)
+
+        with patch.object(InventoryCounterService, '_rebalance_claim', every_slot_busy):
+            self.assertTrue(inventory_counters.claim(self.event.pk, 5))
+        self.assertEqual(inventory_counters.available(self.event.pk), 3)
+
+    def test_refusal_with_tickets_left_asks_to_retry(self):
+        inventory_counters.shard(self.event, shards=2)
+
+        with patch.object(InventoryCounterService, 'claim', return_value=False), \
+                self.assertRaisesMessage(ValidationError, 'being reserved by other customers'):
+            self._order(2)
+
+    def test_holds_on_sharded_events_use_the_slots(self):
+        inventory_counters.shard(self.event, shards=2)
+
+        kept = self._order(3)
+        dropped = self._order(2)
+        self.assertEqual(self.event.tickets_available, 3)
+
+        ticket_holds.release_order(dropped.pk)
+        ticket_holds.convert_order(kept)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 5)
+        self.assertEqual(self.event.tickets_held, 0)
+        self.assertEqual(self.event.tickets_available, 5)
+        self.assertFalse(TicketHold.objects.exists())
+
+    def test_sales_without_a_hold_come_out_of_the_slots(self):
+        inventory_counters.shard(self.event, shards=2)
+        late = self._order(3)
+        ticket_holds.release_order(late.pk)
+        self._order(4)
+
+        # The hold lapsed, but the order was paid: its tickets still leave the slots
+        ticket_holds.convert_order(late)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 5)
+        self.assertEqual(self.event.tickets_available, 1)
+
+        # Past the slots' last ticket the sale stands and availability stays at 0
+        lapsed = self._order(1)
+        ticket_holds.release_order(lapsed.pk)
+        self._order(1)
+        ticket_holds.convert_order(lapsed)
+        self.assertEqual(self.event.tickets_available, 0)
+
+    def test_unshard_folds_slots_back(self):
+        inventory_counters.shard(self.event, shards=4)
+        self._order(3)
+
+        inventory_counters.unshard(self.event)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.inventory_shards, 0)
+        self.assertEqual(self.event.tickets_held, 3)
+        self.assertEqual(self.event.tickets_available, 5)
+        self.assertFalse(InventorySlot.objects.exists())
+
+    def test_sharded_tier_reservations(self):
+        tier = TicketTier.objects.create(
+            event=self.event,
+            tier_type='vip',
+            name='VIP',
+            price=Decimal('20.00'),
+            quantity_available=6,
+            quantity_sold=1
+        )
+        inventory_counters.shard(self.event, tier=tier, shards=2)
+
+        self.assertTrue(tier.reserve_tickets(4))
+        self.assertFalse(tier.reserve_tickets(2))
+        self.assertEqual(tier.tickets_remaining, 1)
+        # The event's own counters are untouched
+        self.assertEqual(self.event.tickets_available, 8)
+
+        inventory_counters.unshard(self.event, tier=tier)
+        tier.refresh_from_db()
+        self.assertEqual(tier.quantity_sold, 5)
+        self.assertEqual(tier.tickets_remaining, 1)
+
+    def test_benchmark_needs_postgresql(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_inventory')
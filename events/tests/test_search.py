@@ -0,0 +1,101 @@
+"""
+Tests for event search: the PostgreSQL full-text path and the icontains fallback.
+"""
+
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events.catalog import catalog_cache
+from events.models import Event
+
+User = get_user_model()
+
+
+class EventSearchTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.organiser = User.objects.create_user(
+            email='search-organiser@test.com',
+            password='test123',
+            user_type='artist',
+            first_name='Rosa',
+            last_name='Vibes'
+        )
+        self.jazz = self._event('Jazz Night', 'Smooth jazz quartet playing <b>standards</b> all night.', 'Opera House')
+        self.folk = self._event('Folk Evening', 'Acoustic folk songs from the Channel Islands.', 'Jazz Cellar')
+        self.quiz = self._event('Pub Quiz', 'Six rounds of general knowledge.', 'The Lamplighter')
+
+    def _event(self, title, description, venue, status='published'):
+        return Event.objects.create(
+            title=title,
+            organiser=self.organiser,
+            description=description,
+            venue_name=venue,
+            venue_address='St Helier',
+            event_date=timezone.now().date(),
+            event_time=timezone.now().time(),
+            capacity=100,
+            ticket_price=Decimal('10.00'),
+            status=status
+        )
+
+    def _search(self, text):
+        return [card['pk'] for card in catalog_cache.get_search(text)['cards']]
+
+    def test_matches_title_and_venue(self):
+        self.assertCountEqual(self._search('jazz'), [self.jazz.pk, self.folk.pk])
+
+    def test_matches_organiser_name(self):
+        self.assertCountEqual(self._search('vibes'), [self.jazz.pk, self.folk.pk, self.quiz.pk])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self._search('jazz quartet'), [self.jazz.pk])
+
+    def test_only_published_events(self):
+        self._event('Jazz Rehearsal', 'Closed rehearsal.', 'Studio', status='draft')
+
+        self.assertCountEqual(self._search('jazz'), [self.jazz.pk, self.folk.pk])
+
+    def test_snippet_is_escaped_and_highlighted(self):
+        card = next(c for c in catalog_cache.get_search('standards')['cards'] if c['pk'] == self.jazz.pk)
+
+        self.assertIn('<mark>standards</mark>', card['snippet'])
+        self.assertIn('&lt;b&gt;', card['snippet'])
+        self.assertNotIn('<b>', card['snippet'])
+
+    def test_results_follow_edits(self):
+        self.assertEqual(self._search('quiz'), [self.quiz.pk])
+
+        self.quiz.title = 'Trivia Night'
+        self.quiz.save()
+
+        self.assertEqual(self._search('trivia'), [self.quiz.pk])
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_events_list_search(self):
+        response = self.client.get(reverse('events:events_list'), {'q': 'acoustic'})
+
+        self.assertEqual([card['pk'] for card in response.context['events']], [self.folk.pk])
+        self.assertContains(response, '<mark>Acoustic</mark>')
+        self.assertFalse(response.context['has_next'])
+
+    @skipUnless(connection.vendor == 'postgresql', 'full-text search needs PostgreSQL')
+    def test_full_text_ranks_title_matches_first(self):
+        self.assertEqual(self._search('jazz'), [self.jazz.pk, self.folk.pk])
+
+    @skipUnless(connection.vendor == 'postgresql', 'full-text search needs PostgreSQL')
+    def test_organiser_rename_updates_vectors(self):
+        self.organiser.last_name = 'Harmonie'
+        self.organiser.save()
+
+        self.assertEqual(len(self._search('harmonie')), 3)
+        self.assertEqual(self._search('vibes'), [])
+
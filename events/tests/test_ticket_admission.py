@@ -0,0 +1,254 @@
+"""
+Tests for single-statement and batch ticket admission.
+"""
+
+import json
+import threading
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event, Ticket
+from events.ticket_render_service import TicketRenderService
+from events.ticket_token import encode_ticket_token
+from events.ticket_validator import TicketValidator
+from events.validation_log import validation_log
+
+User = get_user_model()
+
+
+def create_ticket(slug):
+    organiser = User.objects.create_user(
+        email=f'{slug}-organiser@test.com',
+        password='test123',
+        user_type='artist'
+    )
+    customer = User.objects.create_user(
+        email=f'{slug}-customer@test.com',
+        password='test123',
+        user_type='customer'
+    )
+    event = Event.objects.create(
+        title='Admission Event',
+        slug=slug,
+        organiser=organiser,
+        description='Test event',
+        venue_name='Test Venue',
+        venue_address='Test Address',
+        event_date=timezone.now().date(),
+        event_time=timezone.now().time(),
+        capacity=100,
+        ticket_price=Decimal('10.00'),
+        status='published'
+    )
+    with patch.object(TicketRenderService, 'enqueue_tickets'):
+        return Ticket.objects.create(event=event, customer=customer)
+
+
+class TicketAdmissionTests(TestCase):
+
+    def setUp(self):
+        # Door scans load a validation index keyed by ids other tests reuse
+        cache.clear()
+        validation_log.flush()
+        self.ticket = create_ticket('admission-event')
+
+    def test_admission_is_one_update(self):
+        with self.assertNumQueries(1):
+            success, message = self.ticket.validate_ticket()
+
+        self.assertTrue(success, message)
+        self.ticket.refresh_from_db()
+        self.assertTrue(self.ticket.is_validated)
+        self.assertIsNotNone(self.ticket.validated_at)
+
+    def test_stale_instance_cannot_admit_twice(self):
+        stale = Ticket.objects.get(pk=self.ticket.pk)
+        self.ticket.validate_ticket()
+
+        success, message = stale.validate_ticket()
+
+        self.assertFalse(success)
+        self.assertEqual(message, "Ticket has already been used")
+        self.assertTrue(stale.is_validated)
+
+    def test_refunded_ticket_is_not_admitted(self):
+        Ticket.objects.filter(pk=self.ticket.pk).update(status='refunded')
+
+        success, message = self.ticket.validate_ticket()
+
+        self.assertFalse(success)
+        self.assertEqual(message, "Ticket is refunded and cannot be used")
+
+    def test_qr_scan_admits_in_two_queries(self):
+        # Ticket lookup + conditional UPDATE
+        with self.assertNumQueries(2):
+            success, message, _ = TicketValidator().validate_ticket_qr(encode_ticket_token(self.ticket))
+
+        self.assertTrue(success, message)
+
+
+class ConcurrentAdmissionTests(TransactionTestCase):
+
+    SCANNERS = 12
+
+    def setUp(self):
+        # Primary keys are reused between transactional tests; drop any
+        # validation index left behind for the same event/ticket ids
+        cache.clear()
+
+    def test_exactly_one_scanner_admits(self):
+        ticket = create_ticket('concurrent-admission')
+        token = encode_ticket_token(ticket)
+        barrier = threading.Barrier(self.SCANNERS)
+        results = []
+        errors = []
+
+        def scan():
+            try:
+                barrier.wait()
+                success, message, _ = TicketValidator().validate_ticket_qr(token)
+                results.append((success, message))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=scan) for _ in range(self.SCANNERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), self.SCANNERS)
+        self.assertEqual(sum(1 for success, _ in results if success), 1)
+        ticket.refresh_from_db()
+        self.assertTrue(ticket.is_validated)
+
+
+class BatchAdmissionTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        first = create_ticket('batch-admission')
+        with patch.object(TicketRenderService, 'enqueue_tickets'):
+            others = [Ticket.objects.create(event=first.event, customer=first.customer) for _ in range(4)]
+        self.tickets = [first] + others
+        self.event = first.event
+        self.client.force_login(self.event.organiser)
+
+    def test_batch_admits_with_one_fetch_and_one_update(self):
+        tokens = [encode_ticket_token(ticket) for ticket in self.tickets]
+
+        with CaptureQueriesContext(connection) as queries:
+            results, summary = TicketValidator().bulk_validate_tickets(tokens, event_id=self.event.pk)
+
+        statements = [q['sql'] for q in queries.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(statements), 4)  # IN fetch, lock, UPDATE, attempt log INSERT
+        self.assertEqual(summary, "5/5 tickets validated successfully")
+        self.assertEqual([r['ticket_number'] for r in results], [t.ticket_number for t in self.tickets])
+        self.assertEqual(Ticket.objects.filter(event=self.event, is_validated=True).count(), 5)
+
+    def test_batch_reports_each_rejection_in_order(self):
+        used, refunded, good = self.tickets[:3]
+        used.validate_ticket()
+        Ticket.objects.filter(pk=refunded.pk).update(status='refunded')
+        good_token = encode_ticket_token(good)
+
+        results, summary = TicketValidator().bulk_validate_tickets(
+            ['garbage', encode_ticket_token(used), encode_ticket_token(refunded), good_token, good_token],
+            event_id=self.event.pk
+        )
+
+        self.assertEqual([r['success'] for r in results], [False, False, False, True, False])
+        self.assertEqual(results[0]['message'], "Invalid QR code format")
+        self.assertTrue(results[1]['message'].startswith("Ticket already used"))
+        self.assertEqual(results[2]['message'], "Ticket is refunded and cannot be used")
+        self.assertEqual(results[4]['message'], "Duplicate scan in this batch")
+        self.assertEqual(summary, "1/5 tickets validated successfully")
+
+    def test_batch_rejects_tickets_for_other_events(self):
+        other = create_ticket('batch-other-event')
+
+        results, _ = TicketValidator().bulk_validate_tickets([encode_ticket_token(other)], event_id=self.event.pk)
+
+        self.assertEqual(results[0]['message'], "Ticket is for a different event")
+
+    def test_batch_endpoint(self):
+        response = self.client.post(
+            reverse('events:validate_ticket_batch'),
+            data=json.dumps({
+                'event_id': self.event.pk,
+                'qr_codes': [encode_ticket_token(ticket) for ticket in self.tickets[:2]],
+            }),
+            content_type='application/json'
+        )
+
+        data = response.json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['admitted'], 2)
+        self.assertEqual(len(data['results']), 2)
+
+    def test_batch_endpoint_requires_event_organiser(self):
+        self.client.force_login(create_ticket('batch-intruder').event.organiser)
+
+        response = self.client.post(
+            reverse('events:validate_ticket_batch'),
+            data=json.dumps({'event_id': self.event.pk, 'qr_codes': [encode_ticket_token(self.tickets[0])]}),
+            content_type='application/json'
+        )
+
+        self.assertEqual(response.json(), {'success': False, 'message': 'Access denied'})
+        self.assertFalse(Ticket.objects.get(pk=self.tickets[0].pk).is_validated)
+
+
+class ScanEndpointTests(TestCase):
+
+    def setUp(self):
+        # Door scans load a validation index keyed by ids other tests reuse
+        cache.clear()
+        validation_log.flush()
+        self.ticket = create_ticket('scan-endpoint')
+        self.token = encode_ticket_token(self.ticket)
+
+    def _scan(self, user, **data):
+        self.client.force_login(user)
+        return self.client.post(
+            reverse('events:validate_ticket_qr'),
+            data=json.dumps({'qr_data': self.token, **data}),
+            content_type='application/json'
+        ).json()
+
+    def test_organiser_admits_ticket(self):
+        data = self._scan(self.ticket.event.organiser, event_id=self.ticket.event_id)
+
+        self.assertTrue(data['success'], data['message'])
+        self.assertEqual(data['ticket']['ticket_number'], self.ticket.ticket_number)
+
+    def test_scan_requires_an_event(self):
+        data = self._scan(self.ticket.customer)
+
+        self.assertEqual(data, {'success': False, 'message': 'Event not found'})
+        self.assertFalse(Ticket.objects.get(pk=self.ticket.pk).is_validated)
+
+    def test_scan_requires_event_organiser(self):
+        data = self._scan(self.ticket.customer, event_id=self.ticket.event_id)
+
+        self.assertEqual(data, {'success': False, 'message': 'Access denied'})
+        self.assertFalse(Ticket.objects.get(pk=self.ticket.pk).is_validated)
+
+    def test_ticket_for_another_event_is_rejected(self):
+        other_event = create_ticket('scan-endpoint-other').event
+
+        data = self._scan(other_event.organiser, event_id=other_event.pk)
+
+        self.assertEqual(data, {'success': False, 'message': 'Ticket is for a different event'})
+        self.assertFalse(Ticket.objects.get(pk=self.ticket.pk).is_validated)
@@ -0,0 +1,129 @@
+"""
+Tests for the ticket PDF layout engine.
+"""
+
+import pickle
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from pypdf import PdfReader
+
+from events.models import Event, Ticket
+from events.ticket_generator import TicketGenerator, get_ticket_layout
+from events.ticket_render_service import TicketRenderService
+
+User = get_user_model()
+
+
+class TicketGeneratorTests(TestCase):
+
+    def setUp(self):
+        self.organiser = User.objects.create_user(
+            email='layout-organiser@test.com',
+            password='test123',
+            user_type='artist'
+        )
+        self.customer = User.objects.create_user(
+            email='layout-customer@test.com',
+            password='test123',
+            user_type='customer'
+        )
+        self.event = Event.objects.create(
+            title='Layout Event',
+            slug='layout-event',
+            organiser=self.organiser,
+            description='Test event',
+            venue_name='Test Venue',
+            venue_address='Test Address',
+            event_date=timezone.now().date() + timedelta(days=30),
+            event_time=timezone.now().time(),
+            capacity=100,
+            ticket_price=Decimal('10.00'),
+            status='published'
+        )
+
+    def _tickets(self, count):
+        with patch.object(TicketRenderService, 'enqueue_tickets'):
+            return [Ticket.objects.create(event=self.event, customer=self.customer) for _ in range(count)]
+
+    def test_layout_is_built_once_per_process(self):
+        self.assertIs(TicketGenerator().layout, TicketGenerator().layout)
+        self.assertIs(TicketGenerator().layout, get_ticket_layout())
+
+    def test_event_block_is_shared_by_tickets_of_same_event(self):
+        first, second = self._tickets(2)
+        generator = TicketGenerator()
+
+        self.assertIs(
+            generator.get_event_block(generator.build_ticket_snapshot(first)),
+            generator.get_event_block(generator.build_ticket_snapshot(second))
+        )
+
+    def test_snapshot_is_plain_picklable_data(self):
+        ticket = self._tickets(1)[0]
+
+        snapshot = TicketGenerator().build_ticket_snapshot(ticket)
+
+        self.assertEqual(pickle.loads(pickle.dumps(snapshot)), snapshot)
+        self.assertNotIsInstance(snapshot['event'], Event)
+        self.assertEqual(snapshot['qr_data'], TicketGenerator().generate_qr_code_data(ticket))
+
+    def test_multiple_tickets_pdf_has_one_page_per_ticket(self):
+        tickets = self._tickets(3)
+
+        pdf_data = TicketGenerator().generate_multiple_tickets_pdf(tickets)
+
+        reader = PdfReader(BytesIO(pdf_data))
+        self.assertEqual(len(reader.pages), 3)
+        for ticket, page in zip(tickets, reader.pages):
+            text = page.extract_text()
+            self.assertIn(ticket.ticket_number, text)
+            self.assertIn('Layout Event', text)
+            self.assertIn('TERMS & CONDITIONS', text)
+
+    def test_qr_code_is_drawn_as_vector_graphics(self):
+        ticket = self._tickets(1)[0]
+
+        pdf_data = TicketGenerator().generate_ticket_pdf(ticket)
+
+        reader = PdfReader(BytesIO(pdf_data))
+        resources = reader.pages[0]['/Resources']
+        self.assertNotIn('/XObject', resources)
+
+    @override_settings(TICKET_PDF_WORKERS=2, TICKET_PDF_CHUNK_SIZE=2)
+    def test_parallel_pdf_keeps_page_order_and_metadata(self):
+        tickets = self._tickets(5)
+        generator = TicketGenerator()
+
+        first = generator.generate_multiple_tickets_pdf(tickets, parallel=True)
+        second = generator.generate_multiple_tickets_pdf(tickets, parallel=True)
+
+        self.assertEqual(first, second)
+        reader = PdfReader(BytesIO(first))
+        self.assertEqual(
+            [ticket.ticket_number in page.extract_text() for ticket, page in zip(tickets, reader.pages)],
+            [True] * 5
+        )
+        self.assertEqual(reader.metadata.title, 'Jersey Events Tickets - Order')
+
+    @override_settings(TICKET_PDF_PARALLEL_THRESHOLD=3, TICKET_PDF_WORKERS=2)
+    def test_large_orders_use_process_pool(self):
+        generator = TicketGenerator()
+
+        self.assertFalse(generator.should_render_in_parallel(2))
+        self.assertTrue(generator.should_render_in_parallel(3))
+
+    @override_settings(TICKET_PDF_PARALLEL_THRESHOLD=3, TICKET_PDF_WORKERS=2)
+    def test_parallel_failure_falls_back_to_one_core(self):
+        tickets = self._tickets(3)
+
+        with patch.object(TicketGenerator, '_write_parallel', side_effect=BrokenProcessPool('worker died')):
+            pdf_data = TicketGenerator().generate_multiple_tickets_pdf(tickets)
+
+        self.assertEqual(len(PdfReader(BytesIO(pdf_data)).pages), 3)
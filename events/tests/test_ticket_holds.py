@@ -0,0 +1,160 @@
+"""
+Tests for time-limited ticket holds and the expiry sweeper.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from events.models import Event, TicketHold
+from events.ticket_holds import ticket_holds
+from orders.models import Order, OrderItem
+from payments.fulfillment_service import fulfillment_service
+
+User = get_user_model()
+
+
+class TicketHoldTests(TestCase):
+
+    def setUp(self):
+        self.organiser = User.objects.create_user(
+            email='hold-organiser@test.com',
+            password='test123',
+            user_type='artist'
+        )
+        self.customer = User.objects.create_user(
+            email='hold-customer@test.com',
+            password='test123',
+            user_type='customer'
+        )
+        self.event = self._event('Hold Event', capacity=10)
+        self.other_event = self._event('Other Hold Event', capacity=10)
+
+    def _event(self, title, capacity):
+        return Event.objects.create(
+            title=title,
+            organiser=self.organiser,
+            description='Test event',
+            venue_name='Test Venue',
+            venue_address='Test Address',
+            event_date=timezone.now().date() + timedelta(days=30),
+            event_time=timezone.now().time(),
+            capacity=capacity,
+            ticket_price=Decimal('10.00'),
+            status='published'
+        )
+
+    def _order(self, *lines):
+        order = Order.objects.create(
+            user=self.customer,
+            email='hold-customer@test.com',
+            phone='07700900000',
+            delivery_first_name='Hold',
+            delivery_last_name='Customer',
+            delivery_address_line_1='1 Test Street',
+            delivery_parish='st_helier',
+            delivery_postcode='JE2 3AB',
+            subtotal=Decimal('10.00'),
+            shipping_cost=Decimal('0.00'),
+            total=Decimal('10.00'),
+            status='pending'
+        )
+        for event, quantity in lines:
+            OrderItem.objects.create(order=order, event=event, quantity=quantity, price=Decimal('10.00'))
+        return order
+
+    def _hold(self, *lines):
+        order = self._order(*lines)
+        ticket_holds.hold_items(order.items.all(), order=order)
+        return order
+
+    def _expire(self, order):
+        TicketHold.objects.filter(order=order).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    def _refresh(self):
+        self.event.refresh_from_db()
+        self.other_event.refresh_from_db()
+
+    def test_holds_reduce_availability(self):
+        self._hold((self.event, 4), (self.other_event, 1))
+
+        self._refresh()
+        self.assertEqual(self.event.tickets_held, 4)
+        self.assertEqual(self.event.tickets_available, 6)
+        self.assertEqual(self.other_event.tickets_available, 9)
+        self.assertEqual(TicketHold.objects.count(), 2)
+
+    def test_hold_is_all_or_nothing(self):
+        self._hold((self.other_event, 8))
+
+        with self.assertRaises(ValidationError):
+            self._hold((self.event, 2), (self.other_event, 3))
+
+        self._refresh()
+        self.assertEqual(self.event.tickets_held, 0)
+        self.assertEqual(self.other_event.tickets_held, 8)
+        self.assertEqual(TicketHold.objects.count(), 1)
+
+    def test_full_event_reclaims_expired_holds(self):
+        abandoned = self._hold((self.event, 10))
+        self._expire(abandoned)
+
+        self._hold((self.event, 3))
+
+        self._refresh()
+        self.assertEqual(self.event.tickets_held, 3)
+        self.assertFalse(TicketHold.objects.filter(order=abandoned).exists())
+
+    def test_sweeper_releases_expired_holds_in_batches(self):
+        orders = [self._hold((self.event, 1)) for _ in range(3)]
+        live = self._hold((self.other_event, 2))
+        for order in orders:
+            self._expire(order)
+
+        stats = ticket_holds.release_expired(batch_size=2)
+
+        self.assertEqual(stats, {'holds': 3, 'tickets': 3, 'batches': 2})
+        self._refresh()
+        self.assertEqual(self.event.tickets_held, 0)
+        self.assertEqual(self.other_event.tickets_held, 2)
+        self.assertEqual(list(TicketHold.objects.values_list('order', flat=True)), [live.pk])
+
+    def test_release_order(self):
+        order = self._hold((self.event, 5))
+
+        self.assertEqual(ticket_holds.release_order(order.pk), 5)
+
+        self._refresh()
+        self.assertEqual(self.event.tickets_held, 0)
+        self.assertFalse(TicketHold.objects.exists())
+
+    @patch('payments.fulfillment_service.OrderFulfillmentService.run_followups')
+    def test_fulfillment_converts_holds_to_sales(self, mock_followups):
+        order = self._hold((self.event, 4))
+
+        fulfillment_service.fulfill_order(order)
+        # A repeat delivery sells nothing twice
+        fulfillment_service.fulfill_order(order)
+
+        self._refresh()
+        self.assertEqual(self.event.tickets_sold, 4)
+        self.assertEqual(self.event.tickets_held, 0)
+        self.assertEqual(self.event.tickets_available, 6)
+        self.assertFalse(TicketHold.objects.exists())
+
+    def test_command(self):
+        self._expire(self._hold((self.event, 2)))
+        out = StringIO()
+
+        call_command('release_ticket_holds', stdout=out)
+
+        self.assertIn('Released 1 expired ticket holds', out.getvalue())
+        self._refresh()
+        self.assertEqual(self.event.tickets_held, 0)
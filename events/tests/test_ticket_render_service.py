@@ -0,0 +1,119 @@
+"""
+Tests for the asynchronous ticket QR/PDF rendering pipeline.
+"""
+
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from events.models import Event, Ticket
+from events.ticket_render_service import TicketRenderService
+
+User = get_user_model()
+
+
+class TicketRenderTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root, TICKET_RENDER_ASYNC=False)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.organiser = User.objects.create_user(
+            email='render-organiser@test.com',
+            password='test123',
+            user_type='artist'
+        )
+        self.customer = User.objects.create_user(
+            email='render-customer@test.com',
+            password='test123',
+            user_type='customer'
+        )
+        self.event = Event.objects.create(
+            title='Render Event',
+            slug='render-event',
+            organiser=self.organiser,
+            description='Test event',
+            venue_name='Test Venue',
+            venue_address='Test Address',
+            event_date=timezone.now().date() + timedelta(days=30),
+            event_time=timezone.now().time(),
+            capacity=100,
+            ticket_price=Decimal('10.00'),
+            status='published'
+        )
+
+    def _ticket(self):
+        with patch.object(TicketRenderService, 'enqueue_tickets'):
+            return Ticket.objects.create(event=self.event, customer=self.customer)
+
+    @patch.object(TicketRenderService, 'render_tickets')
+    def test_save_queues_render_instead_of_encoding_inline(self, mock_render):
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket = Ticket.objects.create(event=self.event, customer=self.customer)
+
+        self.assertFalse(ticket.qr_code)
+        self.assertEqual(ticket.render_status, 'pending')
+        mock_render.assert_called_once_with([ticket.pk])
+
+    def test_render_tickets_renders_once(self):
+        ticket = self._ticket()
+        service = TicketRenderService()
+
+        self.assertEqual(service.render_tickets([ticket.pk]), {'rendered': 1, 'failed': 0, 'skipped': 0})
+        self.assertEqual(service.render_tickets([ticket.pk]), {'rendered': 0, 'failed': 0, 'skipped': 1})
+
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.render_status, 'ready')
+        self.assertEqual(ticket.render_attempts, 1)
+        self.assertTrue(ticket.qr_code)
+        self.assertTrue(ticket.pdf_file)
+
+    @override_settings(TICKET_RENDER_MAX_ATTEMPTS=2)
+    @patch.object(Ticket, 'generate_pdf_ticket', return_value=False)
+    def test_failed_render_is_retried_until_max_attempts(self, _mock_pdf):
+        ticket = self._ticket()
+        service = TicketRenderService()
+
+        self.assertEqual(service.render_pending()['failed'], 1)
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.render_status, 'failed')
+        self.assertEqual(ticket.render_error, 'PDF generation failed')
+
+        self.assertEqual(service.render_pending()['failed'], 1)
+        self.assertEqual(service.render_pending(), {'rendered': 0, 'failed': 0, 'skipped': 0})
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.render_attempts, 2)
+
+    def test_download_renders_on_demand(self):
+        ticket = self._ticket()
+        self.client.force_login(self.customer)
+
+        response = self.client.get(ticket.get_download_url())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.render_status, 'ready')
+
+    def test_download_is_limited_to_ticket_holder(self):
+        ticket = self._ticket()
+        other = User.objects.create_user(
+            email='render-other@test.com',
+            password='test123',
+            user_type='customer'
+        )
+        self.client.force_login(other)
+
+        response = self.client.get(ticket.get_download_url())
+
+        self.assertEqual(response.status_code, 404)
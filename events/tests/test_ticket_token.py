@@ -0,0 +1,133 @@
+"""
+Tests for the signed ticket token codec and its use by the validator.
+"""
+
+import base64
+import hashlib
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+import qrcode
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from events.models import Event, Ticket
+from events.ticket_generator import TicketGenerator
+from events.ticket_render_service import TicketRenderService
+from events.ticket_token import (
+    InvalidTicketToken, TOKEN_PREFIX, decode_ticket_token, encode_ticket_token, encode_token
+)
+from events.ticket_validator import TicketValidator
+
+User = get_user_model()
+
+
+class TicketTokenCodecTests(TestCase):
+
+    def test_round_trip(self):
+        token = decode_ticket_token(encode_token(ticket_id=1234, event_id=56))
+
+        self.assertEqual((token.ticket_id, token.event_id, token.version), (1234, 56, 1))
+
+    def test_token_fits_version_2_qr_code(self):
+        qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M)
+        qr.add_data(encode_token(ticket_id=4294967295, event_id=4294967295))
+        qr.make(fit=True)
+
+        self.assertLessEqual(qr.version, 2)
+
+    def test_tampered_token_is_rejected(self):
+        raw = bytearray(base64.b32decode(encode_token(ticket_id=1, event_id=1)[len(TOKEN_PREFIX):]))
+        raw[6] ^= 0x01  # different event id, same signature
+        forged = TOKEN_PREFIX + base64.b32encode(bytes(raw)).decode()
+
+        with self.assertRaisesMessage(InvalidTicketToken, "Invalid ticket signature"):
+            decode_ticket_token(forged)
+
+    def test_malformed_token_is_rejected(self):
+        with self.assertRaises(InvalidTicketToken):
+            decode_ticket_token(TOKEN_PREFIX + 'NOT-BASE32')
+
+    def test_previous_key_still_verifies_after_rotation(self):
+        with override_settings(TICKET_TOKEN_KEY_ID=1, TICKET_TOKEN_KEYS={1: 'old-secret'}):
+            old_token = encode_token(ticket_id=7, event_id=8)
+
+        with override_settings(TICKET_TOKEN_KEY_ID=2, TICKET_TOKEN_KEYS={1: 'old-secret', 2: 'new-secret'}):
+            self.assertEqual(decode_ticket_token(old_token).key_id, 1)
+            self.assertEqual(decode_ticket_token(encode_token(ticket_id=7, event_id=8)).key_id, 2)
+
+        with override_settings(TICKET_TOKEN_KEY_ID=2, TICKET_TOKEN_KEYS={2: 'new-secret'}):
+            with self.assertRaisesMessage(InvalidTicketToken, "Unknown signing key 1"):
+                decode_ticket_token(old_token)
+
+
+class TicketTokenValidationTests(TestCase):
+
+    def setUp(self):
+        organiser = User.objects.create_user(
+            email='token-organiser@test.com',
+            password='test123',
+            user_type='artist'
+        )
+        self.customer = User.objects.create_user(
+            email='token-customer@test.com',
+            password='test123',
+            user_type='customer'
+        )
+        self.event = Event.objects.create(
+            title='Token Event',
+            slug='token-event',
+            organiser=organiser,
+            description='Test event',
+            venue_name='Test Venue',
+            venue_address='Test Address',
+            event_date=timezone.now().date(),
+            event_time=timezone.now().time(),
+            capacity=100,
+            ticket_price=Decimal('10.00'),
+            status='published'
+        )
+        with patch.object(TicketRenderService, 'enqueue_tickets'):
+            self.ticket = Ticket.objects.create(event=self.event, customer=self.customer)
+
+    def test_generator_issues_signed_tokens(self):
+        qr_data = TicketGenerator().generate_qr_code_data(self.ticket)
+
+        self.assertEqual(qr_data, encode_ticket_token(self.ticket))
+        self.assertEqual(decode_ticket_token(qr_data).ticket_id, self.ticket.pk)
+
+    def test_validator_admits_signed_token(self):
+        success, message, ticket = TicketValidator().validate_ticket_qr(encode_ticket_token(self.ticket))
+
+        self.assertTrue(success, message)
+        self.assertEqual(ticket.pk, self.ticket.pk)
+
+    def test_validator_rejects_token_for_other_event(self):
+        forged = encode_token(ticket_id=self.ticket.pk, event_id=self.event.pk + 1)
+
+        success, message, ticket = TicketValidator().validate_ticket_qr(forged)
+
+        self.assertFalse(success)
+        self.assertEqual(message, "Ticket not found")
+
+    def test_validator_still_accepts_legacy_payload(self):
+        hash_data = (
+            f"{self.ticket.ticket_number}:{self.event.id}:{self.customer.email}:"
+            f"{self.ticket.purchase_date.isoformat()}"
+        )
+        legacy_hash = hashlib.sha256(hash_data.encode()).hexdigest()[:16]
+        legacy = f"JERSEY_EVENTS|{self.ticket.ticket_number}|{self.event.id}|{self.customer.email}|{legacy_hash}"
+
+        success, message, _ = TicketValidator().validate_ticket_qr(legacy)
+
+        self.assertTrue(success, message)
+
+    def test_validator_rejects_bad_signature(self):
+        token = encode_ticket_token(self.ticket)
+        with override_settings(TICKET_TOKEN_KEYS={1: 'another-secret'}, TICKET_TOKEN_KEY_ID=1):
+            success, message, _ = TicketValidator().validate_ticket_qr(token)
+
+        self.assertFalse(success)
+        self.assertEqual(message, "Invalid ticket signature")
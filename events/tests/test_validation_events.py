@@ -0,0 +1,156 @@
+"""
+Tests for the live validation event channel and the dashboard SSE stream.
+"""
+
+import json
+from decimal import Decimal
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event, Ticket
+from events.ticket_render_service import TicketRenderService
+from events.ticket_token import encode_ticket_token
+from events.ticket_validator import TicketValidator
+from events.validation_events import CacheChannel, LocalChannel, validation_events
+from events.validation_log import validation_log
+
+User = get_user_model()
+
+
+def parse_sse(chunk):
+    """Return (event name, data) for one server-sent event chunk."""
+    if isinstance(chunk, bytes):
+        chunk = chunk.decode()
+    name = None
+    data = None
+    for line in chunk.splitlines():
+        if line.startswith('event: '):
+            name = line[len('event: '):]
+        elif line.startswith('data: '):
+            data = json.loads(line[len('data: '):])
+    return name, data
+
+
+class ValidationChannelTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def _check_channel(self, channel):
+        self.assertEqual(channel.read(7, 0), ([], 0))
+
+        channel.publish(7, {'n': 1})
+        channel.publish(7, {'n': 2})
+        channel.publish(8, {'n': 'other event'})
+
+        self.assertEqual(channel.read(7, 0), ([(1, {'n': 1}), (2, {'n': 2})], 2))
+        self.assertEqual(channel.read(7, 1), ([(2, {'n': 2})], 2))
+        self.assertEqual(channel.read(7, 2), ([], 2))
+
+    def test_local_channel(self):
+        self._check_channel(LocalChannel(backlog=10))
+
+    def test_cache_channel(self):
+        self._check_channel(CacheChannel(backlog=10, timeout=60))
+
+    def test_backlog_drops_oldest_messages(self):
+        for channel in (LocalChannel(backlog=2), CacheChannel(backlog=2, timeout=60)):
+            for n in range(5):
+                channel.publish(9, n)
+            self.assertEqual(channel.read(9, 0), ([(4, 3), (5, 4)], 5))
+            cache.clear()
+
+    def test_cache_channel_numbering_outlives_its_timeout_while_busy(self):
+        channel = CacheChannel(backlog=10, timeout=60)
+        with patch('django.core.cache.backends.locmem.time.time') as now:
+            for minute in range(3):
+                now.return_value = 1000 + minute * 50
+                channel.publish(7, minute)
+
+            self.assertEqual(channel.latest(7), 3)
+            self.assertEqual(channel.read(7, 2), ([(3, 2)], 3))
+
+
+class ValidationStreamTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        validation_log.flush()
+        self.organiser = User.objects.create_user(
+            email='stream-organiser@test.com',
+            password='test123',
+            user_type='artist'
+        )
+        customer = User.objects.create_user(
+            email='stream-customer@test.com',
+            password='test123',
+            user_type='customer'
+        )
+        self.event = Event.objects.create(
+            title='Stream Event',
+            slug='stream-event',
+            organiser=self.organiser,
+            description='Test event',
+            venue_name='Test Venue',
+            venue_address='Test Address',
+            event_date=timezone.now().date(),
+            event_time=timezone.now().time(),
+            capacity=100,
+            ticket_price=Decimal('10.00'),
+            status='published'
+        )
+        with patch.object(TicketRenderService, 'enqueue_tickets'):
+            self.ticket = Ticket.objects.create(event=self.event, customer=customer)
+
+    def test_scans_are_published(self):
+        latest = validation_events.latest(self.event.pk)
+
+        TicketValidator().validate_ticket_qr(encode_ticket_token(self.ticket), scanner_id='door-1')
+
+        messages, _ = validation_events.read(self.event.pk, latest)
+        self.assertEqual(len(messages), 1)
+        scan = messages[0][1]['scans'][0]
+        self.assertEqual(scan['ticket_number'], self.ticket.ticket_number)
+        self.assertEqual(scan['outcome'], 'admitted')
+        self.assertEqual(scan['scanner_id'], 'door-1')
+
+    @override_settings(VALIDATION_STREAM_POLL_SECONDS=0.01, VALIDATION_STREAM_MAX_SECONDS=5)
+    async def test_stream_sends_snapshot_then_scans(self):
+        await self.async_client.aforce_login(self.organiser)
+
+        response = await self.async_client.get(reverse('events:validation_event_stream', args=[self.event.pk]))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+
+        name, stats = parse_sse(await anext(stream))
+        self.assertEqual(name, 'stats')
+        self.assertEqual(stats['total_tickets'], 1)
+
+        await sync_to_async(TicketValidator().validate_ticket_qr)(encode_ticket_token(self.ticket))
+
+        name, message = parse_sse(await anext(stream))
+        self.assertEqual(name, 'scan')
+        self.assertEqual(message['scans'][0]['outcome'], 'admitted')
+        self.assertEqual(message['stats']['validated'], 1)
+        await stream.aclose()
+
+    async def test_stream_requires_event_organiser(self):
+        intruder = await sync_to_async(User.objects.create_user)(
+            email='stream-intruder@test.com', password='test123', user_type='artist'
+        )
+        await self.async_client.aforce_login(intruder)
+
+        response = await self.async_client.get(reverse('events:validation_event_stream', args=[self.event.pk]))
+
+        self.assertEqual(response.status_code, 403)
+
+    async def test_stream_requires_login(self):
+        response = await self.async_client.get(reverse('events:validation_event_stream', args=[self.event.pk]))
+
+        self.assertEqual(response.status_code, 401)
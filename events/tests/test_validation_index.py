@@ -0,0 +1,143 @@
+"""
+Tests for the cached door validation index.
+"""
+
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event, Ticket
+from events.ticket_render_service import TicketRenderService
+from events.ticket_token import encode_ticket_token
+from events.ticket_validator import TicketValidator
+from events.validation_index import validation_index
+from events.validation_log import validation_log
+
+User = get_user_model()
+
+
+class ValidationIndexTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        validation_log.flush()
+        organiser = User.objects.create_user(
+            email='index-organiser@test.com',
+            password='test123',
+            user_type='artist'
+        )
+        self.customer = User.objects.create_user(
+            email='index-customer@test.com',
+            password='test123',
+            user_type='customer'
+        )
+        self.event = Event.objects.create(
+            title='Index Event',
+            slug='index-event',
+            organiser=organiser,
+            description='Test event',
+            venue_name='Test Venue',
+            venue_address='Test Address',
+            event_date=timezone.now().date(),
+            event_time=timezone.now().time(),
+            capacity=100,
+            ticket_price=Decimal('10.00'),
+            status='published'
+        )
+        self.ticket = self._ticket()
+        self.validator = TicketValidator()
+
+    def _ticket(self):
+        with patch.object(TicketRenderService, 'enqueue_tickets'):
+            return Ticket.objects.create(event=self.event, customer=self.customer)
+
+    def test_load_indexes_every_ticket(self):
+        self._ticket()
+
+        self.assertEqual(validation_index.load_event(self.event), 2)
+        header, entry = validation_index.lookup(self.event.pk, self.ticket.pk)
+        self.assertEqual(header['event_date'], self.event.event_date)
+        self.assertEqual(entry['ticket_number'], self.ticket.ticket_number)
+        self.assertEqual(entry['status'], 'valid')
+
+    def test_second_scan_is_rejected_without_sql(self):
+        validation_index.load_event(self.event)
+        token = encode_ticket_token(self.ticket)
+
+        success, message, _ = self.validator.validate_ticket_qr(token)
+        self.assertTrue(success, message)
+
+        with self.assertNumQueries(0):
+            success, message, _ = self.validator.validate_ticket_qr(token)
+        self.assertFalse(success)
+        self.assertTrue(message.startswith("Ticket already used"))
+
+    def test_refund_updates_index(self):
+        validation_index.load_event(self.event)
+
+        self.ticket.status = 'refunded'
+        self.ticket.save()
+
+        with self.assertNumQueries(0):
+            success, message, _ = self.validator.validate_ticket_qr(encode_ticket_token(self.ticket))
+        self.assertFalse(success)
+        self.assertEqual(message, "Ticket is refunded and cannot be used")
+
+    def test_ticket_issued_after_load_falls_back_to_database(self):
+        validation_index.load_event(self.event)
+        late_ticket = self._ticket()
+
+        success, message, ticket = self.validator.validate_ticket_qr(encode_ticket_token(late_ticket))
+
+        self.assertTrue(success, message)
+        self.assertEqual(ticket.pk, late_ticket.pk)
+
+    def test_invalidated_event_falls_back_to_database(self):
+        validation_index.load_event(self.event)
+        validation_index.invalidate_event(self.event.pk)
+        Ticket.objects.filter(pk=self.ticket.pk).update(status='cancelled')
+
+        success, message, ticket = self.validator.validate_ticket_qr(encode_ticket_token(self.ticket))
+
+        self.assertFalse(success)
+        self.assertEqual(message, "Ticket is cancelled and cannot be used")
+        self.assertEqual(ticket.pk, self.ticket.pk)
+
+    def test_ensure_loaded_keeps_existing_generation(self):
+        validation_index.ensure_loaded(self.event)
+        generation = validation_index.get_header(self.event.pk)['generation']
+
+        validation_index.ensure_loaded(self.event)
+
+        self.assertEqual(validation_index.get_header(self.event.pk)['generation'], generation)
+
+    def _scan(self):
+        self.client.force_login(self.event.organiser)
+        return self.client.post(
+            reverse('events:validate_ticket_qr'),
+            data=json.dumps({'event_id': self.event.pk, 'qr_data': encode_ticket_token(self.ticket)}),
+            content_type='application/json'
+        ).json()
+
+    def test_first_scan_of_the_day_loads_the_index(self):
+        self.assertTrue(self._scan()['success'])
+
+        self.assertTrue(validation_index.is_loaded(self.event.pk))
+        # The repeat scan is rejected from the index
+        with self.assertNumQueries(0):
+            rejection = self.validator.check_validation_index({'event_id': self.event.pk, 'ticket_id': self.ticket.pk})
+        self.assertTrue(rejection.startswith("Ticket already used"))
+
+    def test_scans_on_other_days_leave_the_index_unloaded(self):
+        Event.objects.filter(pk=self.event.pk).update(event_date=timezone.now().date() + timedelta(days=1))
+
+        self.assertFalse(self._scan()['success'])
+
+        self.assertFalse(validation_index.is_loaded(self.event.pk))
@@ -0,0 +1,179 @@
+"""
+Tests for the validation attempt log and the live door counters.
+"""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event, Ticket, TicketValidationAttempt
+from events.ticket_render_service import TicketRenderService
+from events.ticket_token import encode_ticket_token
+from events.ticket_validator import TicketValidator
+from events.validation_log import get_outcome, validation_log
+
+User = get_user_model()
+
+
+class ValidationLogTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        # Start from an empty log: drop scans other tests left in the buffer
+        validation_log.flush()
+        TicketValidationAttempt.objects.all().delete()
+        self.organiser = User.objects.create_user(
+            email='log-organiser@test.com',
+            password='test123',
+            user_type='artist'
+        )
+        self.customer = User.objects.create_user(
+            email='log-customer@test.com',
+            password='test123',
+            user_type='customer'
+        )
+        self.event = Event.objects.create(
+            title='Log Event',
+            slug='log-event',
+            organiser=self.organiser,
+            description='Test event',
+            venue_name='Test Venue',
+            venue_address='Test Address',
+            event_date=timezone.now().date(),
+            event_time=timezone.now().time(),
+            capacity=100,
+            ticket_price=Decimal('10.00'),
+            status='published'
+        )
+        self.tickets = [self._ticket() for _ in range(3)]
+        self.validator = TicketValidator()
+
+    def _ticket(self):
+        with patch.object(TicketRenderService, 'enqueue_tickets'):
+            return Ticket.objects.create(event=self.event, customer=self.customer)
+
+    def test_outcome_classification(self):
+        self.assertEqual(get_outcome(True, "Ticket validated successfully"), 'admitted')
+        self.assertEqual(get_outcome(False, "Ticket already used on 2026-06-01 at 19:00"), 'duplicate')
+        self.assertEqual(get_outcome(False, "Ticket has already been used"), 'duplicate')
+        self.assertEqual(get_outcome(False, "Invalid ticket signature"), 'rejected')
+
+    def test_scans_are_buffered_then_written_in_one_insert(self):
+        token = encode_ticket_token(self.tickets[0])
+        self.validator.validate_ticket_qr(token, validated_by=self.organiser, scanner_id='door-1')
+        self.validator.validate_ticket_qr(token, validated_by=self.organiser, scanner_id='door-1')
+        self.validator.validate_ticket_qr('garbage', event_id=self.event.pk)
+        self.assertFalse(TicketValidationAttempt.objects.exists())
+
+        with self.assertNumQueries(1):
+            self.assertEqual(validation_log.flush(), 3)
+
+        attempts = list(TicketValidationAttempt.objects.order_by('pk'))
+        self.assertEqual([a.outcome for a in attempts], ['admitted', 'duplicate', 'rejected'])
+        self.assertEqual(attempts[0].ticket_id, self.tickets[0].pk)
+        self.assertEqual(attempts[0].scanner_id, 'door-1')
+        self.assertIsNotNone(attempts[0].latency_ms)
+        self.assertEqual(attempts[2].event_id, self.event.pk)
+
+    def test_flushes_when_buffer_is_full(self):
+        with self.settings(VALIDATION_LOG_FLUSH_SIZE=2):
+            self.validator.validate_ticket_qr('garbage', event_id=self.event.pk)
+            self.assertEqual(TicketValidationAttempt.objects.count(), 0)
+            self.validator.validate_ticket_qr('garbage', event_id=self.event.pk)
+
+        self.assertEqual(TicketValidationAttempt.objects.count(), 2)
+
+    def test_timer_flushes_a_quiet_buffer(self):
+        with patch('events.validation_log.threading.Timer') as timer:
+            self.validator.validate_ticket_qr('garbage', event_id=self.event.pk)
+            self.validator.validate_ticket_qr('garbage', event_id=self.event.pk)
+
+        # One timer per buffer, started by its first scan
+        self.assertEqual(timer.call_count, 1)
+        interval, flush_on_timer = timer.call_args.args
+        self.assertEqual(interval, validation_log.get_flush_interval())
+
+        with patch('events.validation_log.connection'):
+            flush_on_timer()
+        self.assertEqual(TicketValidationAttempt.objects.count(), 2)
+
+    def test_batch_is_logged_immediately(self):
+        tokens = [encode_ticket_token(ticket) for ticket in self.tickets[:2]]
+
+        self.validator.bulk_validate_tickets(tokens + tokens[:1], event_id=self.event.pk, scanner_id='door-2')
+
+        outcomes = TicketValidationAttempt.objects.filter(scanner_id='door-2').values_list('outcome', flat=True)
+        self.assertEqual(sorted(outcomes), ['admitted', 'admitted', 'duplicate'])
+
+    def test_counters_follow_scans_without_queries(self):
+        stats = validation_log.get_stats(self.event)
+        self.assertEqual((stats['total_tickets'], stats['remaining_tickets']), (3, 3))
+
+        token = encode_ticket_token(self.tickets[0])
+        self.validator.validate_ticket_qr(token)
+        self.validator.validate_ticket_qr(token)
+        self.validator.validate_ticket_qr('garbage', event_id=self.event.pk)
+
+        with self.assertNumQueries(0):
+            stats = validation_log.get_stats(self.event)
+
+        self.assertEqual(stats['admitted'], 1)
+        self.assertEqual(stats['duplicate'], 1)
+        self.assertEqual(stats['rejected'], 1)
+        self.assertEqual(stats['validated_tickets'], 1)
+        self.assertEqual(stats['remaining_tickets'], 2)
+
+    def test_counters_are_seeded_from_the_database(self):
+        self.tickets[0].validate_ticket()
+        self.validator.validate_ticket_qr(encode_ticket_token(self.tickets[0]))
+        cache.clear()
+
+        stats = validation_log.get_stats(self.event)
+
+        self.assertEqual(stats['validated_tickets'], 1)
+        self.assertEqual(stats['duplicate'], 1)
+        self.assertEqual(stats['validation_rate'], 33.3)
+
+    def test_refund_resets_ticket_totals(self):
+        validation_log.get_stats(self.event)
+
+        self.tickets[1].status = 'refunded'
+        self.tickets[1].save()
+
+        stats = validation_log.get_stats(self.event)
+        self.assertEqual(stats['cancelled_tickets'], 1)
+        self.assertEqual(stats['remaining_tickets'], 2)
+
+    def test_duplicate_entry_attempts_come_from_the_log(self):
+        token = encode_ticket_token(self.tickets[0])
+        for _ in range(3):
+            self.validator.validate_ticket_qr(token)
+
+        found, message = self.validator.check_duplicate_entry_attempts(self.tickets[0].ticket_number)
+
+        self.assertTrue(found)
+        self.assertTrue(message.startswith("2 duplicate entry attempt(s)"))
+
+    def test_stats_endpoint(self):
+        self.client.force_login(self.organiser)
+        self.validator.validate_ticket_qr(encode_ticket_token(self.tickets[0]))
+
+        response = self.client.get(reverse('events:event_validation_stats', args=[self.event.pk]))
+
+        data = response.json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['stats']['validated_tickets'], 1)
+        self.assertEqual(data['stats']['total_tickets'], 3)
+
+    def test_stats_endpoint_requires_event_organiser(self):
+        intruder = User.objects.create_user(email='log-intruder@test.com', password='test123', user_type='artist')
+        self.client.force_login(intruder)
+
+        response = self.client.get(reverse('events:event_validation_stats', args=[self.event.pk]))
+
+        self.assertEqual(response.json(), {'success': False, 'message': 'Access denied'})
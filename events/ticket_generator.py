@@ -3,12 +3,21 @@ PDF Ticket Generation System for Jersey Events
 
 Generates professional PDF tickets with QR codes, event details,
 customer information, and proper branding.
+
+Paragraph/table styles and the static footer are built once per process
+(see get_ticket_layout), and the event block of a ticket is reused for every
+ticket of the same event. Benchmark with:
+
+    python manage.py benchmark_ticket_pdfs
 """
 
 import os
-import qrcode
-import hashlib
 import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from copy import copy
 from io import BytesIO
 from datetime import datetime
 from decimal import Decimal
@@ -23,14 +32,155 @@ from reportlab.lib.units import inch, mm
 from reportlab.lib.colors import HexColor, white, black
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.platypus.flowables import HRFlowable
 from reportlab.lib import colors
-from reportlab.graphics.shapes import Drawing
 from reportlab.graphics.barcode import qr
+from pypdf import PdfReader, PdfWriter
+
+from .ticket_token import encode_ticket_token, token_signature
 
 logger = logging.getLogger(__name__)
 
+ORDER_PDF_METADATA = {
+    'title': "Jersey Events Tickets - Order",
+    'author': "Jersey Events",
+    'subject': "Tickets for order",
+    'creator': "Jersey Events Ticketing System",
+}
+
+
+class TicketLayout:
+    """
+    Styles and static flowables shared by every ticket.
+
+    Built once per process by get_ticket_layout(). Flowables are copied
+    before being added to a story, because ReportLab stores wrap state on the
+    flowable and several threads may render at the same time.
+    """
+
+    def __init__(self, brand_colors):
+        sample_styles = getSampleStyleSheet()
+
+        self.title_style = ParagraphStyle(
+            'EventTitle',
+            parent=sample_styles['Heading1'],
+            fontSize=20,
+            spaceAfter=10,
+            textColor=brand_colors['dark'],
+            alignment=TA_CENTER
+        )
+        self.qr_instructions_style = ParagraphStyle(
+            'QRInstructions',
+            parent=sample_styles['Normal'],
+            fontSize=9,
+            textColor=brand_colors['text'],
+            alignment=TA_CENTER,
+            spaceAfter=10
+        )
+        self.organizer_style = ParagraphStyle(
+            'OrganizerInfo',
+            parent=sample_styles['Normal'],
+            fontSize=9,
+            textColor=brand_colors['text'],
+            alignment=TA_CENTER,
+            spaceAfter=8
+        )
+        self.terms_style = ParagraphStyle(
+            'Terms',
+            parent=sample_styles['Normal'],
+            fontSize=8,
+            textColor=brand_colors['text'],
+            alignment=TA_LEFT,
+            leftIndent=20,
+            rightIndent=20,
+            spaceAfter=10
+        )
+        self.footer_style = ParagraphStyle(
+            'Footer',
+            parent=sample_styles['Normal'],
+            fontSize=8,
+            textColor=brand_colors['primary'],
+            alignment=TA_CENTER
+        )
+
+        self.header_table_style = TableStyle([
+            ('FONTNAME', (0, 0), (0, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (0, 0), 24),
+            ('TEXTCOLOR', (0, 0), (0, 0), brand_colors['primary']),
+            ('FONTNAME', (1, 0), (1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (1, 0), (1, 0), 14),
+            ('TEXTCOLOR', (1, 0), (1, 0), brand_colors['dark']),
+            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ])
+        self.details_table_style = TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 11),
+            ('TEXTCOLOR', (0, 0), (-1, -1), brand_colors['text']),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('ROWBACKGROUNDS', (0, 0), (-1, -1), [white, brand_colors['light']]),
+            ('GRID', (0, 0), (-1, -1), 0.5, brand_colors['light']),
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ])
+        self.customer_table_style = TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('TEXTCOLOR', (0, 0), (-1, -1), brand_colors['text']),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 3),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+        ])
+        self.customer_qr_table_style = TableStyle([
+            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+            ('ALIGN', (1, 0), (1, 0), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ])
+
+        self.qr_instructions = Paragraph(
+            "Present this QR code at the venue for entry. Keep this ticket safe and bring a digital or printed copy to the event.",
+            self.qr_instructions_style
+        )
+        self.footer_rule = HRFlowable(width="100%", thickness=1, lineCap='round', color=brand_colors['light'])
+
+        # Terms and conditions, then the Jersey Events footer
+        terms_text = """
+        <b>TERMS & CONDITIONS:</b> This ticket is non-transferable and non-refundable unless the event is cancelled.
+        Entry may be refused if this ticket has been resold or transferred. Please arrive at least 15 minutes before
+        the event start time. Jersey Events and the event organizer reserve the right to refuse entry or remove
+        attendees who violate venue policies. For support, contact: support@jerseyevents.je
+        """
+        footer_text = "Jersey Events | Professional Event Ticketing | www.jerseyevents.je"
+        self.footer_flowables = [
+            Paragraph(terms_text, self.terms_style),
+            Paragraph(footer_text, self.footer_style),
+        ]
+
+
+_layout = None
+_layout_lock = threading.Lock()
+
+
+def get_ticket_layout():
+    """Return the process-wide TicketLayout, building it on first use."""
+    global _layout
+    if _layout is None:
+        with _layout_lock:
+            if _layout is None:
+                _layout = TicketLayout(TicketGenerator.BRAND_COLORS)
+    return _layout
+
 
 class TicketGenerator:
     """Professional PDF ticket generator with QR codes."""
@@ -50,236 +200,179 @@ class TicketGenerator:
         self.page_width, self.page_height = A4
         self.margin = 0.75 * inch
         self.content_width = self.page_width - (2 * self.margin)
+        self.layout = get_ticket_layout()
+        self._event_blocks = {}
 
     def generate_ticket_validation_hash(self, ticket):
-        """Generate a secure validation hash for the ticket."""
-        # Create hash from ticket data
-        hash_data = f"{ticket.ticket_number}:{ticket.event.id}:{ticket.customer.email}:{ticket.purchase_date.isoformat()}"
-        return hashlib.sha256(hash_data.encode()).hexdigest()[:16]
+        """Return the signature of the ticket's QR token (stored as Ticket.validation_hash)."""
+        return token_signature(self.generate_qr_code_data(ticket))
 
     def generate_qr_code_data(self, ticket):
-        """Generate QR code data with validation information."""
-        validation_hash = self.generate_ticket_validation_hash(ticket)
+        """Generate the signed QR token for the ticket (see events.ticket_token)."""
+        return encode_ticket_token(ticket)
+
+    def build_ticket_snapshot(self, ticket):
+        """
+        Capture everything needed to draw a ticket as plain, picklable data.
 
-        qr_data = {
-            'ticket_id': ticket.ticket_number,
-            'event_id': ticket.event.id,
+        Layout code only reads snapshots, so tickets can be rendered in a
+        worker process without ORM objects crossing the process boundary.
+        """
+        event = ticket.event
+        return {
+            'ticket_number': ticket.ticket_number,
+            'status': ticket.status,
+            'purchase_date': ticket.purchase_date,
+            'order_number': getattr(ticket, 'order_number', 'N/A'),
+            'qr_data': self.generate_qr_code_data(ticket),
+            'customer_name': ticket.customer.get_full_name() or ticket.customer.username,
             'customer_email': ticket.customer.email,
-            'purchase_date': ticket.purchase_date.isoformat(),
-            'validation_hash': validation_hash,
-            'event_date': ticket.event.event_date.isoformat(),
-            'venue': ticket.event.venue_name
+            'event': {
+                'id': event.id,
+                'title': event.title,
+                'event_date': event.event_date,
+                'event_time': event.event_time,
+                'venue_name': event.venue_name,
+                'venue_address': event.venue_address,
+                'ticket_price': event.ticket_price,
+                'organiser_name': event.organiser.get_full_name() or event.organiser.username,
+                'organiser_email': event.organiser.email,
+            },
         }
 
-        # Convert to string format for QR code
-        return f"JERSEY_EVENTS|{ticket.ticket_number}|{ticket.event.id}|{ticket.customer.email}|{validation_hash}"
-
-    def create_qr_code_image(self, ticket):
-        """Create QR code image for the ticket."""
-        qr_data = self.generate_qr_code_data(ticket)
-
-        # Create QR code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_M,
-            box_size=10,
-            border=4,
+    def create_qr_code_flowable(self, snapshot, size=120):
+        """Create the ticket QR code as vector graphics drawn straight onto the PDF canvas."""
+        return qr.QrCode(
+            snapshot['qr_data'],
+            width=size,
+            height=size,
+            qrLevel='M',
+            qrBorder=4
         )
-        qr.add_data(qr_data)
-        qr.make(fit=True)
 
-        # Create image
-        qr_img = qr.make_image(fill_color="black", back_color="white")
+    def get_event_block(self, snapshot):
+        """
+        Return the cached per-event flowables for a ticket snapshot.
 
-        # Convert to BytesIO for ReportLab
-        img_buffer = BytesIO()
-        qr_img.save(img_buffer, format='PNG')
-        img_buffer.seek(0)
+        The title, details table and organiser line only depend on the event
+        (and order number), so tickets of the same event share one block.
+        """
+        event = snapshot['event']
+        order_number = snapshot['order_number']
+        key = (event['id'], order_number)
+        block = self._event_blocks.get(key)
+        if block is not None:
+            return block
+
+        layout = self.layout
+        event_details = [
+            ['Date & Time:', f"{event['event_date'].strftime('%A, %B %d, %Y')} at {event['event_time'].strftime('%I:%M %p')}"],
+            ['Venue:', event['venue_name']],
+            ['Address:', event['venue_address']],
+            ['Ticket Price:', f"£{event['ticket_price']}"],
+            ['Order Number:', order_number]
+        ]
+        details_table = Table(event_details, colWidths=[self.content_width * 0.3, self.content_width * 0.7])
+        details_table.setStyle(layout.details_table_style)
 
-        return img_buffer
+        organizer_info = f"Event organized by: {event['organiser_name']}"
+        if event['organiser_email']:
+            organizer_info += f" | Contact: {event['organiser_email']}"
 
-    def create_ticket_header(self, story, ticket):
+        block = {
+            'title': Paragraph(event['title'], layout.title_style),
+            'details': details_table,
+            'organizer': Paragraph(organizer_info, layout.organizer_style),
+        }
+        self._event_blocks[key] = block
+        return block
+
+    def create_ticket_header(self, story, snapshot):
         """Create the ticket header with branding."""
         # Jersey Events Logo/Brand Section
         header_table = Table([
-            ['JERSEY EVENTS', f'TICKET #{ticket.ticket_number}']
+            ['JERSEY EVENTS', f"TICKET #{snapshot['ticket_number']}"]
         ], colWidths=[self.content_width * 0.6, self.content_width * 0.4])
-
-        header_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (0, 0), 24),
-            ('TEXTCOLOR', (0, 0), (0, 0), self.BRAND_COLORS['primary']),
-            ('FONTNAME', (1, 0), (1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (1, 0), (1, 0), 14),
-            ('TEXTCOLOR', (1, 0), (1, 0), self.BRAND_COLORS['dark']),
-            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        header_table.setStyle(self.layout.header_table_style)
 
         story.append(header_table)
         story.append(Spacer(1, 20))
 
-    def create_event_info_section(self, story, ticket):
+    def create_event_info_section(self, story, snapshot):
         """Create the main event information section."""
-        event = ticket.event
+        block = self.get_event_block(snapshot)
 
-        # Event title
-        title_style = ParagraphStyle(
-            'EventTitle',
-            parent=getSampleStyleSheet()['Heading1'],
-            fontSize=20,
-            spaceAfter=10,
-            textColor=self.BRAND_COLORS['dark'],
-            alignment=TA_CENTER
-        )
-
-        story.append(Paragraph(event.title, title_style))
+        story.append(copy(block['title']))
         story.append(Spacer(1, 15))
-
-        # Event details table
-        event_details = [
-            ['Date & Time:', f"{event.event_date.strftime('%A, %B %d, %Y')} at {event.event_time.strftime('%I:%M %p')}"],
-            ['Venue:', event.venue_name],
-            ['Address:', event.venue_address],
-            ['Ticket Price:', f"£{ticket.event.ticket_price}"],
-            ['Order Number:', getattr(ticket, 'order_number', 'N/A')]
-        ]
-
-        details_table = Table(event_details, colWidths=[self.content_width * 0.3, self.content_width * 0.7])
-        details_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('TEXTCOLOR', (0, 0), (-1, -1), self.BRAND_COLORS['text']),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('ROWBACKGROUNDS', (0, 0), (-1, -1), [white, self.BRAND_COLORS['light']]),
-            ('GRID', (0, 0), (-1, -1), 0.5, self.BRAND_COLORS['light']),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
-
-        story.append(details_table)
+        story.append(copy(block['details']))
         story.append(Spacer(1, 20))
 
-    def create_customer_qr_section(self, story, ticket):
+    def create_customer_qr_section(self, story, snapshot):
         """Create customer info and QR code section."""
-        # Create QR code
-        qr_buffer = self.create_qr_code_image(ticket)
-        qr_image = Image(qr_buffer, width=120, height=120)
+        layout = self.layout
+        qr_code = self.create_qr_code_flowable(snapshot)
 
         # Customer information
         customer_info = [
-            ['Customer Name:', ticket.customer.get_full_name() or ticket.customer.username],
-            ['Email:', ticket.customer.email],
-            ['Purchase Date:', ticket.purchase_date.strftime('%B %d, %Y at %I:%M %p')],
-            ['Ticket Status:', ticket.status.title()]
+            ['Customer Name:', snapshot['customer_name']],
+            ['Email:', snapshot['customer_email']],
+            ['Purchase Date:', snapshot['purchase_date'].strftime('%B %d, %Y at %I:%M %p')],
+            ['Ticket Status:', snapshot['status'].title()]
         ]
 
         customer_table = Table(customer_info, colWidths=[100, 200])
-        customer_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('TEXTCOLOR', (0, 0), (-1, -1), self.BRAND_COLORS['text']),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-        ]))
+        customer_table.setStyle(layout.customer_table_style)
 
         # Combine customer info and QR code
         main_table = Table([
-            [customer_table, qr_image]
+            [customer_table, qr_code]
         ], colWidths=[self.content_width * 0.6, self.content_width * 0.4])
-
-        main_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-            ('ALIGN', (1, 0), (1, 0), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
+        main_table.setStyle(layout.customer_qr_table_style)
 
         story.append(main_table)
         story.append(Spacer(1, 15))
+        story.append(copy(layout.qr_instructions))
 
-        # QR code instructions
-        qr_instructions = ParagraphStyle(
-            'QRInstructions',
-            parent=getSampleStyleSheet()['Normal'],
-            fontSize=9,
-            textColor=self.BRAND_COLORS['text'],
-            alignment=TA_CENTER,
-            spaceAfter=10
-        )
-
-        story.append(Paragraph(
-            "Present this QR code at the venue for entry. Keep this ticket safe and bring a digital or printed copy to the event.",
-            qr_instructions
-        ))
-
-    def create_footer_section(self, story, ticket):
+    def create_footer_section(self, story, snapshot):
         """Create footer with terms and organizer info."""
-        story.append(Spacer(1, 20))
+        block = self.get_event_block(snapshot)
 
-        # Horizontal line
-        story.append(HRFlowable(width="100%", thickness=1, lineCap='round', color=self.BRAND_COLORS['light']))
+        story.append(Spacer(1, 20))
+        story.append(copy(self.layout.footer_rule))
         story.append(Spacer(1, 10))
-
-        # Organizer information
-        organizer_info = f"Event organized by: {ticket.event.organiser.get_full_name() or ticket.event.organiser.username}"
-        if ticket.event.organiser.email:
-            organizer_info += f" | Contact: {ticket.event.organiser.email}"
-
-        organizer_style = ParagraphStyle(
-            'OrganizerInfo',
-            parent=getSampleStyleSheet()['Normal'],
-            fontSize=9,
-            textColor=self.BRAND_COLORS['text'],
-            alignment=TA_CENTER,
-            spaceAfter=8
-        )
-
-        story.append(Paragraph(organizer_info, organizer_style))
-
-        # Terms and conditions
-        terms_text = """
-        <b>TERMS & CONDITIONS:</b> This ticket is non-transferable and non-refundable unless the event is cancelled.
-        Entry may be refused if this ticket has been resold or transferred. Please arrive at least 15 minutes before
-        the event start time. Jersey Events and the event organizer reserve the right to refuse entry or remove
-        attendees who violate venue policies. For support, contact: support@jerseyevents.je
-        """
-
-        terms_style = ParagraphStyle(
-            'Terms',
-            parent=getSampleStyleSheet()['Normal'],
-            fontSize=8,
-            textColor=self.BRAND_COLORS['text'],
-            alignment=TA_LEFT,
-            leftIndent=20,
-            rightIndent=20,
-            spaceAfter=10
-        )
-
-        story.append(Paragraph(terms_text, terms_style))
-
-        # Jersey Events footer
-        footer_text = "Jersey Events | Professional Event Ticketing | www.jerseyevents.je"
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=getSampleStyleSheet()['Normal'],
-            fontSize=8,
-            textColor=self.BRAND_COLORS['primary'],
-            alignment=TA_CENTER
+        story.append(copy(block['organizer']))
+        story.extend(copy(flowable) for flowable in self.layout.footer_flowables)
+
+    def build_story(self, snapshots):
+        """Build the flowables for one or more tickets, one page per ticket."""
+        story = []
+        for i, snapshot in enumerate(snapshots):
+            if i > 0:
+                # Add page break between tickets
+                story.append(PageBreak())
+
+            self.create_ticket_header(story, snapshot)
+            self.create_event_info_section(story, snapshot)
+            self.create_customer_qr_section(story, snapshot)
+            self.create_footer_section(story, snapshot)
+        return story
+
+    def build_document(self, output, metadata):
+        """Create a SimpleDocTemplate writing to a filename or file-like object."""
+        return SimpleDocTemplate(
+            output,
+            pagesize=A4,
+            topMargin=self.margin,
+            bottomMargin=self.margin,
+            leftMargin=self.margin,
+            rightMargin=self.margin,
+            title=metadata['title'],
+            author=metadata['author'],
+            subject=metadata['subject'],
+            creator=metadata['creator'],
+            invariant=metadata.get('invariant', 0)
         )
 
-        story.append(Paragraph(footer_text, footer_style))
-
     def generate_ticket_pdf(self, ticket):
         """Generate a complete PDF ticket."""
         try:
@@ -289,30 +382,15 @@ class TicketGenerator:
             buffer = BytesIO()
 
             # Create PDF document
-            doc = SimpleDocTemplate(
-                buffer,
-                pagesize=A4,
-                topMargin=self.margin,
-                bottomMargin=self.margin,
-                leftMargin=self.margin,
-                rightMargin=self.margin,
-                title=f"Jersey Events Ticket - {ticket.ticket_number}",
-                author="Jersey Events",
-                subject=f"Ticket for {ticket.event.title}",
-                creator="Jersey Events Ticketing System"
-            )
-
-            # Build the ticket content
-            story = []
-
-            # Add all sections
-            self.create_ticket_header(story, ticket)
-            self.create_event_info_section(story, ticket)
-            self.create_customer_qr_section(story, ticket)
-            self.create_footer_section(story, ticket)
+            doc = self.build_document(buffer, {
+                'title': f"Jersey Events Ticket - {ticket.ticket_number}",
+                'author': "Jersey Events",
+                'subject': f"Ticket for {ticket.event.title}",
+                'creator': "Jersey Events Ticketing System",
+            })
 
             # Build PDF
-            doc.build(story)
+            doc.build(self.build_story([self.build_ticket_snapshot(ticket)]))
 
             # Get PDF data
             buffer.seek(0)
@@ -346,61 +424,105 @@ class TicketGenerator:
             logger.error(f"Failed to save PDF for ticket {ticket.ticket_number}: {e}")
             raise
 
-    def generate_multiple_tickets_pdf(self, tickets):
+    def get_parallel_threshold(self):
+        return getattr(settings, 'TICKET_PDF_PARALLEL_THRESHOLD', 100)
+
+    def get_parallel_workers(self):
+        return getattr(settings, 'TICKET_PDF_WORKERS', min(os.cpu_count() or 1, 4))
+
+    def get_parallel_chunk_size(self):
+        return getattr(settings, 'TICKET_PDF_CHUNK_SIZE', 25)
+
+    def should_render_in_parallel(self, ticket_count):
+        """
+        Use the process pool for large orders only, and never from a daemonic
+        process (Django-Q workers), which is not allowed to have children.
+        """
+        return (
+            ticket_count >= self.get_parallel_threshold()
+            and self.get_parallel_workers() > 1
+            and not multiprocessing.current_process().daemon
+        )
+
+    def generate_multiple_tickets_pdf(self, tickets, parallel=None):
         """Generate a combined PDF for multiple tickets."""
+        buffer = BytesIO()
+        self.write_multiple_tickets_pdf(tickets, buffer, parallel=parallel)
+        pdf_data = buffer.getvalue()
+        buffer.close()
+        return pdf_data
+
+    def write_multiple_tickets_pdf(self, tickets, output, parallel=None):
+        """
+        Write a combined PDF for multiple tickets to a file-like object.
+
+        Large orders are rendered in a process pool (see
+        should_render_in_parallel); pass parallel=True/False to force a mode.
+        Either way pages follow the order of `tickets` and the document
+        metadata is the same.
+        """
         try:
             if not tickets:
                 raise ValueError("No tickets provided")
 
-            logger.info(f"Generating combined PDF for {len(tickets)} tickets")
+            snapshots = [self.build_ticket_snapshot(ticket) for ticket in tickets]
+            if parallel is None:
+                parallel = self.should_render_in_parallel(len(snapshots))
 
-            # Create PDF buffer
-            buffer = BytesIO()
-
-            # Create PDF document
-            doc = SimpleDocTemplate(
-                buffer,
-                pagesize=A4,
-                topMargin=self.margin,
-                bottomMargin=self.margin,
-                leftMargin=self.margin,
-                rightMargin=self.margin,
-                title=f"Jersey Events Tickets - Order",
-                author="Jersey Events",
-                subject=f"Tickets for order",
-                creator="Jersey Events Ticketing System"
-            )
-
-            story = []
-
-            # Add each ticket with page breaks
-            for i, ticket in enumerate(tickets):
-                if i > 0:
-                    # Add page break between tickets
-                    from reportlab.platypus import PageBreak
-                    story.append(PageBreak())
-
-                # Add ticket content
-                self.create_ticket_header(story, ticket)
-                self.create_event_info_section(story, ticket)
-                self.create_customer_qr_section(story, ticket)
-                self.create_footer_section(story, ticket)
+            logger.info(f"Generating combined PDF for {len(snapshots)} tickets (parallel={parallel})")
 
-            # Build PDF
-            doc.build(story)
+            if parallel:
+                try:
+                    self._write_parallel(snapshots, output)
+                except (OSError, BrokenProcessPool) as e:
+                    # Nothing has been written yet - the combined PDF is only written once every chunk is back
+                    logger.warning(f"Parallel ticket rendering unavailable, rendering on one core: {e}")
+                    parallel = False
 
-            # Get PDF data
-            buffer.seek(0)
-            pdf_data = buffer.getvalue()
-            buffer.close()
+            if not parallel:
+                doc = self.build_document(output, ORDER_PDF_METADATA)
+                doc.build(self.build_story(snapshots))
 
-            logger.info(f"Successfully generated combined PDF for {len(tickets)} tickets ({len(pdf_data)} bytes)")
-            return pdf_data
+            logger.info(f"Successfully generated combined PDF for {len(snapshots)} tickets")
 
         except Exception as e:
             logger.error(f"Failed to generate combined PDF for tickets: {e}")
             raise
 
+    def _write_parallel(self, snapshots, output):
+        chunk_size = self.get_parallel_chunk_size()
+        chunks = [snapshots[i:i + chunk_size] for i in range(0, len(snapshots), chunk_size)]
+        workers = min(self.get_parallel_workers(), len(chunks))
+
+        # executor.map yields results in submission order, so pages stay in ticket order
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            writer = PdfWriter()
+            for chunk_pdf in executor.map(render_ticket_pages, chunks):
+                writer.append(PdfReader(BytesIO(chunk_pdf)))
+
+        writer.add_metadata({
+            '/Title': ORDER_PDF_METADATA['title'],
+            '/Author': ORDER_PDF_METADATA['author'],
+            '/Subject': ORDER_PDF_METADATA['subject'],
+            '/Creator': ORDER_PDF_METADATA['creator'],
+        })
+        writer.write(output)
+
+
+def render_ticket_pages(snapshots):
+    """
+    Render ticket snapshots to PDF bytes.
+
+    Runs in a worker process; each worker builds its TicketLayout once and
+    reuses it for every chunk. Chunks are rendered with an invariant document
+    so the combined PDF doesn't depend on when or where a chunk was built.
+    """
+    generator = TicketGenerator()
+    buffer = BytesIO()
+    doc = generator.build_document(buffer, dict(ORDER_PDF_METADATA, invariant=1))
+    doc.build(generator.build_story(snapshots))
+    return buffer.getvalue()
+
 
 # Utility functions
 def generate_ticket_pdf(ticket):
@@ -0,0 +1,258 @@
+"""
+Ticket Holds
+============
+Checkout sets tickets aside for TICKET_HOLD_TTL_SECONDS, so two buyers can't
+both be told the last tickets are theirs and pay for them, and a buyer who
+walks away gives the tickets back without anyone releasing them.
+
+    available = capacity - tickets_sold - tickets_held
+
+Each hold is a TicketHold row, and Event.tickets_held keeps the sum of an
+event's holds so availability is read straight off the event. Taking a hold
+is one conditional UPDATE of the event's counter:
+
+    UPDATE events_event SET tickets_held = tickets_held + n
+     WHERE id = %s AND capacity >= tickets_sold + tickets_held + n
+
+so the Event row is only locked for that statement, never for the lifetime
+of a checkout, and it fails rather than oversells when the tickets are gone.
+
+Holds end in one of three ways, each moving the counter with the rows:
+
+    - fulfillment (payments.fulfillment_service) converts the order's holds
+      into tickets_sold
+    - a new checkout or cancelled payment releases the order's holds
+    - the sweeper (release_expired) returns expired holds in batches
+
+An expired hold still counts until the sweeper gets to it, so a hold that
+finds no tickets first sweeps that event's expired holds and tries again.
+
+Events sharded for a hot on-sale (events.inventory) take and return their
+held tickets through counter slots instead of tickets_held.
+
+Run the sweeper every minute with django_q:
+
+    Schedule.objects.create(
+        name='Release Expired Ticket Holds - Every Minute',
+        func='events.ticket_holds.ticket_holds.release_expired',
+        schedule_type='I',
+        minutes=1,
+        repeats=-1
+    )
+
+or with cron through `python manage.py release_ticket_holds`.
+"""
+
+import logging
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class TicketHoldService:
+    """Takes, converts and releases time-limited ticket holds."""
+
+    def get_ttl(self):
+        return timedelta(seconds=getattr(settings, 'TICKET_HOLD_TTL_SECONDS', 15 * 60))
+
+    def get_batch_size(self):
+        return getattr(settings, 'TICKET_HOLD_SWEEP_BATCH_SIZE', 500)
+
+    # Taking holds
+
+    def hold_items(self, items, order=None):
+        """
+        Hold tickets for cart or order lines, all or nothing.
+
+        Args:
+            items: CartItem or OrderItem instances (event_id and quantity)
+            order: optional Order the holds belong to (see assign)
+
+        Returns:
+            list: the TicketHold rows created
+
+        Raises:
+            ValidationError: when an event has too few tickets left
+        """
+        from .models import Event, TicketHold
+
+        quantities = Counter()
+        for item in items:
+            if item.event_id:
+                quantities[item.event_id] += item.quantity
+
+        expires_at = timezone.now() + self.get_ttl()
+        sharded = self._sharded(quantities)
+        with transaction.atomic():
+            # Events in id order, so concurrent multi-event checkouts can't deadlock
+            for event_id, quantity in sorted(quantities.items()):
+                if not self._claim(event_id, quantity, sharded):
+                    self.release_expired(event_id=event_id)
+                    if not self._claim(event_id, quantity, sharded):
+                        event = Event.objects.get(pk=event_id)
+                        raise ValidationError(self._refusal(event, quantity))
+
+            holds = TicketHold.objects.bulk_create([
+                TicketHold(event_id=event_id, order=order, quantity=quantity, expires_at=expires_at)
+                for event_id, quantity in quantities.items()
+            ])
+
+        self._changed()
+        return holds
+
+    @staticmethod
+    def _refusal(event, quantity):
+        # Read after the claim failed, so a concurrent checkout may have
+        # changed the count; never tell the buyer there are enough left
+        remaining = max(event.tickets_available, 0)
+        if remaining >= quantity:
+            return f'{event.title}: Tickets are being reserved by other customers, please try again'
+        return f'{event.title}: Only {remaining} tickets remaining, but you requested {quantity}'
+
+    def _sharded(self, event_ids):
+        """The events among event_ids whose tickets are counted in slots (events.inventory)."""
+        from .models import Event
+
+        if not event_ids:
+            return set()
+        return set(Event.objects.filter(pk__in=event_ids, inventory_shards__gt=0).values_list('pk', flat=True))
+
+    def _claim(self, event_id, quantity, sharded):
+        from .inventory import inventory_counters
+        from .models import Event
+
+        if event_id in sharded:
+            return inventory_counters.claim(event_id, quantity)
+        return Event.objects.filter(
+            pk=event_id,
+            capacity__gte=F('tickets_sold') + F('tickets_held') + quantity
+        ).update(tickets_held=F('tickets_held') + quantity) == 1
+
+    def assign(self, holds, order):
+        """Attach holds taken before their order existed to the order."""
+        from .models import TicketHold
+
+        TicketHold.objects.filter(pk__in=[hold.pk for hold in holds]).update(order=order)
+
+    # Ending holds
+
+    def convert_order(self, order):
+        """
+        Turn an order's items into sales and drop its holds, in the caller's transaction.
+
+        Items are sold whether or not their hold is still there: the order is
+        paid by now. Returns the number of tickets sold.
+        """
+        from .inventory import inventory_counters
+        from .models import Event, TicketHold
+
+        with transaction.atomic(savepoint=False):
+            holds = list(TicketHold.objects.select_for_update().filter(order=order))
+            held = Counter()
+            for hold in holds:
+                held[hold.event_id] += hold.quantity
+
+            sold = dict(
+                order.items.filter(event__isnull=False)
+                .values('event_id').annotate(quantity=Sum('quantity'))
+                .values_list('event_id', 'quantity')
+            )
+            # Sharded events' holds came out of their slots, not tickets_held;
+            # tickets sold beyond the live holds still have to leave the slots
+            sharded = self._sharded(set(sold) | set(held))
+            for event_id in sorted(set(sold) | set(held)):
+                counters = {'tickets_sold': F('tickets_sold') + sold.get(event_id, 0)}
+                if event_id in sharded:
+                    unheld = sold.get(event_id, 0) - held[event_id]
+                    if unheld > 0 and inventory_counters.take(event_id, unheld) < unheld:
+                        logger.warning(f"Event {event_id} oversold: order {order.pk} paid after its hold lapsed")
+                else:
+                    counters['tickets_held'] = F('tickets_held') - held[event_id]
+                Event.objects.filter(pk=event_id).update(**counters)
+            TicketHold.objects.filter(pk__in=[hold.pk for hold in holds]).delete()
+
+        unheld = sorted(set(sold) - set(held))
+        if unheld:
+            logger.warning(f"Order {order.pk} sold tickets for events {unheld} without a live hold")
+        self._changed()
+        return sum(sold.values())
+
+    def release_order(self, order_id):
+        """Give back the tickets held for an order that won't be paid."""
+        from .models import TicketHold
+
+        with transaction.atomic():
+            holds = list(TicketHold.objects.select_for_update().filter(order_id=order_id))
+            released = self._release(holds)
+        if released:
+            self._changed()
+        return released
+
+    def release_expired(self, batch_size=None, max_batches=None, event_id=None):
+        """
+        Return expired holds, one batch per transaction.
+
+        Holds another transaction has locked (being converted or released)
+        are skipped. Returns a dict of holds, tickets and batches.
+        """
+        from .models import TicketHold
+
+        batch_size = batch_size or self.get_batch_size()
+        now = timezone.now()
+        stats = {'holds': 0, 'tickets': 0, 'batches': 0}
+
+        expired = TicketHold.objects.filter(expires_at__lte=now)
+        if event_id is not None:
+            expired = expired.filter(event_id=event_id)
+
+        while max_batches is None or stats['batches'] < max_batches:
+            with transaction.atomic():
+                holds = list(expired.select_for_update(skip_locked=True).order_by('pk')[:batch_size])
+                tickets = self._release(holds)
+            if not holds:
+                break
+            stats['holds'] += len(holds)
+            stats['tickets'] += tickets
+            stats['batches'] += 1
+            if len(holds) < batch_size:
+                break
+
+        if stats['holds']:
+            logger.info(f"Released {stats['holds']} expired ticket holds ({stats['tickets']} tickets)")
+            self._changed()
+        return stats
+
+    def _release(self, holds):
+        """Delete locked holds and take their tickets off the events' counters."""
+        from .inventory import inventory_counters
+        from .models import Event, TicketHold
+
+        held = Counter()
+        for hold in holds:
+            held[hold.event_id] += hold.quantity
+        sharded = self._sharded(held)
+        for event_id in sorted(held):
+            if event_id in sharded:
+                inventory_counters.release(event_id, held[event_id])
+            else:
+                Event.objects.filter(pk=event_id).update(tickets_held=F('tickets_held') - held[event_id])
+        TicketHold.objects.filter(pk__in=[hold.pk for hold in holds]).delete()
+        return sum(held.values())
+
+    @staticmethod
+    def _changed():
+        """Availability changed: refresh the catalog's ticket figures (debounced)."""
+        from .catalog import catalog_cache
+
+        transaction.on_commit(catalog_cache.ticket_counts_changed)
+
+
+# Singleton instance
+ticket_holds = TicketHoldService()
@@ -0,0 +1,190 @@
+"""
+Ticket Render Service
+=====================
+Renders ticket QR images and PDFs outside the request/webhook thread.
+
+New tickets start with render_status='pending'. Rendering is queued per order
+(or per ticket for tickets created one at a time) as a Django-Q task when
+TICKET_RENDER_ASYNC is enabled, otherwise it runs straight after commit.
+Failed renders are retried by a scheduled sweep until
+TICKET_RENDER_MAX_ATTEMPTS is reached:
+
+    Schedule.objects.create(
+        name='Ticket Render Sweep - Every 5 Minutes',
+        func='events.ticket_render_service.ticket_render_service.render_pending',
+        schedule_type='I',
+        minutes=5,
+        repeats=-1
+    )
+
+Downloads call ensure_rendered(), which renders on demand when a ticket's PDF
+is not ready yet and serves the stored file afterwards.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+logger = logging.getLogger('events.ticket_render')
+
+
+class TicketRenderService:
+    """
+    Claims pending tickets with a conditional UPDATE, renders their QR code
+    and PDF, and records the outcome on Ticket.render_status.
+    """
+
+    def is_async(self):
+        return getattr(settings, 'TICKET_RENDER_ASYNC', False)
+
+    def get_max_attempts(self):
+        return getattr(settings, 'TICKET_RENDER_MAX_ATTEMPTS', 3)
+
+    def get_claim_timeout(self):
+        return getattr(settings, 'TICKET_RENDER_CLAIM_TIMEOUT_SECONDS', 600)
+
+    def get_batch_size(self):
+        return getattr(settings, 'TICKET_RENDER_BATCH_SIZE', 200)
+
+    def enqueue_order(self, order_id):
+        """Queue rendering for every ticket in an order once the transaction commits."""
+        transaction.on_commit(lambda: self._dispatch('render_order', order_id))
+
+    def enqueue_tickets(self, ticket_ids):
+        """Queue rendering for specific tickets once the transaction commits."""
+        ticket_ids = list(ticket_ids)
+        transaction.on_commit(lambda: self._dispatch('render_tickets', ticket_ids))
+
+    def _dispatch(self, method, argument):
+        if self.is_async():
+            try:
+                from django_q.tasks import async_task
+                async_task(f'events.ticket_render_service.ticket_render_service.{method}', argument)
+                return
+            except Exception as e:
+                logger.error(f"Failed to queue {method}({argument}), rendering inline: {e}")
+        getattr(self, method)(argument)
+
+    def _claimable_q(self, now):
+        stale_before = now - timedelta(seconds=self.get_claim_timeout())
+        return (
+            Q(render_status='pending') |
+            Q(render_status='failed', render_attempts__lt=self.get_max_attempts()) |
+            Q(render_status='rendering', render_started_at__lt=stale_before)
+        )
+
+    def render_order(self, order_id):
+        """
+        Render all unrendered tickets for an order.
+
+        Returns:
+            dict: counts of 'rendered', 'failed' and 'skipped'
+        """
+        from .models import Ticket
+
+        ticket_ids = list(Ticket.objects.filter(order_id=order_id).values_list('pk', flat=True))
+        return self.render_tickets(ticket_ids)
+
+    def render_pending(self, batch_size=None):
+        """
+        Sweep for tickets that still need rendering: never queued, failed with
+        attempts left, or stuck in 'rendering' after a worker died.
+
+        Returns:
+            dict: counts of 'rendered', 'failed' and 'skipped'
+        """
+        from .models import Ticket
+
+        batch_size = batch_size or self.get_batch_size()
+        ticket_ids = list(
+            Ticket.objects.filter(
+                self._claimable_q(timezone.now())
+            ).order_by('purchase_date').values_list('pk', flat=True)[:batch_size]
+        )
+        stats = self.render_tickets(ticket_ids)
+        if ticket_ids:
+            logger.info(f"Ticket render sweep complete: {stats}")
+        return stats
+
+    def render_tickets(self, ticket_ids):
+        """
+        Render the given tickets, skipping any that are already rendered or
+        claimed by another worker.
+
+        Returns:
+            dict: counts of 'rendered', 'failed' and 'skipped'
+        """
+        from .models import Ticket
+
+        stats = {'rendered': 0, 'failed': 0, 'skipped': 0}
+        if not ticket_ids:
+            return stats
+
+        tickets = Ticket.objects.filter(pk__in=ticket_ids).select_related('event', 'customer')
+        for ticket in tickets:
+            if not self._claim(ticket):
+                stats['skipped'] += 1
+                continue
+            stats['rendered' if self._render(ticket) else 'failed'] += 1
+
+        return stats
+
+    def ensure_rendered(self, ticket):
+        """
+        Make sure a ticket's PDF exists, rendering it in this thread if needed.
+
+        Used by downloads so a customer never waits on the queue; once the
+        PDF is stored every later download is served from storage.
+
+        Returns:
+            bool: True if the ticket has a PDF
+        """
+        if ticket.render_status == 'ready' and ticket.pdf_file:
+            return True
+
+        self._claim(ticket, force=True)
+        return self._render(ticket)
+
+    def _claim(self, ticket, force=False):
+        from .models import Ticket
+
+        now = timezone.now()
+        queryset = Ticket.objects.filter(pk=ticket.pk)
+        if not force:
+            queryset = queryset.filter(self._claimable_q(now))
+
+        claimed = queryset.update(
+            render_status='rendering',
+            render_started_at=now,
+            render_attempts=F('render_attempts') + 1
+        )
+        return bool(claimed)
+
+    def _render(self, ticket):
+        from .models import Ticket
+
+        try:
+            if not ticket.qr_code:
+                ticket.generate_qr_code()
+            if not ticket.generate_pdf_ticket():
+                raise RuntimeError("PDF generation failed")
+        except Exception as e:
+            logger.error(f"Rendering failed for ticket {ticket.ticket_number}: {e}", exc_info=True)
+            ticket.render_status = 'failed'
+            ticket.render_error = str(e)
+            Ticket.objects.filter(pk=ticket.pk).update(render_status='failed', render_error=str(e))
+            return False
+
+        ticket.render_status = 'ready'
+        ticket.render_error = ''
+        Ticket.objects.filter(pk=ticket.pk).update(render_status='ready', render_error='')
+        logger.info(f"Rendered ticket {ticket.ticket_number}")
+        return True
+
+
+# Singleton instance
+ticket_render_service = TicketRenderService()
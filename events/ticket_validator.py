@@ -6,14 +6,20 @@ Includes anti-fraud measures and validation tracking.
 """
 
 import json
+import hmac
 import hashlib
 import logging
+import time
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django.db import transaction
+from django.db.models import Count, Max, Q
 
-from .models import Event, Ticket
+from .models import Event, Ticket, TicketValidationAttempt
+from .ticket_token import InvalidTicketToken, decode_ticket_token, is_ticket_token
+from .validation_index import validation_index
+from .validation_log import validation_log
 
 logger = logging.getLogger(__name__)
 
@@ -25,9 +31,28 @@ class TicketValidator:
         self.validation_timeout = 30  # seconds for validation session
 
     def parse_qr_data(self, qr_data_string):
-        """Parse QR code data and extract ticket information."""
+        """
+        Parse QR code data and extract ticket information.
+
+        Signed tokens (events.ticket_token) are verified here, without a
+        database lookup. The legacy "JERSEY_EVENTS|..." payload printed on
+        older tickets is still accepted and checked against the ticket later.
+        """
         try:
-            # Expected format: "JERSEY_EVENTS|ticket_number|event_id|customer_email|validation_hash"
+            if is_ticket_token(qr_data_string):
+                try:
+                    token = decode_ticket_token(qr_data_string)
+                except InvalidTicketToken as e:
+                    return None, str(e)
+
+                return {
+                    'ticket_id': token.ticket_id,
+                    'event_id': token.event_id,
+                    'key_id': token.key_id,
+                    'signed': True
+                }, None
+
+            # Legacy format: "JERSEY_EVENTS|ticket_number|event_id|customer_email|validation_hash"
             parts = qr_data_string.strip().split('|')
 
             if len(parts) != 5:
@@ -42,93 +67,178 @@ class TicketValidator:
                 'ticket_number': ticket_number,
                 'event_id': int(event_id),
                 'customer_email': customer_email,
-                'validation_hash': validation_hash
+                'validation_hash': validation_hash,
+                'signed': False
             }, None
 
         except Exception as e:
             logger.error(f"Failed to parse QR data: {e}")
             return None, "Invalid QR code format"
 
+    def get_ticket(self, qr_data):
+        """Look up the ticket a parsed QR payload refers to (raises Ticket.DoesNotExist)."""
+        lookup = {'event_id': qr_data['event_id']}
+        if qr_data['signed']:
+            lookup['pk'] = qr_data['ticket_id']
+        else:
+            lookup['ticket_number'] = qr_data['ticket_number']
+        return Ticket.objects.select_related('event', 'customer').get(**lookup)
+
     def verify_ticket_hash(self, ticket, provided_hash):
-        """Verify the validation hash matches the ticket."""
+        """Verify a legacy QR payload's validation hash matches the ticket."""
         try:
-            from .ticket_generator import TicketGenerator
-            generator = TicketGenerator()
-            expected_hash = generator.generate_ticket_validation_hash(ticket)
-            return expected_hash == provided_hash
+            hash_data = f"{ticket.ticket_number}:{ticket.event.id}:{ticket.customer.email}:{ticket.purchase_date.isoformat()}"
+            expected_hash = hashlib.sha256(hash_data.encode()).hexdigest()[:16]
+            return hmac.compare_digest(expected_hash, provided_hash)
         except Exception as e:
             logger.error(f"Failed to verify ticket hash: {e}")
             return False
 
-    def validate_ticket_qr(self, qr_data_string, validated_by=None):
+    def verify_legacy_payload(self, ticket, qr_data):
+        """Check the email and hash of a legacy QR payload; return why it's invalid, or None."""
+        # Verify customer email matches
+        if ticket.customer.email.lower() != qr_data['customer_email'].lower():
+            logger.warning(f"Customer email mismatch for ticket {ticket.ticket_number}")
+            return "Invalid ticket data"
+
+        # Verify validation hash
+        if not self.verify_ticket_hash(ticket, qr_data['validation_hash']):
+            logger.warning(f"Invalid validation hash for ticket {ticket.ticket_number}")
+            return "Invalid ticket signature"
+        return None
+
+    @staticmethod
+    def check_admission(is_validated, validated_at, status):
+        """Return why a ticket can't be admitted, or None."""
+        # Check if ticket is already validated
+        if is_validated:
+            return f"Ticket already used on {validated_at.strftime('%Y-%m-%d at %H:%M')}"
+
+        # Check ticket status
+        if status != 'valid':
+            return f"Ticket is {status} and cannot be used"
+        return None
+
+    @staticmethod
+    def check_event_date(event_date):
+        """Return why entry isn't allowed on this date, or None (entry is on event day only)."""
+        today = timezone.now().date()
+
+        if event_date < today:
+            return "Event has already passed"
+        elif event_date > today:
+            return f"Event is not today (scheduled for {event_date.strftime('%Y-%m-%d')})"
+        return None
+
+    def check_validation_index(self, qr_data):
+        """
+        Reject a signed scan from the cached door index, without SQL.
+
+        Returns None when the ticket may be admissible (or the event isn't
+        indexed) - the caller then confirms against the database.
+        """
+        header, entry = validation_index.lookup(qr_data['event_id'], qr_data['ticket_id'])
+        if entry is None:
+            return None
+
+        rejection = (
+            self.check_admission(entry['validated'], entry['validated_at'], entry['status'])
+            or self.check_event_date(header['event_date'])
+        )
+        if rejection:
+            logger.info(f"Ticket {entry['ticket_number']} rejected from validation index: {rejection}")
+        return rejection
+
+    def validate_ticket_qr(self, qr_data_string, validated_by=None, scanner_id='', event_id=None):
         """
         Validate a ticket using QR code data.
 
+        The scan is recorded in the validation log (events.validation_log).
+        Pass event_id to reject tickets for other events; it also files
+        scans that can't be tied to a ticket.
+
         Returns:
             (success: bool, message: str, ticket: Ticket|None)
         """
+        started = time.monotonic()
+        success, message, ticket, qr_data = self._validate_ticket_qr(qr_data_string, validated_by, event_id)
+
+        if ticket is not None:
+            ref_event_id, ticket_id = ticket.event_id, ticket.pk
+        elif qr_data and qr_data['signed']:
+            ref_event_id, ticket_id = qr_data['event_id'], qr_data['ticket_id']
+        else:
+            ref_event_id, ticket_id = event_id, None
+
+        validation_log.record([validation_log.build_attempt(
+            success, message,
+            event_id=ref_event_id,
+            ticket_id=ticket_id,
+            ticket_number=ticket.ticket_number if ticket else (qr_data or {}).get('ticket_number', ''),
+            scanner_id=scanner_id,
+            validated_by=validated_by,
+            latency_ms=int((time.monotonic() - started) * 1000)
+        )])
+        return success, message, ticket
+
+    def _validate_ticket_qr(self, qr_data_string, validated_by=None, event_id=None):
+        """Returns (success, message, ticket|None, parsed qr_data|None)."""
+        qr_data = None
         try:
             # Parse QR data
             qr_data, error = self.parse_qr_data(qr_data_string)
             if error:
                 logger.warning(f"QR parse error: {error}")
-                return False, error, None
+                return False, error, None, None
+
+            if event_id is not None and qr_data['event_id'] != int(event_id):
+                return False, "Ticket is for a different event", None, qr_data
+
+            # Signed tokens are checked against the cached door index first, so
+            # known-bad scans are rejected without touching the database
+            if qr_data['signed']:
+                rejection = self.check_validation_index(qr_data)
+                if rejection:
+                    return False, rejection, None, qr_data
 
             # Find the ticket
             try:
-                ticket = Ticket.objects.select_related('event', 'customer').get(
-                    ticket_number=qr_data['ticket_number'],
-                    event_id=qr_data['event_id']
-                )
+                ticket = self.get_ticket(qr_data)
             except Ticket.DoesNotExist:
-                logger.warning(f"Ticket not found: {qr_data['ticket_number']}")
-                return False, "Ticket not found", None
-
-            # Verify customer email matches
-            if ticket.customer.email.lower() != qr_data['customer_email'].lower():
-                logger.warning(f"Customer email mismatch for ticket {ticket.ticket_number}")
-                return False, "Invalid ticket data", None
-
-            # Verify validation hash
-            if not self.verify_ticket_hash(ticket, qr_data['validation_hash']):
-                logger.warning(f"Invalid validation hash for ticket {ticket.ticket_number}")
-                return False, "Invalid ticket signature", None
+                logger.warning(f"Ticket not found: {qr_data.get('ticket_number') or qr_data['ticket_id']}")
+                return False, "Ticket not found", None, qr_data
 
-            # Check if ticket is already validated
-            if ticket.is_validated:
-                return False, f"Ticket already used on {ticket.validated_at.strftime('%Y-%m-%d at %H:%M')}", ticket
+            if not qr_data['signed']:
+                rejection = self.verify_legacy_payload(ticket, qr_data)
+                if rejection:
+                    return False, rejection, None, qr_data
 
-            # Check ticket status
-            if ticket.status != 'valid':
-                return False, f"Ticket is {ticket.status} and cannot be used", ticket
+            rejection = self.check_admission(ticket.is_validated, ticket.validated_at, ticket.status)
+            if rejection:
+                return False, rejection, ticket, qr_data
 
             # Check event date (allow entry on event day)
             try:
-                event_date = ticket.event.event_date
-                today = timezone.now().date()
-
-                if event_date < today:
-                    return False, "Event has already passed", ticket
-                elif event_date > today:
-                    return False, f"Event is not today (scheduled for {event_date.strftime('%Y-%m-%d')})", ticket
+                rejection = self.check_event_date(ticket.event.event_date)
             except AttributeError:
                 logger.error(f"Invalid event date for ticket {ticket.ticket_number}")
-                return False, "Invalid ticket event data", ticket
+                return False, "Invalid ticket event data", ticket, qr_data
+            if rejection:
+                return False, rejection, ticket, qr_data
 
-            # Validate the ticket
-            with transaction.atomic():
-                success, message = ticket.validate_ticket(validated_by)
+            # Admit the ticket (one conditional UPDATE - concurrent scans can't both succeed)
+            success, message = ticket.validate_ticket(validated_by)
 
             if success:
                 logger.info(f"Ticket {ticket.ticket_number} validated successfully for {ticket.event.title}")
-                return True, "Ticket validated successfully", ticket
+                return True, "Ticket validated successfully", ticket, qr_data
             else:
                 logger.warning(f"Ticket validation failed: {message}")
-                return False, message, ticket
+                return False, message, ticket, qr_data
 
         except Exception as e:
             logger.error(f"Ticket validation error: {e}")
-            return False, "Validation system error", None
+            return False, "Validation system error", None, qr_data
 
     def get_ticket_info(self, qr_data_string):
         """
@@ -145,10 +255,7 @@ class TicketValidator:
 
             # Find the ticket
             try:
-                ticket = Ticket.objects.select_related('event', 'customer').get(
-                    ticket_number=qr_data['ticket_number'],
-                    event_id=qr_data['event_id']
-                )
+                ticket = self.get_ticket(qr_data)
             except Ticket.DoesNotExist:
                 return False, "Ticket not found", None
 
@@ -174,27 +281,10 @@ class TicketValidator:
             return False, "Failed to retrieve ticket information", None
 
     def get_event_validation_stats(self, event_id):
-        """Get validation statistics for an event."""
+        """Get validation statistics for an event (cached counters, see events.validation_log)."""
         try:
-            event = Event.objects.get(id=event_id)
-            tickets = Ticket.objects.filter(event=event)
-
-            stats = {
-                'event_title': event.title,
-                'event_date': event.event_date.strftime('%Y-%m-%d'),
-                'total_tickets': tickets.count(),
-                'validated_tickets': tickets.filter(is_validated=True).count(),
-                'remaining_tickets': tickets.filter(is_validated=False, status='valid').count(),
-                'cancelled_tickets': tickets.filter(status__in=['cancelled', 'refunded']).count(),
-                'validation_rate': 0
-            }
-
-            if stats['total_tickets'] > 0:
-                stats['validation_rate'] = round(
-                    (stats['validated_tickets'] / stats['total_tickets']) * 100, 1
-                )
-
-            return True, "Statistics retrieved", stats
+            event = Event.objects.only('id', 'title', 'event_date').get(id=event_id)
+            return True, "Statistics retrieved", validation_log.get_stats(event)
 
         except Event.DoesNotExist:
             return False, "Event not found", None
@@ -202,34 +292,172 @@ class TicketValidator:
             logger.error(f"Failed to get event stats: {e}")
             return False, "Failed to retrieve statistics", None
 
-    def bulk_validate_tickets(self, qr_data_list, validated_by=None):
-        """Validate multiple tickets at once (for group entries)."""
-        results = []
+    def bulk_validate_tickets(self, qr_data_list, validated_by=None, event_id=None, scanner_id=''):
+        """
+        Validate multiple tickets at once (for group entries and queued scans).
 
-        for qr_data in qr_data_list:
-            success, message, ticket = self.validate_ticket_qr(qr_data, validated_by)
-            results.append({
-                'qr_data': qr_data,
-                'success': success,
-                'message': message,
-                'ticket_number': ticket.ticket_number if ticket else None
-            })
+        Every payload is parsed and verified first, the tickets are fetched
+        with one IN query, and all eligible tickets are admitted by a single
+        UPDATE in one transaction. Results follow the order of qr_data_list
+        and are written to the validation log with one INSERT.
+        Pass event_id to reject tickets for other events.
+        """
+        started = time.monotonic()
+        results = [
+            {'qr_data': qr_data, 'success': False, 'message': None, 'ticket_number': None}
+            for qr_data in qr_data_list
+        ]
+
+        parsed = {}
+        # (event_id, ticket_id) each scan is logged against
+        refs = dict.fromkeys(range(len(qr_data_list)), (event_id, None))
+        for index, qr_data_string in enumerate(qr_data_list):
+            if not isinstance(qr_data_string, str):
+                results[index]['message'] = "Invalid QR code format"
+                continue
+            qr_data, error = self.parse_qr_data(qr_data_string)
+            if error:
+                results[index]['message'] = error
+            elif event_id is not None and qr_data['event_id'] != int(event_id):
+                results[index]['message'] = "Ticket is for a different event"
+            else:
+                parsed[index] = qr_data
+                if qr_data['signed']:
+                    refs[index] = (qr_data['event_id'], qr_data['ticket_id'])
 
-        successful_validations = sum(1 for r in results if r['success'])
+        by_pk, by_number = self._fetch_tickets(parsed.values())
+
+        eligible = {}
+        tickets = {}
+        for index, qr_data in parsed.items():
+            if qr_data['signed']:
+                ticket = by_pk.get(qr_data['ticket_id'])
+            else:
+                ticket = by_number.get(qr_data['ticket_number'])
+            if ticket is None or ticket.event_id != qr_data['event_id']:
+                results[index]['message'] = "Ticket not found"
+                continue
+
+            results[index]['ticket_number'] = ticket.ticket_number
+            refs[index] = (ticket.event_id, ticket.pk)
+            if ticket.pk in eligible:
+                rejection = "Duplicate scan in this batch"
+            else:
+                rejection = (
+                    (None if qr_data['signed'] else self.verify_legacy_payload(ticket, qr_data))
+                    or self.check_admission(ticket.is_validated, ticket.validated_at, ticket.status)
+                    or self.check_event_date(ticket.event.event_date)
+                )
+            if rejection:
+                results[index]['message'] = rejection
+                continue
+
+            eligible[ticket.pk] = index
+            tickets[ticket.pk] = ticket
+
+        admitted = self._admit_tickets(list(tickets.values()), validated_by)
+
+        for pk, index in eligible.items():
+            if pk in admitted:
+                results[index]['success'] = True
+                results[index]['message'] = "Ticket validated successfully"
+            else:
+                # Admitted by another scanner between the fetch and the UPDATE
+                results[index]['message'] = "Ticket has already been used"
+
+        latency_ms = int((time.monotonic() - started) * 1000)
+        validation_log.record([
+            validation_log.build_attempt(
+                result['success'], result['message'],
+                event_id=refs[index][0],
+                ticket_id=refs[index][1],
+                ticket_number=result['ticket_number'],
+                scanner_id=scanner_id,
+                validated_by=validated_by,
+                latency_ms=latency_ms
+            )
+            for index, result in enumerate(results)
+        ], flush=True)
+
+        successful_validations = len(admitted)
         total_tickets = len(results)
 
         logger.info(f"Bulk validation completed: {successful_validations}/{total_tickets} successful")
 
         return results, f"{successful_validations}/{total_tickets} tickets validated successfully"
 
+    def _fetch_tickets(self, parsed_payloads):
+        """Fetch the tickets for parsed payloads in one query; returns (by_pk, by_ticket_number)."""
+        ticket_ids = set()
+        ticket_numbers = set()
+        for qr_data in parsed_payloads:
+            if qr_data['signed']:
+                ticket_ids.add(qr_data['ticket_id'])
+            else:
+                ticket_numbers.add(qr_data['ticket_number'])
+
+        if not ticket_ids and not ticket_numbers:
+            return {}, {}
+
+        tickets = Ticket.objects.select_related('event', 'customer').filter(
+            Q(pk__in=ticket_ids) | Q(ticket_number__in=ticket_numbers)
+        )
+        by_pk = {}
+        by_number = {}
+        for ticket in tickets:
+            by_pk[ticket.pk] = ticket
+            by_number[ticket.ticket_number] = ticket
+        return by_pk, by_number
+
+    def _admit_tickets(self, tickets, validated_by=None):
+        """
+        Admit tickets with one conditional UPDATE.
+
+        The rows still admissible are locked first, so the returned set is
+        exactly the tickets this call admitted.
+
+        Returns:
+            set: primary keys of admitted tickets
+        """
+        if not tickets:
+            return set()
+
+        now = timezone.now()
+        with transaction.atomic():
+            admitted = set(
+                Ticket.objects.select_for_update()
+                .filter(pk__in=[ticket.pk for ticket in tickets], is_validated=False, status='valid')
+                .values_list('pk', flat=True)
+            )
+            if admitted:
+                Ticket.objects.filter(pk__in=admitted).update(
+                    is_validated=True, validated_at=now, validated_by=validated_by, updated_at=now
+                )
+
+        for ticket in tickets:
+            if ticket.pk in admitted:
+                ticket.is_validated = True
+                ticket.validated_at = now
+                ticket.validated_by = validated_by
+                validation_index.update_ticket(ticket)
+        return admitted
+
     def check_duplicate_entry_attempts(self, ticket_number, time_window_minutes=5):
-        """Check for potential duplicate entry attempts."""
+        """Check the validation log for repeat scans of a ticket within a time window."""
         try:
             cutoff_time = timezone.now() - timedelta(minutes=time_window_minutes)
+            ticket = Ticket.objects.only('pk', 'is_validated', 'validated_at').get(ticket_number=ticket_number)
 
-            # This would require a validation log model to track attempts
-            # For now, we just check if the ticket was recently validated
-            ticket = Ticket.objects.get(ticket_number=ticket_number)
+            validation_log.flush()
+            duplicates = TicketValidationAttempt.objects.filter(
+                ticket_id=ticket.pk, outcome='duplicate', attempted_at__gt=cutoff_time
+            ).aggregate(count=Count('pk'), last=Max('attempted_at'))
+
+            if duplicates['count']:
+                return True, (
+                    f"{duplicates['count']} duplicate entry attempt(s) in the last {time_window_minutes} minutes, "
+                    f"latest at {timezone.localtime(duplicates['last']).strftime('%H:%M')}"
+                )
 
             if ticket.is_validated and ticket.validated_at and ticket.validated_at > cutoff_time:
                 return True, f"Ticket was recently validated at {ticket.validated_at.strftime('%H:%M')}"
@@ -244,10 +472,10 @@ class TicketValidator:
 
 
 # Utility functions for easy access
-def validate_ticket(qr_data_string, validated_by=None):
+def validate_ticket(qr_data_string, validated_by=None, scanner_id='', event_id=None):
     """Validate a single ticket using QR code data."""
     validator = TicketValidator()
-    return validator.validate_ticket_qr(qr_data_string, validated_by)
+    return validator.validate_ticket_qr(qr_data_string, validated_by, scanner_id=scanner_id, event_id=event_id)
 
 
 def get_ticket_info(qr_data_string):
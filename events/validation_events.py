@@ -0,0 +1,155 @@
+"""
+Live Validation Events
+======================
+A small per-event pub/sub channel that carries door activity to the
+validation dashboard's server-sent events stream
+(validation_views.validation_event_stream).
+
+validation_log.record() publishes one message per event for every recorded
+batch of scans:
+
+    {'scans': [{'ticket_number', 'outcome', 'message', 'scanner_id', 'at'}, ...],
+     'stats': {counter: value, ...}}
+
+Messages are numbered per event. A subscriber remembers the last number it
+has seen and reads anything newer, so a reconnecting EventSource resumes
+from its Last-Event-ID.
+
+Two channels are available (VALIDATION_EVENTS_BACKEND):
+
+    'cache'  the shared Django cache (Redis in production), so scans on any
+             web worker reach dashboards on every other worker
+    'local'  an in-process buffer, for tests and single-process development
+
+Only the last VALIDATION_EVENTS_BACKLOG messages of an event are kept; a
+subscriber that falls further behind just skips ahead.
+"""
+
+import logging
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger('events.validation')
+
+
+class CacheChannel:
+    """Messages stored under numbered cache keys; the counter key holds the latest number."""
+
+    KEY_PREFIX = 'validation_events'
+
+    def __init__(self, backlog, timeout):
+        self.backlog = backlog
+        self.timeout = timeout
+
+    def _seq_key(self, event_id):
+        return f"{self.KEY_PREFIX}:{event_id}:seq"
+
+    def _message_key(self, event_id, seq):
+        return f"{self.KEY_PREFIX}:{event_id}:{seq}"
+
+    def publish(self, event_id, message):
+        cache.add(self._seq_key(event_id), 0, self.timeout)
+        seq = cache.incr(self._seq_key(event_id))
+        # incr keeps the expiry set by add: push it back, or a busy door's
+        # numbering restarts every timeout and subscribers skip what follows
+        cache.touch(self._seq_key(event_id), self.timeout)
+        cache.set(self._message_key(event_id, seq), message, self.timeout)
+        return seq
+
+    def latest(self, event_id):
+        return cache.get(self._seq_key(event_id), 0)
+
+    def read(self, event_id, after):
+        latest = self.latest(event_id)
+        if latest <= after:
+            return [], latest
+
+        first = max(after + 1, latest - self.backlog + 1)
+        keys = [self._message_key(event_id, seq) for seq in range(first, latest + 1)]
+        found = cache.get_many(keys)
+        messages = [
+            (seq, found[key])
+            for seq, key in zip(range(first, latest + 1), keys)
+            if key in found
+        ]
+        return messages, latest
+
+
+class LocalChannel:
+    """Messages kept in this process only."""
+
+    def __init__(self, backlog, timeout=None):
+        self.backlog = backlog
+        self._events = {}
+        self._lock = threading.Lock()
+
+    def publish(self, event_id, message):
+        with self._lock:
+            seq, messages = self._events.get(event_id, (0, None))
+            if messages is None:
+                messages = deque(maxlen=self.backlog)
+            seq += 1
+            messages.append((seq, message))
+            self._events[event_id] = (seq, messages)
+        return seq
+
+    def latest(self, event_id):
+        with self._lock:
+            return self._events.get(event_id, (0, None))[0]
+
+    def read(self, event_id, after):
+        with self._lock:
+            latest, messages = self._events.get(event_id, (0, ()))
+            return [(seq, message) for seq, message in messages if seq > after], latest
+
+
+class ValidationEventBus:
+    """Publishes door activity and lets dashboard streams read it."""
+
+    CHANNELS = {
+        'cache': CacheChannel,
+        'local': LocalChannel,
+    }
+
+    def __init__(self):
+        self._channel = None
+        self._channel_config = None
+
+    def get_channel(self):
+        config = (
+            getattr(settings, 'VALIDATION_EVENTS_BACKEND', 'cache'),
+            getattr(settings, 'VALIDATION_EVENTS_BACKLOG', 100),
+            getattr(settings, 'VALIDATION_EVENTS_TIMEOUT_SECONDS', 15 * 60),
+        )
+        if self._channel is None or self._channel_config != config:
+            backend, backlog, timeout = config
+            self._channel = self.CHANNELS[backend](backlog, timeout)
+            self._channel_config = config
+        return self._channel
+
+    def publish(self, event_id, message):
+        """Publish a message for an event; never raises (the scan must still succeed)."""
+        try:
+            return self.get_channel().publish(event_id, message)
+        except Exception as e:
+            logger.warning(f"Failed to publish validation event for event {event_id}: {e}")
+            return None
+
+    def latest(self, event_id):
+        return self.get_channel().latest(event_id)
+
+    def read(self, event_id, after=0):
+        """
+        Return messages published after a sequence number.
+
+        Returns:
+            (list, int): [(seq, message), ...] in order, and the latest seq
+        """
+        return self.get_channel().read(event_id, after)
+
+
+# Singleton instance
+validation_events = ValidationEventBus()
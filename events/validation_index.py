@@ -0,0 +1,154 @@
+"""
+Door Validation Index
+=====================
+A per-event copy of what the door needs to know about each ticket, kept in
+the shared Django cache so every scanner (and every web worker) can reject
+bad scans without a database query.
+
+The index is loaded on the event day by the first scan, batch or scanner
+manifest request the organiser's door makes (events.validation_views):
+
+    validation_index.ensure_loaded(event)
+
+Each ticket gets its own cache entry keyed by ticket primary key (which is
+what signed QR tokens carry):
+
+    {'ticket_number', 'hash', 'status', 'validated', 'validated_at'}
+
+plus one header entry holding the index generation and the event date.
+Entries are written before the header, so a half-loaded index is never
+visible. Reloading or invalidating the event bumps/deletes the header and
+the old entries simply expire.
+
+Ticket.save() refreshes the ticket's entry, so refunds, cancellations and
+admissions made anywhere are reflected. A ticket missing from the index
+(issued after it was loaded) is looked up in the database as before. The
+index only ever short-circuits rejections: an accept is always confirmed
+against the database, so a stale entry can't let anyone in.
+"""
+
+import logging
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger('events.validation')
+
+
+class ValidationIndexService:
+    """Loads, reads and updates the cached per-event validation index."""
+
+    KEY_PREFIX = 'validation_index'
+
+    def get_timeout(self):
+        return getattr(settings, 'VALIDATION_INDEX_TIMEOUT_SECONDS', 12 * 60 * 60)
+
+    def get_batch_size(self):
+        return getattr(settings, 'VALIDATION_INDEX_BATCH_SIZE', 500)
+
+    def _header_key(self, event_id):
+        return f"{self.KEY_PREFIX}:{event_id}"
+
+    def _entry_key(self, event_id, generation, ticket_id):
+        return f"{self.KEY_PREFIX}:{event_id}:{generation}:{ticket_id}"
+
+    @staticmethod
+    def build_entry(ticket):
+        return {
+            'ticket_number': ticket.ticket_number,
+            'hash': ticket.validation_hash,
+            'status': ticket.status,
+            'validated': ticket.is_validated,
+            'validated_at': ticket.validated_at,
+        }
+
+    def get_header(self, event_id):
+        """Return {'generation', 'event_date'} for a loaded index, or None."""
+        return cache.get(self._header_key(event_id))
+
+    def is_loaded(self, event_id):
+        return self.get_header(event_id) is not None
+
+    def load_event(self, event):
+        """
+        (Re)build the index for an event from the database.
+
+        Returns:
+            int: number of tickets indexed
+        """
+        from .models import Ticket
+
+        generation = uuid.uuid4().hex[:12]
+        timeout = self.get_timeout()
+        rows = Ticket.objects.filter(event_id=event.pk).values_list(
+            'pk', 'ticket_number', 'validation_hash', 'status', 'is_validated', 'validated_at'
+        ).order_by('pk')
+
+        count = 0
+        batch = {}
+        for pk, ticket_number, validation_hash, status, is_validated, validated_at in rows.iterator():
+            batch[self._entry_key(event.pk, generation, pk)] = {
+                'ticket_number': ticket_number,
+                'hash': validation_hash,
+                'status': status,
+                'validated': is_validated,
+                'validated_at': validated_at,
+            }
+            if len(batch) >= self.get_batch_size():
+                cache.set_many(batch, timeout)
+                count += len(batch)
+                batch = {}
+        if batch:
+            cache.set_many(batch, timeout)
+            count += len(batch)
+
+        # Publish the header last so readers never see a partial index
+        cache.set(
+            self._header_key(event.pk),
+            {'generation': generation, 'event_date': event.event_date},
+            timeout
+        )
+        logger.info(f"Loaded validation index for event {event.pk}: {count} tickets")
+        return count
+
+    def ensure_loaded(self, event):
+        """Load the index for an event unless it is already in the cache."""
+        if not self.is_loaded(event.pk):
+            self.load_event(event)
+
+    def invalidate_event(self, event_id):
+        """Drop an event's index; scans fall back to the database until it is reloaded."""
+        cache.delete(self._header_key(event_id))
+
+    def lookup(self, event_id, ticket_id):
+        """
+        Return (header, entry) for a ticket, or (None, None) when the event
+        is not indexed or the ticket is unknown to the index.
+        """
+        header = self.get_header(event_id)
+        if header is None:
+            return None, None
+        entry = cache.get(self._entry_key(event_id, header['generation'], ticket_id))
+        if entry is None:
+            return None, None
+        return header, entry
+
+    def update_ticket(self, ticket):
+        """Refresh one ticket's entry if its event is indexed."""
+        try:
+            header = self.get_header(ticket.event_id)
+            if header is None:
+                return
+            cache.set(
+                self._entry_key(ticket.event_id, header['generation'], ticket.pk),
+                self.build_entry(ticket),
+                self.get_timeout()
+            )
+        except Exception as e:
+            # Never fail a ticket save because the cache is unavailable
+            logger.error(f"Failed to update validation index for ticket {ticket.pk}: {e}")
+
+
+# Singleton instance
+validation_index = ValidationIndexService()
@@ -0,0 +1,306 @@
+"""
+Door Validation Log and Live Counters
+=====================================
+Every scan is recorded as a TicketValidationAttempt (outcome, scanner id,
+latency). Attempts are buffered in the worker and inserted with one
+bulk_create when VALIDATION_LOG_FLUSH_SIZE attempts are pending or the
+oldest is VALIDATION_LOG_FLUSH_SECONDS old. A timer flushes the buffer once
+its oldest attempt is due even when no further scan arrives, and whatever
+is still pending is flushed when the worker exits. Batch and offline uploads
+are flushed straight away, so each upload is one INSERT. Scans rejected from
+the validation index therefore still need no SQL.
+
+The dashboard reads per-event counters from the shared cache:
+
+    admitted / duplicate / rejected   scans by outcome
+    total / validated / remaining / cancelled   ticket totals
+
+Counters are incremented as scans are recorded. A missing counter is seeded
+with one aggregate query over the log (or over the event's tickets) and
+expires after VALIDATION_STATS_TIMEOUT_SECONDS. Ticket saves that change a
+status reset the ticket totals.
+
+Recorded scans are also published to open dashboards through
+events.validation_events.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+
+logger = logging.getLogger('events.validation')
+
+# Rejection messages that mean the ticket had already been admitted
+DUPLICATE_MESSAGES = (
+    "Ticket already used",
+    "Ticket has already been used",
+    "Ticket was already admitted",
+    "Duplicate scan in this batch",
+)
+
+
+def get_outcome(success, message):
+    """Classify a scan result as admitted, duplicate or rejected."""
+    if success:
+        return 'admitted'
+    if message and message.startswith(DUPLICATE_MESSAGES):
+        return 'duplicate'
+    return 'rejected'
+
+
+class ValidationLogService:
+    """Buffers validation attempts and keeps the per-event counters."""
+
+    KEY_PREFIX = 'validation_stats'
+    OUTCOMES = ('admitted', 'duplicate', 'rejected')
+    TOTALS = ('total', 'validated', 'remaining', 'cancelled')
+
+    def __init__(self):
+        self._pending = []
+        self._oldest = None
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def get_flush_size(self):
+        return getattr(settings, 'VALIDATION_LOG_FLUSH_SIZE', 50)
+
+    def get_flush_interval(self):
+        return getattr(settings, 'VALIDATION_LOG_FLUSH_SECONDS', 5)
+
+    def get_timeout(self):
+        return getattr(settings, 'VALIDATION_STATS_TIMEOUT_SECONDS', 300)
+
+    def _key(self, event_id, name):
+        return f"{self.KEY_PREFIX}:{event_id}:{name}"
+
+    @staticmethod
+    def build_attempt(success, message, event_id=None, ticket_id=None, ticket_number='',
+                      scanner_id='', validated_by=None, latency_ms=None, attempted_at=None):
+        """Return an unsaved TicketValidationAttempt for a scan result."""
+        from django.utils import timezone
+
+        from .models import TicketValidationAttempt
+
+        return TicketValidationAttempt(
+            event_id=event_id,
+            ticket_id=ticket_id,
+            ticket_number=(ticket_number or '')[:20],
+            scanner_id=(scanner_id or '')[:50],
+            validated_by_id=getattr(validated_by, 'pk', None),
+            outcome=get_outcome(success, message),
+            message=(message or '')[:255],
+            latency_ms=latency_ms,
+            attempted_at=attempted_at or timezone.now()
+        )
+
+    def record(self, attempts, flush=False):
+        """
+        Count attempts and queue them for the log.
+
+        Args:
+            attempts: unsaved TicketValidationAttempt instances
+            flush: write everything pending now (batch and offline uploads)
+        """
+        if not attempts:
+            return
+
+        try:
+            self._count(attempts)
+        except Exception as e:
+            logger.warning(f"Failed to update validation counters: {e}")
+        self._publish(attempts)
+
+        with self._lock:
+            if not self._pending:
+                self._oldest = time.monotonic()
+                self._schedule_flush()
+            self._pending.extend(attempts)
+            due = (
+                flush
+                or len(self._pending) >= self.get_flush_size()
+                or time.monotonic() - self._oldest >= self.get_flush_interval()
+            )
+
+        if due:
+            self.flush()
+
+    def flush(self):
+        """
+        Insert every pending attempt with one bulk_create.
+
+        Returns:
+            int: number of attempts written
+        """
+        from .models import TicketValidationAttempt
+
+        with self._lock:
+            attempts, self._pending = self._pending, []
+            self._oldest = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not attempts:
+            return 0
+
+        try:
+            TicketValidationAttempt.objects.bulk_create(attempts, batch_size=500)
+        except Exception as e:
+            logger.error(f"Failed to write {len(attempts)} validation attempts: {e}")
+            return 0
+        return len(attempts)
+
+    def _schedule_flush(self):
+        """Flush the buffer once its first attempt is due, even if no further scan arrives."""
+        self._timer = threading.Timer(self.get_flush_interval(), self._flush_on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_on_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread's connection would otherwise stay open
+            connection.close()
+
+    def _count(self, attempts):
+        deltas = {}
+        for attempt in attempts:
+            if attempt.event_id is None:
+                continue
+            key = self._key(attempt.event_id, attempt.outcome)
+            deltas[key] = deltas.get(key, 0) + 1
+            if attempt.outcome == 'admitted':
+                validated = self._key(attempt.event_id, 'validated')
+                remaining = self._key(attempt.event_id, 'remaining')
+                deltas[validated] = deltas.get(validated, 0) + 1
+                deltas[remaining] = deltas.get(remaining, 0) - 1
+
+        for key, delta in deltas.items():
+            try:
+                cache.incr(key, delta)
+            except ValueError:
+                # Not seeded yet - the next read seeds it from the database
+                pass
+
+    def _publish(self, attempts):
+        """Push the scans and the updated counters to live dashboards (events.validation_events)."""
+        from .validation_events import validation_events
+
+        by_event = {}
+        for attempt in attempts:
+            if attempt.event_id is not None:
+                by_event.setdefault(attempt.event_id, []).append(attempt)
+
+        recent = getattr(settings, 'VALIDATION_EVENTS_RECENT_SCANS', 20)
+        for event_id, event_attempts in by_event.items():
+            try:
+                stats = self.get_cached_counters(event_id)
+            except Exception:
+                stats = {}
+            validation_events.publish(event_id, {
+                'scans': [
+                    {
+                        'ticket_number': attempt.ticket_number,
+                        'outcome': attempt.outcome,
+                        'message': attempt.message,
+                        'scanner_id': attempt.scanner_id,
+                        'at': attempt.attempted_at.isoformat(),
+                    }
+                    for attempt in event_attempts[-recent:]
+                ],
+                'stats': stats,
+            })
+
+    def get_cached_counters(self, event_id):
+        """Return the counters currently in the cache, without seeding missing ones."""
+        names = self.OUTCOMES + self.TOTALS
+        cached = cache.get_many([self._key(event_id, name) for name in names])
+        return {
+            name: cached[self._key(event_id, name)]
+            for name in names
+            if self._key(event_id, name) in cached
+        }
+
+    def invalidate_totals(self, event_id):
+        """Drop an event's cached ticket totals (tickets issued, refunded or cancelled)."""
+        try:
+            cache.delete_many([self._key(event_id, name) for name in self.TOTALS])
+        except Exception as e:
+            logger.warning(f"Failed to reset validation totals for event {event_id}: {e}")
+
+    def get_counters(self, event_id):
+        """
+        Return all counters for an event, seeding missing ones from the database.
+
+        Polling costs one cache round trip; each seed is a single aggregate query.
+        """
+        from .models import Ticket, TicketValidationAttempt
+
+        keys = {name: self._key(event_id, name) for name in self.OUTCOMES + self.TOTALS}
+        cached = cache.get_many(list(keys.values()))
+        counters = {name: cached.get(key) for name, key in keys.items()}
+
+        if any(counters[name] is None for name in self.TOTALS):
+            totals = Ticket.objects.filter(event_id=event_id).aggregate(
+                total=Count('pk'),
+                validated=Count('pk', filter=Q(is_validated=True)),
+                remaining=Count('pk', filter=Q(is_validated=False, status='valid')),
+                cancelled=Count('pk', filter=Q(status__in=['cancelled', 'refunded'])),
+            )
+            counters.update(self._seed(event_id, totals))
+
+        if any(counters[name] is None for name in self.OUTCOMES):
+            self.flush()
+            outcomes = dict.fromkeys(self.OUTCOMES, 0)
+            outcomes.update(
+                TicketValidationAttempt.objects.filter(event_id=event_id)
+                .values_list('outcome').annotate(count=Count('pk')).order_by()
+            )
+            counters.update(self._seed(event_id, outcomes))
+
+        return counters
+
+    def _seed(self, event_id, values):
+        """Cache seeded values unless another worker got there first; return what's cached."""
+        timeout = self.get_timeout()
+        for name, value in values.items():
+            cache.add(self._key(event_id, name), value, timeout)
+        cached = cache.get_many([self._key(event_id, name) for name in values])
+        return {name: cached.get(self._key(event_id, name), value) for name, value in values.items()}
+
+    def get_stats(self, event):
+        """Dashboard statistics for an event, served from the counters."""
+        counters = self.get_counters(event.pk)
+
+        stats = {
+            'event_title': event.title,
+            'event_date': event.event_date.strftime('%Y-%m-%d'),
+            'total_tickets': counters['total'],
+            'validated_tickets': counters['validated'],
+            'remaining_tickets': counters['remaining'],
+            'cancelled_tickets': counters['cancelled'],
+            'admitted': counters['admitted'],
+            'duplicate': counters['duplicate'],
+            'rejected': counters['rejected'],
+            'validation_rate': 0
+        }
+
+        if stats['total_tickets'] > 0:
+            stats['validation_rate'] = round(
+                (stats['validated_tickets'] / stats['total_tickets']) * 100, 1
+            )
+        return stats
+
+
+# Singleton instance
+validation_log = ValidationLogService()
+
+# Don't lose the last scans when a worker shuts down
+atexit.register(validation_log.flush)
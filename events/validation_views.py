@@ -2,24 +2,45 @@
 Ticket validation views for event organizers and staff.
 """
 
+import asyncio
 import json
 import logging
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils.decorators import method_decorator
 from django.views import View
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 
+from .door_sync import door_sync
 from .models import Event, Ticket
 from .ticket_validator import TicketValidator, validate_ticket, get_ticket_info, get_event_stats
+from .validation_events import validation_events
+from .validation_index import validation_index
+from .validation_log import validation_log
 
 logger = logging.getLogger(__name__)
 
 
+def _ensure_validation_index(event):
+    """
+    Load the event's door index on its first scan of the day.
+
+    From then on scanners reject used/refunded tickets from the cache
+    (events.validation_index). Returns whether the event is today.
+    """
+    if event.event_date != timezone.now().date():
+        return False
+    validation_index.ensure_loaded(event)
+    return True
+
+
 @login_required
 def event_validation_dashboard(request, event_id):
     """Dashboard for event organizers to validate tickets."""
@@ -35,10 +56,12 @@ def event_validation_dashboard(request, event_id):
     if not success:
         stats = {'error': message}
 
+    can_validate = _ensure_validation_index(event)
+
     context = {
         'event': event,
         'stats': stats,
-        'can_validate': event.event_date == timezone.now().date(),
+        'can_validate': can_validate,
     }
 
     return render(request, 'events/validation_dashboard.html', context)
@@ -47,7 +70,12 @@ def event_validation_dashboard(request, event_id):
 @login_required
 @require_http_methods(["POST"])
 def validate_ticket_qr(request):
-    """AJAX endpoint to validate a ticket via QR code."""
+    """
+    AJAX endpoint to validate a ticket via QR code.
+
+    Scanner clients post {"event_id": 12, "qr_data": "JE:..."}; only the
+    event's organiser may admit, and only tickets for that event.
+    """
     try:
         data = json.loads(request.body)
         qr_data = data.get('qr_data', '').strip()
@@ -60,22 +88,28 @@ def validate_ticket_qr(request):
             })
 
         # Verify event access
-        if event_id:
-            try:
-                event = Event.objects.get(id=event_id)
-                if event.organiser != request.user:
-                    return JsonResponse({
-                        'success': False,
-                        'message': 'Access denied'
-                    })
-            except Event.DoesNotExist:
-                return JsonResponse({
-                    'success': False,
-                    'message': 'Event not found'
-                })
+        try:
+            event = Event.objects.only('id', 'organiser_id', 'event_date').get(id=event_id)
+        except (Event.DoesNotExist, ValueError, TypeError):
+            return JsonResponse({
+                'success': False,
+                'message': 'Event not found'
+            })
+        if event.organiser_id != request.user.id:
+            return JsonResponse({
+                'success': False,
+                'message': 'Access denied'
+            })
+
+        _ensure_validation_index(event)
 
         # Validate the ticket
-        success, message, ticket = validate_ticket(qr_data, validated_by=request.user)
+        success, message, ticket = validate_ticket(
+            qr_data,
+            validated_by=request.user,
+            scanner_id=str(data.get('scanner_id') or ''),
+            event_id=event.id
+        )
 
         response_data = {
             'success': success,
@@ -111,6 +145,161 @@ def validate_ticket_qr(request):
         })
 
 
+@login_required
+@require_http_methods(["POST"])
+def validate_ticket_batch(request):
+    """
+    AJAX endpoint to admit several tickets in one request.
+
+    Scanner clients post queued scans together:
+        {"event_id": 12, "qr_codes": ["JE:...", "JE:..."]}
+    and get one result per QR code, in the order submitted.
+    """
+    try:
+        data = json.loads(request.body)
+        qr_data_list = data.get('qr_codes') or []
+        event_id = data.get('event_id')
+
+        if not isinstance(qr_data_list, list) or not qr_data_list:
+            return JsonResponse({
+                'success': False,
+                'message': 'No QR codes provided'
+            })
+
+        max_batch_size = getattr(settings, 'VALIDATION_BATCH_MAX_SIZE', 200)
+        if len(qr_data_list) > max_batch_size:
+            return JsonResponse({
+                'success': False,
+                'message': f'Too many QR codes (maximum {max_batch_size})'
+            }, status=400)
+
+        # Verify event access
+        try:
+            event = Event.objects.only('id', 'organiser_id', 'event_date').get(id=event_id)
+        except (Event.DoesNotExist, ValueError, TypeError):
+            return JsonResponse({
+                'success': False,
+                'message': 'Event not found'
+            })
+        if event.organiser_id != request.user.id:
+            return JsonResponse({
+                'success': False,
+                'message': 'Access denied'
+            })
+
+        _ensure_validation_index(event)
+
+        validator = TicketValidator()
+        results, summary = validator.bulk_validate_tickets(
+            [qr_data.strip() if isinstance(qr_data, str) else qr_data for qr_data in qr_data_list],
+            validated_by=request.user,
+            event_id=event.id,
+            scanner_id=str(data.get('scanner_id') or '')
+        )
+
+        logger.info(f"Batch ticket validation by {request.user.username}: {summary}")
+
+        return JsonResponse({
+            'success': True,
+            'results': results,
+            'summary': summary,
+            'admitted': sum(1 for result in results if result['success'])
+        })
+
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'message': 'Invalid request data'
+        })
+    except Exception as e:
+        logger.error(f"Batch ticket validation error: {e}")
+        return JsonResponse({
+            'success': False,
+            'message': 'Validation system error'
+        })
+
+
+@login_required
+@require_http_methods(["GET"])
+def event_scanner_manifest(request, event_id):
+    """
+    Manifest for offline door scanners: admissible and admitted ticket ids
+    plus the event's token verification keys (see events.door_sync).
+    """
+    event = get_object_or_404(Event, id=event_id)
+
+    if event.organiser != request.user:
+        return JsonResponse({
+            'success': False,
+            'message': 'Access denied'
+        }, status=403)
+
+    _ensure_validation_index(event)
+    manifest = door_sync.build_manifest(event)
+    logger.info(f"Scanner manifest for event {event.id} issued to {request.user.username}")
+
+    response = JsonResponse({'success': True, 'manifest': manifest})
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+@login_required
+@require_http_methods(["POST"])
+def sync_offline_admissions(request, event_id):
+    """
+    Upload admissions recorded offline and receive the delta since a cursor.
+
+    Request:
+        {"scanner_id": "door-2", "cursor": "<from last sync or manifest>",
+         "admissions": [{"qr_data": "JE:...", "scanned_at": "2026-06-01T19:02:11Z"}]}
+    """
+    event = get_object_or_404(Event, id=event_id)
+
+    if event.organiser != request.user:
+        return JsonResponse({
+            'success': False,
+            'message': 'Access denied'
+        }, status=403)
+
+    try:
+        data = json.loads(request.body)
+        admissions = data.get('admissions') or []
+
+        if not isinstance(admissions, list):
+            return JsonResponse({
+                'success': False,
+                'message': 'Invalid request data'
+            }, status=400)
+
+        if len(admissions) > door_sync.get_max_batch_size():
+            return JsonResponse({
+                'success': False,
+                'message': f'Too many admissions (maximum {door_sync.get_max_batch_size()})'
+            }, status=400)
+
+        sync = door_sync.sync_admissions(
+            event,
+            admissions,
+            scanner_id=str(data.get('scanner_id') or '')[:50],
+            validated_by=request.user,
+            cursor=data.get('cursor')
+        )
+
+        return JsonResponse({'success': True, **sync})
+
+    except (json.JSONDecodeError, ValueError):
+        return JsonResponse({
+            'success': False,
+            'message': 'Invalid request data'
+        }, status=400)
+    except Exception as e:
+        logger.error(f"Offline admission sync error: {e}")
+        return JsonResponse({
+            'success': False,
+            'message': 'Sync failed'
+        }, status=500)
+
+
 @login_required
 @require_http_methods(["POST"])
 def get_ticket_preview(request):
@@ -153,28 +342,119 @@ def get_ticket_preview(request):
 
 @login_required
 def event_validation_stats(request, event_id):
-    """AJAX endpoint to get real-time validation statistics."""
-    event = get_object_or_404(Event, id=event_id)
+    """
+    AJAX endpoint to get real-time validation statistics.
+
+    Served from cached counters (events.validation_log), so dashboards can
+    poll it every few seconds during doors.
+    """
+    event = get_object_or_404(Event.objects.only('id', 'organiser_id', 'title', 'event_date'), id=event_id)
 
     # Check access
-    if event.organiser != request.user:
+    if event.organiser_id != request.user.id:
         return JsonResponse({
             'success': False,
             'message': 'Access denied'
         })
 
-    success, message, stats = get_event_stats(event_id)
-
-    if success:
+    try:
+        stats = validation_log.get_stats(event)
+    except Exception as e:
+        logger.error(f"Failed to get event stats: {e}")
         return JsonResponse({
-            'success': True,
-            'stats': stats
+            'success': False,
+            'message': 'Failed to retrieve statistics'
         })
-    else:
+
+    return JsonResponse({
+        'success': True,
+        'stats': stats
+    })
+
+
+async def validation_event_stream(request, event_id):
+    """
+    Server-sent events stream of door activity for the validation dashboard.
+
+    Sends a 'stats' snapshot, then a 'scan' event for every batch of scans
+    recorded on any worker (events.validation_events). This is an async view,
+    so under the ASGI application open dashboards don't each hold a worker.
+    The stream closes after VALIDATION_STREAM_MAX_SECONDS; the browser's
+    EventSource reconnects and resumes from Last-Event-ID.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
         return JsonResponse({
             'success': False,
-            'message': message
-        })
+            'message': 'Authentication required'
+        }, status=401)
+
+    try:
+        event = await Event.objects.only('id', 'organiser_id', 'title', 'event_date').aget(id=event_id)
+    except Event.DoesNotExist:
+        raise Http404("Event not found")
+
+    if event.organiser_id != user.id:
+        return JsonResponse({
+            'success': False,
+            'message': 'Access denied'
+        }, status=403)
+
+    try:
+        last_seen = int(request.headers.get('Last-Event-ID') or request.GET.get('last_event_id') or 0)
+    except ValueError:
+        last_seen = 0
+
+    response = StreamingHttpResponse(
+        _validation_event_stream(event, last_seen),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _sse_message(data, event=None, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, cls=DjangoJSONEncoder)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _validation_event_stream(event, last_seen):
+    poll_interval = getattr(settings, 'VALIDATION_STREAM_POLL_SECONDS', 1)
+    keepalive_interval = getattr(settings, 'VALIDATION_STREAM_KEEPALIVE_SECONDS', 15)
+    max_seconds = getattr(settings, 'VALIDATION_STREAM_MAX_SECONDS', 300)
+    read_events = sync_to_async(validation_events.read, thread_sensitive=False)
+
+    loop = asyncio.get_running_loop()
+    started = last_sent = loop.time()
+
+    if not last_seen:
+        # New dashboard: the snapshot already covers everything published so far
+        last_seen = await sync_to_async(validation_events.latest, thread_sensitive=False)(event.pk)
+    stats = await sync_to_async(validation_log.get_stats)(event)
+    yield "retry: 3000\n" + _sse_message(stats, event='stats')
+
+    while loop.time() - started < max_seconds:
+        messages, latest = await read_events(event.pk, last_seen)
+        for seq, message in messages:
+            yield _sse_message(message, event='scan', event_id=seq)
+
+        # latest < last_seen means the channel was reset (cache expiry)
+        last_seen = latest
+
+        now = loop.time()
+        if messages:
+            last_sent = now
+        elif now - last_sent >= keepalive_interval:
+            last_sent = now
+            yield ": keepalive\n\n"
+
+        await asyncio.sleep(poll_interval)
 
 
 @login_required
@@ -242,7 +522,9 @@ class BulkTicketValidationView(View):
 
             # Validate tickets
             validator = TicketValidator()
-            results, summary = validator.bulk_validate_tickets(qr_data_list, validated_by=request.user)
+            results, summary = validator.bulk_validate_tickets(
+                qr_data_list, validated_by=request.user, event_id=event.id
+            )
 
             return JsonResponse({
                 'success': True,
@@ -281,19 +563,17 @@ def admin_validation_overview(request):
     events_with_validation = Event.objects.filter(
         event_date__gte=recent_date,
         tickets__isnull=False
-    ).distinct().prefetch_related('tickets')
+    ).distinct()
 
     event_stats = []
     for event in events_with_validation:
-        tickets = event.tickets.all()
-        validated_count = tickets.filter(is_validated=True).count()
-        total_count = tickets.count()
+        stats = validation_log.get_stats(event)
 
         event_stats.append({
             'event': event,
-            'total_tickets': total_count,
-            'validated_tickets': validated_count,
-            'validation_rate': round((validated_count / total_count) * 100, 1) if total_count > 0 else 0
+            'total_tickets': stats['total_tickets'],
+            'validated_tickets': stats['validated_tickets'],
+            'validation_rate': stats['validation_rate']
         })
 
     context = {
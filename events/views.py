@@ -1,4 +1,6 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from events.models import Event, EventImage, Category
@@ -7,10 +9,11 @@ from django.conf import settings
 from django.db.models import Count
 from django.views.generic import DetailView
 from .models import Event
+from .catalog import catalog_cache
 from django.views.generic import ListView, DetailView
 from decimal import Decimal
 from orders.models import Order, OrderItem
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, FileResponse, Http404
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.cache import never_cache
 import csv
@@ -138,31 +141,61 @@ def my_events(request):
 
     return render(request, 'events/my_events.html', context)
 
-def events_list(request):
-    events = Event.objects.filter(status='published')
-    
-    # Filter by category
-    category = request.GET.get('category')
-    if category:
-        events = events.filter(category__slug=category)
-    
-    # Filter by artist
-    artist_id = request.GET.get('artist')
-    if artist_id:
-        events = events.filter(organiser_id=artist_id)
-    
-    # Sort events
-    sort = request.GET.get('sort')
-    if sort == 'price_low':
-        events = events.order_by('ticket_price')
-    elif sort == 'price_high':
-        events = events.order_by('-ticket_price')
-    elif sort == 'date':
-        events = events.order_by('event_date', 'event_time')
+def _catalog_page(request):
+    """One keyset page of the public listing (or the search results) plus the query string of the next page."""
+    query = request.GET.get('q', '').strip()
+    if query:
+        listing = catalog_cache.get_search(query, category=request.GET.get('category') or None)
     else:
-        events = events.order_by('-created_at')
-    
-    return render(request, 'events/gallery.html', {'events': events})
+        listing = catalog_cache.get_listing(
+            category=request.GET.get('category') or None,
+            artist_id=request.GET.get('artist') or None,
+            sort=request.GET.get('sort'),
+            cursor=request.GET.get('after') or None
+        )
+
+    next_query = None
+    if listing['next_cursor']:
+        params = request.GET.copy()
+        params['after'] = listing['next_cursor']
+        next_query = params.urlencode()
+
+    first_params = request.GET.copy()
+    first_params.pop('after', None)
+    return listing, next_query, first_params.urlencode()
+
+
+def events_list(request):
+    """Public events listing, served from the catalog cache (events.catalog)."""
+    listing, next_query, first_query = _catalog_page(request)
+
+    return render(request, 'events/gallery.html', {
+        'events': listing['cards'],
+        'query': request.GET.get('q', '').strip(),
+        'has_previous': listing['has_previous'],
+        'has_next': listing['has_next'],
+        'next_query': next_query,
+        'first_query': first_query,
+        'is_paginated': listing['has_previous'] or listing['has_next'],
+    })
+
+
+def events_list_json(request):
+    """
+    JSON page of the public events listing for infinite scroll.
+
+    Takes the same q/category/artist/sort/after parameters as events_list and
+    returns the cards as data and as rendered HTML, plus the URL of the next page.
+    """
+    listing, next_query, _ = _catalog_page(request)
+
+    return JsonResponse({
+        'events': listing['cards'],
+        'html': render_to_string('events/partials/gallery_card.html', {'events': listing['cards']}, request=request),
+        'has_next': listing['has_next'],
+        'next_cursor': listing['next_cursor'],
+        'next_url': f"{reverse('events:events_list_json')}?{next_query}" if next_query else None,
+    })
 
 def event_detail(request, pk):
     event = get_object_or_404(Event, pk=pk)
@@ -193,34 +226,14 @@ def health_check(request):
     }, status=200)
 
 def home(request):
-    """Homepage view with featured events and artists."""
-    from accounts.models import User
-    
-    # Get featured events (active, available, and featured or recent)
-    featured_events = Event.objects.filter(
-        status='published'
-    ).select_related('organiser', 'category').order_by('-featured', '-created_at')[:8]
-    
-    # If no featured events, just get the latest ones
-    if not featured_events:
-        featured_events = Event.objects.filter(
-            status='published'
-        ).select_related('organiser', 'category').order_by('-created_at')[:8]
-    
-    # Get featured artists (those with active events)
-    featured_artists = User.objects.filter(
-        user_type='artist',
-        is_active=True,
-        events__status='active'
-    ).distinct().annotate(
-        event_count=Count('events')
-    ).order_by('-event_count')[:4]
-    
+    """Homepage view with featured events and artists (cached, see events.catalog)."""
+    home_data = catalog_cache.get_home()
+
     context = {
-        'featured_events': featured_events,
-        'featured_artists': featured_artists,
+        'featured_events': home_data['featured_events'],
+        'featured_artists': home_data['featured_artists'],
     }
-    
+
     return render(request, 'events/home.html', context)
 
 # Add these at the end of events/views.py
@@ -445,3 +458,58 @@ def export_guest_list(request, event_id):
 
     return response
 
+
+@login_required
+def download_ticket(request, ticket_number):
+    """Download a ticket PDF, rendering it on demand if the worker hasn't yet."""
+    from events.models import Ticket
+    from events.ticket_render_service import ticket_render_service
+
+    ticket = get_object_or_404(
+        Ticket.objects.select_related('event', 'customer'),
+        ticket_number=ticket_number
+    )
+
+    user = request.user
+    if ticket.customer_id != user.id and ticket.event.organiser_id != user.id and not user.is_staff:
+        raise Http404("Ticket not found")
+
+    if not ticket_render_service.ensure_rendered(ticket):
+        return HttpResponse(
+            "Your ticket is still being prepared. Please try again in a minute.",
+            status=503
+        )
+
+    return FileResponse(
+        ticket.pdf_file.open('rb'),
+        as_attachment=True,
+        filename=f"ticket_{ticket.ticket_number}.pdf"
+    )
+
+
+@login_required
+def download_order_tickets(request, order_number):
+    """Download every ticket in an order as one combined PDF."""
+    import tempfile
+    from events.ticket_generator import TicketGenerator
+
+    order = get_object_or_404(Order, order_number=order_number)
+    if order.user_id != request.user.id and not request.user.is_staff:
+        raise Http404("Order not found")
+
+    tickets = list(
+        order.tickets.select_related('event__organiser', 'customer').order_by('pk')
+    )
+    if not tickets:
+        raise Http404("No tickets for this order")
+
+    # Large orders can be several MB - spool to disk rather than holding them in memory
+    output = tempfile.SpooledTemporaryFile(max_size=5 * 1024 * 1024)
+    TicketGenerator().write_multiple_tickets_pdf(tickets, output)
+    output.seek(0)
+
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=f"tickets_{order.order_number}.pdf"
+    )
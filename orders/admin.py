@@ -165,23 +165,24 @@ class OrderAdmin(admin.ModelAdmin):
             admin_notes = request.POST.get('admin_notes', '')
 
             if action == 'approve':
-                # Mark order as confirmed and paid
-                order.status = 'confirmed'
-                order.is_paid = True
-                order.paid_at = timezone.now()
                 order.admin_note = f"Payment manually verified by {request.user.username} at {timezone.now()}. Notes: {admin_notes}"
-                order.payment_notes = f"MANUALLY VERIFIED: {admin_notes}"
-                order.save()
+                order.save(update_fields=['admin_note', 'updated_at'])
 
-                # Generate tickets
+                # Mark order as confirmed and paid, issue tickets and email the customer
                 try:
-                    from payments.redirect_success_fixed import generate_tickets_for_order, send_confirmation_emails
-                    tickets = generate_tickets_for_order(order)
-                    send_confirmation_emails(order, tickets)
+                    from payments.fulfillment_service import fulfillment_service
+                    result = fulfillment_service.fulfill_order(
+                        order,
+                        status='confirmed',
+                        payment_notes=f"MANUALLY VERIFIED: {admin_notes}"
+                    )
 
-                    messages.success(request, f'Order {order.order_number} approved! Customer has been emailed.')
+                    if result.created:
+                        messages.success(request, f'Order {order.order_number} approved! Customer has been emailed.')
+                    else:
+                        messages.info(request, f'Order {order.order_number} was already fulfilled.')
                 except Exception as e:
-                    messages.warning(request, f'Order approved but email failed: {e}')
+                    messages.warning(request, f'Order approval failed: {e}')
 
             elif action == 'reject':
                 # Mark order as cancelled
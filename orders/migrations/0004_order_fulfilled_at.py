@@ -0,0 +1,28 @@
+# Generated manually for the unified order fulfillment service
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def mark_paid_orders_fulfilled(apps, schema_editor):
+    """Orders paid before fulfilled_at existed already had their tickets issued."""
+    Order = apps.get_model('orders', 'Order')
+    Order.objects.filter(is_paid=True, fulfilled_at__isnull=True).update(
+        fulfilled_at=Coalesce('paid_at', 'updated_at')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_acceptance_ip_order_terms_accepted_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='fulfilled_at',
+            field=models.DateTimeField(blank=True, help_text='When tickets were issued - set once by payments.fulfillment_service', null=True),
+        ),
+        migrations.RunPython(mark_paid_orders_fulfilled, migrations.RunPython.noop),
+    ]
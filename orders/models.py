@@ -90,6 +90,11 @@ class Order(models.Model):
     transaction_id = models.CharField(max_length=255, blank=True)
     is_paid = models.BooleanField(default=False)
     paid_at = models.DateTimeField(null=True, blank=True)
+    fulfilled_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When tickets were issued - set once by payments.fulfillment_service"
+    )
     
     # Delivery tracking
     delivery_method = models.CharField(
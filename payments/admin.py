@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import SumUpCheckout, SumUpTransaction, SumUpRefund, ArtistPayout
+from .models import SumUpCheckout, SumUpTransaction, SumUpRefund, ArtistPayout, SumUpWebhookEvent
 
 @admin.register(SumUpCheckout)
 class SumUpCheckoutAdmin(admin.ModelAdmin):
@@ -29,4 +29,12 @@ class ArtistPayoutAdmin(admin.ModelAdmin):
     list_display = ('payout_id', 'artist', 'amount', 'status', 'period_start', 'period_end', 'created_at')
     list_filter = ('status', 'currency', 'created_at')
     search_fields = ('payout_id', 'artist__username', 'reference_number')
-    readonly_fields = ('created_at', 'processed_at')
\ No newline at end of file
+    readonly_fields = ('created_at', 'processed_at')
+
+@admin.register(SumUpWebhookEvent)
+class SumUpWebhookEventAdmin(admin.ModelAdmin):
+    list_display = ('checkout_id', 'source', 'event_type', 'event_status', 'processing_status', 'attempts', 'delivery_count', 'received_at')
+    list_filter = ('processing_status', 'source', 'received_at')
+    search_fields = ('checkout_id', 'dedup_key')
+    readonly_fields = ('dedup_key', 'payload', 'received_at', 'claimed_at', 'processed_at')
+    ordering = ('-received_at',)
@@ -0,0 +1,255 @@
+"""
+Order Fulfillment Service
+=========================
+Single place where a paid order becomes tickets. Every payment confirmation
+path - payment polling, SumUp webhooks, the redirect return pages, the
+widget and manual admin approval - calls fulfill_order(), so an order is
+fulfilled exactly once whichever of them gets there first.
+
+Inside one transaction the order row is locked, marked paid, all of its
+tickets are inserted with a single bulk_create (a guest order is first
+attached to the customer account for its email, created without a
+password if there is none, since every ticket needs a customer) and its ticket holds
+(events.ticket_holds) are converted into sales. QR/PDF rendering (through
+events.ticket_render_service) and the confirmation emails run afterwards as
+a follow-up job (a Django-Q task when FULFILLMENT_ASYNC is enabled, otherwise
+straight after commit), so no image encoding happens while the order lock is
+held.
+"""
+
+import logging
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from events.ticket_holds import ticket_holds
+from orders.models import Order
+from payments.models import SumUpCheckout
+
+logger = logging.getLogger('payments.fulfillment')
+
+FulfillmentResult = namedtuple('FulfillmentResult', ['order', 'tickets', 'created'])
+
+
+class OrderFulfillmentService:
+    """
+    Idempotent order fulfillment keyed by order.
+
+    Order.fulfilled_at is the idempotency marker: it is checked and set while
+    the order row is locked with select_for_update, so concurrent webhook,
+    redirect and poller deliveries serialise on the lock and only the first
+    one issues tickets.
+    """
+
+    def is_async(self):
+        return getattr(settings, 'FULFILLMENT_ASYNC', False)
+
+    def get_batch_size(self):
+        return getattr(settings, 'FULFILLMENT_TICKET_BATCH_SIZE', 500)
+
+    def fulfill_order(self, order, status='confirmed', checkout=None, payment_data=None,
+                      transaction_id=None, payment_notes=None):
+        """
+        Mark an order paid and issue its tickets, once.
+
+        Args:
+            order: Order instance (or pk)
+            status: order status to set when fulfilling ('confirmed', 'completed')
+            checkout: optional SumUpCheckout to mark as paid alongside the order
+            payment_data: optional SumUp response stored on the checkout
+            transaction_id: optional payment reference stored on the order
+            payment_notes: optional note stored on the order
+
+        Returns:
+            FulfillmentResult: (order, tickets, created) - created is False when
+            the order had already been fulfilled by another path
+        """
+        order_id = order.pk if isinstance(order, Order) else order
+
+        with transaction.atomic():
+            order = Order.objects.select_for_update().get(pk=order_id)
+
+            if order.fulfilled_at:
+                logger.info(f"Order {order.order_number} already fulfilled at {order.fulfilled_at} - skipping")
+                return FulfillmentResult(order, list(order.tickets.all()), False)
+
+            now = timezone.now()
+            order.status = status
+            order.is_paid = True
+            order.paid_at = order.paid_at or now
+            order.fulfilled_at = now
+            update_fields = ['status', 'is_paid', 'paid_at', 'fulfilled_at', 'updated_at']
+            if transaction_id:
+                order.transaction_id = transaction_id
+                update_fields.append('transaction_id')
+            if payment_notes:
+                order.payment_notes = payment_notes
+                update_fields.append('payment_notes')
+            if not order.user_id:
+                order.user = self._guest_customer(order)
+                update_fields.append('user')
+            order.save(update_fields=update_fields)
+
+            if checkout is not None:
+                self.mark_checkout_paid(checkout, payment_data, now=now)
+
+            tickets = self._issue_tickets(order)
+
+            # The order's ticket holds become sales
+            ticket_holds.convert_order(order)
+
+            order_pk = order.pk
+            transaction.on_commit(lambda: self._schedule_followups(order_pk))
+
+        logger.info(f"✓ Order {order.order_number} fulfilled - {len(tickets)} tickets issued")
+        return FulfillmentResult(order, tickets, True)
+
+    def mark_checkout_paid(self, checkout, payment_data=None, now=None):
+        """Mark a checkout paid and stop polling it (also for orders another path fulfilled)."""
+        now = now or timezone.now()
+        checkout.status = 'paid'
+        checkout.paid_at = now
+        checkout.should_poll = False
+        fields = {'status': 'paid', 'paid_at': now, 'should_poll': False, 'updated_at': now}
+        if payment_data is not None:
+            checkout.sumup_response = payment_data
+            fields['sumup_response'] = payment_data
+        SumUpCheckout.objects.filter(pk=checkout.pk).update(**fields)
+
+    @staticmethod
+    def _guest_customer(order):
+        """
+        The account a guest order's tickets are issued to.
+
+        An existing account with the order's email is reused; otherwise a
+        customer account without a usable password is created, which the
+        guest can claim with a password reset.
+        """
+        from django.contrib.auth import get_user_model
+        from django.contrib.auth.hashers import make_password
+
+        User = get_user_model()
+        customer = User.objects.filter(email__iexact=order.email).first()
+        if customer is None:
+            customer, _ = User.objects.get_or_create(
+                email=User.objects.normalize_email(order.email),
+                defaults={
+                    'password': make_password(None),
+                    'user_type': 'customer',
+                    'first_name': order.delivery_first_name,
+                    'last_name': order.delivery_last_name,
+                }
+            )
+            logger.info(f"Created customer account for guest order {order.order_number}")
+        return customer
+
+    def _issue_tickets(self, order):
+        """
+        Insert every ticket for the order in one bulk_create.
+
+        Ticket numbers are generated up front. The signed QR token includes the
+        DB-assigned primary key, so tokens and their signatures are written
+        with a single bulk_update straight after the insert.
+
+        Returns:
+            list: created Ticket instances
+        """
+        from events.models import Ticket
+        from events.ticket_generator import TicketGenerator
+
+        customer = order.user
+        tickets = []
+        for item in order.items.select_related('event').filter(event__isnull=False):
+            for _ in range(item.quantity):
+                ticket = Ticket(event=item.event, customer=customer, order=order, status='valid')
+                ticket.ticket_number = ticket.generate_ticket_number()
+                tickets.append(ticket)
+
+        if not tickets:
+            return []
+
+        tickets = Ticket.objects.bulk_create(tickets, batch_size=self.get_batch_size())
+
+        if tickets[0].pk is None:
+            # Backend can't return primary keys from bulk inserts
+            tickets = list(Ticket.objects.filter(order=order).select_related('event'))
+            for ticket in tickets:
+                ticket.customer = customer
+
+        generator = TicketGenerator()
+        for ticket in tickets:
+            ticket.validation_hash = generator.generate_ticket_validation_hash(ticket)
+            ticket.qr_data = generator.generate_qr_code_data(ticket)
+        Ticket.objects.bulk_update(tickets, ['validation_hash', 'qr_data'], batch_size=self.get_batch_size())
+
+        # bulk_create skips Ticket.save(), so reset the door counters here
+        from events.validation_log import validation_log
+        for event_id in {ticket.event_id for ticket in tickets}:
+            validation_log.invalidate_totals(event_id)
+
+        return tickets
+
+    def _schedule_followups(self, order_id):
+        if self.is_async():
+            try:
+                from django_q.tasks import async_task
+                async_task('payments.fulfillment_service.fulfillment_service.run_followups', order_id)
+                return
+            except Exception as e:
+                logger.error(f"Failed to queue fulfillment follow-ups for order {order_id}, running inline: {e}")
+        self.run_followups(order_id)
+
+    def run_followups(self, order_id):
+        """
+        Render ticket QR codes/PDFs and send the confirmation emails.
+
+        Runs after the fulfillment transaction has committed. Rendering goes
+        through the ticket render pipeline, which records failures on each
+        ticket for retry and never undoes the fulfillment.
+        """
+        from events.ticket_render_service import ticket_render_service
+
+        ticket_render_service.render_order(order_id)
+        self.send_confirmation_emails(Order.objects.get(pk=order_id))
+
+    def send_confirmation_emails(self, order):
+        """
+        Send order confirmation to the customer and notify each organiser once.
+
+        Admins are alerted when the customer's confirmation can't be sent.
+        """
+        from events.email_utils import email_service
+        from payments.polling_service import polling_service
+
+        try:
+            if email_service.send_order_confirmation(order):
+                logger.info(f"Order confirmation email sent to {order.email}")
+            else:
+                logger.warning(f"Failed to send order confirmation email to {order.email}")
+                polling_service.alert_email_failure(order, "Order confirmation email was not sent")
+        except Exception as e:
+            logger.error(f"Error sending order confirmation email for {order.order_number}: {e}", exc_info=True)
+            polling_service.alert_email_failure(order, str(e))
+
+        organizers_notified = set()
+        for order_item in order.items.select_related('event__organiser__artistprofile'):
+            if not order_item.event:
+                continue
+            organizer = order_item.event.organiser
+            if organizer.email in organizers_notified:
+                continue
+            try:
+                artist_profile = getattr(organizer, 'artistprofile', None)
+                if artist_profile and email_service.send_artist_notification(order, artist_profile):
+                    organizers_notified.add(organizer.email)
+                    logger.info(f"Order notification sent to organizer {organizer.email}")
+                elif not artist_profile:
+                    logger.warning(f"No artist profile found for organizer {organizer.email}")
+            except Exception as e:
+                logger.error(f"Error sending notification to organizer {organizer.email}: {e}")
+
+
+# Singleton instance
+fulfillment_service = OrderFulfillmentService()
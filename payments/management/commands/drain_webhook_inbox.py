@@ -0,0 +1,43 @@
+"""
+Management command to process stored SumUp webhook events.
+
+Used by Django-Q on a schedule (or cron) to drain the webhook inbox.
+Can also be run manually to replay anything left pending.
+
+Usage:
+    python manage.py drain_webhook_inbox
+    python manage.py drain_webhook_inbox --batch-size 500
+"""
+
+from django.core.management.base import BaseCommand
+from payments.webhook_inbox import webhook_inbox
+import logging
+
+logger = logging.getLogger('payments.webhooks')
+
+
+class Command(BaseCommand):
+    help = 'Process pending SumUp webhook events from the inbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Maximum events to process (default: WEBHOOK_INBOX_BATCH_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            stats = webhook_inbox.drain(batch_size=options.get('batch_size'))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Webhook inbox drain failed: {str(e)}'))
+            logger.error(f"Management command error: {e}", exc_info=True)
+            raise
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Processed {stats['processed']} webhook events "
+                f"(retrying {stats['retrying']}, failed {stats['failed']}, skipped {stats['skipped']})"
+            )
+        )
@@ -0,0 +1,61 @@
+"""
+Management command to refresh artist SumUp tokens before they expire.
+
+Used by Django-Q on a schedule so customer requests and payment polling
+never have to refresh an artist token inline. Can also be run manually.
+
+Usage:
+    python manage.py refresh_sumup_tokens
+    python manage.py refresh_sumup_tokens --window 60 --batch-size 20 --concurrency 2
+"""
+
+from django.core.management.base import BaseCommand
+from payments.token_refresh_service import token_refresh_service
+import logging
+
+logger = logging.getLogger('payments.sumup')
+
+
+class Command(BaseCommand):
+    help = 'Refresh SumUp tokens for connected artists that expire soon'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--window',
+            type=int,
+            default=None,
+            help='Refresh tokens expiring within this many minutes (default: SUMUP_TOKEN_REFRESH_WINDOW_MINUTES)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Artist profiles per batch (default: SUMUP_TOKEN_REFRESH_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=None,
+            help='Parallel token refreshes (default: SUMUP_TOKEN_REFRESH_CONCURRENCY)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            stats = token_refresh_service.refresh_expiring_tokens(
+                window_minutes=options.get('window'),
+                batch_size=options.get('batch_size'),
+                concurrency=options.get('concurrency'),
+            )
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Token refresh failed: {str(e)}'))
+            logger.error(f"Management command error: {e}", exc_info=True)
+            raise
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Refreshed {stats['refreshed']} tokens "
+                f"(skipped {stats['skipped']}, expired {stats['expired']}, "
+                f"errors {stats['errors']}, retry later {stats['failed']}) "
+                f"in {stats['duration_seconds']}s"
+            )
+        )
@@ -7,6 +7,7 @@ It can also be run manually for testing.
 Usage:
     python manage.py run_payment_polling
     python manage.py run_payment_polling --verbose
+    python manage.py run_payment_polling --concurrency 10
 """
 
 from django.core.management.base import BaseCommand
@@ -25,6 +26,12 @@ class Command(BaseCommand):
             action='store_true',
             help='Enable verbose output',
         )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=None,
+            help='Parallel SumUp status lookups (default: PAYMENT_POLLING_CONCURRENCY)',
+        )
 
     def handle(self, *args, **options):
         verbose = options.get('verbose', False)
@@ -34,7 +41,9 @@ class Command(BaseCommand):
 
         try:
             # Run the polling service
-            stats = polling_service.process_pending_payments()
+            stats = polling_service.process_pending_payments(
+                concurrency=options.get('concurrency')
+            )
 
             # Output results
             if verbose:
@@ -43,6 +52,12 @@ class Command(BaseCommand):
                 self.stdout.write(f"  Failed: {stats.get('failed', 0)}")
                 self.stdout.write(f"  Still Pending: {stats.get('still_pending', 0)}")
                 self.stdout.write(f"  Errors: {stats.get('errors', 0)}")
+                if 'cycle_seconds' in stats:
+                    self.stdout.write(f"  Cycle time: {stats['cycle_seconds']}s")
+                    self.stdout.write(
+                        f"  SumUp calls: {stats['api_calls']} "
+                        f"(avg {stats['api_latency_avg_ms']}ms, max {stats['api_latency_max_ms']}ms)"
+                    )
 
             # Return success message
             if stats.get('message'):
@@ -50,7 +65,7 @@ class Command(BaseCommand):
             else:
                 self.stdout.write(
                     self.style.SUCCESS(
-                        f"✓ Processed {sum(stats.values())} orders"
+                        f"✓ Processed {sum(stats.get(key, 0) for key in polling_service.RESULT_KEYS)} orders"
                     )
                 )
 
@@ -6,7 +6,6 @@ Routes customer payments to event organizers via SumUp.
 import logging
 from decimal import Decimal
 from django.conf import settings
-from django.utils import timezone
 
 from .models import SumUpCheckout
 from orders.models import Order
@@ -187,17 +186,14 @@ class MarketplacePaymentService:
                 logger.warning(f"No order found for checkout {checkout_id}")
                 return
 
-            # Update checkout status
-            checkout.status = 'paid'
-            checkout.paid_at = timezone.now()
-            checkout.sumup_response.update(payment_data)
-            checkout.save()
-
-            # Update order status
-            order.status = 'confirmed'
-            order.is_paid = True
-            order.paid_at = timezone.now()
-            order.save()
+            # Mark checkout and order paid and issue the tickets (no-op if already fulfilled)
+            from .fulfillment_service import fulfillment_service
+            fulfillment_service.fulfill_order(
+                order,
+                status='confirmed',
+                checkout=checkout,
+                payment_data={**(checkout.sumup_response or {}), **payment_data}
+            )
 
             # Get routing info to determine next steps
             routing_info = self.get_payment_routing(order)
@@ -213,9 +209,6 @@ class MarketplacePaymentService:
                 # TODO: Calculate and record organizer payout
                 # TODO: Send notification to organizer about pending payout
 
-            # TODO: Generate and send tickets
-            # TODO: Send confirmation emails
-
             return True
 
         except SumUpCheckout.DoesNotExist:
@@ -0,0 +1,23 @@
+# Generated manually for the adaptive payment polling schedule
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_make_order_nullable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sumupcheckout',
+            name='next_poll_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='When this checkout is next due to be polled'),
+        ),
+        migrations.AddIndex(
+            model_name='sumupcheckout',
+            index=models.Index(fields=['should_poll', 'status', 'next_poll_at'], name='payments_su_poll_due_idx'),
+        ),
+    ]
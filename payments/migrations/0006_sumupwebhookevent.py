@@ -0,0 +1,36 @@
+# Generated manually for the SumUp webhook inbox
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_sumupcheckout_next_poll_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SumUpWebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50)),
+                ('dedup_key', models.CharField(help_text='source + checkout id + event type + status', max_length=255, unique=True)),
+                ('checkout_id', models.CharField(blank=True, db_index=True, max_length=255)),
+                ('event_type', models.CharField(blank=True, max_length=100)),
+                ('event_status', models.CharField(blank=True, max_length=50)),
+                ('payload', models.JSONField(default=dict)),
+                ('processing_status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('processed', 'Processed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('delivery_count', models.IntegerField(default=1, help_text='Times SumUp delivered this event')),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['received_at'],
+                'indexes': [models.Index(fields=['processing_status', 'received_at'], name='payments_webhook_due_idx')],
+            },
+        ),
+    ]
@@ -1,7 +1,9 @@
 from django.db import models
+from django.db.models import DurationField, ExpressionWrapper, F, Q
 from django.conf import settings
 from orders.models import Order
 from decimal import Decimal
+from datetime import timedelta
 import uuid
 from django.utils import timezone
 
@@ -130,11 +132,25 @@ class SumUpCheckout(models.Model):
         default=120,
         help_text="Maximum duration to poll this checkout (in minutes)"
     )
+    next_poll_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="When this checkout is next due to be polled"
+    )
+
+    # Poll schedule: fast while the checkout is fresh (customers who pay do so
+    # in the first minutes), then back off as it ages - see get_poll_interval().
+    # The poller runs every minute, so POLL_BASE_INTERVAL_SECONDS is the
+    # finest interval that takes effect; a slower schedule overrides these.
+    POLL_FAST_WINDOW_MINUTES = 10
+    POLL_MIN_FAST_POLLS = 3
+    POLL_BASE_INTERVAL_SECONDS = 60
+    POLL_MAX_INTERVAL_SECONDS = 20 * 60
 
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['status', 'should_poll', 'last_polled_at']),
+            models.Index(fields=['should_poll', 'status', 'next_poll_at'], name='payments_su_poll_due_idx'),
         ]
 
     def __str__(self):
@@ -209,6 +225,91 @@ class SumUpCheckout(models.Model):
             return delta.total_seconds() / 60
         return 0
 
+    @classmethod
+    def polling_window_q(cls, now=None):
+        """
+        SQL equivalent of the expiry and max-duration checks in needs_polling.
+
+        Returns:
+            Q: matches checkouts still inside their SumUp validity and polling window
+        """
+        now = now or timezone.now()
+        return (
+            (Q(valid_until__isnull=True) | Q(valid_until__gte=now)) &
+            (Q(polling_started_at__isnull=True) | Q(polling_deadline__gte=now))
+        )
+
+    @classmethod
+    def due_for_polling(cls, now=None, max_age_hours=2):
+        """
+        Checkouts whose next poll is due, most recent first.
+
+        Uses the (should_poll, status, next_poll_at) index; expiry and
+        max-duration rules are evaluated in SQL so rows that no longer
+        need polling are never fetched.
+        """
+        now = now or timezone.now()
+        return cls.objects.alias(
+            polling_deadline=cls._polling_deadline_expression()
+        ).filter(
+            cls.polling_window_q(now),
+            should_poll=True,
+            status__in=['created', 'pending'],
+            next_poll_at__lte=now,
+            created_at__gte=now - timedelta(hours=max_age_hours),
+        ).order_by('-created_at')
+
+    @classmethod
+    def stop_polling_outside_window(cls, now=None):
+        """
+        Switch off polling in one UPDATE for checkouts past their validity
+        or max polling duration.
+
+        Returns:
+            int: number of checkouts updated
+        """
+        now = now or timezone.now()
+        return cls.objects.alias(
+            polling_deadline=cls._polling_deadline_expression()
+        ).filter(
+            should_poll=True,
+            status__in=['created', 'pending'],
+        ).exclude(
+            cls.polling_window_q(now)
+        ).update(should_poll=False)
+
+    @staticmethod
+    def _polling_deadline_expression():
+        """polling_started_at + max_poll_duration_minutes, as a DB expression."""
+        return ExpressionWrapper(
+            F('polling_started_at') + ExpressionWrapper(
+                F('max_poll_duration_minutes') * timedelta(minutes=1),
+                output_field=DurationField()
+            ),
+            output_field=models.DateTimeField()
+        )
+
+    def get_poll_interval(self, now=None):
+        """
+        Delay before the next poll, based on checkout age and poll count.
+
+        Fresh checkouts (inside POLL_FAST_WINDOW_MINUTES, or polled fewer than
+        POLL_MIN_FAST_POLLS times) are polled every POLL_BASE_INTERVAL_SECONDS.
+        After that the delay grows with age (a quarter of the checkout's age),
+        capped at POLL_MAX_INTERVAL_SECONDS.
+
+        Returns:
+            timedelta: delay until the next poll
+        """
+        now = now or timezone.now()
+        base = timedelta(seconds=self.POLL_BASE_INTERVAL_SECONDS)
+        age = now - self.created_at if self.created_at else timedelta(0)
+
+        if age < timedelta(minutes=self.POLL_FAST_WINDOW_MINUTES) or self.poll_count < self.POLL_MIN_FAST_POLLS:
+            return base
+
+        return min(max(age / 4, base), timedelta(seconds=self.POLL_MAX_INTERVAL_SECONDS))
+
     def start_polling(self):
         """Mark this checkout as started for polling."""
         if not self.polling_started_at:
@@ -216,10 +317,12 @@ class SumUpCheckout(models.Model):
             self.save(update_fields=['polling_started_at'])
 
     def update_poll_timestamp(self):
-        """Update the last polled timestamp and increment poll count."""
-        self.last_polled_at = timezone.now()
+        """Update the last polled timestamp, increment poll count and schedule the next poll."""
+        now = timezone.now()
+        self.last_polled_at = now
         self.poll_count += 1
-        self.save(update_fields=['last_polled_at', 'poll_count'])
+        self.next_poll_at = now + self.get_poll_interval(now)
+        self.save(update_fields=['last_polled_at', 'poll_count', 'next_poll_at'])
 
     def stop_polling(self, reason=None):
         """Stop polling this checkout."""
@@ -552,6 +655,57 @@ class ArtistPayout(models.Model):
             self.payout_id = f"{prefix}-{unique_id}"
         super().save(*args, **kwargs)
 
+
+class SumUpWebhookEvent(models.Model):
+    """
+    Inbox row for a received SumUp webhook.
+
+    Webhook views only validate and store the payload here, then acknowledge
+    SumUp straight away. payments.webhook_inbox drains the inbox in the
+    background and runs the handler for each event exactly once; SumUp
+    redeliveries collapse onto the same row via dedup_key.
+    """
+    PROCESSING_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('processed', 'Processed'),
+        ('failed', 'Failed'),
+    ]
+
+    # Which webhook endpoint received the event (selects the handler)
+    source = models.CharField(max_length=50)
+    dedup_key = models.CharField(
+        max_length=255,
+        unique=True,
+        help_text="source + checkout id + event type + status"
+    )
+    checkout_id = models.CharField(max_length=255, blank=True, db_index=True)
+    event_type = models.CharField(max_length=100, blank=True)
+    event_status = models.CharField(max_length=50, blank=True)
+    payload = models.JSONField(default=dict)
+
+    processing_status = models.CharField(
+        max_length=20,
+        choices=PROCESSING_STATUS_CHOICES,
+        default='pending'
+    )
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    delivery_count = models.IntegerField(default=1, help_text="Times SumUp delivered this event")
+
+    received_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['received_at']
+        indexes = [
+            models.Index(fields=['processing_status', 'received_at'], name='payments_webhook_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"Webhook {self.source} {self.checkout_id} {self.event_type}/{self.event_status} - {self.processing_status}"
+
 # payments/models.py
 
 
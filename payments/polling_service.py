@@ -1,7 +1,7 @@
 """
 Payment Polling Service
 =======================
-Verifies pending payments by calling SumUp API every 5 minutes.
+Verifies pending payments by calling SumUp API every minute.
 
 SECURITY CRITICAL: This service verifies payment amounts server-side
 before issuing tickets. NEVER issue tickets based on return_url alone.
@@ -10,8 +10,10 @@ Author: Jersey Events Platform
 """
 
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from django.utils import timezone
-from django.db import transaction
+from django.db import connections, transaction
 from django.core.mail import send_mail
 from datetime import timedelta
 from decimal import Decimal
@@ -20,6 +22,7 @@ from orders.models import Order
 from payments import sumup as sumup_api
 from payments.models import SumUpCheckout
 from events.email_utils import email_service
+from payments.fulfillment_service import fulfillment_service
 
 logger = logging.getLogger('payments.polling_service')
 
@@ -27,7 +30,8 @@ logger = logging.getLogger('payments.polling_service')
 class PaymentPollingService:
     """
     Polls SumUp API to verify pending payments and issue tickets.
-    Runs every 5 minutes via Django-Q scheduled task.
+    Runs every minute via Django-Q scheduled task; each run only polls the
+    checkouts whose next_poll_at is due (SumUpCheckout.get_poll_interval).
 
     Security Features:
     - Verifies payment amounts match order totals
@@ -39,30 +43,49 @@ class PaymentPollingService:
 
     MAX_ORDERS_PER_CYCLE = 20
     MAX_AGE_HOURS = 2
+    RESULT_KEYS = ('verified', 'failed', 'still_pending', 'errors', 'listing_fees')
     ADMIN_EMAIL = 'alerts@coderra.je'
 
-    def process_pending_payments(self):
+    def process_pending_payments(self, concurrency=None):
         """
-        Main entry point - called by scheduled task every 5 minutes.
+        Main entry point - called by scheduled task every minute.
 
-        Now uses SumUpCheckout.needs_polling property for efficient polling.
+        Only checkouts whose next_poll_at is due are selected (newest first),
+        with the expiry and max-duration rules evaluated in SQL - see
+        SumUpCheckout.due_for_polling(). Each poll schedules the next one
+        with a backoff, so fresh checkouts are polled most often.
         Supports both ticket orders and listing fees.
+
+        SumUp status lookups are fetched in parallel (up to ``concurrency``
+        requests in flight, default settings.PAYMENT_POLLING_CONCURRENCY).
+        Database side effects are still applied one checkout at a time on
+        the calling thread.
+
+        Args:
+            concurrency: Optional override for the number of parallel API calls.
+                         1 disables the thread pool entirely.
         """
+        cycle_started = time.monotonic()
+
         logger.info("=" * 80)
         logger.info("Starting payment polling cycle")
 
-        # Find all checkouts that need polling using the new polling fields
-        pending_checkouts = SumUpCheckout.objects.filter(
-            status__in=['created', 'pending'],
-            should_poll=True,
-            created_at__gte=timezone.now() - timedelta(hours=self.MAX_AGE_HOURS)
-        ).select_related('order', 'customer').order_by('created_at')[:self.MAX_ORDERS_PER_CYCLE]
+        # Switch off polling for checkouts past their validity/max duration
+        stopped = SumUpCheckout.stop_polling_outside_window()
+        if stopped:
+            logger.info(f"Stopped polling {stopped} checkouts (expired or reached max duration)")
+
+        # Find checkouts whose next poll is due
+        pending_checkouts = list(
+            SumUpCheckout.due_for_polling(max_age_hours=self.MAX_AGE_HOURS)
+            .select_related('order', 'customer')[:self.MAX_ORDERS_PER_CYCLE]
+        )
 
-        if not pending_checkouts.exists():
+        if not pending_checkouts:
             logger.info("No pending checkouts to process")
             return {'message': 'No pending checkouts'}
 
-        logger.info(f"Found {pending_checkouts.count()} pending checkouts to verify")
+        logger.info(f"Found {len(pending_checkouts)} pending checkouts to verify")
 
         stats = {
             'verified': 0,
@@ -72,19 +95,27 @@ class PaymentPollingService:
             'listing_fees': 0,  # Track listing fee payments separately
         }
 
+        checkouts_to_verify = []
         for checkout in pending_checkouts:
             try:
-                # Check if this checkout actually needs polling
-                if not checkout.needs_polling:
-                    logger.info(f"Checkout {checkout.payment_id} no longer needs polling (may have expired or reached max duration)")
-                    checkout.stop_polling("Max duration reached or expired")
-                    continue
-
                 # Start polling timestamp if not already set
                 checkout.start_polling()
+                checkouts_to_verify.append(checkout)
+
+            except Exception as e:
+                logger.error(
+                    f"Unexpected error processing checkout {checkout.payment_id}: {e}",
+                    exc_info=True
+                )
+                stats['errors'] += 1
 
-                # Verify the checkout
-                result = self._verify_single_checkout(checkout)
+        # Fetch SumUp statuses in parallel (network only - no DB access)
+        fetched = self._fetch_checkout_statuses(checkouts_to_verify, concurrency)
+
+        for checkout in checkouts_to_verify:
+            try:
+                # Verify the checkout (DB updates stay serialized here)
+                result = self._verify_single_checkout(checkout, fetched.get(checkout.pk))
 
                 # Update polling timestamp
                 checkout.update_poll_timestamp()
@@ -105,16 +136,122 @@ class PaymentPollingService:
                 )
                 stats['errors'] += 1
 
+        stats.update(self._build_timing_stats(cycle_started, checkouts_to_verify, fetched))
+
         logger.info(f"Polling cycle complete: {stats}")
         return stats
 
-    def _verify_single_checkout(self, checkout):
+    def get_concurrency(self):
+        """Number of SumUp status lookups allowed in flight per cycle."""
+        from django.conf import settings
+        return max(1, int(getattr(settings, 'PAYMENT_POLLING_CONCURRENCY', 5)))
+
+    def _fetch_checkout_statuses(self, checkouts, concurrency=None):
+        """
+        Fetch SumUp status for several checkouts, in parallel where allowed.
+
+        Worker threads only talk to SumUp; they never touch the ORM, so all
+        order/checkout updates remain on the caller's thread.
+
+        Args:
+            checkouts: list of SumUpCheckout instances
+            concurrency: max parallel API calls (defaults to get_concurrency())
+
+        Returns:
+            dict: checkout pk -> (payment_data, error, latency_seconds)
+        """
+        jobs = [
+            (checkout.pk, checkout.sumup_checkout_id or checkout.checkout_id)
+            for checkout in checkouts
+            if checkout.sumup_checkout_id or checkout.checkout_id
+        ]
+        if not jobs:
+            return {}
+
+        workers = min(concurrency or self.get_concurrency(), len(jobs))
+
+        if workers <= 1:
+            return {pk: self._fetch_checkout_status(checkout_id) for pk, checkout_id in jobs}
+
+        # Warm the token cache once so workers don't all request a new token
+        try:
+            sumup_api.get_platform_access_token()
+        except Exception as token_error:
+            logger.warning(f"Could not pre-fetch SumUp platform token: {token_error}")
+
+        logger.info(f"Fetching {len(jobs)} checkout statuses with {workers} workers")
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sumup-poll') as executor:
+            futures = {
+                executor.submit(self._fetch_checkout_status_in_thread, checkout_id): pk
+                for pk, checkout_id in jobs
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        return results
+
+    def _fetch_checkout_status_in_thread(self, checkout_id):
+        """Thread-pool wrapper that releases any DB connection the worker opened."""
+        try:
+            return self._fetch_checkout_status(checkout_id)
+        finally:
+            # Token lookups may hit a DB-backed cache from this thread
+            connections.close_all()
+
+    def _fetch_checkout_status(self, checkout_id):
+        """
+        Call SumUp for a single checkout and time the request.
+
+        Returns:
+            tuple: (payment_data or None, exception or None, latency in seconds)
+        """
+        logger.info(f"Calling SumUp API for checkout {checkout_id}")
+        started = time.monotonic()
+        try:
+            # Always use platform token for consistency
+            payment_data = sumup_api.get_checkout_status(checkout_id)
+            return payment_data, None, time.monotonic() - started
+        except Exception as api_error:
+            return None, api_error, time.monotonic() - started
+
+    def _build_timing_stats(self, cycle_started, checkouts, fetched):
+        """
+        Summarise cycle wall-clock time and per-call SumUp latency.
+
+        Args:
+            cycle_started: time.monotonic() value at the start of the cycle
+            checkouts: SumUpCheckout instances verified this cycle
+            fetched: dict returned by _fetch_checkout_statuses
+
+        Returns:
+            dict: timing entries to merge into the cycle stats
+        """
+        per_call = {
+            checkout.payment_id: round(fetched[checkout.pk][2] * 1000, 1)
+            for checkout in checkouts
+            if checkout.pk in fetched
+        }
+        latencies = list(per_call.values())
+
+        return {
+            'cycle_seconds': round(time.monotonic() - cycle_started, 3),
+            'api_calls': len(latencies),
+            'api_latency_ms': per_call,
+            'api_latency_avg_ms': round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+            'api_latency_max_ms': max(latencies) if latencies else 0.0,
+        }
+
+    def _verify_single_checkout(self, checkout, fetched=None):
         """
         Verify a single checkout via SumUp API.
         Handles both ticket orders and listing fee payments.
 
         Args:
             checkout: SumUpCheckout instance to verify
+            fetched: Optional (payment_data, error, latency) tuple already
+                     fetched by _fetch_checkout_statuses; when omitted the
+                     SumUp API is called inline.
 
         Returns:
             str: 'verified', 'failed', 'still_pending', 'errors', or 'listing_fees'
@@ -130,14 +267,13 @@ class PaymentPollingService:
             # Determine if this is a listing fee or ticket order
             is_listing_fee = checkout.order is None and 'listing_fee' in checkout.checkout_reference.lower()
 
-            # Call SumUp API to get current status
-            logger.info(f"Calling SumUp API for checkout {checkout_id}")
+            # Call SumUp API to get current status (unless already fetched)
+            if fetched is None:
+                fetched = self._fetch_checkout_status(checkout_id)
 
-            try:
-                # Always use platform token for consistency
-                payment_data = sumup_api.get_checkout_status(checkout_id)
-            except Exception as api_error:
-                logger.error(f"SumUp API call failed for {checkout_id}: {api_error}", exc_info=True)
+            payment_data, api_error, _latency = fetched
+            if api_error is not None:
+                logger.error(f"SumUp API call failed for {checkout_id}: {api_error}", exc_info=api_error)
                 # Don't mark as failed - might be temporary issue
                 return 'errors'
 
@@ -330,94 +466,34 @@ class PaymentPollingService:
     def _process_successful_payment(self, order, checkout, payment_data):
         """
         Payment verified successfully - issue tickets and send email.
-        Uses database transaction for atomicity.
+
+        Fulfillment (order lock, idempotency check, ticket issuance and the
+        follow-up rendering/email job) is handled by fulfillment_service.
 
         Args:
             order: Order instance
             checkout: SumUpCheckout instance
             payment_data: Dict from SumUp API
         """
-        with transaction.atomic():
-            # Lock order to prevent race conditions
-            order = Order.objects.select_for_update().get(id=order.id)
-
-            # Double-check not already processed (idempotency)
-            if order.status == 'completed':
-                logger.warning(f"Order {order.order_number} already completed - skipping")
-                return
-
-            # Update order
-            order.status = 'completed'
-            order.is_paid = True
-            order.paid_at = timezone.now()
-            order.transaction_id = payment_data.get('transaction_code', checkout.sumup_checkout_id)
-            order.payment_notes = f"Payment verified via polling at {timezone.now()}"
-            order.save()
-
-            # Update checkout
-            checkout.status = 'paid'
-            checkout.paid_at = timezone.now()
-            checkout.sumup_response = payment_data
-            checkout.save()
-
-            # Generate tickets
-            tickets = self._generate_tickets(order)
-
-            logger.info(
-                f"✓ Order {order.order_number} verified successfully. "
-                f"{len(tickets)} tickets issued."
-            )
-
-        # Send confirmation email (after transaction commits)
-        try:
-            email_service.send_order_confirmation(order, tickets)
-            logger.info(f"Confirmation email sent to {order.email}")
-        except Exception as email_error:
-            logger.error(
-                f"Failed to send confirmation email for order {order.order_number}: {email_error}",
-                exc_info=True
-            )
-            # Alert admin but don't fail the order
-            self._alert_email_failure(order, str(email_error))
-
-    def _generate_tickets(self, order):
-        """
-        Generate ticket records for order items.
-
-        Args:
-            order: Order instance
-
-        Returns:
-            list: List of created Ticket instances
-        """
-        from events.models import Ticket
-
-        tickets = []
-
-        for order_item in order.items.all():
-            for i in range(order_item.quantity):
-                ticket = Ticket.objects.create(
-                    event=order_item.event,
-                    order=order,
-                    customer=order.user if order.user else None,
-                    status='valid'
-                )
-
-                # Generate PDF if method exists
-                if hasattr(ticket, 'generate_pdf_ticket'):
-                    try:
-                        ticket.generate_pdf_ticket()
-                        logger.info(f"PDF generated for ticket {ticket.ticket_number}")
-                    except Exception as pdf_error:
-                        logger.error(
-                            f"PDF generation failed for ticket {ticket.id}: {pdf_error}",
-                            exc_info=True
-                        )
+        result = fulfillment_service.fulfill_order(
+            order,
+            status='completed',
+            checkout=checkout,
+            payment_data=payment_data,
+            transaction_id=payment_data.get('transaction_code', checkout.sumup_checkout_id),
+            payment_notes=f"Payment verified via polling at {timezone.now()}"
+        )
 
-                tickets.append(ticket)
+        if not result.created:
+            # Fulfilled by another path: this checkout is paid too, stop polling it
+            fulfillment_service.mark_checkout_paid(checkout, payment_data)
+            logger.warning(f"Order {result.order.order_number} already fulfilled - checkout marked paid")
+            return
 
-        logger.info(f"Generated {len(tickets)} tickets for order {order.order_number}")
-        return tickets
+        logger.info(
+            f"✓ Order {result.order.order_number} verified successfully. "
+            f"{len(result.tickets)} tickets issued."
+        )
 
     def _process_failed_payment(self, order, checkout):
         """
@@ -563,9 +639,9 @@ View order: {self._get_admin_order_url(order)}
             """.strip()
         )
 
-    def _alert_email_failure(self, order, error_message):
+    def alert_email_failure(self, order, error_message):
         """
-        Alert about email delivery failure.
+        Alert about email delivery failure (called by the fulfillment service).
 
         Args:
             order: Order instance
@@ -678,51 +754,7 @@ View order: {self._get_admin_order_url(order)}
             checkout: SumUpCheckout instance
             payment_data: Dict from SumUp API
         """
-        order = checkout.order
-
-        with transaction.atomic():
-            # Lock order to prevent race conditions
-            order = Order.objects.select_for_update().get(id=order.id)
-
-            # Double-check not already processed (idempotency)
-            if order.status == 'completed':
-                logger.warning(f"Order {order.order_number} already completed - skipping")
-                checkout.stop_polling("Order already completed")
-                return
-
-            # Update order
-            order.status = 'completed'
-            order.is_paid = True
-            order.paid_at = timezone.now()
-            order.transaction_id = payment_data.get('transaction_code', checkout.sumup_checkout_id)
-            order.payment_notes = f"Payment verified via polling at {timezone.now()}"
-            order.save()
-
-            # Update checkout
-            checkout.status = 'paid'
-            checkout.paid_at = timezone.now()
-            checkout.sumup_response = payment_data
-            checkout.stop_polling("Payment completed")
-            checkout.save()
-
-            # Generate tickets
-            tickets = self._generate_tickets(order)
-
-            logger.info(
-                f"✓ Order {order.order_number} verified successfully. "
-                f"{len(tickets)} tickets issued."
-            )
-
-        # Send confirmation email (after transaction commits)
-        try:
-            email_service.send_order_confirmation(order, tickets)
-            logger.info(f"Confirmation email sent to {order.email}")
-        except Exception as email_error:
-            logger.error(
-                f"Failed to send confirmation email for order {order.order_number}: {email_error}",
-                exc_info=True
-            )
-            self._alert_email_failure(order, str(email_error))
+        self._process_successful_payment(checkout.order, checkout, payment_data)
 
     def _process_listing_fee_payment(self, checkout, payment_data):
         """
@@ -14,9 +14,10 @@ from django.db import transaction
 from django.contrib.auth.decorators import login_required
 
 from orders.models import Order
-from events.models import Event, ListingFee, ListingFeeConfig, Ticket
+from events.models import Event, ListingFee, ListingFeeConfig
 from .models import SumUpCheckout
 from . import sumup as sumup_api
+from .fulfillment_service import fulfillment_service
 
 logger = logging.getLogger(__name__)
 
@@ -44,8 +45,8 @@ def create_order_checkout(request, order_id):
                 messages.error(request, "Order not found in your session.")
                 return redirect('cart:view')
 
-        # Check if order is already paid
-        if order.is_paid:
+        # Check if order is already paid and fulfilled
+        if order.fulfilled_at:
             messages.info(request, "This order has already been paid.")
             from django.urls import reverse
             return redirect(reverse('payments:redirect_success') + f'?order={order.order_number}')
@@ -117,8 +118,8 @@ def redirect_success(request):
     try:
         order = Order.objects.get(order_number=order_number)
 
-        # Check if already processed
-        if order.is_paid:
+        # Check if already processed (paid and tickets issued)
+        if order.fulfilled_at:
             logger.info(f"Order {order_number} already paid")
             return render(request, 'payments/redirect_success.html', {
                 'order': order,
@@ -126,37 +127,20 @@ def redirect_success(request):
                 'tickets': order.tickets.all()
             })
 
-        # Process the payment
-        with transaction.atomic():
-            # Mark order as paid
-            order.is_paid = True
-            order.status = 'confirmed'
-            order.paid_at = timezone.now()
-            order.save()
-
-            # Update checkout record if exists
-            if checkout_id:
-                try:
-                    checkout = SumUpCheckout.objects.get(sumup_checkout_id=checkout_id)
-                    checkout.status = 'paid'
-                    checkout.paid_at = timezone.now()
-                    checkout.save()
-                except SumUpCheckout.DoesNotExist:
-                    pass
-
-            # Generate tickets
-            tickets = generate_tickets_for_order(order)
-
-            # Send confirmation emails
-            send_confirmation_emails(order, tickets)
-
-            logger.info(f"Order {order_number} processed successfully")
+        checkout = None
+        if checkout_id:
+            checkout = SumUpCheckout.objects.filter(sumup_checkout_id=checkout_id).first()
 
-            return render(request, 'payments/redirect_success.html', {
-                'order': order,
-                'success': True,
-                'tickets': tickets
-            })
+        # Process the payment - tickets are issued and emailed by the fulfillment service
+        result = fulfillment_service.fulfill_order(order, status='confirmed', checkout=checkout)
+
+        logger.info(f"Order {order_number} processed successfully")
+
+        return render(request, 'payments/redirect_success.html', {
+            'order': result.order,
+            'success': True,
+            'tickets': result.tickets
+        })
 
     except Order.DoesNotExist:
         logger.error(f"Order not found: {order_number}")
@@ -193,62 +177,6 @@ def redirect_cancel(request):
     return render(request, 'payments/redirect_cancel.html', context)
 
 
-def generate_tickets_for_order(order):
-    """Generate tickets for all items in the order."""
-    tickets = []
-
-    for order_item in order.items.all():
-        event = order_item.event
-        quantity = order_item.quantity
-
-        for i in range(quantity):
-            try:
-                ticket = Ticket.objects.create(
-                    event=event,
-                    customer=order.user,
-                    order=order,
-                    status='valid'
-                )
-
-                # Generate PDF with QR code
-                if hasattr(ticket, 'generate_pdf_ticket'):
-                    ticket.generate_pdf_ticket()
-
-                tickets.append(ticket)
-                logger.info(f"Generated ticket {ticket.ticket_number}")
-
-            except Exception as e:
-                logger.error(f"Failed to generate ticket: {e}")
-
-    return tickets
-
-
-def send_confirmation_emails(order, tickets):
-    """Send order confirmation emails."""
-    try:
-        from events.email_utils import email_service
-
-        # Send to customer
-        email_service.send_order_confirmation(order)
-
-        # Notify organizers
-        organizers_notified = set()
-        for item in order.items.all():
-            organizer = item.event.organiser
-            if organizer.email not in organizers_notified:
-                try:
-                    artist_profile = getattr(organizer, 'artistprofile', None)
-                    if artist_profile:
-                        email_service.send_artist_notification(order, artist_profile)
-                        organizers_notified.add(organizer.email)
-                except Exception as e:
-                    logger.error(f"Failed to notify organizer: {e}")
-
-    except Exception as e:
-        logger.error(f"Error sending confirmation emails: {e}")
-        # Don't fail the order if emails fail
-
-
 def create_listing_fee_checkout(request, event_id):
     """
     Create a SumUp checkout for event listing fee and redirect.
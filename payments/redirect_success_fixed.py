@@ -7,14 +7,13 @@ import logging
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.utils import timezone
-from django.db import transaction
 from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
 from orders.models import Order, OrderItem
 from cart.models import Cart
 from .models import SumUpCheckout
 from events.models import Ticket
-from .ticket_email_service import ticket_email_service
+from .fulfillment_service import fulfillment_service
 import requests
 
 logger = logging.getLogger('payment_debug')
@@ -177,53 +176,33 @@ def redirect_success_fixed(request):
 
     # Process the successful payment
     try:
-        with transaction.atomic():
-            logger.info(f"💳 Processing payment for order {order.order_number}")
-
-            # Mark order as paid
-            order.is_paid = True
-            order.status = 'confirmed'
-            order.paid_at = timezone.now()
-            order.save()
-
-            logger.info(f"✅ Order {order.order_number} marked as paid")
-
-            # Update checkout record if exists
-            if checkout_id:
-                try:
-                    checkout = SumUpCheckout.objects.get(sumup_checkout_id=checkout_id)
-                    checkout.status = 'paid'
-                    checkout.paid_at = timezone.now()
-                    checkout.save()
-                    logger.info(f"✅ Checkout {checkout_id} marked as paid")
-                except SumUpCheckout.DoesNotExist:
-                    logger.warning(f"Checkout record not found: {checkout_id}")
-
-            # Generate tickets
-            tickets = generate_tickets_for_order(order)
-            logger.info(f"🎫 Generated {len(tickets)} tickets for order {order.order_number}")
-
-            # Clear cart from session
-            clear_cart_session(request)
-
-            # Send confirmation emails (if implemented)
-            try:
-                send_confirmation_emails(order, tickets)
-                logger.info(f"📧 Confirmation email sent to {order.email}")
-            except Exception as e:
-                logger.error(f"Failed to send confirmation email: {e}")
-                # Don't fail the whole transaction for email errors
+        logger.info(f"💳 Processing payment for order {order.order_number}")
+
+        checkout = None
+        if checkout_id:
+            checkout = SumUpCheckout.objects.filter(sumup_checkout_id=checkout_id).first()
+            if not checkout:
+                logger.warning(f"Checkout record not found: {checkout_id}")
+
+        # Mark paid, issue tickets and queue the confirmation email (once per order)
+        result = fulfillment_service.fulfill_order(order, status='confirmed', checkout=checkout)
+        order = result.order
+        tickets = result.tickets
+        logger.info(f"🎫 Order {order.order_number} has {len(tickets)} tickets")
+
+        # Clear cart from session
+        clear_cart_session(request)
 
-            logger.info(f"🎉 Order {order.order_number} processed successfully!")
+        logger.info(f"🎉 Order {order.order_number} processed successfully!")
 
-            messages.success(request, f"Payment successful! Your order {order.order_number} has been confirmed.")
+        messages.success(request, f"Payment successful! Your order {order.order_number} has been confirmed.")
 
-            return render(request, 'payments/redirect_success.html', {
-                'order': order,
-                'success': True,
-                'tickets': tickets,
-                'just_paid': True
-            })
+        return render(request, 'payments/redirect_success.html', {
+            'order': order,
+            'success': True,
+            'tickets': tickets,
+            'just_paid': True
+        })
 
     except Exception as e:
         logger.error(f"❌ Error processing payment for order {order.order_number}: {e}")
@@ -316,56 +295,6 @@ def clear_cart_session(request):
         logger.error(f"Error clearing session: {e}")
 
 
-def generate_tickets_for_order(order):
-    """Generate tickets for all items in the order."""
-    tickets = []
-
-    for order_item in order.items.all():
-        event = order_item.event
-        quantity = order_item.quantity
-
-        for i in range(quantity):
-            # Only create ticket if we have a customer (user)
-            # For anonymous orders, skip ticket generation or handle differently
-            if order.user:
-                ticket = Ticket.objects.create(
-                    order=order,
-                    event=event,
-                    customer=order.user,
-                    status='valid'
-                )
-                # Generate QR code (if implemented)
-                try:
-                    ticket.generate_qr_code()
-                except:
-                    pass
-                tickets.append(ticket)
-                logger.info(f"Created ticket {ticket.ticket_number} for {event.title}")
-            else:
-                # For anonymous orders, we can't create Ticket objects
-                # Just log that tickets would be sent via email
-                logger.info(f"Anonymous order - tickets for {event.title} will be sent via email")
-
-    return tickets
-
-
-def send_confirmation_emails(order, tickets):
-    """Send order confirmation and tickets via email with QR codes."""
-    try:
-        # Use the ticket email service to send professional email with QR codes
-        success = ticket_email_service.send_ticket_confirmation(order)
-
-        if success:
-            logger.info(f"📧 Confirmation email with tickets sent to {order.email}")
-        else:
-            logger.error(f"Failed to send confirmation email to {order.email}")
-            # Don't raise exception - email failure shouldn't break the order
-
-    except Exception as e:
-        logger.error(f"Failed to send confirmation email: {e}")
-        # Don't raise - email failure shouldn't break the order process
-
-
 def send_admin_verification_alert(order, checkout_id, verification_failed):
     """
     Send alert to admin for manual payment verification.
@@ -9,9 +9,12 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.urls import reverse
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import transaction
 
+from cart.cart import get_checkout_cart
 from cart.models import Cart
+from events.ticket_holds import ticket_holds
 from orders.models import Order, OrderItem
 from .redirect_checkout import create_order_checkout
 
@@ -122,6 +125,9 @@ def simple_checkout_process(request):
                         total=item_total
                     )
 
+                # Set the tickets aside until payment (or TICKET_HOLD_TTL_SECONDS)
+                ticket_holds.hold_items(order.items.all(), order=order)
+
                 # Store order ID in session for anonymous users
                 if not request.user.is_authenticated:
                     request.session['order_id'] = order.id
@@ -134,6 +140,10 @@ def simple_checkout_process(request):
                 # Redirect to payment
                 return redirect('payments:redirect_checkout', order_id=order.id)
 
+        except ValidationError as e:
+            for error in e.messages:
+                messages.error(request, error)
+            return redirect('cart:view')
         except Exception as e:
             logger.error(f"Checkout error: {e}")
             messages.error(request, "An error occurred during checkout. Please try again.")
@@ -143,22 +153,12 @@ def simple_checkout_process(request):
 
 
 def get_cart(request):
-    """Get or create cart for current user/session."""
+    """Get current cart for user or session (an anonymous session cart is saved to a Cart row here)."""
     if request.user.is_authenticated:
         cart, _ = Cart.objects.get_or_create(
             user=request.user,
             is_active=True
         )
-    else:
-        # For anonymous users, use session
-        session_key = request.session.session_key
-        if not session_key:
-            request.session.create()
-            session_key = request.session.session_key
-
-        cart, _ = Cart.objects.get_or_create(
-            session_key=session_key,
-            is_active=True
-        )
+        return cart
 
-    return cart
\ No newline at end of file
+    return get_checkout_cart(request)
@@ -15,6 +15,8 @@ from orders.models import Order
 from events.models import Event, ListingFee
 from .models import SumUpCheckout
 from . import sumup as sumup_api
+from .webhook_inbox import webhook_inbox
+from .fulfillment_service import fulfillment_service
 
 logger = logging.getLogger(__name__)
 
@@ -128,118 +130,21 @@ def payment_failure(request):
 def process_order_payment(order, checkout_id=None):
     """Process successful order payment - generate tickets and send emails."""
     try:
-        from django.db import transaction
+        checkout = None
+        if checkout_id:
+            checkout = SumUpCheckout.objects.filter(sumup_checkout_id=checkout_id).first()
+            if not checkout:
+                logger.warning(f"SumUpCheckout record not found for checkout_id: {checkout_id}")
 
-        with transaction.atomic():
-            # Mark order as paid
-            order.status = 'confirmed'
-            order.is_paid = True
-            order.paid_at = timezone.now()
-            order.save()
-
-            logger.info(f"Order {order.order_number} marked as paid")
-
-            # Generate tickets for each order item
-            tickets_created = generate_tickets_for_order(order)
-
-            # Send confirmation emails
-            send_order_confirmation_emails(order, tickets_created)
-
-            # Update SumUpCheckout record if it exists
-            if checkout_id:
-                try:
-                    sumup_checkout = SumUpCheckout.objects.get(sumup_checkout_id=checkout_id)
-                    sumup_checkout.status = 'paid'
-                    sumup_checkout.paid_at = timezone.now()
-                    sumup_checkout.save()
-                except SumUpCheckout.DoesNotExist:
-                    logger.warning(f"SumUpCheckout record not found for checkout_id: {checkout_id}")
-
-            return True
+        # Tickets and confirmation emails are handled by the fulfillment service
+        fulfillment_service.fulfill_order(order, status='confirmed', checkout=checkout)
+        logger.info(f"Order {order.order_number} marked as paid")
+        return True
 
     except Exception as e:
         logger.error(f"Error processing order payment for {order.order_number}: {e}")
         return False
 
-def generate_tickets_for_order(order):
-    """Generate tickets for all items in an order."""
-    from events.models import Ticket
-
-    tickets_created = []
-
-    for order_item in order.items.all():
-        event = order_item.event
-        quantity = order_item.quantity
-
-        # Create tickets for each quantity
-        for i in range(quantity):
-            try:
-                ticket = Ticket.objects.create(
-                    event=event,
-                    customer=order.user,
-                    order=order,
-                    status='valid'
-                )
-
-                # Generate PDF ticket with QR code
-                pdf_generated = ticket.generate_pdf_ticket()
-                if pdf_generated:
-                    logger.info(f"Generated PDF ticket for {ticket.ticket_number}")
-                else:
-                    logger.warning(f"Failed to generate PDF for ticket {ticket.ticket_number}")
-
-                tickets_created.append(ticket)
-                logger.info(f"Generated ticket {ticket.ticket_number} for order {order.order_number}")
-
-            except Exception as e:
-                logger.error(f"Failed to generate ticket for order {order.order_number}: {e}")
-                # Continue creating other tickets even if one fails
-
-    logger.info(f"Generated {len(tickets_created)} tickets for order {order.order_number}")
-    return tickets_created
-
-def send_order_confirmation_emails(order, tickets):
-    """Send order confirmation emails to customer and notify organizers."""
-    try:
-        from events.email_utils import email_service
-
-        # Send confirmation email to customer
-        customer_email_sent = email_service.send_order_confirmation(order)
-
-        if customer_email_sent:
-            logger.info(f"Order confirmation email sent to {order.email}")
-        else:
-            logger.warning(f"Failed to send order confirmation email to {order.email}")
-
-        # Send notifications to organizers for each event
-        organizers_notified = set()
-        for order_item in order.items.all():
-            event = order_item.event
-            organizer = event.organiser
-
-            # Only send one notification per organizer
-            if organizer.email not in organizers_notified:
-                try:
-                    # Get the artist profile for the notification
-                    artist_profile = getattr(organizer, 'artistprofile', None)
-
-                    if artist_profile:
-                        organizer_email_sent = email_service.send_artist_notification(order, artist_profile)
-                        if organizer_email_sent:
-                            logger.info(f"Order notification sent to organizer {organizer.email}")
-                            organizers_notified.add(organizer.email)
-                        else:
-                            logger.warning(f"Failed to send notification to organizer {organizer.email}")
-                    else:
-                        logger.warning(f"No artist profile found for organizer {organizer.email}")
-
-                except Exception as e:
-                    logger.error(f"Error sending notification to organizer {organizer.email}: {e}")
-
-    except Exception as e:
-        logger.error(f"Error sending order confirmation emails: {e}")
-        # Don't raise exception - emails are not critical for order completion
-
 @csrf_exempt
 @require_http_methods(["POST"])
 def sumup_webhook(request):
@@ -249,47 +154,57 @@ def sumup_webhook(request):
 
         # Parse webhook payload
         payload = json.loads(request.body.decode('utf-8'))
-        event_type = payload.get('event_type')
-        checkout_id = payload.get('id')
-
-        logger.info(f"SumUp webhook received: {event_type} for checkout {checkout_id}")
-
-        if event_type == 'CHECKOUT_PAID':
-            # Find and process the order
-            try:
-                sumup_checkout = SumUpCheckout.objects.get(sumup_checkout_id=checkout_id)
-
-                if sumup_checkout.order:
-                    # Process order payment
-                    if not sumup_checkout.order.is_paid:
-                        success = process_order_payment(sumup_checkout.order, checkout_id)
-                        if success:
-                            logger.info(f"Order {sumup_checkout.order.order_number} processed via webhook")
-                        else:
-                            logger.error(f"Failed to process order via webhook: {checkout_id}")
-                else:
-                    # Check for listing fee
-                    try:
-                        listing_fee = ListingFee.objects.get(sumup_checkout_id=checkout_id)
-                        if not listing_fee.is_paid:
-                            listing_fee.payment_status = 'paid'
-                            listing_fee.paid_at = timezone.now()
-                            listing_fee.save()
-
-                            # Publish the event
-                            if listing_fee.event.status == 'draft':
-                                listing_fee.event.status = 'published'
-                                listing_fee.event.save()
-
-                            logger.info(f"Listing fee paid via webhook for event {listing_fee.event.id}")
-                    except ListingFee.DoesNotExist:
-                        logger.warning(f"No listing fee found for checkout {checkout_id}")
-
-            except SumUpCheckout.DoesNotExist:
-                logger.error(f"SumUpCheckout not found for webhook: {checkout_id}")
+        if not isinstance(payload, dict):
+            raise ValueError("Webhook payload must be a JSON object")
+
+        logger.info(f"SumUp webhook received: {payload.get('event_type')} for checkout {payload.get('id')}")
 
+        # Store and acknowledge - process_checkout_paid_webhook runs from the inbox
+        webhook_inbox.record('checkout_paid', payload)
         return HttpResponse("OK", status=200)
 
     except Exception as e:
         logger.error(f"Error processing SumUp webhook: {e}")
-        return HttpResponse("Error", status=400)
\ No newline at end of file
+        return HttpResponse("Error", status=400)
+
+
+def process_checkout_paid_webhook(payload):
+    """Apply a stored CHECKOUT_PAID webhook (called by the webhook inbox)."""
+    event_type = payload.get('event_type')
+    checkout_id = payload.get('id')
+
+    if event_type != 'CHECKOUT_PAID':
+        return
+
+    # Find and process the order
+    try:
+        sumup_checkout = SumUpCheckout.objects.get(sumup_checkout_id=checkout_id)
+    except SumUpCheckout.DoesNotExist:
+        logger.error(f"SumUpCheckout not found for webhook: {checkout_id}")
+        return
+
+    if sumup_checkout.order:
+        # Process order payment
+        if not sumup_checkout.order.is_paid:
+            success = process_order_payment(sumup_checkout.order, checkout_id)
+            if success:
+                logger.info(f"Order {sumup_checkout.order.order_number} processed via webhook")
+            else:
+                logger.error(f"Failed to process order via webhook: {checkout_id}")
+    else:
+        # Check for listing fee
+        try:
+            listing_fee = ListingFee.objects.get(sumup_checkout_id=checkout_id)
+            if not listing_fee.is_paid:
+                listing_fee.payment_status = 'paid'
+                listing_fee.paid_at = timezone.now()
+                listing_fee.save()
+
+                # Publish the event
+                if listing_fee.event.status == 'draft':
+                    listing_fee.event.status = 'published'
+                    listing_fee.event.save()
+
+                logger.info(f"Listing fee paid via webhook for event {listing_fee.event.id}")
+        except ListingFee.DoesNotExist:
+            logger.warning(f"No listing fee found for checkout {checkout_id}")
\ No newline at end of file
@@ -1,5 +1,7 @@
 # payments/sumup.py
-import time, requests, datetime
+import os, threading, time, requests, datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from django.utils import timezone
 from django.conf import settings
 from django.core.cache import cache
@@ -7,40 +9,386 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-def get_platform_access_token():
-    """Get or refresh the platform's SumUp access token using client credentials."""
-    # Check cache first
-    cached_token = cache.get('sumup_platform_token')
-    if cached_token:
-        return cached_token
 
-    try:
-        # Request new token using client credentials
-        response = requests.post(
-            f"{settings.SUMUP_BASE_URL}/token",
-            data={
-                'grant_type': 'client_credentials',
-                'client_id': settings.SUMUP_CLIENT_ID,
-                'client_secret': settings.SUMUP_CLIENT_SECRET,
-                'scope': 'payments'
-            },
-            headers={
-                'Content-Type': 'application/x-www-form-urlencoded'
-            },
-            timeout=20
+class SumUpClient:
+    """
+    Shared HTTP client for the SumUp API.
+
+    Holds one keep-alive ``requests.Session`` per worker process so TCP/TLS
+    connections to SumUp are reused across calls instead of re-handshaking
+    on every request. Idempotent GETs are retried with jittered exponential
+    backoff on connection errors and 429/5xx responses; POSTs are never
+    retried. Every request is timed and reported to registered hooks.
+
+    Defaults come from the SUMUP_HTTP_* settings.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    RETRY_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+    def __init__(self, pool_size=None, connect_timeout=None, read_timeout=None,
+                 max_retries=None, backoff_factor=None, backoff_jitter=None):
+        self.pool_size = pool_size or getattr(settings, 'SUMUP_HTTP_POOL_SIZE', 10)
+        self.timeout = (
+            connect_timeout or getattr(settings, 'SUMUP_HTTP_CONNECT_TIMEOUT', 5),
+            read_timeout or getattr(settings, 'SUMUP_HTTP_READ_TIMEOUT', 20),
+        )
+        self.max_retries = max_retries if max_retries is not None else getattr(settings, 'SUMUP_HTTP_MAX_RETRIES', 3)
+        self.backoff_factor = backoff_factor if backoff_factor is not None else getattr(settings, 'SUMUP_HTTP_BACKOFF_FACTOR', 0.3)
+        self.backoff_jitter = backoff_jitter if backoff_jitter is not None else getattr(settings, 'SUMUP_HTTP_BACKOFF_JITTER', 0.3)
+
+        self._session = None
+        self._session_pid = None
+        self._lock = threading.Lock()
+        self._hooks = []
+
+    @property
+    def session(self):
+        """Pooled session for the current process (rebuilt after a fork)."""
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._lock:
+                if self._session is None or self._session_pid != pid:
+                    self._session = self._build_session()
+                    self._session_pid = pid
+        return self._session
+
+    def _build_session(self):
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=self.max_retries,
+            status=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            backoff_jitter=self.backoff_jitter,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=self.RETRY_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
         )
-        response.raise_for_status()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def add_request_hook(self, hook):
+        """
+        Register a timing hook.
+
+        Args:
+            hook: callable(method, url, status_code, elapsed_seconds); status_code
+                  is None when the request raised.
+        """
+        self._hooks.append(hook)
+
+    def remove_request_hook(self, hook):
+        """Unregister a hook added with add_request_hook()."""
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+
+    def request(self, method, url, **kwargs):
+        """Send a request through the pooled session, timing it (including retries)."""
+        kwargs.setdefault('timeout', self.timeout)
+        status_code = None
+        started = time.monotonic()
+        try:
+            response = self.session.request(method, url, **kwargs)
+            status_code = response.status_code
+            return response
+        finally:
+            elapsed = time.monotonic() - started
+            logger.debug(f"SumUp {method} {url} -> {status_code} in {elapsed * 1000:.0f}ms")
+            for hook in list(self._hooks):
+                try:
+                    hook(method, url, status_code, elapsed)
+                except Exception as hook_error:
+                    logger.warning(f"SumUp request hook failed: {hook_error}")
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
 
-        data = response.json()
-        access_token = data.get('access_token')
-        expires_in = data.get('expires_in', 3600)
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
 
-        # Cache the token for slightly less than its expiry time
-        cache_duration = max(expires_in - 300, 60)  # At least 1 minute
-        cache.set('sumup_platform_token', access_token, cache_duration)
 
-        logger.info(f"Successfully obtained new SumUp platform token, expires in {expires_in}s")
-        return access_token
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide SumUpClient, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SumUpClient()
+    return _client
+
+
+class SumUpTokenManager:
+    """
+    Keeps SumUp access tokens off the request hot path.
+
+    - A per-process memory cache sits in front of the shared Django cache
+      (platform token) and the ArtistProfile row (artist tokens).
+    - Refreshes are single-flight: a lock per token inside the process, plus
+      a short cache lock (platform) or a row lock (artist) across processes,
+      so concurrent callers never race to rotate the same refresh token.
+    - Tokens within SUMUP_TOKEN_REFRESH_MARGIN_SECONDS of expiry are
+      refreshed in a background thread while callers keep using the
+      still-valid token. Only an already-expired token blocks the caller.
+    """
+
+    PLATFORM_KEY = 'platform'
+    PLATFORM_CACHE_KEY = 'sumup_platform_token:v2'
+    PLATFORM_LOCK_KEY = 'sumup_platform_token:refresh_lock'
+    LOCK_TIMEOUT_SECONDS = 30
+    LOCK_WAIT_SECONDS = 5
+
+    def __init__(self, refresh_margin=None, background_refresh=True):
+        self._refresh_margin = refresh_margin
+        self.background_refresh = background_refresh
+        self._memory = {}  # key -> (access_token, expires_at as epoch seconds)
+        self._locks = {}
+        self._refreshing = set()
+        self._guard = threading.Lock()
+
+    @property
+    def refresh_margin(self):
+        if self._refresh_margin is not None:
+            return self._refresh_margin
+        return getattr(settings, 'SUMUP_TOKEN_REFRESH_MARGIN_SECONDS', 300)
+
+    def clear(self):
+        """Forget all tokens held in process memory."""
+        self._memory.clear()
+
+    def _lock_for(self, key):
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _remember(self, key, access_token, expires_at):
+        self._memory[key] = (access_token, expires_at)
+
+    def _recall(self, key, min_ttl=0):
+        entry = self._memory.get(key)
+        if entry and entry[1] - time.time() > min_ttl:
+            return entry
+        return None
+
+    def _refresh_in_background(self, key, refresh):
+        """Run refresh() once per key at a time, off the caller's thread."""
+        if not self.background_refresh:
+            try:
+                refresh()
+            except Exception as e:
+                logger.warning(f"Proactive SumUp token refresh failed for {key}: {e}")
+            return
+
+        with self._guard:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            from django.db import connections
+            try:
+                refresh()
+            except Exception as e:
+                logger.warning(f"Proactive SumUp token refresh failed for {key}: {e}")
+            finally:
+                with self._guard:
+                    self._refreshing.discard(key)
+                connections.close_all()
+
+        threading.Thread(target=run, name=f'sumup-token-{key}', daemon=True).start()
+
+    # Platform token (client credentials)
+
+    def get_platform_token(self):
+        """Return a valid platform access token, refreshing only when needed."""
+        entry = self._recall(self.PLATFORM_KEY) or self._read_shared_platform_token()
+        if entry:
+            access_token, expires_at = entry
+            if expires_at - time.time() <= self.refresh_margin:
+                self._refresh_in_background(
+                    self.PLATFORM_KEY,
+                    lambda: self.refresh_platform_token(min_ttl=self.refresh_margin)
+                )
+            return access_token
+
+        return self.refresh_platform_token()
+
+    def _read_shared_platform_token(self, min_ttl=0):
+        cached = cache.get(self.PLATFORM_CACHE_KEY)
+        if not cached or cached['expires_at'] - time.time() <= min_ttl:
+            return None
+        entry = (cached['access_token'], cached['expires_at'])
+        self._remember(self.PLATFORM_KEY, *entry)
+        return entry
+
+    def refresh_platform_token(self, min_ttl=0):
+        """
+        Fetch a new platform token unless another caller already has.
+
+        Args:
+            min_ttl: seconds of validity a cached token needs to be reused
+        """
+        with self._lock_for(self.PLATFORM_KEY):
+            # Another thread or worker may have refreshed while we waited
+            entry = self._recall(self.PLATFORM_KEY, min_ttl) or self._read_shared_platform_token(min_ttl)
+            if entry:
+                return entry[0]
+
+            acquired = cache.add(self.PLATFORM_LOCK_KEY, os.getpid(), self.LOCK_TIMEOUT_SECONDS)
+            if not acquired:
+                # Another worker is refreshing - wait briefly for its result
+                deadline = time.monotonic() + self.LOCK_WAIT_SECONDS
+                while time.monotonic() < deadline:
+                    time.sleep(0.1)
+                    entry = self._read_shared_platform_token(min_ttl)
+                    if entry:
+                        return entry[0]
+                logger.warning("Timed out waiting for another worker to refresh the SumUp platform token")
+
+            try:
+                access_token, expires_in = _request_platform_token()
+                expires_at = time.time() + expires_in
+                cache.set(
+                    self.PLATFORM_CACHE_KEY,
+                    {'access_token': access_token, 'expires_at': expires_at},
+                    max(expires_in - 30, 60)
+                )
+                self._remember(self.PLATFORM_KEY, access_token, expires_at)
+                return access_token
+            finally:
+                # After a timed-out wait the lock is still the other worker's
+                if acquired:
+                    cache.delete(self.PLATFORM_LOCK_KEY)
+
+    # Artist OAuth tokens (ArtistProfile)
+
+    def get_artist_token(self, artist_profile):
+        """
+        Return a valid access token for an artist's SumUp connection.
+
+        Raises:
+            ValueError: if the token has expired and cannot be refreshed
+        """
+        key = f'artist:{artist_profile.pk}'
+
+        # A refresh done by another request in this process wins over a stale instance
+        entry = self._recall(key)
+        if entry and artist_profile.sumup_expires_at and entry[1] > artist_profile.sumup_expires_at.timestamp():
+            artist_profile.sumup_access_token = entry[0]
+            artist_profile.sumup_expires_at = datetime.datetime.fromtimestamp(entry[1], tz=datetime.timezone.utc)
+
+        if not artist_profile.sumup_expires_at:
+            return artist_profile.sumup_access_token
+
+        ttl = (artist_profile.sumup_expires_at - timezone.now()).total_seconds()
+        if ttl > self.refresh_margin:
+            return artist_profile.sumup_access_token
+
+        if ttl > 0:
+            profile_id = artist_profile.pk
+            self._refresh_in_background(
+                key,
+                lambda: self.refresh_artist_token_by_id(profile_id, min_ttl=self.refresh_margin)
+            )
+            return artist_profile.sumup_access_token
+
+        try:
+            return self.refresh_artist_token(artist_profile)
+        except Exception as e:
+            raise ValueError(f"Artist SumUp token expired and refresh failed: {e}")
+
+    def refresh_artist_token(self, artist_profile, min_ttl=0):
+        """
+        Refresh an artist's token under a row lock and copy the result onto
+        the given instance. Skips the OAuth call if another worker already
+        refreshed it.
+        """
+        refreshed = self.refresh_artist_token_by_id(artist_profile.pk, min_ttl=min_ttl)
+        for field in ('sumup_access_token', 'sumup_refresh_token', 'sumup_token_type',
+                      'sumup_scope', 'sumup_expires_at', 'sumup_connection_status',
+                      'sumup_connected_at'):
+            setattr(artist_profile, field, getattr(refreshed, field))
+        return artist_profile.sumup_access_token
+
+    def refresh_artist_token_by_id(self, profile_id, min_ttl=0):
+        """
+        Refresh an ArtistProfile's token if it expires within min_ttl seconds.
+
+        Returns:
+            ArtistProfile: the locked, up-to-date profile
+        """
+        from django.db import transaction
+        from accounts.models import ArtistProfile
+
+        key = f'artist:{profile_id}'
+        with self._lock_for(key):
+            with transaction.atomic():
+                profile = ArtistProfile.objects.select_for_update().select_related('user').get(pk=profile_id)
+
+                ttl = (
+                    (profile.sumup_expires_at - timezone.now()).total_seconds()
+                    if profile.sumup_expires_at else 0
+                )
+                if ttl <= min_ttl:
+                    token_data = refresh_access_token_direct(profile.sumup_refresh_token)
+                    # SumUp only sometimes rotates the refresh token - never drop the current one
+                    if not token_data.get('refresh_token'):
+                        token_data['refresh_token'] = profile.sumup_refresh_token
+                    profile.update_sumup_connection(token_data)
+                    logger.info(f"Refreshed SumUp token for artist profile {profile_id}")
+
+            if profile.sumup_expires_at:
+                self._remember(key, profile.sumup_access_token, profile.sumup_expires_at.timestamp())
+            return profile
+
+
+token_manager = SumUpTokenManager()
+
+
+def _request_platform_token():
+    """
+    Request a platform token from SumUp using client credentials.
+
+    Returns:
+        tuple: (access_token, expires_in seconds)
+    """
+    response = get_client().post(
+        f"{settings.SUMUP_BASE_URL}/token",
+        data={
+            'grant_type': 'client_credentials',
+            'client_id': settings.SUMUP_CLIENT_ID,
+            'client_secret': settings.SUMUP_CLIENT_SECRET,
+            'scope': 'payments'
+        },
+        headers={
+            'Content-Type': 'application/x-www-form-urlencoded'
+        }
+    )
+    response.raise_for_status()
+
+    data = response.json()
+    access_token = data.get('access_token')
+    expires_in = data.get('expires_in', 3600)
+
+    logger.info(f"Successfully obtained new SumUp platform token, expires in {expires_in}s")
+    return access_token, expires_in
+
+
+def get_platform_access_token():
+    """Get or refresh the platform's SumUp access token using client credentials."""
+    try:
+        return token_manager.get_platform_token()
 
     except requests.exceptions.RequestException as e:
         logger.error(f"Failed to get SumUp platform token: {e}")
@@ -112,11 +460,10 @@ def exchange_code_for_tokens(code: str):
     logger.info("📤 Sending POST request to SumUp token endpoint...")
 
     try:
-        r = requests.post(
+        r = get_client().post(
             token_url,
             headers={"Content-Type": "application/x-www-form-urlencoded"},
             data=request_data,
-            timeout=20,
         )
 
         logger.info(f"📥 Response received:")
@@ -218,7 +565,7 @@ def exchange_code_for_tokens(code: str):
         raise
 
 def refresh_access_token(artist_sumup):
-    r = requests.post(
+    r = get_client().post(
         f"{settings.SUMUP_BASE_URL}/token",
         headers={"Content-Type": "application/x-www-form-urlencoded"},
         data={
@@ -227,7 +574,6 @@ def refresh_access_token(artist_sumup):
             "client_id": settings.SUMUP_CLIENT_ID,
             "client_secret": settings.SUMUP_CLIENT_SECRET,
         },
-        timeout=20,
     )
     r.raise_for_status()
     data = r.json()
@@ -248,7 +594,7 @@ def get_artist_token(artist_sumup):
 
 def create_checkout_for_artist(artist_sumup, *, amount, currency, reference, description, return_url):
     token = get_artist_token(artist_sumup)
-    r = requests.post(
+    r = get_client().post(
         f"{settings.SUMUP_API_URL}/checkouts",
         headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
         json={
@@ -258,17 +604,15 @@ def create_checkout_for_artist(artist_sumup, *, amount, currency, reference, des
             "description": description,
             "return_url": return_url,
         },
-        timeout=20,
     )
     r.raise_for_status()
     return r.json()
 
 def get_checkout(artist_sumup, checkout_id):
     token = get_artist_token(artist_sumup)
-    r = requests.get(
+    r = get_client().get(
         f"{settings.SUMUP_API_URL}/checkouts/{checkout_id}",
         headers={"Authorization": f"Bearer {token}"},
-        timeout=20,
     )
     r.raise_for_status()
     return r.json()
@@ -276,10 +620,9 @@ def get_checkout(artist_sumup, checkout_id):
 def get_merchant_info(access_token):
     """Get merchant information from SumUp."""
     try:
-        r = requests.get(
+        r = get_client().get(
             f"{settings.SUMUP_API_URL}/me",
             headers={"Authorization": f"Bearer {access_token}"},
-            timeout=20,
         )
         r.raise_for_status()
         data = r.json()
@@ -294,7 +637,7 @@ def get_merchant_info(access_token):
 
 def refresh_access_token_direct(refresh_token):
     """Refresh access token using refresh token."""
-    r = requests.post(
+    r = get_client().post(
         f"{settings.SUMUP_BASE_URL}/token",
         headers={"Content-Type": "application/x-www-form-urlencoded"},
         data={
@@ -303,7 +646,6 @@ def refresh_access_token_direct(refresh_token):
             "client_id": settings.SUMUP_CLIENT_ID,
             "client_secret": settings.SUMUP_CLIENT_SECRET,
         },
-        timeout=20,
     )
     r.raise_for_status()
     return r.json()
@@ -372,11 +714,10 @@ def create_checkout_simple(amount, currency, reference, description, return_url,
         payload["hosted_checkout"] = {"enabled": True}
 
     try:
-        r = requests.post(
+        r = get_client().post(
             f"{settings.SUMUP_API_URL}/checkouts",
             headers=headers,
-            json=payload,
-            timeout=20
+            json=payload
         )
         r.raise_for_status()
         result = r.json()
@@ -396,10 +737,9 @@ def get_checkout_status(checkout_id):
         "Authorization": f"Bearer {access_token}"
     }
 
-    r = requests.get(
+    r = get_client().get(
         f"{settings.SUMUP_API_URL}/checkouts/{checkout_id}",
-        headers=headers,
-        timeout=20
+        headers=headers
     )
     r.raise_for_status()
     return r.json()
@@ -416,11 +756,10 @@ def list_transactions(limit=50, order="desc"):
         "order": order
     }
 
-    r = requests.get(
+    r = get_client().get(
         f"{settings.SUMUP_API_URL}/me/transactions/history",
         headers=headers,
-        params=params,
-        timeout=20
+        params=params
     )
     r.raise_for_status()
     return r.json()
@@ -432,10 +771,9 @@ def get_transaction(transaction_id):
         "Authorization": f"Bearer {access_token}"
     }
 
-    r = requests.get(
+    r = get_client().get(
         f"{settings.SUMUP_API_URL}/me/transactions/{transaction_id}",
-        headers=headers,
-        timeout=20
+        headers=headers
     )
     r.raise_for_status()
     return r.json()
@@ -452,11 +790,10 @@ def process_refund(transaction_id, amount=None):
     if amount:
         payload["amount"] = float(amount)
 
-    r = requests.post(
+    r = get_client().post(
         f"{settings.SUMUP_API_URL}/me/transactions/{transaction_id}/refund",
         headers=headers,
-        json=payload if payload else None,
-        timeout=20
+        json=payload if payload else None
     )
     r.raise_for_status()
     return r.json()
@@ -465,19 +802,13 @@ def process_refund(transaction_id, amount=None):
 
 def create_checkout_for_connected_artist(artist_profile, *, amount, currency, reference, description, return_url):
     """Create checkout for artist with their own SumUp connection."""
-    # Check if artist token is still valid
-    if artist_profile.sumup_token_expired:
-        # Try to refresh token
-        try:
-            new_token_data = refresh_access_token_direct(artist_profile.sumup_refresh_token)
-            artist_profile.update_sumup_connection(new_token_data)
-        except Exception as e:
-            raise ValueError(f"Artist SumUp token expired and refresh failed: {e}")
+    # Refreshes (single-flight) only if the token is expired or about to expire
+    access_token = token_manager.get_artist_token(artist_profile)
 
-    r = requests.post(
+    r = get_client().post(
         f"{settings.SUMUP_API_URL}/checkouts",
         headers={
-            "Authorization": f"Bearer {artist_profile.sumup_access_token}",
+            "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json"
         },
         json={
@@ -487,24 +818,17 @@ def create_checkout_for_connected_artist(artist_profile, *, amount, currency, re
             "description": description,
             "return_url": return_url,
         },
-        timeout=20,
     )
     r.raise_for_status()
     return r.json()
 
 def get_checkout_for_artist(artist_profile, checkout_id):
     """Get checkout status for artist with their own connection."""
-    if artist_profile.sumup_token_expired:
-        try:
-            new_token_data = refresh_access_token_direct(artist_profile.sumup_refresh_token)
-            artist_profile.update_sumup_connection(new_token_data)
-        except Exception as e:
-            raise ValueError(f"Artist SumUp token expired and refresh failed: {e}")
+    access_token = token_manager.get_artist_token(artist_profile)
 
-    r = requests.get(
+    r = get_client().get(
         f"{settings.SUMUP_API_URL}/checkouts/{checkout_id}",
-        headers={"Authorization": f"Bearer {artist_profile.sumup_access_token}"},
-        timeout=20,
+        headers={"Authorization": f"Bearer {access_token}"},
     )
     r.raise_for_status()
     return r.json()
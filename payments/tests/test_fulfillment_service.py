@@ -0,0 +1,217 @@
+"""
+Tests for the unified order fulfillment service.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event, Ticket
+from events.ticket_generator import TicketGenerator
+from orders.models import Order, OrderItem
+from payments.fulfillment_service import OrderFulfillmentService
+from payments.models import SumUpCheckout, SumUpTransaction
+
+User = get_user_model()
+
+
+@patch('payments.fulfillment_service.OrderFulfillmentService.run_followups')
+class OrderFulfillmentServiceTests(TestCase):
+
+    def setUp(self):
+        self.organiser = User.objects.create_user(
+            email='fulfil-organiser@test.com',
+            password='test123',
+            user_type='artist'
+        )
+        self.customer = User.objects.create_user(
+            email='fulfil-customer@test.com',
+            password='test123',
+            user_type='customer'
+        )
+        self.event = Event.objects.create(
+            title='Fulfillment Event',
+            slug='fulfillment-event',
+            organiser=self.organiser,
+            description='Test event',
+            venue_name='Test Venue',
+            venue_address='Test Address',
+            event_date=timezone.now().date() + timedelta(days=30),
+            event_time=timezone.now().time(),
+            capacity=100,
+            ticket_price=Decimal('10.00'),
+            status='published'
+        )
+        self.order = self._order(self.customer, quantity=10)
+
+    def _order(self, user, quantity):
+        order = Order.objects.create(
+            user=user,
+            email='fulfil-customer@test.com',
+            phone='07700900000',
+            delivery_first_name='Fulfil',
+            delivery_last_name='Customer',
+            delivery_address_line_1='1 Test Street',
+            delivery_parish='st_helier',
+            delivery_postcode='JE2 3AB',
+            subtotal=Decimal('100.00'),
+            shipping_cost=Decimal('0.00'),
+            total=Decimal('100.00'),
+            status='pending_verification'
+        )
+        OrderItem.objects.create(order=order, event=self.event, quantity=quantity, price=Decimal('10.00'))
+        return order
+
+    def test_issues_all_tickets_in_a_handful_of_queries(self, mock_followups):
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                result = OrderFulfillmentService().fulfill_order(self.order, status='completed')
+
+        self.assertTrue(result.created)
+        self.assertEqual(len(result.tickets), 10)
+        # Plus three for turning the order's ticket holds into sales
+        self.assertLessEqual(len(queries), 13)
+        mock_followups.assert_called_once_with(self.order.pk)
+
+        self.order.refresh_from_db()
+        self.assertTrue(self.order.is_paid)
+        self.assertEqual(self.order.status, 'completed')
+        self.assertIsNotNone(self.order.fulfilled_at)
+
+        generator = TicketGenerator()
+        tickets = Ticket.objects.filter(order=self.order).select_related('event', 'customer')
+        self.assertEqual(tickets.count(), 10)
+        self.assertEqual(len({ticket.ticket_number for ticket in tickets}), 10)
+        for ticket in tickets:
+            self.assertEqual(ticket.validation_hash, generator.generate_ticket_validation_hash(ticket))
+            self.assertEqual(ticket.qr_data, generator.generate_qr_code_data(ticket))
+
+    def test_repeat_delivery_is_idempotent(self, mock_followups):
+        checkout = SumUpCheckout.objects.create(
+            order=self.order,
+            customer=self.customer,
+            amount=Decimal('100.00'),
+            description='Fulfillment checkout',
+            merchant_code='TEST',
+            return_url='https://example.com/return/',
+            checkout_id='sumup-fulfil',
+            status='pending'
+        )
+        service = OrderFulfillmentService()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first = service.fulfill_order(self.order, checkout=checkout, payment_data={'status': 'PAID'})
+        with self.captureOnCommitCallbacks(execute=True):
+            second = service.fulfill_order(self.order.pk)
+
+        self.assertTrue(first.created)
+        self.assertFalse(second.created)
+        self.assertEqual(len(second.tickets), 10)
+        self.assertEqual(Ticket.objects.filter(order=self.order).count(), 10)
+        mock_followups.assert_called_once()
+
+        checkout.refresh_from_db()
+        self.assertEqual(checkout.status, 'paid')
+        self.assertFalse(checkout.should_poll)
+        self.assertEqual(checkout.sumup_response, {'status': 'PAID'})
+
+    def test_guest_order_tickets_go_to_an_account_for_its_email(self, mock_followups):
+        guest_order = self._order(None, quantity=2)
+        guest_order.email = 'Guest@Test.com'
+        guest_order.save()
+
+        result = OrderFulfillmentService().fulfill_order(guest_order)
+
+        self.assertTrue(result.created)
+        self.assertEqual(len(result.tickets), 2)
+        guest = User.objects.get(email='Guest@test.com')
+        self.assertFalse(guest.has_usable_password())
+        self.assertEqual(guest.user_type, 'customer')
+        self.assertEqual(Order.objects.get(pk=guest_order.pk).user, guest)
+        self.assertEqual(Ticket.objects.filter(order=guest_order, customer=guest).count(), 2)
+
+        # A later guest order with the same email reuses the account
+        repeat_order = self._order(None, quantity=1)
+        repeat_order.email = 'guest@test.com'
+        repeat_order.save()
+        OrderFulfillmentService().fulfill_order(repeat_order)
+        self.assertEqual(Order.objects.get(pk=repeat_order.pk).user, guest)
+
+    @patch('payments.polling_service.PaymentPollingService._send_admin_alert')
+    def test_failed_confirmation_email_alerts_admin(self, mock_alert, mock_followups):
+        service = OrderFulfillmentService()
+
+        for outcome in ({'return_value': False}, {'side_effect': RuntimeError('SMTP down')}):
+            mock_alert.reset_mock()
+            with patch('events.email_utils.email_service.send_order_confirmation', **outcome), \
+                    patch('events.email_utils.email_service.send_artist_notification', return_value=True):
+                service.send_confirmation_emails(self.order)
+
+            mock_alert.assert_called_once()
+            self.assertEqual(
+                mock_alert.call_args.kwargs['subject'],
+                f"Email Delivery Failed: Order {self.order.order_number}"
+            )
+        self.assertIn('SMTP down', mock_alert.call_args.kwargs['message'])
+
+    def test_paid_webhook_issues_tickets(self, mock_followups):
+        from payments.views import process_sumup_webhook_event
+
+        SumUpCheckout.objects.create(
+            order=self.order,
+            customer=self.customer,
+            amount=Decimal('100.00'),
+            description='Webhook checkout',
+            merchant_code='TEST',
+            return_url='https://example.com/return/',
+            sumup_checkout_id='sumup-webhook',
+            status='pending'
+        )
+
+        process_sumup_webhook_event({'id': 'sumup-webhook', 'status': 'PAID'})
+
+        order = Order.objects.get(pk=self.order.pk)
+        self.assertIsNotNone(order.fulfilled_at)
+        self.assertEqual(order.status, 'confirmed')
+        self.assertEqual(Ticket.objects.filter(order=order).count(), 10)
+        self.assertEqual(SumUpCheckout.objects.get(sumup_checkout_id='sumup-webhook').status, 'paid')
+
+    def test_sumup_callback_fulfils_once(self, mock_followups):
+        from events.ticket_holds import ticket_holds
+
+        ticket_holds.hold_items(self.order.items.all(), order=self.order)
+        checkout = SumUpCheckout.objects.create(
+            order=self.order,
+            customer=self.customer,
+            amount=Decimal('100.00'),
+            description='Callback checkout',
+            merchant_code='TEST',
+            return_url='https://example.com/return/',
+            status='pending'
+        )
+        payload = {
+            'checkout_reference': checkout.checkout_reference,
+            'status': 'PAID',
+            'transactions': [{'id': 'txn-1', 'transaction_code': 'TCODE1', 'amount': 100}],
+        }
+
+        for _ in range(2):
+            response = self.client.post(reverse('payments:sumup_callback'), data=payload, content_type='application/json')
+            self.assertEqual(response.json(), {'status': 'ok'})
+
+        order = Order.objects.get(pk=self.order.pk)
+        self.assertIsNotNone(order.fulfilled_at)
+        self.assertEqual(order.transaction_id, 'TCODE1')
+        self.assertEqual(Ticket.objects.filter(order=order).count(), 10)
+        self.assertEqual(SumUpTransaction.objects.filter(checkout=checkout).count(), 1)
+        self.event.refresh_from_db()
+        # The holds became sales rather than counting twice
+        self.assertEqual((self.event.tickets_sold, self.event.tickets_held), (10, 0))
+        self.assertEqual(SumUpCheckout.objects.get(pk=checkout.pk).status, 'paid')
@@ -0,0 +1,205 @@
+"""
+Tests for the SumUp payment polling service.
+"""
+
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from orders.models import Order
+from payments.models import SumUpCheckout
+from payments.polling_service import PaymentPollingService
+
+User = get_user_model()
+
+
+class ConcurrentPollingTests(TestCase):
+    """Status lookups run in parallel; DB updates stay on the polling thread."""
+
+    def setUp(self):
+        self.customer = User.objects.create_user(
+            email='poll-customer@test.com',
+            password='test123',
+            user_type='customer'
+        )
+        self.checkouts = []
+        for i in range(4):
+            order = Order.objects.create(
+                user=self.customer,
+                email=self.customer.email,
+                phone='07700900000',
+                delivery_first_name='Poll',
+                delivery_last_name='Customer',
+                delivery_address_line_1='1 Test Street',
+                delivery_parish='st_helier',
+                delivery_postcode='JE2 3AB',
+                subtotal=Decimal('10.00'),
+                shipping_cost=Decimal('0.00'),
+                total=Decimal('10.00'),
+                status='pending_verification'
+            )
+            self.checkouts.append(SumUpCheckout.objects.create(
+                order=order,
+                customer=self.customer,
+                amount=Decimal('10.00'),
+                description=f'Test checkout {i}',
+                merchant_code='TEST',
+                return_url='https://example.com/return/',
+                checkout_id=f'sumup-{i}',
+                status='pending'
+            ))
+
+    @patch('payments.polling_service.sumup_api.get_platform_access_token', return_value='token')
+    @patch('payments.polling_service.sumup_api.get_checkout_status')
+    def test_parallel_fetch_reports_stats_and_timing(self, mock_status, _mock_token):
+        main_thread = threading.get_ident()
+        api_threads = set()
+
+        def fake_status(checkout_id):
+            api_threads.add(threading.get_ident())
+            if checkout_id == 'sumup-3':
+                raise ConnectionError('SumUp unavailable')
+            return {'status': 'PENDING', 'amount': 10.00}
+
+        mock_status.side_effect = fake_status
+
+        stats = PaymentPollingService().process_pending_payments(concurrency=4)
+
+        self.assertEqual(mock_status.call_count, 4)
+        self.assertNotIn(main_thread, api_threads)
+        self.assertEqual(stats['still_pending'], 3)
+        self.assertEqual(stats['errors'], 1)
+        self.assertEqual(stats['api_calls'], 4)
+        self.assertEqual(
+            set(stats['api_latency_ms']),
+            {checkout.payment_id for checkout in self.checkouts}
+        )
+        self.assertIn('cycle_seconds', stats)
+        self.assertGreaterEqual(stats['api_latency_max_ms'], stats['api_latency_avg_ms'])
+
+        for checkout in self.checkouts:
+            checkout.refresh_from_db()
+            self.assertEqual(checkout.poll_count, 1)
+            self.assertIsNotNone(checkout.polling_started_at)
+        self.assertEqual(self.checkouts[0].sumup_response['status'], 'PENDING')
+
+    @patch('payments.polling_service.sumup_api.get_checkout_status')
+    def test_concurrency_of_one_runs_inline(self, mock_status):
+        main_thread = threading.get_ident()
+        api_threads = set()
+
+        def fake_status(checkout_id):
+            api_threads.add(threading.get_ident())
+            return {'status': 'PENDING', 'amount': 10.00}
+
+        mock_status.side_effect = fake_status
+
+        stats = PaymentPollingService().process_pending_payments(concurrency=1)
+
+        self.assertEqual(api_threads, {main_thread})
+        self.assertEqual(stats['still_pending'], 4)
+        self.assertEqual(stats['api_calls'], 4)
+
+    @patch('payments.fulfillment_service.OrderFulfillmentService.run_followups')
+    def test_order_fulfilled_elsewhere_stops_polling(self, _mock_followups):
+        from payments.fulfillment_service import fulfillment_service
+
+        checkout = self.checkouts[0]
+        fulfillment_service.fulfill_order(checkout.order)
+
+        PaymentPollingService()._process_successful_payment(checkout.order, checkout, {'status': 'PAID'})
+
+        checkout.refresh_from_db()
+        self.assertEqual(checkout.status, 'paid')
+        self.assertFalse(checkout.should_poll)
+
+
+class PollScheduleTests(TestCase):
+    """next_poll_at backoff and the SQL-side due-checkout selection."""
+
+    def _checkout(self, **kwargs):
+        defaults = {
+            'amount': Decimal('10.00'),
+            'description': 'Schedule test',
+            'merchant_code': 'TEST',
+            'return_url': 'https://example.com/return/',
+            'checkout_id': 'sumup-schedule',
+            'status': 'pending',
+        }
+        defaults.update(kwargs)
+        return SumUpCheckout.objects.create(**defaults)
+
+    def test_due_for_polling_applies_schedule_and_window_in_sql(self):
+        now = timezone.now()
+        due = self._checkout()
+        not_due = self._checkout(next_poll_at=now + timedelta(minutes=5))
+        expired = self._checkout(valid_until=now - timedelta(minutes=1))
+        past_max_duration = self._checkout(
+            polling_started_at=now - timedelta(minutes=30),
+            max_poll_duration_minutes=20
+        )
+        inside_max_duration = self._checkout(
+            polling_started_at=now - timedelta(minutes=10),
+            max_poll_duration_minutes=20
+        )
+        paid = self._checkout(status='paid')
+        now = timezone.now()
+
+        due_ids = set(SumUpCheckout.due_for_polling(now=now).values_list('id', flat=True))
+
+        self.assertEqual(due_ids, {due.id, inside_max_duration.id})
+        self.assertNotIn(not_due.id, due_ids)
+        self.assertNotIn(paid.id, due_ids)
+
+        self.assertEqual(SumUpCheckout.stop_polling_outside_window(now=now), 2)
+        expired.refresh_from_db()
+        past_max_duration.refresh_from_db()
+        self.assertFalse(expired.should_poll)
+        self.assertFalse(past_max_duration.should_poll)
+
+    def test_due_for_polling_returns_newest_first(self):
+        older = self._checkout()
+        SumUpCheckout.objects.filter(pk=older.pk).update(created_at=timezone.now() - timedelta(minutes=30))
+        newer = self._checkout()
+
+        self.assertEqual(list(SumUpCheckout.due_for_polling()), [newer, older])
+
+    def test_poll_interval_backs_off_with_age(self):
+        checkout = self._checkout()
+        now = timezone.now()
+        base = timedelta(seconds=SumUpCheckout.POLL_BASE_INTERVAL_SECONDS)
+
+        self.assertEqual(checkout.get_poll_interval(now), base)
+
+        checkout.created_at = now - timedelta(minutes=40)
+        checkout.poll_count = SumUpCheckout.POLL_MIN_FAST_POLLS
+        self.assertEqual(checkout.get_poll_interval(now), timedelta(minutes=10))
+
+        # Not enough polls yet - stay on the fast schedule regardless of age
+        checkout.poll_count = 0
+        self.assertEqual(checkout.get_poll_interval(now), base)
+
+        checkout.created_at = now - timedelta(hours=2)
+        checkout.poll_count = 10
+        self.assertEqual(
+            checkout.get_poll_interval(now),
+            timedelta(seconds=SumUpCheckout.POLL_MAX_INTERVAL_SECONDS)
+        )
+
+    def test_update_poll_timestamp_schedules_next_poll(self):
+        checkout = self._checkout()
+
+        checkout.update_poll_timestamp()
+        checkout.refresh_from_db()
+
+        self.assertEqual(checkout.poll_count, 1)
+        self.assertEqual(
+            checkout.next_poll_at - checkout.last_polled_at,
+            timedelta(seconds=SumUpCheckout.POLL_BASE_INTERVAL_SECONDS)
+        )
+        self.assertFalse(SumUpCheckout.due_for_polling().filter(pk=checkout.pk).exists())
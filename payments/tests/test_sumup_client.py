@@ -0,0 +1,79 @@
+"""
+Tests for the pooled SumUp HTTP client.
+"""
+
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase, override_settings
+
+from payments import sumup
+from payments.sumup import SumUpClient
+
+
+class SumUpClientTests(SimpleTestCase):
+
+    @override_settings(SUMUP_HTTP_POOL_SIZE=4, SUMUP_HTTP_CONNECT_TIMEOUT=2, SUMUP_HTTP_READ_TIMEOUT=7)
+    def test_session_is_pooled_and_reused(self):
+        client = SumUpClient()
+
+        session = client.session
+        adapter = session.get_adapter('https://api.sumup.com/v0.1/checkouts')
+
+        self.assertIs(client.session, session)
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(client.timeout, (2, 7))
+
+    def test_only_idempotent_methods_are_retried(self):
+        client = SumUpClient(max_retries=2)
+        retry = client.session.get_adapter('https://api.sumup.com').max_retries
+
+        self.assertEqual(retry.total, 2)
+        self.assertTrue(retry.is_retry('GET', 503))
+        self.assertFalse(retry.is_retry('POST', 503))
+        self.assertGreater(retry.backoff_jitter, 0)
+
+    def test_session_rebuilt_after_fork(self):
+        client = SumUpClient()
+        session = client.session
+
+        with patch('payments.sumup.os.getpid', return_value=-1):
+            self.assertIsNot(client.session, session)
+
+    def test_request_hooks_receive_timing(self):
+        client = SumUpClient()
+        response = Mock(status_code=200)
+        hook = Mock()
+        client.add_request_hook(hook)
+
+        with patch.object(client.session, 'request', return_value=response) as mock_request:
+            self.assertIs(client.get('https://api.sumup.com/v0.1/me'), response)
+
+        mock_request.assert_called_once_with('GET', 'https://api.sumup.com/v0.1/me', timeout=client.timeout)
+        method, url, status_code, elapsed = hook.call_args.args
+        self.assertEqual((method, url, status_code), ('GET', 'https://api.sumup.com/v0.1/me', 200))
+        self.assertGreaterEqual(elapsed, 0)
+
+    def test_request_hooks_called_when_request_raises(self):
+        client = SumUpClient()
+        hook = Mock()
+        client.add_request_hook(hook)
+
+        with patch.object(client.session, 'request', side_effect=ConnectionError('down')):
+            with self.assertRaises(ConnectionError):
+                client.post('https://api.sumup.com/v0.1/checkouts', json={})
+
+        self.assertEqual(hook.call_args.args[2], None)
+
+    @patch('payments.sumup.get_platform_access_token', return_value='platform-token')
+    def test_module_functions_route_through_shared_client(self, _mock_token):
+        response = Mock()
+        response.json.return_value = {'id': 'chk_1', 'status': 'PENDING'}
+        client = sumup.get_client()
+
+        with patch.object(client, 'request', return_value=response) as mock_request:
+            self.assertEqual(sumup.get_checkout_status('chk_1')['status'], 'PENDING')
+
+        self.assertIs(sumup.get_client(), client)
+        method, url = mock_request.call_args.args
+        self.assertEqual(method, 'GET')
+        self.assertTrue(url.endswith('/checkouts/chk_1'))
@@ -0,0 +1,142 @@
+"""
+Tests for SumUp token caching and single-flight refresh.
+"""
+
+import threading
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import ArtistProfile
+from payments import sumup
+from payments.sumup import SumUpTokenManager
+
+User = get_user_model()
+
+
+class PlatformTokenTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.manager = SumUpTokenManager(refresh_margin=300, background_refresh=False)
+
+    @patch('payments.sumup._request_platform_token', return_value=('platform-1', 3600))
+    def test_token_served_from_memory_then_shared_cache(self, mock_request):
+        self.assertEqual(self.manager.get_platform_token(), 'platform-1')
+        self.assertEqual(self.manager.get_platform_token(), 'platform-1')
+
+        # A new worker process starts with an empty memory cache
+        other_worker = SumUpTokenManager(refresh_margin=300, background_refresh=False)
+        self.assertEqual(other_worker.get_platform_token(), 'platform-1')
+
+        self.assertEqual(mock_request.call_count, 1)
+
+    @patch('payments.sumup._request_platform_token')
+    def test_concurrent_callers_share_one_refresh(self, mock_request):
+        def slow_request():
+            time.sleep(0.1)
+            return 'platform-1', 3600
+
+        mock_request.side_effect = slow_request
+        results = []
+
+        def call():
+            results.append(self.manager.get_platform_token())
+
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ['platform-1'] * 8)
+        self.assertEqual(mock_request.call_count, 1)
+
+    @patch('payments.sumup._request_platform_token')
+    def test_token_near_expiry_is_refreshed_proactively(self, mock_request):
+        mock_request.side_effect = [('platform-1', 200), ('platform-2', 3600)]
+
+        self.assertEqual(self.manager.get_platform_token(), 'platform-1')
+
+        # Still valid, so the caller keeps the current token while it is refreshed
+        self.assertEqual(self.manager.get_platform_token(), 'platform-1')
+        self.assertEqual(self.manager.get_platform_token(), 'platform-2')
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch('payments.sumup._request_platform_token', return_value=('platform-1', 3600))
+    def test_timed_out_wait_leaves_other_workers_lock(self, mock_request):
+        cache.add(SumUpTokenManager.PLATFORM_LOCK_KEY, 'other-worker', 60)
+
+        with patch.object(SumUpTokenManager, 'LOCK_WAIT_SECONDS', 0):
+            self.assertEqual(self.manager.get_platform_token(), 'platform-1')
+
+        self.assertEqual(cache.get(SumUpTokenManager.PLATFORM_LOCK_KEY), 'other-worker')
+
+    @patch('payments.sumup._request_platform_token')
+    def test_falls_back_to_api_key_when_token_request_fails(self, mock_request):
+        mock_request.side_effect = sumup.requests.exceptions.ConnectionError('down')
+
+        with patch.object(sumup, 'token_manager', self.manager), \
+                self.settings(SUMUP_API_KEY='api-key'):
+            self.assertEqual(sumup.get_platform_access_token(), 'api-key')
+
+
+class ArtistTokenTests(TestCase):
+
+    def setUp(self):
+        self.manager = SumUpTokenManager(refresh_margin=300, background_refresh=False)
+        user = User.objects.create_user(
+            email='token-artist@test.com',
+            password='test123',
+            user_type='artist'
+        )
+        self.profile = ArtistProfile.objects.create(
+            user=user,
+            display_name='Token Artist',
+            sumup_access_token='old-access',
+            sumup_refresh_token='refresh-1',
+            sumup_merchant_code='MERCHANT',
+            sumup_connection_status='connected',
+            sumup_expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+    @patch('payments.sumup.refresh_access_token_direct')
+    def test_expired_token_refreshed_and_refresh_token_kept(self, mock_refresh):
+        mock_refresh.return_value = {'access_token': 'new-access', 'expires_in': 3600}
+
+        self.assertEqual(self.manager.get_artist_token(self.profile), 'new-access')
+
+        mock_refresh.assert_called_once_with('refresh-1')
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.sumup_access_token, 'new-access')
+        self.assertEqual(self.profile.sumup_refresh_token, 'refresh-1')
+
+    @patch('payments.sumup.refresh_access_token_direct')
+    def test_skips_refresh_already_done_by_another_worker(self, mock_refresh):
+        stale_instance = ArtistProfile.objects.get(pk=self.profile.pk)
+        ArtistProfile.objects.filter(pk=self.profile.pk).update(
+            sumup_access_token='rotated-access',
+            sumup_refresh_token='refresh-2',
+            sumup_expires_at=timezone.now() + timedelta(hours=1)
+        )
+
+        self.assertEqual(self.manager.get_artist_token(stale_instance), 'rotated-access')
+        self.assertEqual(stale_instance.sumup_refresh_token, 'refresh-2')
+        mock_refresh.assert_not_called()
+
+    @patch('payments.sumup.refresh_access_token_direct')
+    def test_valid_token_needs_no_refresh(self, mock_refresh):
+        self.profile.sumup_expires_at = timezone.now() + timedelta(hours=1)
+
+        self.assertEqual(self.manager.get_artist_token(self.profile), 'old-access')
+        mock_refresh.assert_not_called()
+
+    @patch('payments.sumup.refresh_access_token_direct', side_effect=Exception('invalid_grant'))
+    def test_failed_refresh_raises_value_error(self, _mock_refresh):
+        with self.assertRaises(ValueError):
+            self.manager.get_artist_token(self.profile)
@@ -0,0 +1,88 @@
+"""
+Tests for the scheduled artist SumUp token refresh.
+"""
+
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+import requests
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import ArtistProfile
+from payments.token_refresh_service import ArtistTokenRefreshService
+
+User = get_user_model()
+
+
+class ArtistTokenRefreshServiceTests(TestCase):
+
+    def _profile(self, name, expires_in, **kwargs):
+        user = User.objects.create_user(
+            email=f'{name}@test.com',
+            password='test123',
+            user_type='artist'
+        )
+        defaults = {
+            'user': user,
+            'display_name': name,
+            'sumup_access_token': f'{name}-access',
+            'sumup_refresh_token': f'{name}-refresh',
+            'sumup_merchant_code': 'MERCHANT',
+            'sumup_connection_status': 'connected',
+            'sumup_expires_at': timezone.now() + expires_in,
+        }
+        defaults.update(kwargs)
+        return ArtistProfile.objects.create(**defaults)
+
+    @patch('payments.sumup.refresh_access_token_direct')
+    def test_refreshes_only_tokens_inside_window(self, mock_refresh):
+        mock_refresh.return_value = {
+            'access_token': 'new-access',
+            'refresh_token': 'new-refresh',
+            'expires_in': 3600,
+        }
+        expiring = self._profile('expiring', timedelta(minutes=10))
+        fresh = self._profile('fresh', timedelta(hours=2))
+        no_refresh_token = self._profile('orphan', timedelta(minutes=5), sumup_refresh_token='')
+
+        stats = ArtistTokenRefreshService().refresh_expiring_tokens(window_minutes=30, concurrency=1)
+
+        self.assertEqual(stats['refreshed'], 1)
+        self.assertEqual(stats['errors'] + stats['expired'] + stats['failed'], 0)
+        mock_refresh.assert_called_once_with('expiring-refresh')
+
+        expiring.refresh_from_db()
+        self.assertEqual(expiring.sumup_access_token, 'new-access')
+        self.assertGreater(expiring.sumup_expires_at, timezone.now() + timedelta(minutes=30))
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.sumup_access_token, 'fresh-access')
+        no_refresh_token.refresh_from_db()
+        self.assertEqual(no_refresh_token.sumup_access_token, 'orphan-access')
+
+    @patch('payments.sumup.refresh_access_token_direct')
+    def test_rejected_refresh_token_marks_artist_expired(self, mock_refresh):
+        mock_refresh.side_effect = requests.exceptions.HTTPError(response=Mock(status_code=401))
+        profile = self._profile('revoked', timedelta(minutes=10))
+
+        stats = ArtistTokenRefreshService().refresh_expiring_tokens(window_minutes=30, concurrency=1)
+
+        self.assertEqual(stats['expired'], 1)
+        profile.refresh_from_db()
+        self.assertEqual(profile.sumup_connection_status, 'expired')
+
+    @patch('payments.sumup.refresh_access_token_direct')
+    def test_transient_failure_only_flags_already_expired_tokens(self, mock_refresh):
+        mock_refresh.side_effect = requests.exceptions.ConnectionError('SumUp unavailable')
+        still_valid = self._profile('valid', timedelta(minutes=10))
+        already_expired = self._profile('lapsed', -timedelta(minutes=1))
+
+        stats = ArtistTokenRefreshService().refresh_expiring_tokens(window_minutes=30, concurrency=1)
+
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(stats['errors'], 1)
+        still_valid.refresh_from_db()
+        already_expired.refresh_from_db()
+        self.assertEqual(still_valid.sumup_connection_status, 'connected')
+        self.assertEqual(already_expired.sumup_connection_status, 'error')
@@ -0,0 +1,107 @@
+"""
+Tests for the SumUp webhook inbox.
+"""
+
+import json
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from payments.models import SumUpWebhookEvent
+from payments.webhook_inbox import WebhookInboxService
+
+
+class WebhookInboxTests(TestCase):
+
+    def _post_webhook(self, payload):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse('payments:sumup_webhook'),
+                data=json.dumps(payload),
+                content_type='application/json'
+            )
+
+    @override_settings(WEBHOOK_INBOX_ASYNC=False)
+    @patch('payments.views.process_sumup_webhook_event')
+    def test_redelivered_webhook_is_handled_once(self, mock_handler):
+        payload = {'id': 'chk-1', 'status': 'PAID'}
+
+        first = self._post_webhook(payload)
+        second = self._post_webhook(payload)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        mock_handler.assert_called_once_with(payload)
+
+        event = SumUpWebhookEvent.objects.get()
+        self.assertEqual(event.processing_status, 'processed')
+        self.assertEqual(event.delivery_count, 2)
+        self.assertEqual(event.dedup_key, 'sumup:chk-1::PAID')
+
+    @override_settings(WEBHOOK_INBOX_ASYNC=True)
+    @patch('payments.webhook_inbox.WebhookInboxService._queue_drain')
+    @patch('payments.views.process_sumup_webhook_event')
+    def test_async_mode_acks_then_drains(self, mock_handler, mock_queue):
+        self._post_webhook({'id': 'chk-1', 'status': 'PENDING'})
+        self._post_webhook({'id': 'chk-1', 'status': 'PAID'})
+
+        # Acknowledged without running the handler; a status change is a new event
+        mock_handler.assert_not_called()
+        self.assertEqual(mock_queue.call_count, 2)
+        self.assertEqual(SumUpWebhookEvent.objects.filter(processing_status='pending').count(), 2)
+
+        stats = WebhookInboxService().drain()
+        self.assertEqual(stats['processed'], 2)
+        self.assertEqual(
+            [call.args[0]['status'] for call in mock_handler.call_args_list],
+            ['PENDING', 'PAID']
+        )
+
+        self.assertEqual(WebhookInboxService().drain()['processed'], 0)
+        self.assertEqual(mock_handler.call_count, 2)
+
+    def test_invalid_payload_is_rejected(self):
+        response = self.client.post(
+            reverse('payments:sumup_webhook'),
+            data='not json',
+            content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(SumUpWebhookEvent.objects.exists())
+
+    @override_settings(WEBHOOK_INBOX_MAX_ATTEMPTS=2)
+    @patch('payments.views.process_sumup_webhook_event', side_effect=RuntimeError('boom'))
+    def test_failing_handler_retries_then_gives_up(self, mock_handler):
+        inbox = WebhookInboxService()
+        with patch.object(WebhookInboxService, 'is_async', return_value=True), \
+                patch.object(WebhookInboxService, '_queue_drain'):
+            event = inbox.record('sumup', {'id': 'chk-1', 'status': 'PAID'})
+
+        self.assertEqual(inbox.drain()['retrying'], 1)
+        event.refresh_from_db()
+        self.assertEqual(event.processing_status, 'pending')
+        self.assertEqual(event.last_error, 'boom')
+
+        self.assertEqual(inbox.drain()['failed'], 1)
+        event.refresh_from_db()
+        self.assertEqual(event.processing_status, 'failed')
+        self.assertEqual(event.attempts, 2)
+
+        self.assertEqual(inbox.drain(), {'processed': 0, 'retrying': 0, 'failed': 0, 'skipped': 0})
+
+    @patch('payments.views.process_sumup_webhook_event')
+    def test_event_claimed_elsewhere_is_skipped(self, mock_handler):
+        event = SumUpWebhookEvent.objects.create(
+            source='sumup',
+            dedup_key='sumup:chk-1::PAID',
+            checkout_id='chk-1',
+            event_status='PAID',
+            payload={'id': 'chk-1', 'status': 'PAID'},
+            processing_status='processing',
+        )
+        SumUpWebhookEvent.objects.filter(pk=event.pk).update(claimed_at=event.received_at)
+
+        self.assertEqual(WebhookInboxService().process_event(event.pk), 'skipped')
+        mock_handler.assert_not_called()
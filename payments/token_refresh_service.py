@@ -0,0 +1,170 @@
+"""
+Artist Token Refresh Service
+============================
+Refreshes SumUp OAuth tokens for connected artists before they expire, so
+checkout creation and payment polling almost never hit an expired token.
+
+Runs as a Django-Q scheduled task (or via `manage.py refresh_sumup_tokens`):
+
+    Schedule.objects.create(
+        name='SumUp Token Refresh - Every 10 Minutes',
+        func='payments.token_refresh_service.token_refresh_service.refresh_expiring_tokens',
+        schedule_type='I',
+        minutes=10,
+        repeats=-1
+    )
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from accounts.models import ArtistProfile
+from payments import sumup as sumup_api
+
+logger = logging.getLogger('payments.sumup')
+
+
+class ArtistTokenRefreshService:
+    """
+    Finds connected ArtistProfiles whose SumUp token expires within a window
+    and refreshes them in batches with bounded concurrency.
+
+    Refreshes go through sumup_api.token_manager, so they are single-flight
+    with any refresh a customer request triggers at the same moment.
+
+    Failures are recorded on sumup_connection_status:
+    - 'expired': SumUp rejected the refresh token (artist must reconnect)
+    - 'error':   refresh failed and the current token has already expired
+    A transient failure while the current token is still valid leaves the
+    artist connected; the next run retries it.
+    """
+
+    RETRYABLE_STATUSES = ('connected', 'error')
+
+    def get_window_minutes(self):
+        return getattr(settings, 'SUMUP_TOKEN_REFRESH_WINDOW_MINUTES', 30)
+
+    def get_batch_size(self):
+        return getattr(settings, 'SUMUP_TOKEN_REFRESH_BATCH_SIZE', 50)
+
+    def get_concurrency(self):
+        return max(1, getattr(settings, 'SUMUP_TOKEN_REFRESH_CONCURRENCY', 4))
+
+    def refresh_expiring_tokens(self, window_minutes=None, batch_size=None, concurrency=None):
+        """
+        Main entry point - refresh every artist token expiring within the window.
+
+        Args:
+            window_minutes: refresh tokens expiring within this many minutes
+            batch_size: profiles processed per batch
+            concurrency: parallel OAuth refreshes per batch (1 = inline)
+
+        Returns:
+            dict: counts of 'refreshed', 'skipped', 'expired', 'errors' and 'failed'
+                  plus 'duration_seconds'
+        """
+        started = time.monotonic()
+        window_minutes = window_minutes or self.get_window_minutes()
+        batch_size = batch_size or self.get_batch_size()
+        concurrency = concurrency or self.get_concurrency()
+        window_seconds = window_minutes * 60
+
+        profile_ids = list(
+            ArtistProfile.objects.filter(
+                sumup_connection_status__in=self.RETRYABLE_STATUSES,
+                sumup_expires_at__isnull=False,
+                sumup_expires_at__lte=timezone.now() + timedelta(minutes=window_minutes),
+            ).exclude(
+                sumup_refresh_token=''
+            ).order_by('sumup_expires_at').values_list('pk', flat=True)
+        )
+
+        stats = {'refreshed': 0, 'skipped': 0, 'expired': 0, 'errors': 0, 'failed': 0}
+
+        if not profile_ids:
+            logger.info("No artist SumUp tokens expiring soon")
+            stats['duration_seconds'] = round(time.monotonic() - started, 3)
+            return stats
+
+        logger.info(
+            f"Refreshing {len(profile_ids)} artist SumUp tokens expiring within {window_minutes} minutes "
+            f"(batch size {batch_size}, concurrency {concurrency})"
+        )
+
+        for offset in range(0, len(profile_ids), batch_size):
+            batch = profile_ids[offset:offset + batch_size]
+
+            if concurrency <= 1:
+                results = [self._refresh_one(profile_id, window_seconds) for profile_id in batch]
+            else:
+                with ThreadPoolExecutor(max_workers=min(concurrency, len(batch)),
+                                        thread_name_prefix='sumup-token-refresh') as executor:
+                    results = list(executor.map(
+                        lambda profile_id: self._refresh_one_in_thread(profile_id, window_seconds),
+                        batch
+                    ))
+
+            for result in results:
+                stats[result] += 1
+
+        stats['duration_seconds'] = round(time.monotonic() - started, 3)
+        logger.info(f"Artist token refresh complete: {stats}")
+        return stats
+
+    def _refresh_one_in_thread(self, profile_id, window_seconds):
+        """Thread-pool wrapper that releases the worker's DB connection."""
+        try:
+            return self._refresh_one(profile_id, window_seconds)
+        finally:
+            connections.close_all()
+
+    def _refresh_one(self, profile_id, window_seconds):
+        """
+        Refresh a single artist's token.
+
+        Returns:
+            str: 'refreshed', 'skipped', 'expired', 'errors' or 'failed'
+        """
+        before = ArtistProfile.objects.filter(pk=profile_id).values_list('sumup_expires_at', flat=True).first()
+
+        try:
+            profile = sumup_api.token_manager.refresh_artist_token_by_id(profile_id, min_ttl=window_seconds)
+        except ArtistProfile.DoesNotExist:
+            return 'skipped'
+        except requests.exceptions.HTTPError as e:
+            status_code = e.response.status_code if e.response is not None else None
+            if status_code in (400, 401):
+                logger.warning(f"SumUp rejected refresh token for artist profile {profile_id}: {e}")
+                self._record_failure(profile_id, 'expired')
+                return 'expired'
+            return self._handle_transient_failure(profile_id, e)
+        except Exception as e:
+            return self._handle_transient_failure(profile_id, e)
+
+        if profile.sumup_expires_at == before:
+            # Another worker refreshed it since we selected it
+            return 'skipped'
+        return 'refreshed'
+
+    def _handle_transient_failure(self, profile_id, error):
+        logger.error(f"SumUp token refresh failed for artist profile {profile_id}: {error}", exc_info=True)
+
+        expires_at = ArtistProfile.objects.filter(pk=profile_id).values_list('sumup_expires_at', flat=True).first()
+        if expires_at and expires_at <= timezone.now():
+            self._record_failure(profile_id, 'error')
+            return 'errors'
+        return 'failed'
+
+    def _record_failure(self, profile_id, status):
+        ArtistProfile.objects.filter(pk=profile_id).update(sumup_connection_status=status)
+
+
+# Singleton instance
+token_refresh_service = ArtistTokenRefreshService()
@@ -16,9 +16,11 @@ from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
 
+from cart.cart import get_checkout_cart
 from cart.models import Cart
 from orders.models import Order, OrderItem
 from events.models import Event
+from events.ticket_holds import ticket_holds
 from payments.connected_payment_service import ConnectedPaymentService
 from accounts.models import User
 from django.contrib.auth import login
@@ -26,6 +28,8 @@ from django.contrib.auth import login
 from .models import SumUpCheckout, SumUpTransaction
 from .forms import CheckoutForm, PaymentMethodForm
 from .marketplace_service import MarketplacePaymentService
+from .webhook_inbox import webhook_inbox
+from .fulfillment_service import fulfillment_service
 from orders.validators import validate_checkout_data, record_terms_acceptance
 
 from django.http import HttpResponse
@@ -35,7 +39,7 @@ from django_ratelimit.decorators import ratelimit
 from .models import SumUpCheckout, SumUpTransaction, Artist, ArtistSumUpAuth, Payment, Subscription
 from . import sumup as sumup_api
 from . import citypay as citypay_api
-from events.models import Ticket, EventFee
+from events.models import EventFee
 import logging
 
 logger = logging.getLogger(__name__)
@@ -62,21 +66,8 @@ class CheckoutView(FormView):
         return super().dispatch(request, *args, **kwargs)
     
     def get_cart(self):
-        """Get current cart for user or session."""
-        if self.request.user.is_authenticated:
-            return Cart.objects.filter(
-                user=self.request.user,
-                is_active=True
-            ).first()
-        else:
-            session_key = self.request.session.session_key
-            if not session_key:
-                self.request.session.create()
-                session_key = self.request.session.session_key
-            return Cart.objects.filter(
-                session_key=session_key,
-                is_active=True
-            ).first()
+        """Get current cart for user or session (an anonymous session cart is saved to a Cart row here)."""
+        return get_checkout_cart(self.request)
     
     def get_initial(self):
         """Pre-fill form for logged-in users."""
@@ -101,6 +92,11 @@ class CheckoutView(FormView):
     
     def form_valid(self, form):
         """Process valid checkout form."""
+        # A resubmitted checkout replaces the previous attempt's order and holds
+        previous_order_id = self.request.session.get('pending_order_id')
+        if previous_order_id:
+            ticket_holds.release_order(previous_order_id)
+
         try:
             # Validate checkout data comprehensively
             validate_checkout_data(form.cleaned_data, self.cart)
@@ -110,6 +106,14 @@ class CheckoutView(FormView):
                 messages.error(self.request, error)
             return self.form_invalid(form)
 
+        # Set the tickets aside until payment (or TICKET_HOLD_TTL_SECONDS)
+        try:
+            holds = ticket_holds.hold_items(self.cart.items.all())
+        except ValidationError as e:
+            for error in e.messages:
+                messages.error(self.request, error)
+            return self.form_invalid(form)
+
         with transaction.atomic():
             # Handle guest account creation
             if not self.request.user.is_authenticated and form.cleaned_data.get('create_account'):
@@ -124,6 +128,7 @@ class CheckoutView(FormView):
 
             # Create order
             order = self.create_order(form.cleaned_data)
+            ticket_holds.assign(holds, order)
 
             # Record T&C acceptance with legal metadata (IP address, timestamp, version)
             if form.cleaned_data.get('accept_terms'):
@@ -341,107 +346,6 @@ class ConnectedSumUpCheckoutView(View):
             return redirect('payments:select_method')
 
 
-class SumUpCallbackView(View):
-    """Handle SumUp payment callbacks."""
-
-    def get(self, request):
-        """Handle SumUp return URL callback."""
-        checkout_id = request.GET.get('id')
-        status = request.GET.get('status')
-
-        if not checkout_id:
-            messages.error(request, "Invalid payment callback.")
-            return redirect('events:home')
-
-        try:
-            # Get checkout record
-            checkout = SumUpCheckout.objects.get(sumup_checkout_id=checkout_id)
-
-            # Update status from SumUp
-            sumup_status = sumup_api.get_checkout_status(checkout_id)
-            checkout.sumup_response = sumup_status
-            checkout.status = self.map_sumup_status(sumup_status['status'])
-            checkout.save()
-
-            if checkout.status == 'paid':
-                # Process successful payment
-                self.process_successful_payment(checkout)
-                messages.success(request, "Payment successful! Your tickets have been confirmed.")
-                return redirect('orders:confirmation', pk=checkout.order.id)
-            else:
-                messages.error(request, "Payment was not completed.")
-                return redirect('payments:select_method')
-
-        except SumUpCheckout.DoesNotExist:
-            messages.error(request, "Payment session not found.")
-            return redirect('events:home')
-        except Exception as e:
-            logger.error(f"Payment callback error: {e}")
-            messages.error(request, "Payment verification failed.")
-            return redirect('payments:select_method')
-
-    def map_sumup_status(self, sumup_status):
-        """Map SumUp status to our status."""
-        status_map = {
-            'PENDING': 'pending',
-            'SUCCESSFUL': 'paid',
-            'PAID': 'paid',
-            'FAILED': 'failed',
-            'EXPIRED': 'expired'
-        }
-        return status_map.get(sumup_status, 'pending')
-
-    def process_successful_payment(self, checkout):
-        """Process successful payment."""
-        order = checkout.order
-
-        with transaction.atomic():
-            # Update order status
-            order.status = 'confirmed'
-            order.payment_date = timezone.now()
-            order.save()
-
-            # Create transaction record
-            if 'transaction_id' in checkout.sumup_response:
-                SumUpTransaction.objects.create(
-                    checkout=checkout,
-                    sumup_transaction_id=checkout.sumup_response['transaction_id'],
-                    transaction_code=checkout.sumup_response.get('transaction_code', ''),
-                    amount=checkout.amount,
-                    currency=checkout.currency,
-                    status='successful',
-                    timestamp=timezone.now(),
-                    sumup_response=checkout.sumup_response
-                )
-
-            # Generate tickets for each order item
-            for item in order.items.all():
-                for _ in range(item.quantity):
-                    ticket = Ticket.objects.create(
-                        event=item.event,
-                        customer=order.user if order.user else None,
-                        customer_email=order.email,
-                        customer_name=f"{order.delivery_first_name} {order.delivery_last_name}",
-                        order=order,
-                        price=item.price,
-                        status='confirmed'
-                    )
-                    # Generate QR code
-                    ticket.generate_qr_code()
-
-                # Update event tickets sold
-                item.event.tickets_sold += item.quantity
-                item.event.save()
-
-            # Clear the cart
-            if checkout.customer:
-                Cart.objects.filter(user=checkout.customer, is_active=True).delete()
-
-            # Remove order from session
-            if 'pending_order_id' in self.request.session:
-                del self.request.session['pending_order_id']
-
-
 class SumUpSuccessView(TemplateView):
     """Display success page after payment."""
     template_name = 'payments/success.html'
@@ -463,36 +367,44 @@ class SumUpWebhookView(View):
     """Handle SumUp webhook notifications."""
 
     def post(self, request):
-        """Process webhook notification."""
+        """Validate and store the webhook; process_event runs from the inbox."""
         try:
-            # Parse webhook data
             payload = json.loads(request.body)
-            event_type = payload.get('event_type')
-            event_data = payload.get('payload', {})
-
-            logger.info(f"SumUp webhook received: {event_type}")
-
-            # Handle different event types
-            if event_type == 'checkout.completed':
-                self.handle_checkout_completed(event_data)
-            elif event_type == 'checkout.failed':
-                self.handle_checkout_failed(event_data)
-            elif event_type == 'payment.successful':
-                self.handle_payment_successful(event_data)
-            elif event_type == 'refund.successful':
-                self.handle_refund_successful(event_data)
-            else:
-                logger.info(f"Unhandled webhook event: {event_type}")
-
-            return JsonResponse({'status': 'success'})
-
         except json.JSONDecodeError:
             logger.error("Invalid JSON in webhook payload")
             return JsonResponse({'error': 'Invalid payload'}, status=400)
+
+        if not isinstance(payload, dict):
+            logger.error("Invalid webhook payload")
+            return JsonResponse({'error': 'Invalid payload'}, status=400)
+
+        logger.info(f"SumUp webhook received: {payload.get('event_type')}")
+
+        try:
+            webhook_inbox.record('sumup_event', payload)
         except Exception as e:
-            logger.error(f"Webhook processing error: {e}")
+            logger.error(f"Webhook storage error: {e}")
             return JsonResponse({'error': 'Processing failed'}, status=500)
 
+        return JsonResponse({'status': 'success'})
+
+    def process_event(self, payload):
+        """Apply a stored webhook event."""
+        event_type = payload.get('event_type')
+        event_data = payload.get('payload', {})
+
+        # Handle different event types
+        if event_type == 'checkout.completed':
+            self.handle_checkout_completed(event_data)
+        elif event_type == 'checkout.failed':
+            self.handle_checkout_failed(event_data)
+        elif event_type == 'payment.successful':
+            self.handle_payment_successful(event_data)
+        elif event_type == 'refund.successful':
+            self.handle_refund_successful(event_data)
+        else:
+            logger.info(f"Unhandled webhook event: {event_type}")
+
     def handle_checkout_completed(self, data):
         """Handle successful checkout completion."""
         checkout_id = data.get('id')
@@ -502,14 +414,9 @@ class SumUpWebhookView(View):
             checkout = SumUpCheckout.objects.get(sumup_checkout_id=checkout_id)
 
             if checkout.status != 'paid':
-                checkout.status = 'paid'
-                checkout.paid_at = timezone.now()
-                checkout.sumup_response = data
-                checkout.save()
-
                 # Process the payment
                 callback_view = SumUpCallbackView()
-                callback_view.process_successful_payment(checkout)
+                callback_view.handle_successful_payment(checkout, data)
 
                 logger.info(f"Checkout {checkout_id} marked as paid via webhook")
 
@@ -597,6 +504,11 @@ class SumUpWebhookView(View):
             logger.error(f"Transaction {transaction_id} not found for refund webhook")
 
 
+def process_sumup_event_webhook(payload):
+    """Webhook inbox handler for SumUpWebhookView events."""
+    SumUpWebhookView().process_event(payload)
+
+
 class ProcessSumUpPaymentView(View):
     """Create SumUp checkout and redirect to payment."""
     
@@ -686,46 +598,34 @@ class SumUpCallbackView(View):
     
     def handle_successful_payment(self, checkout, data):
         """Process successful payment."""
+        transaction_data = (data.get('transactions') or [{}])[0]
         with transaction.atomic():
-            # Update checkout
-            checkout.status = 'paid'
-            checkout.paid_at = timezone.now()
-            checkout.sumup_response = data
-            checkout.save()
-            
-            # Create transaction record
-            transaction_data = data.get('transactions', [{}])[0]
-            SumUpTransaction.objects.create(
+            # Mark the order paid, issue its tickets and convert its holds
+            # (no-op if another path already fulfilled it)
+            result = fulfillment_service.fulfill_order(
+                checkout.order,
                 checkout=checkout,
-                sumup_transaction_id=transaction_data.get('id'),
-                transaction_code=transaction_data.get('transaction_code'),
-                amount=Decimal(str(transaction_data.get('amount', 0))),
-                currency=transaction_data.get('currency', 'GBP'),
-                status='successful',
-                payment_type='ecom',
-                timestamp=transaction_data.get('timestamp', timezone.now()),
-                sumup_response=transaction_data
+                payment_data=data,
+                transaction_id=transaction_data.get('transaction_code')
             )
-            
-            # Update order
-            order = checkout.order
-            order.status = 'processing'
-            order.is_paid = True
-            order.paid_at = timezone.now()
-            order.transaction_id = transaction_data.get('transaction_code')
-            order.save()
-            
-            # Update event ticket availability
-            for item in order.items.all():
-                # Update tickets sold count
-                item.event.tickets_sold += item.quantity
-                if item.event.tickets_sold >= item.event.capacity:
-                    item.event.status = 'sold_out'
-                item.event.save()
-            
+
+            # Create transaction record
+            if result.created and transaction_data.get('id'):
+                SumUpTransaction.objects.create(
+                    checkout=checkout,
+                    sumup_transaction_id=transaction_data['id'],
+                    transaction_code=transaction_data.get('transaction_code'),
+                    amount=Decimal(str(transaction_data.get('amount', 0))),
+                    currency=transaction_data.get('currency', 'GBP'),
+                    status='successful',
+                    payment_type='ecom',
+                    timestamp=transaction_data.get('timestamp', timezone.now()),
+                    sumup_response=transaction_data
+                )
+
             # Clear cart
-            if order.user:
-                Cart.objects.filter(user=order.user, is_active=True).delete()
+            if result.order.user:
+                Cart.objects.filter(user=result.order.user, is_active=True).delete()
     
     def handle_failed_payment(self, checkout, data):
         """Process failed payment."""
@@ -786,6 +686,7 @@ class PaymentCancelView(TemplateView):
                 if order.status == 'pending':
                     order.status = 'cancelled'
                     order.save()
+                    ticket_holds.release_order(order.pk)
                 context['order'] = order
             except Order.DoesNotExist:
                 pass
@@ -1081,22 +982,27 @@ def sumup_webhook(request):
         data = json.loads(request.body.decode("utf-8"))
     except Exception:
         return HttpResponseBadRequest("Invalid JSON")
+    if not isinstance(data, dict):
+        return HttpResponseBadRequest("Invalid JSON")
 
-    # Handle test checkout IDs
-    checkout_id = data.get("id") or data.get("checkout_id")
-    status = data.get("status")
+    logger.info(f"SumUp webhook received: checkout_id={data.get('id') or data.get('checkout_id')}, status={data.get('status')}")
+
+    # Store and acknowledge - process_sumup_webhook_event runs from the inbox
+    webhook_inbox.record('sumup', data)
+    return HttpResponse("ok")
 
-    if not checkout_id:
-        return HttpResponse("ok")
 
-    logger.info(f"SumUp webhook received: checkout_id={checkout_id}, status={status}")
+def process_sumup_webhook_event(data):
+    """Apply a stored SumUp checkout webhook (called by the webhook inbox)."""
+    checkout_id = data.get("id") or data.get("checkout_id")
+    status = data.get("status")
 
     # Handle successful payments using marketplace service
     if status in ['PAID', 'SUCCESSFUL']:
         marketplace_service = MarketplacePaymentService()
         success = marketplace_service.handle_successful_payment(checkout_id, data)
         if success:
-            return HttpResponse("ok")
+            return
 
     # Try to find SumUpCheckout for other status updates
     try:
@@ -1111,24 +1017,18 @@ def sumup_webhook(request):
                 p.save()
                 p.order.status = "PAID"
                 p.order.save()
-            return HttpResponse("ok")
+            return
         except Payment.DoesNotExist:
-            return HttpResponse("ok")
+            return
     
     # Handle SumUpCheckout
     if status == "PAID" or status == "SUCCESSFUL":
-        checkout.status = 'paid'
-        checkout.paid_at = timezone.now()
-        checkout.sumup_response = data
-        checkout.save()
-        
-        # Update order
-        order = checkout.order
-        order.is_paid = True
-        order.status = 'confirmed'
-        order.paid_at = timezone.now()
-        order.save()
-        
+        # Mark checkout and order paid and issue the tickets (no-op if already fulfilled)
+        if checkout.order_id:
+            fulfillment_service.fulfill_order(
+                checkout.order, status='confirmed', checkout=checkout, payment_data=data
+            )
+
     elif status == "FAILED":
         checkout.status = 'failed'
         checkout.sumup_response = data
@@ -1137,8 +1037,7 @@ def sumup_webhook(request):
         order = checkout.order
         order.status = 'cancelled'
         order.save()
-    
-    return HttpResponse("ok")
+
 
 # --- Monthly subscription billing (CityPay or SumUp token) ---
 
@@ -0,0 +1,222 @@
+"""
+SumUp Webhook Inbox
+===================
+Webhook views validate the payload, store it as a SumUpWebhookEvent and
+acknowledge SumUp immediately. The inbox is drained in the background and
+each event's handler runs exactly once, however many times SumUp redelivers.
+
+With django_q enabled every new event queues a drain task, and a schedule
+picks up anything left behind (retries, crashed workers):
+
+    Schedule.objects.create(
+        name='SumUp Webhook Inbox - Every Minute',
+        func='payments.webhook_inbox.webhook_inbox.drain',
+        schedule_type='I',
+        minutes=1,
+        repeats=-1
+    )
+
+Without a worker (WEBHOOK_INBOX_ASYNC=false) the event is processed inline
+straight after it is stored, so deduplication still applies. That path is
+for development only: the handler then runs inside the webhook request, so
+SumUp waits on it and a slow or failing handler is only retried by a drain.
+Production runs with a qcluster worker and WEBHOOK_INBOX_ASYNC=true.
+"""
+
+import hashlib
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from payments.models import SumUpWebhookEvent
+
+logger = logging.getLogger('payments.webhooks')
+
+
+class WebhookInboxService:
+    """
+    Stores incoming webhooks and drains them through the per-source handlers.
+
+    Handlers are referenced by dotted path so this module can be imported
+    from the view modules that define them.
+    """
+
+    HANDLERS = {
+        'sumup': 'payments.views.process_sumup_webhook_event',
+        'sumup_event': 'payments.views.process_sumup_event_webhook',
+        'checkout_paid': 'payments.success_views.process_checkout_paid_webhook',
+        'listing_fee': 'events.listing_fee_views.process_listing_fee_webhook',
+        # Widget payments are confirmed on the success redirect; stored for audit only
+        'widget': None,
+    }
+
+    def get_batch_size(self):
+        return getattr(settings, 'WEBHOOK_INBOX_BATCH_SIZE', 100)
+
+    def get_max_attempts(self):
+        return getattr(settings, 'WEBHOOK_INBOX_MAX_ATTEMPTS', 5)
+
+    def get_claim_timeout(self):
+        return getattr(settings, 'WEBHOOK_INBOX_CLAIM_TIMEOUT_SECONDS', 300)
+
+    def is_async(self):
+        return getattr(settings, 'WEBHOOK_INBOX_ASYNC', False)
+
+    @staticmethod
+    def extract_event_fields(payload):
+        """
+        Pull the dedup fields out of a webhook payload.
+
+        Handles both the flat checkout payload ({"id", "status", ...}) and the
+        event envelope ({"event_type", "payload": {"id", "status", ...}}).
+
+        Returns:
+            tuple: (checkout_id, event_type, event_status) as strings
+        """
+        data = payload.get('payload') if isinstance(payload.get('payload'), dict) else payload
+        checkout_id = data.get('id') or data.get('checkout_id') or payload.get('id') or ''
+        event_type = payload.get('event_type') or ''
+        event_status = data.get('status') or payload.get('status') or ''
+        return str(checkout_id), str(event_type), str(event_status)
+
+    @staticmethod
+    def build_dedup_key(source, checkout_id, event_type, event_status):
+        key = f"{source}:{checkout_id}:{event_type}:{event_status}"
+        if len(key) > 255:
+            key = f"{source}:{hashlib.sha256(key.encode('utf-8')).hexdigest()}"
+        return key
+
+    def record(self, source, payload):
+        """
+        Store a webhook payload in the inbox.
+
+        Args:
+            source: key into HANDLERS for the endpoint that received it
+            payload: parsed JSON body
+
+        Returns:
+            SumUpWebhookEvent or None if the payload has no checkout id
+        """
+        if source not in self.HANDLERS:
+            raise ValueError(f"Unknown webhook source: {source}")
+
+        checkout_id, event_type, event_status = self.extract_event_fields(payload)
+        if not checkout_id:
+            logger.info(f"Ignoring {source} webhook without checkout id")
+            return None
+
+        # get_or_create settles a concurrent redelivery's insert itself: it
+        # retries the lookup after the unique dedup_key violation
+        event, created = SumUpWebhookEvent.objects.get_or_create(
+            dedup_key=self.build_dedup_key(source, checkout_id, event_type, event_status),
+            defaults={
+                'source': source,
+                'checkout_id': checkout_id,
+                'event_type': event_type,
+                'event_status': event_status,
+                'payload': payload,
+            }
+        )
+
+        if not created:
+            SumUpWebhookEvent.objects.filter(pk=event.pk).update(delivery_count=F('delivery_count') + 1)
+            logger.info(f"Duplicate {source} webhook for {checkout_id} ({event_type}/{event_status}) - already in inbox")
+            return event
+
+        logger.info(f"Stored {source} webhook for {checkout_id} ({event_type}/{event_status}) as inbox event {event.pk}")
+
+        if self.is_async():
+            transaction.on_commit(self._queue_drain)
+        else:
+            transaction.on_commit(lambda: self.process_event(event.pk))
+
+        return event
+
+    def _queue_drain(self):
+        try:
+            from django_q.tasks import async_task
+            async_task('payments.webhook_inbox.webhook_inbox.drain')
+        except Exception as e:
+            # The scheduled drain will pick the event up
+            logger.error(f"Failed to queue webhook inbox drain: {e}")
+
+    def _claimable_q(self, now):
+        stale_before = now - timedelta(seconds=self.get_claim_timeout())
+        return Q(processing_status='pending') | Q(processing_status='processing', claimed_at__lt=stale_before)
+
+    def drain(self, batch_size=None):
+        """
+        Main entry point - process pending inbox events, oldest first.
+
+        Args:
+            batch_size: maximum number of events to process in this run
+
+        Returns:
+            dict: counts of 'processed', 'retrying', 'failed' and 'skipped'
+        """
+        batch_size = batch_size or self.get_batch_size()
+        stats = {'processed': 0, 'retrying': 0, 'failed': 0, 'skipped': 0}
+
+        event_ids = list(
+            SumUpWebhookEvent.objects.filter(
+                self._claimable_q(timezone.now())
+            ).order_by('received_at', 'pk').values_list('pk', flat=True)[:batch_size]
+        )
+
+        if not event_ids:
+            return stats
+
+        for event_id in event_ids:
+            stats[self.process_event(event_id)] += 1
+
+        logger.info(f"Webhook inbox drain complete: {stats}")
+        return stats
+
+    def process_event(self, event_id):
+        """
+        Claim and handle a single inbox event.
+
+        The claim is a conditional UPDATE, so concurrent drains (or an inline
+        call racing a worker) never run the same event twice.
+
+        Returns:
+            str: 'processed', 'retrying', 'failed' or 'skipped' (claimed elsewhere)
+        """
+        now = timezone.now()
+        claimed = SumUpWebhookEvent.objects.filter(pk=event_id).filter(
+            self._claimable_q(now)
+        ).update(processing_status='processing', claimed_at=now, attempts=F('attempts') + 1)
+
+        if not claimed:
+            return 'skipped'
+
+        event = SumUpWebhookEvent.objects.get(pk=event_id)
+        handler_path = self.HANDLERS.get(event.source)
+
+        try:
+            if handler_path:
+                import_string(handler_path)(event.payload)
+        except Exception as e:
+            logger.error(f"Webhook inbox event {event.pk} ({event.source}) failed: {e}", exc_info=True)
+            status = 'failed' if event.attempts >= self.get_max_attempts() else 'pending'
+            SumUpWebhookEvent.objects.filter(pk=event.pk).update(
+                processing_status=status,
+                last_error=str(e)
+            )
+            return 'failed' if status == 'failed' else 'retrying'
+
+        SumUpWebhookEvent.objects.filter(pk=event.pk).update(
+            processing_status='processed',
+            processed_at=timezone.now(),
+            last_error=''
+        )
+        return 'processed'
+
+
+# Singleton instance
+webhook_inbox = WebhookInboxService()
@@ -13,6 +13,7 @@ from django.contrib.auth.models import AnonymousUser
 
 from . import sumup as sumup_api
 from .models import SumUpCheckout
+from .fulfillment_service import fulfillment_service
 from orders.models import Order
 from events.models import Event, ListingFee
 
@@ -240,28 +241,15 @@ class SumUpWidgetService:
         try:
             checkout = SumUpCheckout.objects.get(sumup_checkout_id=checkout_id)
 
-            # Update checkout status
-            checkout.status = 'paid'
-            checkout.paid_at = timezone.now()
-            checkout.save()
-
             # Handle different types of payments
             if checkout.order:
-                # Customer order payment
-                order = checkout.order
-                order.status = 'confirmed'
-                order.is_paid = True
-                order.paid_at = timezone.now()
-                order.save()
+                # Customer order payment - marks order and checkout paid, issues
+                # tickets and queues the confirmation emails (once per order)
+                result = fulfillment_service.fulfill_order(checkout.order, status='confirmed', checkout=checkout)
+                order = result.order
 
                 logger.info(f"Order {order.order_number} marked as paid via widget")
 
-                # Generate tickets for each order item
-                tickets = self._generate_tickets_for_order(order)
-
-                # Send confirmation emails
-                self._send_order_confirmation_emails(order, tickets)
-
                 return {
                     'type': 'order',
                     'order': order,
@@ -269,6 +257,10 @@ class SumUpWidgetService:
                 }
 
             else:
+                checkout.status = 'paid'
+                checkout.paid_at = timezone.now()
+                checkout.save()
+
                 # Check if it's a listing fee
                 try:
                     listing_fee = ListingFee.objects.get(sumup_checkout_id=checkout_id)
@@ -319,83 +311,3 @@ class SumUpWidgetService:
             'success_url': checkout.return_url,
             'site_url': settings.SITE_URL
         }
-
-    def _generate_tickets_for_order(self, order):
-        """Generate tickets for all items in an order."""
-        from events.models import Ticket
-
-        tickets_created = []
-
-        for order_item in order.items.all():
-            event = order_item.event
-            quantity = order_item.quantity
-
-            # Create tickets for each quantity
-            for i in range(quantity):
-                try:
-                    ticket = Ticket.objects.create(
-                        event=event,
-                        customer=order.user,
-                        order=order,
-                        status='valid'
-                    )
-
-                    # Generate PDF ticket with QR code
-                    pdf_generated = ticket.generate_pdf_ticket()
-                    if pdf_generated:
-                        debug_logger.info(f"Generated PDF ticket for {ticket.ticket_number}")
-                    else:
-                        debug_logger.warning(f"Failed to generate PDF for ticket {ticket.ticket_number}")
-
-                    tickets_created.append(ticket)
-                    logger.info(f"Generated ticket {ticket.ticket_number} for order {order.order_number}")
-
-                except Exception as e:
-                    logger.error(f"Failed to generate ticket for order {order.order_number}: {e}")
-                    debug_logger.error(f"Ticket creation error: {type(e).__name__}: {e}")
-                    # Continue creating other tickets even if one fails
-
-        logger.info(f"Generated {len(tickets_created)} tickets for order {order.order_number}")
-        return tickets_created
-
-    def _send_order_confirmation_emails(self, order, tickets):
-        """Send order confirmation emails to customer and notify organizers."""
-        try:
-            from events.email_utils import email_service
-
-            # Send confirmation email to customer
-            customer_email_sent = email_service.send_order_confirmation(order)
-
-            if customer_email_sent:
-                logger.info(f"Order confirmation email sent to {order.email}")
-            else:
-                logger.warning(f"Failed to send order confirmation email to {order.email}")
-
-            # Send notifications to organizers for each event
-            organizers_notified = set()
-            for order_item in order.items.all():
-                event = order_item.event
-                organizer = event.organiser
-
-                # Only send one notification per organizer
-                if organizer.email not in organizers_notified:
-                    try:
-                        # Get the artist profile for the notification
-                        artist_profile = getattr(organizer, 'artistprofile', None)
-
-                        if artist_profile:
-                            organizer_email_sent = email_service.send_artist_notification(order, artist_profile)
-                            if organizer_email_sent:
-                                logger.info(f"Order notification sent to organizer {organizer.email}")
-                                organizers_notified.add(organizer.email)
-                            else:
-                                logger.warning(f"Failed to send notification to organizer {organizer.email}")
-                        else:
-                            logger.warning(f"No artist profile found for organizer {organizer.email}")
-
-                    except Exception as e:
-                        logger.error(f"Error sending notification to organizer {organizer.email}: {e}")
-
-        except Exception as e:
-            logger.error(f"Error sending order confirmation emails: {e}")
-            # Don't raise exception - emails are not critical for order completion
\ No newline at end of file
@@ -2,6 +2,7 @@
 SumUp Widget-based payment views for Jersey Events.
 """
 
+import json
 import logging
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
@@ -16,6 +17,7 @@ from django.contrib.auth.models import AnonymousUser
 from orders.models import Order
 from events.models import Event, ListingFee, ListingFeeConfig
 from .widget_service import SumUpWidgetService
+from .webhook_inbox import webhook_inbox
 
 logger = logging.getLogger(__name__)
 
@@ -247,8 +249,15 @@ def widget_cancel(request):
 @csrf_exempt
 def widget_webhook(request):
     """Handle webhook notifications from SumUp widget payments."""
-    # Widget payments are handled via the success URL redirect
-    # This endpoint is here for any additional webhook processing if needed
+    # Widget payments are handled via the success URL redirect; the event is
+    # only stored in the webhook inbox for auditing
+    if request.method == 'POST':
+        try:
+            payload = json.loads(request.body.decode('utf-8'))
+            if isinstance(payload, dict):
+                webhook_inbox.record('widget', payload)
+        except Exception as e:
+            logger.warning(f"Widget webhook not stored: {e}")
     return JsonResponse({'status': 'ok'})
 
 
@@ -206,15 +206,25 @@ echo ""
 # - Debug logging temporarily enabled to diagnose startup issues
 # - Access and error logging to stderr for Railway logs
 # - Graceful timeout for clean shutdowns
+# WEB_SERVER_MODE=asgi serves the ASGI app on uvicorn workers, so the
+# validation dashboard's live streams don't each hold a sync worker
+if [ "${WEB_SERVER_MODE:-wsgi}" = "asgi" ]; then
+    APP_MODULE="events.asgi:application"
+    WORKER_CLASS="uvicorn.workers.UvicornWorker"
+else
+    APP_MODULE="events.wsgi:application"
+    WORKER_CLASS="sync"
+fi
+
 echo "🚀 Executing gunicorn now..."
-echo "Command: gunicorn events.wsgi:application --bind 0.0.0.0:$PORT ..."
+echo "Command: gunicorn $APP_MODULE --bind 0.0.0.0:$PORT --worker-class $WORKER_CLASS ..."
 echo ""
 
 # Don't use exec so we can see error output if gunicorn fails
-gunicorn events.wsgi:application \
+gunicorn $APP_MODULE \
     --bind 0.0.0.0:$PORT \
     --workers 2 \
-    --worker-class sync \
+    --worker-class $WORKER_CLASS \
     --timeout 120 \
     --graceful-timeout 30 \
     --preload \